@@ -1 +1,9 @@
 """ChainAlign Server - Arena for comparing model chains."""
+import sys
+from pathlib import Path
+
+# The arena package imports itself as top-level `arena`, so make the server
+# directory importable when the app is loaded as `server.main`.
+server_dir = Path(__file__).parent
+if str(server_dir) not in sys.path:
+    sys.path.insert(0, str(server_dir))
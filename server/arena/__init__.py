@@ -1,7 +1,49 @@
 # Arena package for TTS model management and ELO calculations
 
-from arena.arena_base import Model, ModelChain, ArenaBase
+from arena.arena_base import (
+    Model,
+    ModelChain,
+    ArenaBase,
+    acall_model,
+    aiter_chunks,
+    astream_model,
+    interleave_streams,
+    join_chunks,
+)
+from arena.bradley_terry import BradleyTerryRater, BradleyTerryResult, count_pairs
+from arena.batching import BatchedModel, BatchStats, MicroBatcher
+from arena.bridge import SentenceBridge, split_sentences
+from arena.executors import (
+    ExecutionBackend,
+    ExecutorRegistry,
+    default_executors,
+    worker_state,
+)
+from arena.checkpoint import checkpoint_bytes, checkpoint_position, load_checkpoint, save_checkpoint
+from arena.cache import CachedModel, CacheStats, StageCache, stage_key
+from arena.ingest import VoteIngestor
+from arena.metrics import (
+    CallMetrics,
+    InstrumentedModel,
+    MetricsRegistry,
+    render_snapshots,
+)
+from arena.matchmaking import Matchmaker, MatchupSnapshot, SumTree, information_gain
+from arena.planner import ChainPlanner
+from arena.rating_engines import (
+    EloEngine,
+    Glicko2Engine,
+    RatingEngine,
+    TrueSkillEngine,
+    glicko2_period,
+)
+from arena.ratings import RankedIndex, RatingStore
+from arena.replay import ChainIndex, EloReplayEngine, VoteLog, OUTCOME_CODES
+from arena.shared import SharedRatings, WriterLease
+from arena.singleflight import CoalescedModel, SingleFlight
+from arena.snapshot import RatingSnapshot
 from arena.types import VoteOutcome, TTSModelName
+from arena.wal import VoteWAL, WALRecord, log_position, replay_records, split_log_position
 from arena.elo import (
     calculate_elo,
     calculate_elo_tie,
@@ -17,6 +59,62 @@ __all__ = [
     "Model",
     "ModelChain",
     "ArenaBase",
+    "acall_model",
+    "aiter_chunks",
+    "astream_model",
+    "interleave_streams",
+    "join_chunks",
+    "ChainPlanner",
+    "Matchmaker",
+    "MatchupSnapshot",
+    "SumTree",
+    "information_gain",
+    "CachedModel",
+    "CacheStats",
+    "StageCache",
+    "stage_key",
+    "CoalescedModel",
+    "SentenceBridge",
+    "split_sentences",
+    "MetricsRegistry",
+    "CallMetrics",
+    "InstrumentedModel",
+    "render_snapshots",
+    "SingleFlight",
+    "BatchedModel",
+    "BatchStats",
+    "MicroBatcher",
+    "RatingEngine",
+    "EloEngine",
+    "Glicko2Engine",
+    "TrueSkillEngine",
+    "glicko2_period",
+    "RatingStore",
+    "RankedIndex",
+    "RatingSnapshot",
+    "VoteIngestor",
+    "SharedRatings",
+    "WriterLease",
+    "VoteWAL",
+    "WALRecord",
+    "replay_records",
+    "log_position",
+    "split_log_position",
+    "checkpoint_bytes",
+    "checkpoint_position",
+    "load_checkpoint",
+    "save_checkpoint",
+    "EloReplayEngine",
+    "ChainIndex",
+    "BradleyTerryRater",
+    "BradleyTerryResult",
+    "count_pairs",
+    "VoteLog",
+    "OUTCOME_CODES",
+    "ExecutionBackend",
+    "ExecutorRegistry",
+    "default_executors",
+    "worker_state",
     "VoteOutcome",
     "TTSModelName",
     "calculate_elo",
@@ -1,6 +1,13 @@
-from typing import Generic, TypeVar, Protocol, Callable
+import asyncio
+import inspect
+from typing import Any, AsyncIterator, Generic, Iterable, Optional, TypeVar, Protocol, Callable
 from arena.types import VoteOutcome, TTSModelName
-from arena.elo import calculate_team_elo_from_vote, calculate_elo_from_vote
+from arena.executors import ExecutionBackend, default_executors
+from arena.ratings import RatingStore
+from arena.matchmaking import Matchmaker
+from arena.rating_engines import EloEngine, RatingEngine
+from arena.replay import OUTCOME_CODES, VoteLog
+from arena.snapshot import RatingSnapshot
 
 TInput = TypeVar("TInput")
 TOutput = TypeVar("TOutput")
@@ -19,35 +26,260 @@ class Model(Protocol[TInput, TOutput]):
     Attributes:
         name: Human-readable name/identifier for the model (acts as unique hash key)
         function: The callable that performs the model's inference
+        backend: Where a synchronous `function` runs when called asynchronously
+            (inline, shared thread pool, or a warm process pool)
+        pool: Name of the process pool used by the PROCESS backend
 
     Usage:
         Models can be hashed and compared by name, making them suitable for use
         as dictionary keys or in sets for tracking ELO ratings and statistics.
+        Async callers should go through `acall`, which awaits coroutine
+        functions directly and moves blocking functions off the event loop.
+        Models that can consume their input incrementally override `astream`.
     """
 
-    def __init__(self, name: str, function: Callable[[TInput], TOutput]) -> None:
+    __slots__ = ("name", "function", "backend", "pool")
+
+    name: str
+    function: Callable[[TInput], TOutput]
+    backend: ExecutionBackend
+    pool: str
+
+    def __init__(
+        self,
+        name: str,
+        function: Callable[[TInput], TOutput],
+        backend: ExecutionBackend = ExecutionBackend.THREAD,
+        pool: str = "default",
+    ) -> None:
         self.function = function
         self.name = name
+        self.backend = backend
+        self.pool = pool
 
     def __call__(self, input_data: TInput) -> TOutput: ...
 
+    async def acall(self, input_data: TInput) -> TOutput:
+        """Awaitable counterpart of `__call__` that never blocks the event loop."""
+        return await _run_blocking(self, input_data)
+
+    async def astream(self, chunks: AsyncIterator[TInput]) -> AsyncIterator[TOutput]:
+        """
+        Streaming counterpart of `acall`.
+
+        The default implementation buffers the whole input and yields the
+        output as a single chunk; incremental models override it to start
+        producing output before the input is complete.
+        """
+        async for chunk in _buffered_stream(self, chunks):
+            yield chunk
+
     def __repr__(self) -> str:
         return f"Model(name={self.name})"
 
     def __hash__(self) -> int:
+        # str caches its own hash, so this is O(1) after the first lookup
         return hash(self.name)
 
     def __eq__(self, other) -> bool:
-        if isinstance(other, Model):
-            return self.name == other.name
-        return False
+        # Model is a (non runtime-checkable) Protocol, so compare by duck type
+        if other is self:
+            return True
+        name = getattr(other, "name", None)
+        return isinstance(name, str) and callable(other) and name == self.name
+
+
+async def _run_blocking(function: Callable[[Any], Any], input_data: Any) -> Any:
+    """
+    Run a synchronous callable on its declared execution backend.
+
+    Coroutine callables are awaited directly; anything else runs where its
+    `backend` attribute says (a worker thread by default), and a returned
+    awaitable is awaited.
+    """
+    if inspect.iscoroutinefunction(function) or inspect.iscoroutinefunction(
+        getattr(function, "__call__", None)
+    ):
+        return await function(input_data)
+    result = await default_executors.run(function, input_data)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def acall_model(model: Model[TInput, TOutput], input_data: TInput) -> TOutput:
+    """
+    Call any model asynchronously.
+
+    Models exposing an `acall` coroutine are awaited directly; plain callables
+    (including models that only implement `__call__`) run on their declared
+    execution backend (a worker thread by default) so that slow provider
+    calls and local inference do not stall the event loop.
+
+    Args:
+        model: Model (or any callable) to invoke
+        input_data: Input passed to the model
+
+    Returns:
+        The model output
+    """
+    acall = getattr(model, "acall", None)
+    if acall is not None:
+        return await acall(input_data)
+    return await _run_blocking(model, input_data)
+
+
+def join_chunks(chunks: list[Any]) -> Any:
+    """
+    Reassemble streamed chunks into a single value.
+
+    Text chunks are concatenated into a string and binary chunks (e.g. audio)
+    into bytes; a single chunk of any other type is returned unchanged.
+    """
+    if len(chunks) == 1:
+        return chunks[0]
+    if all(isinstance(chunk, str) for chunk in chunks):
+        return "".join(chunks)
+    if all(isinstance(chunk, (bytes, bytearray, memoryview)) for chunk in chunks):
+        return b"".join(chunks)
+    return chunks
+
+
+async def aiter_chunks(input_data: Any) -> AsyncIterator[Any]:
+    """Wrap a complete value as a single-chunk async stream."""
+    yield input_data
+
+
+async def _buffered_stream(
+    model: Model[TInput, TOutput], chunks: AsyncIterator[TInput]
+) -> AsyncIterator[TOutput]:
+    """Collect the whole input stream, call the model once and yield its output."""
+    collected = [chunk async for chunk in chunks]
+    yield await acall_model(model, join_chunks(collected))
+
+
+def astream_model(
+    model: Model[TInput, TOutput], chunks: AsyncIterator[TInput]
+) -> AsyncIterator[TOutput]:
+    """
+    Stream input chunks through any model.
+
+    Models exposing `astream` consume the chunks incrementally; other
+    callables fall back to buffering the input and yielding one output chunk.
+    """
+    astream = getattr(model, "astream", None)
+    if astream is not None:
+        return astream(chunks)
+    return _buffered_stream(model, chunks)
+
+
+_STREAM_END = object()
+
+
+async def _prefetch(
+    chunks: AsyncIterator[Any], buffer_size: int
+) -> AsyncIterator[Any]:
+    """
+    Drive a stream from a background task through a bounded buffer.
+
+    This lets an upstream stage keep producing while the downstream stage is
+    still busy with earlier chunks, so adjacent stages overlap in time.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+
+    async def produce() -> None:
+        try:
+            async for chunk in chunks:
+                await queue.put((chunk, None))
+        except Exception as exc:
+            await queue.put((_STREAM_END, exc))
+            return
+        await queue.put((_STREAM_END, None))
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            chunk, error = await queue.get()
+            if chunk is _STREAM_END:
+                if error is not None:
+                    raise error
+                return
+            yield chunk
+    finally:
+        producer.cancel()
+
+
+async def interleave_streams(
+    streams: dict[str, AsyncIterator[Any]],
+) -> AsyncIterator[tuple[str, Any]]:
+    """
+    Merge several labelled streams, yielding `(label, chunk)` as chunks arrive.
+
+    Args:
+        streams: Mapping of label (e.g. "A", "B") to the stream it labels
+
+    Yields:
+        Tuples of (label, chunk) in arrival order across all streams
+
+    Raises:
+        Exception: The first error raised by any of the streams
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def drain(label: str, stream: AsyncIterator[Any]) -> None:
+        try:
+            async for chunk in stream:
+                await queue.put((label, chunk, None))
+        except Exception as exc:
+            await queue.put((label, _STREAM_END, exc))
+            return
+        await queue.put((label, _STREAM_END, None))
+
+    tasks = [asyncio.create_task(drain(label, stream)) for label, stream in streams.items()]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            label, chunk, error = await queue.get()
+            if chunk is _STREAM_END:
+                if error is not None:
+                    raise error
+                remaining -= 1
+                continue
+            yield label, chunk
+    finally:
+        for task in tasks:
+            task.cancel()
 
 
 class ModelChain(Generic[TInput, TOutput]):
-    def __init__(self, model_chain: list[Model] | Model):
+    """
+    Immutable sequence of models run one after another.
+
+    The models are stored as a tuple, and the chain's identity (the tuple of
+    model names) and its hash are computed once at construction, so chains
+    are cheap dictionary keys.
+
+    Attributes:
+        model_chain: Tuple of models, in execution order
+        names: Tuple of model names, in execution order
+    """
+
+    __slots__ = ("_models", "_names", "_hash")
+
+    def __init__(self, model_chain: Iterable[Model] | Model):
         if isinstance(model_chain, Callable):
             model_chain = [model_chain]
-        self.model_chain = model_chain
+        self._models = tuple(model_chain)
+        self._names = tuple(model.name for model in self._models)
+        self._hash = hash(self._names)
+
+    @property
+    def model_chain(self) -> tuple[Model, ...]:
+        return self._models
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        return self._names
 
     def __repr__(self) -> str:
         return f"ModelChain({self.model_chain})"
@@ -57,17 +289,54 @@ class ModelChain(Generic[TInput, TOutput]):
             input_data = model(input_data)
         return input_data
 
+    async def acall(self, input_data: TInput) -> TOutput:
+        """Run the chain without blocking the event loop, awaiting each stage in order."""
+        for model in self.model_chain:
+            input_data = await acall_model(model, input_data)
+        return input_data
+
+    def astream(
+        self, input_data: TInput, buffer_size: int = 8
+    ) -> AsyncIterator[TOutput]:
+        """
+        Stream the chain output chunk by chunk.
+
+        Each stage receives the previous stage's output as an async stream of
+        chunks and runs concurrently with it, so an incremental stage can start
+        before the upstream stage finishes.
+
+        Args:
+            input_data: Complete input for the first stage
+            buffer_size: Maximum number of chunks buffered between two stages
+
+        Returns:
+            Async iterator over the final stage's output chunks
+        """
+        stream = aiter_chunks(input_data)
+        for index, model in enumerate(self.model_chain):
+            if index > 0:
+                stream = _prefetch(stream, buffer_size)
+            stream = astream_model(model, stream)
+        return stream
+
     def __hash__(self) -> int:
-        """Hash based on concatenated model names with '|' separator."""
-        chain_key = "|".join(model.name for model in self.model_chain)
-        return hash(chain_key)
+        """Hash of the tuple of model names, computed once at construction."""
+        return self._hash
 
     def __eq__(self, other) -> bool:
         """Two model chains are equal if they contain the same models in the same order."""
+        if other is self:
+            return True
         if isinstance(other, ModelChain):
-            return self.model_chain == other.model_chain
+            return self._hash == other._hash and self._names == other._names
         return False
 
+    def __getstate__(self) -> tuple:
+        return self._models
+
+    def __setstate__(self, state: tuple) -> None:
+        self.__init__(state)
+
 
 class ArenaBase(Generic[TInput, TOutput]):
     """
@@ -89,6 +358,8 @@ class ArenaBase(Generic[TInput, TOutput]):
         self,
         model_chains: list[ModelChain[TInput, TOutput]],
         initial_elo: float = 1500.0,
+        rating_engine: Optional[RatingEngine] = None,
+        matchmaker: Optional[Matchmaker] = None,
     ):
         """
         Initialize the arena.
@@ -96,22 +367,35 @@ class ArenaBase(Generic[TInput, TOutput]):
         Args:
             model_chains: List of model chains to include in the arena
             initial_elo: Initial ELO rating for all models (default: 1500.0)
+            rating_engine: Rating system updating the ratings on each vote
+                (default: `EloEngine` with k-factor 32)
+            matchmaker: Scheduler choosing which chains to compare next
+                (default: a `Matchmaker` with default settings)
         """
         self.model_chains = model_chains
 
-        # Track ELO ratings for each model (using model as key via __hash__)
-        self.model_elos: dict[Model, float] = {}
-        # Initialize ELO ratings for all models in all chains
+        # ELO ratings for each model and for each chain as an individual entity
+        # (treating the entire chain as a single player, not a team). Both are
+        # interned to integer ids, with ratings held in contiguous arrays.
+        self.model_elos = RatingStore()
+        self.chain_elos = RatingStore()
+        # Member model ids of each chain, indexed by chain id
+        self._chain_members: list[tuple[int, ...]] = []
         for chain in model_chains:
-            for model in chain.model_chain:
-                if model not in self.model_elos:
-                    self.model_elos[model] = initial_elo
+            if chain in self.chain_elos:
+                continue
+            self.chain_elos.add(chain, initial_elo)
+            self._chain_members.append(
+                tuple(self.model_elos.add(model, initial_elo) for model in chain.model_chain)
+            )
+
+        self.rating_engine = rating_engine if rating_engine is not None else EloEngine()
+        self.rating_engine.bind(self.model_elos, self.chain_elos, self._chain_members)
+        self.matchmaker = matchmaker if matchmaker is not None else Matchmaker()
+        self.matchmaker.bind(self)
 
-        # Track ELO ratings for each model chain as individual entities
-        # (treating the entire chain as a single player, not a team)
-        self.chain_elos: dict[ModelChain[TInput, TOutput], float] = {
-            chain: initial_elo for chain in model_chains
-        }
+        # Prefix-sharing execution plan over all chains, built on first fan-out
+        self._planner = None
 
     # === Voting and ELO Management ===
     def record_vote(
@@ -121,10 +405,10 @@ class ArenaBase(Generic[TInput, TOutput]):
         vote: VoteOutcome,
     ) -> None:
         """
-        Record a vote between two model chains and update their ELO ratings.
+        Record a vote between two model chains and update their ratings.
 
-        This method updates two types of ELO ratings:
-        1. Team-based: Each model in the chain gets the same rating adjustment
+        The arena's rating engine updates two types of ratings:
+        1. Team-based: Each model in the chain is rated as a member of a team
         2. Chain-based: The entire chain is treated as a single entity
 
         Args:
@@ -132,47 +416,112 @@ class ArenaBase(Generic[TInput, TOutput]):
             chain_b: Second model chain (team B)
             vote: The outcome of the vote (A wins, B wins, tie, or both bad)
         """
-        # Update team-based ELO ratings (each model in the chain)
-        team_a_ratings = [self.model_elos[model] for model in chain_a.model_chain]
-        team_b_ratings = [self.model_elos[model] for model in chain_b.model_chain]
-
-        new_team_a_ratings, new_team_b_ratings = calculate_team_elo_from_vote(
-            vote, team_a_ratings, team_b_ratings
-        )
-
-        for i, model in enumerate(chain_a.model_chain):
-            self.model_elos[model] = new_team_a_ratings[i]
+        chain_a_id = self.chain_elos.id_of(chain_a)
+        chain_b_id = self.chain_elos.id_of(chain_b)
+        self.rating_engine.record_vote(chain_a_id, chain_b_id, vote)
+        self.matchmaker.record(chain_a_id, chain_b_id)
 
-        for i, model in enumerate(chain_b.model_chain):
-            self.model_elos[model] = new_team_b_ratings[i]
+    def record_votes(
+        self,
+        votes: Iterable[
+            tuple[ModelChain[TInput, TOutput], ModelChain[TInput, TOutput], VoteOutcome]
+        ],
+    ) -> None:
+        """
+        Record many votes at once, in order.
 
-        # Update chain-based ELO ratings (treating chains as individual entities)
-        new_chain_a_elo, new_chain_b_elo = calculate_elo_from_vote(
-            vote, self.chain_elos[chain_a], self.chain_elos[chain_b]
-        )
+        Equivalent to calling `record_vote` for each (chain_a, chain_b, vote)
+        tuple, but handed to the rating engine as one `VoteLog`, which engines
+        apply in bulk (ELO replays it through the vectorized `EloReplayEngine`).
 
-        self.chain_elos[chain_a] = new_chain_a_elo
-        self.chain_elos[chain_b] = new_chain_b_elo
+        Args:
+            votes: Iterable of (chain_a, chain_b, vote) tuples
+        """
+        chain_id = self.chain_elos.id_of
+        chain_a, chain_b, outcome = [], [], []
+        for a, b, vote in votes:
+            chain_a.append(chain_id(a))
+            chain_b.append(chain_id(b))
+            outcome.append(OUTCOME_CODES[vote])
+        self.rating_engine.record_votes(VoteLog(chain_a, chain_b, outcome))
+        self.matchmaker.record_many(chain_a, chain_b)
+
+    def flush_ratings(self) -> None:
+        """Apply votes the rating engine is holding back (e.g. an open Glicko-2 period)."""
+        self.rating_engine.flush()
 
     # === Matchup Generation ===
     def generate_matchup(
         self,
     ) -> tuple[ModelChain[TInput, TOutput], ModelChain[TInput, TOutput]]:
-        """Generate a matchup between two models."""
-        raise NotImplementedError
+        """
+        Generate a matchup between two model chains.
+
+        The arena's `Matchmaker` favours chains with uncertain ratings and
+        pairs them with close, informative opponents, avoiding repeats.
+
+        Returns:
+            Tuple of (chain_a, chain_b)
 
-    def generate_output(
+        Raises:
+            ValueError: If the arena has fewer than two chains
+        """
+        return self.matchmaker.next_matchup()
+
+    async def generate_output(
         self,
         input_data: TInput,
-    ) -> TOutput:
-        """Generate outputs to compare from model chains given input data."""
+    ) -> tuple[TOutput, TOutput]:
+        """
+        Generate outputs to compare from model chains given input data.
+
+        Both chains of the matchup run concurrently, so the call takes as long
+        as the slower chain rather than the sum of both.
+        """
+        from arena.planner import ChainPlanner
+
         model_chain_a, model_chain_b = self.generate_matchup()
 
-        # TODO make this work with async + streaming
-        output_a = model_chain_a(input_data)
-        output_b = model_chain_b(input_data)
+        # Chains sharing a leading stage (e.g. both start with gpt-4) run it once
+        outputs = await ChainPlanner([model_chain_a, model_chain_b]).run(input_data)
+
+        return outputs[model_chain_a], outputs[model_chain_b]
+
+    async def generate_all_outputs(
+        self,
+        input_data: TInput,
+    ) -> dict[ModelChain[TInput, TOutput], TOutput]:
+        """
+        Run every chain in the arena on the same input (fan-out).
+
+        Shared chain prefixes are executed once and their output is reused by
+        every chain that starts with them.
 
-        return output_a, output_b
+        Returns:
+            Mapping of each model chain to its output
+        """
+        from arena.planner import ChainPlanner
+
+        if self._planner is None:
+            self._planner = ChainPlanner(self.model_chains)
+        return await self._planner.run(input_data)
+
+    async def stream_output(
+        self,
+        input_data: TInput,
+    ) -> AsyncIterator[tuple[str, TOutput]]:
+        """
+        Stream outputs to compare from a matchup as they are produced.
+
+        Yields:
+            Tuples of ("A" | "B", chunk) in the order chunks arrive from either chain
+        """
+        model_chain_a, model_chain_b = self.generate_matchup()
+
+        async for label, chunk in interleave_streams(
+            {"A": model_chain_a.astream(input_data), "B": model_chain_b.astream(input_data)}
+        ):
+            yield label, chunk
 
     # === Model Access ===
 
@@ -180,14 +529,56 @@ class ArenaBase(Generic[TInput, TOutput]):
         """List all models in the arena."""
         return self.model_chains
 
-    def get_leaderboard(self) -> list[tuple[Model, float]]:
+    @property
+    def leaderboard_version(self) -> int:
+        """
+        Counter that increases whenever any model or chain rating changes.
+
+        Pollers can cache a leaderboard page together with this value and
+        skip rebuilding it while the version is unchanged.
+        """
+        return self.model_elos.version + self.chain_elos.version
+
+    def snapshot(self) -> RatingSnapshot:
+        """
+        Copy the current ratings, leaderboards and matchmaker state (O(n)).
+
+        The returned `RatingSnapshot` is immutable, so it can be read from
+        other threads or tasks while further votes are recorded here.
+        """
+        return RatingSnapshot.capture(self.model_elos, self.chain_elos, self.matchmaker.snapshot())
+
+    def get_leaderboard(
+        self, limit: Optional[int] = None, offset: int = 0
+    ) -> list[tuple[Model, float]]:
         """
         Get models sorted by ELO rating (highest first).
 
+        The ranking is maintained incrementally as votes are recorded, so
+        reading the top `limit` entries costs O(limit) rather than a sort.
+
+        Args:
+            limit: Maximum number of entries to return (default: all)
+            offset: Rank of the first entry, for pagination (default: 0)
+
         Returns:
             List of tuples containing (model, elo_rating) sorted by rating
         """
-        return sorted(self.model_elos.items(), key=lambda x: x[1], reverse=True)
+        return self.model_elos.page(offset, limit)
+
+    def get_model_rank(self, model: Model | str) -> int:
+        """
+        Get the 0-based leaderboard position of a model.
+
+        Args:
+            model: Model object or model name string to look up
+
+        Raises:
+            KeyError: If model is not found in the arena
+        """
+        if isinstance(model, str):
+            model = self.model_elos.keys_by_id[self.model_elos.id_of_name(model)]
+        return self.model_elos.rank(model)
 
     def get_model_elo(self, model: Model | str) -> float:
         """
@@ -203,21 +594,35 @@ class ArenaBase(Generic[TInput, TOutput]):
             KeyError: If model is not found in the arena
         """
         if isinstance(model, str):
-            # Search by name if string provided
-            for m, elo in self.model_elos.items():
-                if m.name == model:
-                    return elo
-            raise KeyError(f"Model with name '{model}' not found in arena")
+            elo = self.model_elos.get_by_name(model)
+            if elo is None:
+                raise KeyError(f"Model with name '{model}' not found in arena")
+            return elo
         return self.model_elos[model]
 
-    def get_chain_leaderboard(self) -> list[tuple[ModelChain[TInput, TOutput], float]]:
+    def get_chain_leaderboard(
+        self, limit: Optional[int] = None, offset: int = 0
+    ) -> list[tuple[ModelChain[TInput, TOutput], float]]:
         """
         Get model chains sorted by ELO rating (highest first).
 
+        Args:
+            limit: Maximum number of entries to return (default: all)
+            offset: Rank of the first entry, for pagination (default: 0)
+
         Returns:
             List of tuples containing (model_chain, elo_rating) sorted by rating
         """
-        return sorted(self.chain_elos.items(), key=lambda x: x[1], reverse=True)
+        return self.chain_elos.page(offset, limit)
+
+    def get_chain_rank(self, chain: ModelChain[TInput, TOutput]) -> int:
+        """
+        Get the 0-based leaderboard position of a model chain.
+
+        Raises:
+            KeyError: If chain is not found in the arena
+        """
+        return self.chain_elos.rank(chain)
 
     def get_chain_elo(self, chain: ModelChain[TInput, TOutput]) -> float:
         """
@@ -233,3 +638,39 @@ class ArenaBase(Generic[TInput, TOutput]):
             KeyError: If chain is not found in the arena
         """
         return self.chain_elos[chain]
+
+    def get_chain_uncertainty(self, chain: ModelChain[TInput, TOutput]) -> Optional[float]:
+        """
+        Get the standard deviation of a chain's rating.
+
+        Returns:
+            Uncertainty in rating points, or None if the rating engine does not
+            track it (ELO)
+
+        Raises:
+            KeyError: If chain is not found in the arena
+        """
+        chain_id = self.chain_elos.id_of(chain)
+        uncertainty = self.rating_engine.chain_uncertainty()
+        return None if uncertainty is None else float(uncertainty[chain_id])
+
+    def get_model_uncertainty(self, model: Model | str) -> Optional[float]:
+        """
+        Get the standard deviation of a model's rating.
+
+        Args:
+            model: Model object or model name string to look up
+
+        Returns:
+            Uncertainty in rating points, or None if the rating engine does not
+            track it (ELO)
+
+        Raises:
+            KeyError: If model is not found in the arena
+        """
+        if isinstance(model, str):
+            model_id = self.model_elos.id_of_name(model)
+        else:
+            model_id = self.model_elos.id_of(model)
+        uncertainty = self.rating_engine.model_uncertainty()
+        return None if uncertainty is None else float(uncertainty[model_id])
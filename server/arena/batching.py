@@ -0,0 +1,208 @@
+import asyncio
+import inspect
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generic, Optional, Sequence, Union
+from arena.arena_base import Model, TInput, TOutput
+
+BatchFunction = Callable[
+    [list[TInput]], Union[Sequence[TOutput], Awaitable[Sequence[TOutput]]]
+]
+
+
+@dataclass
+class BatchStats:
+    """Counters describing how well batches are being filled."""
+    batches: int = 0
+    items: int = 0
+    full_batches: int = 0
+    max_batch_size: int = 1
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    @property
+    def fill_rate(self) -> float:
+        """Average fraction of `max_batch_size` used per dispatched batch."""
+        return self.mean_batch_size / self.max_batch_size
+
+
+class MicroBatcher(Generic[TInput, TOutput]):
+    """
+    Gathers concurrent single-item requests into batches.
+
+    Items submitted while a batch is open are collected until either
+    `max_batch_size` items are waiting or `max_wait_ms` has passed since the
+    first one arrived, then dispatched together through `batch_function`.
+    Each caller receives the result at its own position in the batch.
+
+    Attributes:
+        max_batch_size: Maximum number of items per batch
+        max_wait_ms: Maximum time the first item of a batch waits for company
+        stats: Batch fill counters
+    """
+
+    def __init__(
+        self,
+        batch_function: BatchFunction,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+    ):
+        """
+        Args:
+            batch_function: Maps a list of inputs to a list of outputs of the
+                same length; may be sync (run in a worker thread) or async
+            max_batch_size: Maximum number of items per batch (default: 8)
+            max_wait_ms: Maximum wait before dispatching a partial batch (default: 5ms)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.batch_function = batch_function
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.stats = BatchStats(max_batch_size=max_batch_size)
+        self._pending: list[tuple[TInput, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: set[asyncio.Task] = set()
+
+    async def submit(self, item: TInput) -> TOutput:
+        """
+        Add an item to the current batch and wait for its result.
+
+        Raises:
+            Exception: Whatever the batch function raised for the batch
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Dispatch up to `max_batch_size` pending items as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = self._pending[: self.max_batch_size]
+        self._pending = self._pending[self.max_batch_size :]
+        # Callers that gave up before dispatch do not take a batch slot
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+        if self._pending:
+            loop = asyncio.get_running_loop()
+            if len(self._pending) >= self.max_batch_size:
+                loop.call_soon(self._flush)
+            else:
+                self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+    async def _run_batch(self, batch: list[tuple[TInput, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        self.stats.batches += 1
+        self.stats.items += len(items)
+        if len(items) == self.max_batch_size:
+            self.stats.full_batches += 1
+
+        try:
+            if inspect.iscoroutinefunction(self.batch_function):
+                results = await self.batch_function(items)
+            else:
+                results = await asyncio.to_thread(self.batch_function, items)
+                if inspect.isawaitable(results):
+                    results = await results
+            results = list(results)
+            if len(results) != len(items):
+                raise ValueError(
+                    f"Batch function returned {len(results)} results for {len(items)} inputs"
+                )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        except BaseException:
+            # Cancelled (e.g. on shutdown): callers must not wait forever
+            for _, future in batch:
+                future.cancel()
+            raise
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class BatchedModel(Generic[TInput, TOutput]):
+    """
+    Model whose async calls are transparently micro-batched.
+
+    Suitable for local models (e.g. `kokoro-82m`) and providers with batch
+    APIs, where one call over N inputs is much cheaper than N calls.
+
+    Attributes:
+        name: Model name (unique identifier, as for `Model`)
+        batch_function: Function mapping a list of inputs to a list of outputs
+        batcher: The `MicroBatcher` gathering concurrent calls
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_function: BatchFunction,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        config: Any = None,
+    ):
+        """
+        Args:
+            name: Model name
+            batch_function: Function mapping a list of inputs to a list of outputs
+            max_batch_size: Maximum number of items per batch (default: 8)
+            max_wait_ms: Maximum wait before dispatching a partial batch (default: 5ms)
+            config: Model configuration, included in cache keys
+        """
+        self.name = name
+        self.batch_function = batch_function
+        self.config = config
+        self.batcher = MicroBatcher(batch_function, max_batch_size, max_wait_ms)
+
+    @property
+    def stats(self) -> BatchStats:
+        return self.batcher.stats
+
+    def __call__(self, input_data: TInput) -> TOutput:
+        """
+        Run the batch function on a single item, synchronously.
+
+        Raises:
+            TypeError: If the batch function is async; use `acall`
+        """
+        if inspect.iscoroutinefunction(self.batch_function):
+            raise TypeError(f"{self.name} has an async batch function; call it with acall")
+        outputs = self.batch_function([input_data])
+        if inspect.isawaitable(outputs):
+            if inspect.iscoroutine(outputs):
+                outputs.close()
+            raise TypeError(f"{self.name} has an async batch function; call it with acall")
+        (output,) = outputs
+        return output
+
+    async def acall(self, input_data: TInput) -> TOutput:
+        return await self.batcher.submit(input_data)
+
+    def __repr__(self) -> str:
+        return f"BatchedModel(name={self.name}, max_batch_size={self.batcher.max_batch_size})"
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __eq__(self, other) -> bool:
+        return Model.__eq__(self, other)
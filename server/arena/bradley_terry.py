@@ -0,0 +1,329 @@
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
+import numpy as np
+from arena.replay import OUTCOME_CODES, ChainIndex, VoteLog
+from arena.types import VoteOutcome
+
+_A = OUTCOME_CODES[VoteOutcome.A]
+_B = OUTCOME_CODES[VoteOutcome.B]
+_BOTH_BAD = OUTCOME_CODES[VoteOutcome.BOTH_BAD]
+
+# Converts natural-log strengths to the ELO scale (400 points = 10x odds)
+_ELO_PER_LOGIT = 400 / math.log(10)
+
+
+@dataclass
+class PairCounts:
+    """
+    Votes aggregated per ordered chain pair (first < second).
+
+    Each pair has up to three vote categories: first wins, second wins, and
+    a draw (ties, plus both_bad when counted as a tie).
+
+    Attributes:
+        first: Lower chain id of each category
+        second: Higher chain id of each category
+        score: Score of `first` in each category (1, 0 or 0.5)
+        count: Number of votes in each category
+    """
+    first: np.ndarray
+    second: np.ndarray
+    score: np.ndarray
+    count: np.ndarray
+
+    @property
+    def total(self) -> int:
+        return int(self.count.sum())
+
+
+@dataclass
+class BradleyTerryResult:
+    """
+    Fitted ratings on the ELO scale, with optional bootstrap intervals.
+
+    Attributes:
+        items: Rated chains or models, indexed like `ratings`
+        ratings: Maximum-likelihood rating of each item
+        lower: Lower confidence bound of each rating (None without bootstrap)
+        upper: Upper confidence bound of each rating (None without bootstrap)
+        confidence: Confidence level of the bounds
+    """
+    items: list
+    ratings: np.ndarray
+    lower: Optional[np.ndarray] = None
+    upper: Optional[np.ndarray] = None
+    confidence: float = 0.95
+
+    def leaderboard(self) -> list[tuple[Any, float]]:
+        """
+        Items sorted by rating (highest first).
+
+        Returns:
+            List of (item, rating) tuples, shaped like `ArenaBase.get_chain_leaderboard`
+        """
+        order = np.argsort(-self.ratings, kind="stable")
+        return [(self.items[i], float(self.ratings[i])) for i in order]
+
+    def intervals(self) -> dict[Any, tuple[float, float]]:
+        """
+        Confidence interval of each item's rating.
+
+        Raises:
+            ValueError: If the fit was run without bootstrap resamples
+        """
+        if self.lower is None or self.upper is None:
+            raise ValueError("Confidence intervals require bootstrap resamples")
+        return {
+            item: (float(low), float(high))
+            for item, low, high in zip(self.items, self.lower, self.upper)
+        }
+
+
+def count_pairs(log: VoteLog, both_bad: str = "tie") -> PairCounts:
+    """
+    Aggregate a vote log into per-pair win/loss/draw counts.
+
+    Args:
+        log: Vote log to aggregate
+        both_bad: "tie" to count both_bad votes as draws, "ignore" to drop them
+
+    Returns:
+        Aggregated `PairCounts`
+    """
+    if both_bad not in ("tie", "ignore"):
+        raise ValueError(f"Invalid both_bad handling: {both_bad}")
+
+    a = log.chain_a.astype(np.int64)
+    b = log.chain_b.astype(np.int64)
+    outcome = log.outcome
+    keep = a != b
+    if both_bad == "ignore":
+        keep &= outcome != _BOTH_BAD
+    a, b, outcome = a[keep], b[keep], outcome[keep]
+
+    # Score of side A: 1 for a win, 0 for a loss, 0.5 for a draw
+    score_a = np.where(outcome == _A, 1.0, np.where(outcome == _B, 0.0, 0.5))
+    swap = a > b
+    first = np.where(swap, b, a)
+    second = np.where(swap, a, b)
+    score = np.where(swap, 1.0 - score_a, score_a)
+
+    # 0 = second wins, 1 = draw, 2 = first wins
+    category = (score * 2).astype(np.int64)
+    n = int(max(first.max(initial=-1), second.max(initial=-1))) + 1
+    keys = (first * n + second) * 3 + category
+    unique, counts = np.unique(keys, return_counts=True)
+    category = unique % 3
+    pair = unique // 3
+    return PairCounts(
+        first=pair // max(n, 1),
+        second=pair % max(n, 1),
+        score=category / 2.0,
+        count=counts.astype(np.float64),
+    )
+
+
+def _fit(
+    pairs: PairCounts,
+    count: np.ndarray,
+    design: np.ndarray,
+    regularization: float,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100,
+) -> np.ndarray:
+    """
+    Newton's method for the Bradley-Terry log-likelihood.
+
+    Chain strength is `design @ beta` (identity for chains, mean membership
+    for models). Draws contribute half a win to each side.
+
+    Returns:
+        Mean-centred strengths `beta` in natural-log units
+    """
+    n_chains, n_params = design.shape
+    first, second = pairs.first, pairs.second
+    wins = count * pairs.score
+    beta = np.zeros(n_params)
+
+    for _ in range(max_iterations):
+        strength = design @ beta
+        p = 1 / (1 + np.exp(strength[second] - strength[first]))
+        residual = wins - count * p
+        weight = count * p * (1 - p)
+
+        # Gradient and Hessian with respect to chain strengths
+        gradient = np.bincount(first, residual, n_chains) - np.bincount(second, residual, n_chains)
+        hessian = (
+            np.bincount(first * (n_chains + 1), weight, n_chains * n_chains)
+            + np.bincount(second * (n_chains + 1), weight, n_chains * n_chains)
+            - np.bincount(first * n_chains + second, weight, n_chains * n_chains)
+            - np.bincount(second * n_chains + first, weight, n_chains * n_chains)
+        ).reshape(n_chains, n_chains)
+
+        # Chain rule to the parameters, plus an L2 penalty for identifiability
+        gradient = design.T @ gradient - regularization * beta
+        hessian = design.T @ hessian @ design + regularization * np.eye(n_params)
+        step = np.linalg.solve(hessian, gradient)
+        beta += step
+        if np.max(np.abs(step)) < tolerance:
+            break
+
+    return beta - beta.mean()
+
+
+def _bootstrap_worker(
+    pairs: PairCounts,
+    design: np.ndarray,
+    regularization: float,
+    resamples: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """Fit `resamples` vote-level bootstrap replicates (runs in a worker process)."""
+    rng = np.random.default_rng(seed)
+    total = pairs.total
+    probabilities = pairs.count / total
+    results = np.empty((resamples, design.shape[1]))
+    for i in range(resamples):
+        # Resampling votes with replacement == a multinomial draw over vote categories
+        count = rng.multinomial(total, probabilities).astype(np.float64)
+        results[i] = _fit(pairs, count, design, regularization)
+    return results
+
+
+class BradleyTerryRater:
+    """
+    Offline, order-independent ratings from a vote log.
+
+    Fits a Bradley-Terry model by maximum likelihood to the pairwise results
+    of all votes at once, either per chain or per individual model (chain
+    strength is the mean of its models' strengths, as in team ELO). Ties
+    count as half a win for each side; both_bad votes count as ties or are
+    ignored. Bootstrap confidence intervals resample votes and spread the
+    refits over a process pool.
+
+    Attributes:
+        index: Integer ids of the models and chains being rated
+        initial_elo: Rating of an average item
+        regularization: L2 penalty on strengths (keeps undefeated items finite)
+        both_bad: How both_bad votes are counted ("tie" or "ignore")
+    """
+
+    def __init__(
+        self,
+        model_chains: list | ChainIndex,
+        initial_elo: float = 1500.0,
+        regularization: float = 1e-2,
+        both_bad: str = "tie",
+    ):
+        """
+        Args:
+            model_chains: Chains to rate, or an existing `ChainIndex`
+            initial_elo: Rating of an average item (default: 1500.0)
+            regularization: L2 penalty on natural-log strengths (default: 0.01)
+            both_bad: "tie" (default) or "ignore"
+        """
+        self.index = model_chains if isinstance(model_chains, ChainIndex) else ChainIndex(model_chains)
+        self.initial_elo = initial_elo
+        self.regularization = regularization
+        self.both_bad = both_bad
+
+    def fit_chains(self, log: VoteLog, **bootstrap_options) -> BradleyTerryResult:
+        """
+        Rate every chain as a single player.
+
+        Args:
+            log: Votes encoded with this rater's index
+            **bootstrap_options: See `fit`
+
+        Returns:
+            Ratings for `index.chains`
+        """
+        design = np.eye(len(self.index.chain_ids))
+        return self.fit(log, design, self.index.chains, **bootstrap_options)
+
+    def fit_models(self, log: VoteLog, **bootstrap_options) -> BradleyTerryResult:
+        """
+        Rate individual models, treating each chain as a team.
+
+        Args:
+            log: Votes encoded with this rater's index
+            **bootstrap_options: See `fit`
+
+        Returns:
+            Ratings for `index.models`
+        """
+        n_chains, n_models = len(self.index.chain_ids), len(self.index.model_ids)
+        design = np.zeros((n_chains, n_models))
+        for chain_id, row in enumerate(self.index.members):
+            members = row[row >= 0]
+            np.add.at(design[chain_id], members, 1.0 / len(members))
+        return self.fit(log, design, self.index.models, **bootstrap_options)
+
+    def fit(
+        self,
+        log: VoteLog,
+        design: np.ndarray,
+        items: list,
+        bootstrap: int = 0,
+        confidence: float = 0.95,
+        n_jobs: int = 1,
+        seed: Optional[int] = None,
+    ) -> BradleyTerryResult:
+        """
+        Fit ratings for the parameters of a design matrix.
+
+        Args:
+            log: Votes encoded with this rater's index
+            design: (n_chains, n_items) map from item strengths to chain strength
+            items: Items matching the design columns
+            bootstrap: Number of bootstrap resamples (0 = no intervals)
+            confidence: Confidence level of the intervals (default: 0.95)
+            n_jobs: Worker processes for the bootstrap (1 = in this process)
+            seed: Seed for reproducible resampling
+
+        Returns:
+            The fitted `BradleyTerryResult`
+        """
+        pairs = count_pairs(log, self.both_bad)
+        if len(pairs.count) and pairs.second.max() >= design.shape[0]:
+            raise ValueError("Vote log references chains outside the index")
+
+        beta = _fit(pairs, pairs.count, design, self.regularization)
+        result = BradleyTerryResult(items=items, ratings=self._to_elo(beta), confidence=confidence)
+        if bootstrap <= 0 or not len(pairs.count):
+            return result
+
+        samples = self._bootstrap(pairs, design, bootstrap, n_jobs, seed)
+        tail = (1 - confidence) / 2 * 100
+        result.lower = np.percentile(self._to_elo(samples), tail, axis=0)
+        result.upper = np.percentile(self._to_elo(samples), 100 - tail, axis=0)
+        return result
+
+    def _to_elo(self, beta: np.ndarray) -> np.ndarray:
+        return self.initial_elo + _ELO_PER_LOGIT * beta
+
+    def _bootstrap(
+        self,
+        pairs: PairCounts,
+        design: np.ndarray,
+        resamples: int,
+        n_jobs: int,
+        seed: Optional[int],
+    ) -> np.ndarray:
+        n_jobs = max(1, min(n_jobs, resamples))
+        seeds = np.random.SeedSequence(seed).spawn(n_jobs)
+        chunks = [resamples // n_jobs + (i < resamples % n_jobs) for i in range(n_jobs)]
+
+        if n_jobs == 1:
+            return _bootstrap_worker(pairs, design, self.regularization, resamples, seeds[0])
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as pool:
+            futures = [
+                pool.submit(_bootstrap_worker, pairs, design, self.regularization, chunk, chunk_seed)
+                for chunk, chunk_seed in zip(chunks, seeds)
+            ]
+            return np.concatenate([future.result() for future in futures])
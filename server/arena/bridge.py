@@ -0,0 +1,148 @@
+import asyncio
+import re
+from typing import Any, AsyncIterator, Generic
+from arena.arena_base import Model, TOutput, acall_model
+
+# End of a sentence: terminal punctuation (plus closing quotes/brackets) then
+# whitespace, or a line break
+_SENTENCE_END = re.compile(r"[.!?…。！？]+[\"'”’)\]]*\s+|\n+")
+_END = object()
+
+
+async def split_sentences(
+    chunks: AsyncIterator[str], min_length: int = 16, max_length: int = 400
+) -> AsyncIterator[str]:
+    """
+    Regroup a stream of text chunks into sentences as soon as each is complete.
+
+    Args:
+        chunks: Text chunks, split anywhere (e.g. LLM tokens)
+        min_length: Sentences shorter than this are merged with the next one,
+            so abbreviations and fragments do not become separate requests
+        max_length: Text without a sentence end is cut at the last space
+            before this length, bounding how long output can lag the input
+
+    Yields:
+        Sentences, with surrounding whitespace removed; the remaining text
+        once the input ends
+    """
+    buffer = ""
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        for match in _SENTENCE_END.finditer(buffer):
+            if match.end() - start >= min_length:
+                sentence = buffer[start:match.end()].strip()
+                start = match.end()
+                if sentence:
+                    yield sentence
+        buffer = buffer[start:]
+        while len(buffer) > max_length:
+            cut = buffer.rfind(" ", 0, max_length)
+            cut = cut if cut > 0 else max_length
+            sentence, buffer = buffer[:cut].strip(), buffer[cut:]
+            if sentence:
+                yield sentence
+    if buffer.strip():
+        yield buffer.strip()
+
+
+class SentenceBridge(Generic[TOutput]):
+    """
+    Text-to-audio bridge stage: pipelines a TTS model sentence by sentence.
+
+    When streamed, the upstream text (e.g. LLM tokens) is split into
+    sentences as they complete, each sentence is sent to the wrapped model as
+    soon as it is available, up to `max_in_flight` at once, and the outputs
+    are yielded in sentence order. The first audio therefore arrives after
+    the first sentence is generated and synthesized, not after the whole
+    text. The wrapper keeps the model's name, so chains using it are rated
+    as the plain model.
+
+    Attributes:
+        model: Wrapped text-to-audio model
+        max_in_flight: Most sentences being synthesized or awaiting delivery at once
+        min_length: See `split_sentences`
+        max_length: See `split_sentences`
+    """
+
+    def __init__(
+        self, model: Model[str, TOutput], max_in_flight: int = 4, min_length: int = 16, max_length: int = 400
+    ):
+        """
+        Args:
+            model: Text-to-audio model to wrap
+            max_in_flight: Concurrent sentence limit (at least 1)
+            min_length: Shortest sentence sent on its own
+            max_length: Longest text sent without a sentence end
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.model = model
+        self.max_in_flight = max_in_flight
+        self.min_length = min_length
+        self.max_length = max_length
+        self.name = model.name
+
+    @property
+    def info(self) -> Any:
+        return getattr(self.model, "info", None)
+
+    def __call__(self, input_data: str) -> TOutput:
+        return self.model(input_data)
+
+    async def acall(self, input_data: str) -> TOutput:
+        """Synthesize a complete text in one call: nothing to overlap, and one output file."""
+        return await acall_model(self.model, input_data)
+
+    async def astream(self, chunks: AsyncIterator[str]) -> AsyncIterator[TOutput]:
+        """
+        Stream the model's output for each sentence of the input, in order.
+
+        Raises:
+            Exception: The first error of the upstream stream or of a
+                sentence, after the outputs of all earlier sentences
+        """
+        slots = asyncio.Semaphore(self.max_in_flight)
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> None:
+            try:
+                async for sentence in split_sentences(chunks, self.min_length, self.max_length):
+                    await slots.acquire()
+                    queue.put_nowait(asyncio.ensure_future(acall_model(self.model, sentence)))
+            except Exception as exc:
+                queue.put_nowait(exc)
+                return
+            queue.put_nowait(_END)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                try:
+                    output = await item
+                finally:
+                    slots.release()
+                yield output
+        finally:
+            producer.cancel()
+            while not queue.empty():
+                item = queue.get_nowait()
+                if isinstance(item, asyncio.Future):
+                    item.cancel()
+                    if item.done() and not item.cancelled():
+                        item.exception()  # retrieved: the caller has stopped listening
+
+    def __repr__(self) -> str:
+        return f"SentenceBridge({self.model!r})"
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __eq__(self, other) -> bool:
+        return Model.__eq__(self, other)
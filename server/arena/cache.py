@@ -0,0 +1,432 @@
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Generic, Optional
+from arena.arena_base import (
+    Model,
+    TInput,
+    TOutput,
+    acall_model,
+    astream_model,
+    join_chunks,
+)
+
+
+def hash_input(input_data: Any) -> str:
+    """
+    Compute a stable content digest for a stage input.
+
+    Text and binary inputs are hashed directly; anything else is hashed via
+    its pickled representation.
+    """
+    if isinstance(input_data, str):
+        payload = b"s" + input_data.encode("utf-8")
+    elif isinstance(input_data, (bytes, bytearray, memoryview)):
+        payload = b"b" + bytes(input_data)
+    else:
+        payload = b"p" + pickle.dumps(input_data, protocol=pickle.HIGHEST_PROTOCOL)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def stage_key(model: Model, input_data: Any) -> str:
+    """
+    Content-addressed key for a single model call.
+
+    The key covers the model name, the model's `config` attribute (if any)
+    and a digest of the input, so changing any of them misses the cache.
+    """
+    config = getattr(model, "config", None)
+    config_repr = json.dumps(config, sort_keys=True, default=repr)
+    header = f"{model.name}\0{config_repr}\0".encode("utf-8")
+    return hashlib.sha256(header + hash_input(input_data).encode("ascii")).hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the number of bytes a cached value keeps alive."""
+    if isinstance(value, memoryview):
+        return value.nbytes
+    if isinstance(value, (str, bytes, bytearray)):
+        return sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness and occupancy."""
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    # Entries that could not be pickled for the disk tier, and were dropped
+    spill_failures: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float]) -> None:
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+_MISSING = object()
+
+
+class _CacheHit(Exception):
+    """Raised into a stage's input stream to stop it in favour of a cached output."""
+
+    def __init__(self, output: Any):
+        super().__init__()
+        self.output = output
+
+
+class StageCache:
+    """
+    LRU cache for stage outputs with per-entry TTL and a total byte budget.
+
+    Entries live in memory up to `max_bytes`; least recently used entries are
+    evicted first. When `disk_dir` is given, evicted entries (and entries too
+    large for memory) spill to a disk tier that is consulted on memory misses
+    and survives restarts. The disk tier is bounded by `disk_max_bytes`,
+    dropping its least recently used files first.
+
+    The memory tier and the disk tier's index have separate locks, and no
+    file is read or written while either is held, so memory hits never wait
+    for disk I/O.
+
+    Attributes:
+        max_bytes: Memory budget for cached values
+        ttl: Default time-to-live in seconds (None = never expires)
+        stats: Hit/miss/eviction counters
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: Optional[float] = None,
+        disk_dir: Optional[str | Path] = None,
+        disk_max_bytes: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory budget in bytes (default: 256 MiB)
+            ttl: Default time-to-live for entries in seconds (default: no expiry)
+            disk_dir: Directory for the optional disk tier (default: memory only)
+            disk_max_bytes: Byte budget for the disk tier (default: unbounded)
+            clock: Wall-clock source, injectable for tests
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self._disk_max_bytes = disk_max_bytes
+        # Size of each disk entry, least recently used first
+        self._disk_index: OrderedDict[str, int] = OrderedDict()
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()
+        if self._disk_dir is not None:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            files = [(path.stat(), path.stem) for path in self._disk_files()]
+            for stat, key in sorted(files, key=lambda item: item[0].st_mtime):
+                self._disk_index[key] = stat.st_size
+                self._disk_bytes += stat.st_size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING, record=False) is not _MISSING
+
+    def get(self, key: str, default: Any = None, record: bool = True) -> Any:
+        """
+        Look up a key, promoting it to most recently used.
+
+        Args:
+            key: Cache key (see `stage_key`)
+            default: Value returned on a miss
+            record: Whether to count the lookup in `stats`
+
+        Returns:
+            The cached value, or `default` if absent or expired
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at is not None and entry.expires_at <= now:
+                    self._remove(key)
+                    self.stats.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    if record:
+                        self.stats.hits += 1
+                    return entry.value
+
+        found, value, expires_at = self._disk_read(key, now)
+        if found:
+            size = estimate_size(value)
+            spilled = []
+            with self._lock:
+                if record:
+                    self.stats.hits += 1
+                    self.stats.disk_hits += 1
+                if size <= self.max_bytes and key not in self._entries:
+                    spilled = self._insert(key, value, size, expires_at)
+            self._spill(spilled)
+            return value
+
+        if record:
+            with self._lock:
+                self.stats.misses += 1
+        return default
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = _MISSING) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key (see `stage_key`)
+            value: Value to cache
+            ttl: Time-to-live in seconds for this entry, overriding the default
+        """
+        ttl = self.ttl if ttl is _MISSING else ttl
+        expires_at = self._clock() + ttl if ttl is not None else None
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                spilled = [(key, value, expires_at)]
+            else:
+                spilled = self._insert(key, value, size, expires_at)
+        self._spill(spilled)
+
+    def invalidate(self, key: str) -> None:
+        """Remove a key from both tiers."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        self._disk_delete(key)
+
+    def clear(self) -> None:
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            self.stats.entries = 0
+            self.stats.bytes = 0
+        with self._disk_lock:
+            self._disk_index.clear()
+            self._disk_bytes = 0
+        for path in self._disk_files():
+            path.unlink(missing_ok=True)
+
+    # === Memory tier (callers hold the lock) ===
+
+    def _insert(self, key: str, value: Any, size: int, expires_at: Optional[float]) -> list[tuple]:
+        """Add an entry; returns the evicted (key, value, expires_at) for `_spill` once the lock is released."""
+        self._entries[key] = _Entry(value, size, expires_at)
+        self.stats.entries += 1
+        self.stats.bytes += size
+        evicted = []
+        while self.stats.bytes > self.max_bytes and self._entries:
+            old_key, old_entry = self._entries.popitem(last=False)
+            self.stats.entries -= 1
+            self.stats.bytes -= old_entry.size
+            self.stats.evictions += 1
+            evicted.append((old_key, old_entry.value, old_entry.expires_at))
+        return evicted
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.stats.entries -= 1
+        self.stats.bytes -= entry.size
+
+    # === Disk tier (files are touched without holding a lock) ===
+
+    def _spill(self, entries: list[tuple]) -> None:
+        for key, value, expires_at in entries:
+            self._disk_write(key, value, expires_at)
+
+    def _disk_path(self, key: str) -> Path:
+        return self._disk_dir / key[:2] / f"{key}.pkl"
+
+    def _disk_files(self) -> list[Path]:
+        if self._disk_dir is None:
+            return []
+        return list(self._disk_dir.glob("*/*.pkl"))
+
+    def _disk_read(self, key: str, now: float) -> tuple[bool, Any, Optional[float]]:
+        if self._disk_dir is None:
+            return False, None, None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            self._disk_forget(key)  # dropped by another process
+            return False, None, None
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return False, None, None
+        if expires_at is not None and expires_at <= now:
+            self._disk_delete(key)
+            with self._lock:
+                self.stats.expirations += 1
+            return False, None, None
+        with self._disk_lock:
+            if key in self._disk_index:
+                self._disk_index.move_to_end(key)
+        return True, value, expires_at
+
+    def _disk_write(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        if self._disk_dir is None:
+            return
+        try:
+            data = pickle.dumps((expires_at, value), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Not every output survives pickling (e.g. open handles); it stays a miss
+            with self._lock:
+                self.stats.spill_failures += 1
+            return
+        path = self._disk_path(key)
+        path.parent.mkdir(exist_ok=True)
+        # Write to a temp file and rename so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        dropped = []
+        with self._disk_lock:
+            self._disk_bytes += len(data) - self._disk_index.pop(key, 0)
+            self._disk_index[key] = len(data)
+            while self._disk_max_bytes is not None and self._disk_bytes > self._disk_max_bytes:
+                old_key, size = self._disk_index.popitem(last=False)
+                self._disk_bytes -= size
+                dropped.append(old_key)
+        for old_key in dropped:
+            self._disk_path(old_key).unlink(missing_ok=True)
+
+    def _disk_delete(self, key: str) -> None:
+        if self._disk_dir is None:
+            return
+        self._disk_forget(key)
+        self._disk_path(key).unlink(missing_ok=True)
+
+    def _disk_forget(self, key: str) -> None:
+        with self._disk_lock:
+            self._disk_bytes -= self._disk_index.pop(key, 0)
+
+
+class CachedModel(Generic[TInput, TOutput]):
+    """
+    Model wrapper that serves repeated inputs from a `StageCache`.
+
+    The wrapper keeps the wrapped model's name, hash and equality, so it can
+    stand in for the model in chains without changing rating identities.
+
+    Streamed input is passed to the model as it arrives, so a cached stage
+    still pipelines with its neighbours. The cache key is only known once the
+    input ends; if the model has produced no output by then (as with models
+    that buffer their input), a cached output replaces the call.
+    """
+
+    def __init__(self, model: Model[TInput, TOutput], cache: StageCache, ttl: Optional[float] = _MISSING):
+        """
+        Args:
+            model: Model to wrap
+            cache: Cache shared between wrapped models
+            ttl: Time-to-live for this model's entries (default: the cache default)
+        """
+        self.model = model
+        self.cache = cache
+        self.ttl = ttl
+        self.name = model.name
+
+    @property
+    def config(self) -> Any:
+        return getattr(self.model, "config", None)
+
+    @property
+    def info(self) -> Any:
+        return getattr(self.model, "info", None)
+
+    def __call__(self, input_data: TInput) -> TOutput:
+        key = stage_key(self.model, input_data)
+        output = self.cache.get(key, _MISSING)
+        if output is _MISSING:
+            output = self.model(input_data)
+            self.cache.put(key, output, self.ttl)
+        return output
+
+    async def acall(self, input_data: TInput) -> TOutput:
+        key = stage_key(self.model, input_data)
+        output = self.cache.get(key, _MISSING)
+        if output is _MISSING:
+            output = await acall_model(self.model, input_data)
+            self.cache.put(key, output, self.ttl)
+        return output
+
+    async def astream(self, chunks: AsyncIterator[TInput]) -> AsyncIterator[TOutput]:
+        received = []
+        produced = []
+        key = None
+
+        async def forward() -> AsyncIterator[TInput]:
+            nonlocal key
+            async for chunk in chunks:
+                received.append(chunk)
+                yield chunk
+            key = stage_key(self.model, join_chunks(received))
+            if not produced:
+                output = self.cache.get(key, _MISSING)
+                if output is not _MISSING:
+                    raise _CacheHit(output)
+
+        try:
+            async for chunk in astream_model(self.model, forward()):
+                produced.append(chunk)
+                yield chunk
+        except _CacheHit as hit:
+            yield hit.output
+            return
+        if produced and key is not None:
+            self.cache.put(key, join_chunks(produced), self.ttl)
+
+    def __repr__(self) -> str:
+        return f"CachedModel({self.model!r})"
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __eq__(self, other) -> bool:
+        return Model.__eq__(self, other)
@@ -0,0 +1,146 @@
+import json
+import os
+import struct
+import zlib
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from arena.arena_base import ArenaBase
+
+# magic, format, log position, model ratings version, chain ratings version, metadata length
+_HEADER = struct.Struct("<4sIQQQI")
+_MAGIC = b"CACK"
+_FORMAT = 1
+_CRC = struct.Struct("<I")
+
+
+def checkpoint_bytes(arena: "ArenaBase", position: int) -> bytes:
+    """
+    Serialize an arena's rating state.
+
+    Captures the model and chain ratings, the interned model and chain ids
+    (as names, in id order), the rating engine's extra state (`get_state`)
+    and the matchmaker's pair history. Matchmaker randomness is not saved.
+
+    Layout (little-endian): a header, a JSON metadata block describing the
+    ids and arrays, the raw arrays, and a CRC32 of everything before it.
+
+    Args:
+        arena: Arena to checkpoint; must not be recording votes meanwhile
+        position: Vote log position up to which votes are included
+
+    Returns:
+        The checkpoint file contents
+    """
+    arrays = {
+        "model_ratings": np.array(arena.model_elos.ratings, dtype=np.float64),
+        "chain_ratings": np.array(arena.chain_elos.ratings, dtype=np.float64),
+    }
+    arrays.update((f"engine.{name}", value) for name, value in arena.rating_engine.get_state().items())
+    arrays.update((f"matchmaker.{name}", value) for name, value in arena.matchmaker.get_state().items())
+    arrays = {name: np.ascontiguousarray(value) for name, value in arrays.items()}
+
+    metadata = json.dumps({
+        "engine": type(arena.rating_engine).__name__,
+        "models": [model.name for model in arena.model_elos.keys_by_id],
+        "chains": [list(chain.names) for chain in arena.chain_elos.keys_by_id],
+        "arrays": [[name, value.dtype.str, list(value.shape)] for name, value in arrays.items()],
+    }).encode()
+    header = _HEADER.pack(
+        _MAGIC, _FORMAT, position, arena.model_elos.version, arena.chain_elos.version, len(metadata)
+    )
+    body = b"".join([header, metadata, *(value.tobytes() for value in arrays.values())])
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def save_checkpoint(path: str, data: bytes) -> None:
+    """
+    Write checkpoint contents atomically: readers see the old or the new file.
+
+    Args:
+        path: Checkpoint file (replaced if it exists)
+        data: Contents from `checkpoint_bytes`
+    """
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    directory = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+def checkpoint_position(path: str) -> Optional[int]:
+    """Log position covered by a checkpoint file, or None if there is none."""
+    try:
+        with open(path, "rb") as file:
+            header = file.read(_HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(header) < _HEADER.size:
+        return None
+    magic, version, position, _, _, _ = _HEADER.unpack(header)
+    if magic != _MAGIC or version != _FORMAT:
+        return None
+    return position
+
+
+def load_checkpoint(path: str, arena: "ArenaBase") -> int:
+    """
+    Restore a checkpoint into a freshly built arena.
+
+    Args:
+        path: Checkpoint file
+        arena: Arena over the same chains, with the same engine type, that
+            has not recorded any votes
+
+    Returns:
+        Vote log position up to which the checkpoint includes votes
+
+    Raises:
+        FileNotFoundError: If there is no checkpoint
+        ValueError: If the file is corrupt or was taken from a different arena
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    if len(data) < _HEADER.size + _CRC.size or _CRC.unpack_from(data, len(data) - _CRC.size)[0] != zlib.crc32(
+        data[: -_CRC.size]
+    ):
+        raise ValueError(f"{path} is not a valid checkpoint")
+    magic, version, position, model_version, chain_version, metadata_size = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _FORMAT:
+        raise ValueError(f"{path} is not a checkpoint of format {_FORMAT}")
+    metadata = json.loads(data[_HEADER.size : _HEADER.size + metadata_size])
+
+    if metadata["engine"] != type(arena.rating_engine).__name__:
+        raise ValueError(f"{path} was taken with a {metadata['engine']} rating engine")
+    if metadata["models"] != [model.name for model in arena.model_elos.keys_by_id] or metadata[
+        "chains"
+    ] != [list(chain.names) for chain in arena.chain_elos.keys_by_id]:
+        raise ValueError(f"{path} was taken from an arena with different models or chains")
+
+    arrays = {}
+    offset = _HEADER.size + metadata_size
+    for name, dtype, shape in metadata["arrays"]:
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        arrays[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape)
+        offset += count * dtype.itemsize
+
+    arena.model_elos.load(arrays["model_ratings"])
+    arena.chain_elos.load(arrays["chain_ratings"])
+    arena.model_elos.ranking.version = model_version
+    arena.chain_elos.ranking.version = chain_version
+    arena.rating_engine.set_state(
+        {name[len("engine."):]: value for name, value in arrays.items() if name.startswith("engine.")}
+    )
+    arena.matchmaker.set_state(
+        {name[len("matchmaker."):]: value for name, value in arrays.items() if name.startswith("matchmaker.")}
+    )
+    return position
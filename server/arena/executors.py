@@ -0,0 +1,229 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from multiprocessing import shared_memory
+from typing import Any, Callable, Optional
+
+# Binary outputs at least this large come back from process workers through
+# shared memory instead of being pickled through the result pipe: the parent
+# copies them out of the segment once, rather than receiving them in pipe-sized
+# chunks and unpickling them
+SHARED_MEMORY_THRESHOLD = 64 * 1024
+
+
+class ExecutionBackend(str, Enum):
+    """Where a model's synchronous function runs."""
+
+    INLINE = "inline"  # On the event loop thread (only for trivial, non-blocking work)
+    THREAD = "thread"  # In a shared thread pool (I/O-bound provider calls)
+    PROCESS = "process"  # In a dedicated pool of warm worker processes (CPU-bound local models)
+
+
+@dataclass
+class ProcessPoolConfig:
+    """Configuration of a named pool of warm worker processes."""
+    max_workers: int = 1
+    initializer: Optional[Callable[..., None]] = None
+    initargs: tuple = ()
+
+
+# === Worker-side helpers ===
+
+_worker_state: dict[str, Any] = {}
+
+
+def worker_state() -> dict[str, Any]:
+    """
+    Per-process state for warm workers.
+
+    Pool initializers store loaded resources (e.g. model weights) here so
+    that every call handled by the worker reuses them.
+    """
+    return _worker_state
+
+
+class _SharedResult:
+    """Handle to a binary result left in a shared memory segment by a worker."""
+
+    __slots__ = ("name", "size")
+
+    def __init__(self, name: str, size: int) -> None:
+        self.name = name
+        self.size = size
+
+
+def _init_worker(initializer: Optional[Callable[..., None]], initargs: tuple) -> None:
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _call_in_worker(model: Callable[[Any], Any], input_data: Any) -> Any:
+    result = model(input_data)
+    if isinstance(result, (bytes, bytearray, memoryview)):
+        size = memoryview(result).nbytes
+        if size >= SHARED_MEMORY_THRESHOLD:
+            # The parent unlinks the segment once it has read it (or abandoned
+            # the call). Pool workers share the parent's resource tracker, which
+            # unlinks whatever is left if the parent dies first.
+            segment = shared_memory.SharedMemory(create=True, size=size)
+            segment.buf[:size] = memoryview(result).cast("B")
+            segment.close()
+            return _SharedResult(segment.name, size)
+    return result
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+def _collect_shared_result(result: Any) -> Any:
+    if not isinstance(result, _SharedResult):
+        return result
+    segment = shared_memory.SharedMemory(name=result.name)
+    try:
+        return bytes(segment.buf[: result.size])
+    finally:
+        segment.close()
+        segment.unlink()
+
+
+def _discard_shared_result(future: Future) -> None:
+    """Unlink the segment of a call whose caller stopped waiting."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    if isinstance(result, _SharedResult):
+        segment = shared_memory.SharedMemory(name=result.name)
+        segment.close()
+        segment.unlink()
+
+
+# === Executor registry ===
+
+
+class ExecutorRegistry:
+    """
+    Owns the thread pool and named process pools that models run on.
+
+    Pools are created lazily on first use. Process pools use the `spawn`
+    start method by default so workers never inherit event loop or thread
+    state from the server process.
+    """
+
+    def __init__(
+        self,
+        thread_workers: Optional[int] = None,
+        mp_context: Optional[str] = "spawn",
+    ):
+        """
+        Args:
+            thread_workers: Size of the shared thread pool (default: Python's default)
+            mp_context: Multiprocessing start method for process pools
+        """
+        self.thread_workers = thread_workers
+        self._mp_context = multiprocessing.get_context(mp_context) if mp_context else None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_configs: dict[str, ProcessPoolConfig] = {}
+        self._process_pools: dict[str, ProcessPoolExecutor] = {}
+        self._lock = threading.Lock()
+
+    def configure_process_pool(
+        self,
+        name: str,
+        max_workers: int = 1,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: tuple = (),
+    ) -> None:
+        """
+        Declare a named process pool.
+
+        Args:
+            name: Pool name referenced by models' `pool` attribute
+            max_workers: Number of worker processes
+            initializer: Function run once in each worker, e.g. to load weights
+                into `worker_state()`
+            initargs: Arguments for the initializer
+        """
+        with self._lock:
+            if name in self._process_pools:
+                raise ValueError(f"Process pool '{name}' is already running")
+            self._process_configs[name] = ProcessPoolConfig(max_workers, initializer, initargs)
+
+    def thread_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._thread_pool is None:
+                self._thread_pool = ThreadPoolExecutor(
+                    max_workers=self.thread_workers, thread_name_prefix="arena-model"
+                )
+            return self._thread_pool
+
+    def process_pool(self, name: str = "default") -> ProcessPoolExecutor:
+        with self._lock:
+            pool = self._process_pools.get(name)
+            if pool is None:
+                config = self._process_configs.get(name, ProcessPoolConfig())
+                pool = ProcessPoolExecutor(
+                    max_workers=config.max_workers,
+                    mp_context=self._mp_context,
+                    initializer=_init_worker,
+                    initargs=(config.initializer, config.initargs),
+                )
+                self._process_pools[name] = pool
+            return pool
+
+    def warm_up(self, name: str = "default") -> list[int]:
+        """
+        Start every worker of a process pool and run its initializer.
+
+        Returns:
+            PIDs of the workers that answered
+        """
+        pool = self.process_pool(name)
+        workers = self._process_configs.get(name, ProcessPoolConfig()).max_workers
+        return [future.result() for future in [pool.submit(_noop) for _ in range(workers)]]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down every pool created by this registry."""
+        with self._lock:
+            pools: list[Executor] = list(self._process_pools.values())
+            if self._thread_pool is not None:
+                pools.append(self._thread_pool)
+            self._process_pools.clear()
+            self._thread_pool = None
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+    async def run(self, model: Callable[[Any], Any], input_data: Any) -> Any:
+        """
+        Run a synchronous model call on the backend the model declares.
+
+        Models declare `backend` (an `ExecutionBackend`, default THREAD) and,
+        for PROCESS, the `pool` to use. Process calls send the model itself
+        to the worker and call it there, as the other backends do, so the
+        model (class and function) must be picklable.
+        """
+        backend = ExecutionBackend(getattr(model, "backend", ExecutionBackend.THREAD))
+        if backend is ExecutionBackend.INLINE:
+            return model(input_data)
+
+        loop = asyncio.get_running_loop()
+        if backend is ExecutionBackend.THREAD:
+            return await loop.run_in_executor(self.thread_pool(), model, input_data)
+
+        pool = self.process_pool(getattr(model, "pool", None) or "default")
+        future = pool.submit(_call_in_worker, model, input_data)
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A call already running in a worker still finishes
+            future.add_done_callback(_discard_shared_result)
+            raise
+        return _collect_shared_result(result)
+
+
+# Process-wide registry used by `acall_model`
+default_executors = ExecutorRegistry()
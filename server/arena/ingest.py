@@ -0,0 +1,174 @@
+import asyncio
+import random
+from typing import TYPE_CHECKING, Callable, Optional
+
+from arena.snapshot import RatingSnapshot
+from arena.types import VoteOutcome
+
+if TYPE_CHECKING:
+    from arena.arena_base import ArenaBase, ModelChain
+
+
+class VoteIngestor:
+    """
+    Single-writer vote pipeline in front of an arena.
+
+    Request handlers `submit` votes onto a bounded queue and return at once.
+    One writer task drains the queue in batches of up to `max_batch` votes,
+    applies each batch with `ArenaBase.record_votes` in a worker thread and
+    then publishes a fresh `RatingSnapshot`. Handlers read leaderboards and
+    draw matchups from `snapshot`, which is replaced wholesale after every
+    batch and never mutated, so readers take no locks and never see a
+    half-applied batch.
+
+    Only the writer may touch the arena once the ingestor has started:
+    reading or voting on it directly from a handler would race the worker
+    thread.
+
+    Attributes:
+        arena: Arena the votes are applied to
+        max_batch: Largest number of votes applied at once
+        snapshot: Ratings after the latest applied batch
+        submitted: Number of votes accepted onto the queue
+        processed: Number of queued votes the writer has handled
+        failed: Number of votes dropped because their batch raised
+        last_error: Exception raised by the latest failed batch, if any
+    """
+
+    def __init__(
+        self,
+        arena: "ArenaBase",
+        max_batch: int = 256,
+        max_pending: int = 10_000,
+        seed: Optional[int] = None,
+        on_snapshot: Optional[Callable[[RatingSnapshot], None]] = None,
+    ):
+        """
+        Args:
+            arena: Arena to apply votes to
+            max_batch: Largest number of votes applied at once (default: 256)
+            max_pending: Queued votes before `submit` waits for the writer
+                (default: 10000)
+            seed: Seed for matchups drawn from snapshots
+            on_snapshot: Called with each new snapshot in the writer's worker
+                thread before it is published (e.g. to share it with other
+                processes)
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.arena = arena
+        self.max_batch = max_batch
+        self.snapshot: RatingSnapshot = arena.snapshot()
+        self.submitted = 0
+        self.processed = 0
+        self.failed = 0
+        self.last_error: Optional[BaseException] = None
+        self.rng = random.Random(seed)
+        self.on_snapshot = on_snapshot
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._processed_changed = asyncio.Condition()
+        self._writer: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Votes accepted but not yet handled by the writer."""
+        return self.submitted - self.processed
+
+    # === Writing ===
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop (idempotent)."""
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(
+        self, chain_a: "ModelChain", chain_b: "ModelChain", vote: VoteOutcome
+    ) -> int:
+        """
+        Queue a vote for the writer.
+
+        Returns as soon as the vote is queued; it is applied with the next
+        batch. Waits only if `max_pending` votes are already queued.
+
+        Args:
+            chain_a: First model chain (team A)
+            chain_b: Second model chain (team B)
+            vote: The outcome of the vote
+
+        Returns:
+            Sequence number of the vote (1 for the first vote submitted)
+
+        Raises:
+            KeyError: If either chain is not in the arena
+        """
+        for chain in (chain_a, chain_b):
+            if chain not in self.arena.chain_elos:
+                raise KeyError(f"Chain {chain!r} not found in arena")
+        self.start()
+        await self._queue.put((chain_a, chain_b, VoteOutcome(vote)))
+        self.submitted += 1
+        return self.submitted
+
+    async def wait_processed(self, sequence: int) -> RatingSnapshot:
+        """
+        Wait until the vote with a given sequence number has been handled.
+
+        Returns:
+            A snapshot that includes the vote (unless its batch failed)
+        """
+        if self.processed >= sequence:
+            return self.snapshot
+        self.start()
+        async with self._processed_changed:
+            await self._processed_changed.wait_for(lambda: self.processed >= sequence)
+        return self.snapshot
+
+    async def drain(self) -> RatingSnapshot:
+        """Wait until every vote submitted so far has been handled."""
+        return await self.wait_processed(self.submitted)
+
+    async def stop(self) -> None:
+        """Apply the remaining votes, then stop the writer task."""
+        if self._writer is None:
+            return
+        await self.drain()
+        self._writer.cancel()
+        try:
+            await self._writer
+        except asyncio.CancelledError:
+            pass
+        self._writer = None
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                self.snapshot = await asyncio.to_thread(self._apply, batch)
+            except Exception as exc:
+                self.failed += len(batch)
+                self.last_error = exc
+            self.processed += len(batch)
+            async with self._processed_changed:
+                self._processed_changed.notify_all()
+
+    def _apply(self, batch: list[tuple["ModelChain", "ModelChain", VoteOutcome]]) -> RatingSnapshot:
+        """Apply a batch to the arena and snapshot the result (runs in a worker thread)."""
+        self.arena.record_votes(batch)
+        snapshot = self.arena.snapshot()
+        if self.on_snapshot is not None:
+            self.on_snapshot(snapshot)
+        return snapshot
+
+    # === Reading ===
+
+    def generate_matchup(self) -> tuple["ModelChain", "ModelChain"]:
+        """
+        Pick a matchup from the latest snapshot.
+
+        Raises:
+            ValueError: If the arena has fewer than two chains
+        """
+        return self.snapshot.generate_matchup(self.rng)
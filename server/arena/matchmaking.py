@@ -0,0 +1,408 @@
+import math
+import random
+from array import array
+from bisect import bisect_right
+from collections import deque
+from itertools import accumulate
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Mapping, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from arena.arena_base import ArenaBase, ModelChain
+
+
+class SumTree:
+    """
+    Binary tree of non-negative weights supporting O(log n) updates and sampling.
+
+    Leaves hold one weight per id; every inner node holds the sum of its
+    children, so the root is the total weight and a weighted draw is a
+    single walk from the root to a leaf.
+    """
+
+    __slots__ = ("size", "_capacity", "_tree")
+
+    def __init__(self, weights: list[float]):
+        """
+        Args:
+            weights: Initial weight of each id
+        """
+        self.size = len(weights)
+        capacity = 1
+        while capacity < max(self.size, 1):
+            capacity *= 2
+        self._capacity = capacity
+        tree = [0.0] * (2 * capacity)
+        tree[capacity : capacity + self.size] = [float(weight) for weight in weights]
+        for node in range(capacity - 1, 0, -1):
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+        self._tree = tree
+
+    @property
+    def total(self) -> float:
+        return self._tree[1]
+
+    def __getitem__(self, index: int) -> float:
+        return self._tree[self._capacity + index]
+
+    def update(self, index: int, weight: float) -> None:
+        """Set the weight of an id."""
+        if weight < 0:
+            raise ValueError("Weights must be non-negative")
+        tree = self._tree
+        node = self._capacity + index
+        change = weight - tree[node]
+        while node:
+            tree[node] += change
+            node //= 2
+
+    def sample(self, rng: random.Random) -> int:
+        """
+        Draw an id with probability proportional to its weight.
+
+        Raises:
+            ValueError: If every weight is zero
+        """
+        tree = self._tree
+        if tree[1] <= 0:
+            raise ValueError("Cannot sample from an empty sum tree")
+        target = rng.random() * tree[1]
+        node = 1
+        while node < self._capacity:
+            left = 2 * node
+            if target < tree[left] or tree[left + 1] <= 0:
+                node = left
+            else:
+                target -= tree[left]
+                node = left + 1
+        return min(node - self._capacity, self.size - 1)
+
+
+class Matchmaker:
+    """
+    Active matchup scheduler for an arena.
+
+    Picks the pair of chains whose vote is expected to be most informative:
+
+    1. The first chain is drawn from a `SumTree` with weight equal to the
+       variance of its rating, so uncertain chains are shown more often.
+    2. Its opponent is chosen among its neighbours on the chain leaderboard
+       (within `window` ranks), maximising the expected information gain
+       `p * (1 - p) * (var_a + var_b)`: close ratings make the outcome
+       uncertain, and uncertain ratings have the most to learn. Pairs shown
+       before are discounted and the most recent `recent_pairs` are skipped.
+
+    Variances come from the rating engine when it tracks uncertainty
+    (Glicko-2, TrueSkill); for ELO they are approximated by
+    `prior_uncertainty**2 / (1 + games played)`. Recording a vote updates the
+    two chains' weights in O(log n), so a pick costs O(log n + window).
+
+    Attributes:
+        window: Leaderboard ranks searched on each side of the first chain
+        explore: Probability of pairing with a uniformly random opponent
+        recent_pairs: Number of latest matchups never repeated
+        prior_uncertainty: Rating deviation of an unplayed chain (rating points)
+        games: Number of votes recorded per chain id
+    """
+
+    def __init__(
+        self,
+        window: int = 16,
+        explore: float = 0.05,
+        recent_pairs: int = 8,
+        prior_uncertainty: float = 350.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            window: Leaderboard ranks searched on each side (default: 16)
+            explore: Probability of a uniformly random opponent (default: 0.05)
+            recent_pairs: Number of latest matchups never repeated (default: 8)
+            prior_uncertainty: Rating deviation of an unplayed chain (default: 350)
+            seed: Seed for reproducible schedules
+        """
+        self.window = window
+        self.explore = explore
+        self.recent_pairs = recent_pairs
+        self.prior_uncertainty = prior_uncertainty
+        self.rng = random.Random(seed)
+        self._recent: deque[tuple[int, int]] = deque(maxlen=recent_pairs)
+        self._pair_counts: dict[tuple[int, int], int] = {}
+        self.arena: Optional["ArenaBase"] = None
+
+    def bind(self, arena: "ArenaBase") -> None:
+        """Attach the scheduler to an arena's chains and ratings."""
+        self.arena = arena
+        self.games = [0] * len(arena.chain_elos)
+        self._pair_counts = {}
+        self._recent.clear()
+        self.refresh()
+
+    # === Weights ===
+
+    def _variance(self, chain_id: int) -> float:
+        variance = self.arena.rating_engine.chain_rating_variance(chain_id)
+        if variance is None:
+            return self.prior_uncertainty**2 / (1 + self.games[chain_id])
+        return variance
+
+    def refresh(self) -> None:
+        """Rebuild every weight from the current ratings (O(n))."""
+        self._tree = SumTree([self._variance(chain_id) for chain_id in range(len(self.games))])
+        self._loads = self.arena.chain_elos.loads
+
+    def record(self, chain_a: int, chain_b: int) -> None:
+        """
+        Account for a vote between two chain ids.
+
+        Updates both chains' sampling weights in O(log n); if the ratings
+        were rewritten in bulk since the last refresh (a batch of votes or a
+        closed rating period), every weight is rebuilt instead.
+        """
+        self.games[chain_a] += 1
+        self.games[chain_b] += 1
+        pair = (chain_a, chain_b) if chain_a < chain_b else (chain_b, chain_a)
+        self._pair_counts[pair] = self._pair_counts.get(pair, 0) + 1
+        self._recent.append(pair)
+        if self.arena.chain_elos.loads != self._loads:
+            self.refresh()
+            return
+        for chain_id in (chain_a, chain_b):
+            self._tree.update(chain_id, self._variance(chain_id))
+
+    def record_many(self, chain_a: list[int], chain_b: list[int]) -> None:
+        """Account for a batch of votes and rebuild every weight."""
+        games, pair_counts = self.games, self._pair_counts
+        for a, b in zip(chain_a, chain_b):
+            games[a] += 1
+            games[b] += 1
+            pair = (a, b) if a < b else (b, a)
+            pair_counts[pair] = pair_counts.get(pair, 0) + 1
+            self._recent.append(pair)
+        self.refresh()
+
+    # === Checkpoints ===
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        """Games, pair history and recent pairs as named arrays (for checkpoints)."""
+        pairs = list(self._pair_counts)
+        return {
+            "games": np.array(self.games, dtype=np.int64),
+            "pairs": np.array(pairs, dtype=np.int32).reshape(-1, 2),
+            "pair_counts": np.array([self._pair_counts[pair] for pair in pairs], dtype=np.int64),
+            "recent": np.array(list(self._recent), dtype=np.int32).reshape(-1, 2),
+        }
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        """
+        Restore state returned by `get_state` (bound to the same chains) and
+        rebuild the weights from the current ratings.
+
+        Raises:
+            KeyError: If an array is missing
+        """
+        self.games = state["games"].tolist()
+        self._pair_counts = {
+            (a, b): count
+            for (a, b), count in zip(state["pairs"].tolist(), state["pair_counts"].tolist())
+        }
+        self._recent.clear()
+        self._recent.extend(map(tuple, state["recent"].tolist()))
+        self.refresh()
+
+    # === Selection ===
+
+    def next_pair(self) -> tuple[int, int]:
+        """
+        Choose the next matchup.
+
+        Returns:
+            Tuple of (chain_a_id, chain_b_id), in random A/B order
+
+        Raises:
+            ValueError: If the arena has fewer than two chains
+        """
+        store = self.arena.chain_elos
+        n = len(store)
+        if n < 2:
+            raise ValueError("A matchup needs at least two model chains")
+        if store.loads != self._loads:
+            self.refresh()
+
+        first = self._tree.sample(self.rng)
+        if self.rng.random() < self.explore:
+            second = self.rng.randrange(n - 1)
+            second += second >= first
+        else:
+            second = self._best_opponent(first)
+
+        if self.rng.random() < 0.5:
+            return first, second
+        return second, first
+
+    def _best_opponent(self, first: int) -> int:
+        store = self.arena.chain_elos
+        rank = store.ranking.rank(first, store.ratings[first])
+        start = max(0, rank - self.window)
+        candidates = store.ranking.page(start, 2 * self.window + 1)
+        return _most_informative(
+            first, candidates, store.ratings, self._variance,
+            self._pair_counts, self._recent, self.rng,
+        )
+
+    def next_matchup(self) -> tuple["ModelChain", "ModelChain"]:
+        """Choose the next matchup as a pair of chains."""
+        chain_a, chain_b = self.next_pair()
+        keys = self.arena.chain_elos.keys_by_id
+        return keys[chain_a], keys[chain_b]
+
+    def snapshot(self) -> "MatchupSnapshot":
+        """
+        Freeze the current scheduling state (O(n + pairs played)).
+
+        The snapshot picks matchups exactly like `next_pair`, from copies of
+        the ratings, weights and pair history taken now, so it can be used
+        while votes are being recorded into the live arena.
+        """
+        store = self.arena.chain_elos
+        if store.loads != self._loads:
+            self.refresh()
+        return MatchupSnapshot(
+            chains=tuple(store.keys_by_id),
+            ratings=tuple(store.ratings),
+            variances=tuple(self._tree[chain_id] for chain_id in range(len(store))),
+            order=tuple(store.ranking.page()),
+            pair_counts=MappingProxyType(dict(self._pair_counts)),
+            recent=frozenset(self._recent),
+            window=self.window,
+            explore=self.explore,
+        )
+
+
+class MatchupSnapshot:
+    """
+    Read-only copy of a `Matchmaker`'s state at one point in time.
+
+    Sampling the first chain is a binary search over cumulative weights
+    instead of a `SumTree` walk, and neighbours come from a frozen ranking,
+    so a pick still costs O(log n + window) without touching the arena.
+    Picks do not change the snapshot; only recorded votes do, through the
+    live matchmaker.
+
+    Attributes:
+        chains: Chains indexed by id
+        ratings: Rating of each chain id
+        variances: Sampling weight (rating variance) of each chain id
+        order: Chain ids sorted by rating (highest first)
+        pair_counts: Votes recorded per (lower id, higher id) pair
+        recent: Pairs that are not repeated
+    """
+
+    __slots__ = (
+        "chains", "ratings", "variances", "order", "pair_counts", "recent",
+        "window", "explore", "_position", "_cumulative",
+    )
+
+    def __init__(
+        self,
+        chains: tuple,
+        ratings: tuple[float, ...],
+        variances: tuple[float, ...],
+        order: tuple[int, ...],
+        pair_counts: Mapping[tuple[int, int], int],
+        recent: frozenset[tuple[int, int]],
+        window: int,
+        explore: float,
+    ):
+        self.chains = chains
+        self.ratings = ratings
+        self.variances = variances
+        self.order = order
+        self.window = window
+        self.explore = explore
+        position = array("l", [0]) * len(order)
+        for rank, chain_id in enumerate(order):
+            position[chain_id] = rank
+        self._position = position
+        self._cumulative = tuple(accumulate(variances))
+        self.pair_counts = pair_counts
+        self.recent = recent
+
+    def next_pair(self, rng: random.Random) -> tuple[int, int]:
+        """
+        Choose a matchup as `Matchmaker.next_pair` would have at snapshot time.
+
+        Raises:
+            ValueError: If there are fewer than two chains
+        """
+        n = len(self.chains)
+        if n < 2:
+            raise ValueError("A matchup needs at least two model chains")
+        cumulative = self._cumulative
+        if cumulative[-1] <= 0:
+            raise ValueError("Cannot sample a matchup when every weight is zero")
+        first = min(bisect_right(cumulative, rng.random() * cumulative[-1]), n - 1)
+
+        if rng.random() < self.explore:
+            second = rng.randrange(n - 1)
+            second += second >= first
+        else:
+            start = max(0, self._position[first] - self.window)
+            candidates = self.order[start : start + 2 * self.window + 1]
+            second = _most_informative(
+                first, candidates, self.ratings, self.variances.__getitem__,
+                self.pair_counts, self.recent, rng,
+            )
+
+        if rng.random() < 0.5:
+            return first, second
+        return second, first
+
+    def next_matchup(self, rng: random.Random) -> tuple["ModelChain", "ModelChain"]:
+        """Choose a matchup as a pair of chains."""
+        chain_a, chain_b = self.next_pair(rng)
+        return self.chains[chain_a], self.chains[chain_b]
+
+
+def _most_informative(
+    first: int,
+    candidates,
+    ratings,
+    variance: Callable[[int], float],
+    pair_counts: Mapping[tuple[int, int], int],
+    recent,
+    rng: random.Random,
+) -> int:
+    """Opponent of `first` among `candidates` with the highest discounted information gain."""
+    variance_first = variance(first)
+    # Best opponent overall, and best one not shown against `first` recently
+    best, best_gain = -1, -1.0
+    fresh, fresh_gain = -1, -1.0
+    for candidate in candidates:
+        if candidate == first:
+            continue
+        pair = (first, candidate) if first < candidate else (candidate, first)
+        gain = information_gain(
+            ratings[first], ratings[candidate], variance_first, variance(candidate),
+        )
+        gain /= 1 + pair_counts.get(pair, 0)
+        # Random jitter breaks ties between equally informative opponents
+        gain *= 1 + 1e-9 * rng.random()
+        if gain > best_gain:
+            best, best_gain = candidate, gain
+        if gain > fresh_gain and pair not in recent:
+            fresh, fresh_gain = candidate, gain
+    return fresh if fresh >= 0 else best
+
+
+def information_gain(rating_a: float, rating_b: float, variance_a: float, variance_b: float) -> float:
+    """
+    Expected information from a vote between two ratings.
+
+    The Fisher information of a logistic comparison, `p * (1 - p)`, scaled by
+    the total variance the vote can reduce.
+    """
+    p = 1 / (1 + math.pow(10, (rating_b - rating_a) / 400))
+    return p * (1 - p) * (variance_a + variance_b)
@@ -0,0 +1,363 @@
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Any, AsyncIterator, Callable, Generic, Iterable, Optional
+from arena.arena_base import Model, TInput, TOutput, acall_model, astream_model
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """
+    Distribution of observed values over fixed buckets.
+
+    Counts are kept per bucket (not cumulative); `render_snapshots` turns
+    them into Prometheus' cumulative `le` buckets.
+    """
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last: above every bound
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricFamily:
+    """
+    A named metric with one series per combination of label values.
+
+    Attributes:
+        name: Metric name
+        help: One-line description
+        type: "counter", "gauge" or "histogram"
+        labels: Label names, in the order values are given
+        series: Value (or `Histogram`) per tuple of label values
+    """
+
+    def __init__(self, name: str, help: str, type: str, labels: tuple[str, ...], buckets: tuple = ()):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.labels = labels
+        self.buckets = buckets
+        self.series: dict[tuple[str, ...], Any] = {}
+
+    def inc(self, values: tuple[str, ...] = (), amount: float = 1) -> None:
+        """Add to a counter (or gauge) series."""
+        self.series[values] = self.series.get(values, 0) + amount
+
+    def set(self, values: tuple[str, ...], value: float) -> None:
+        """Set a gauge (or collected counter) series."""
+        self.series[values] = value
+
+    def observe(self, values: tuple[str, ...], value: float) -> None:
+        """Record a value in a histogram series."""
+        histogram = self.series.get(values)
+        if histogram is None:
+            histogram = self.series[values] = Histogram(self.buckets)
+        histogram.observe(value)
+
+
+class MetricsRegistry:
+    """
+    In-process metric aggregators with Prometheus text rendering.
+
+    Metrics are plain counters and bucket arrays without locks: they are
+    updated only from the event loop thread (model functions may run in
+    worker threads or processes, but their timings are recorded by the
+    awaiting coroutine), so updates never interleave. Values owned by other
+    objects (queue lengths, cache statistics) are read by collectors when a
+    snapshot is taken, instead of being mirrored on every change.
+    """
+
+    def __init__(self) -> None:
+        self._families: dict[str, MetricFamily] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def _family(self, name: str, help: str, type: str, labels: Iterable[str], buckets: tuple = ()) -> MetricFamily:
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = MetricFamily(name, help, type, tuple(labels), buckets)
+        elif family.type != type:
+            raise ValueError(f"Metric {name} is already registered as a {family.type}")
+        return family
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> MetricFamily:
+        return self._family(name, help, "counter", labels)
+
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> MetricFamily:
+        return self._family(name, help, "gauge", labels)
+
+    def histogram(
+        self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ) -> MetricFamily:
+        return self._family(name, help, "histogram", labels, buckets)
+
+    def collect(self, collector: Callable[[], None]) -> None:
+        """Run `collector` before every snapshot, to refresh metrics read from elsewhere."""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        """
+        Current values of every metric, as JSON-serializable data.
+
+        Snapshots of several processes can be merged with `render_snapshots`.
+        """
+        for collector in self._collectors:
+            collector()
+        families = {}
+        for family in self._families.values():
+            if family.type == "histogram":
+                series = [
+                    [list(values), {"counts": h.counts, "sum": h.sum, "count": h.count}]
+                    for values, h in family.series.items()
+                ]
+            else:
+                series = [[list(values), value] for values, value in family.series.items()]
+            families[family.name] = {
+                "help": family.help,
+                "type": family.type,
+                "labels": list(family.labels),
+                "buckets": list(family.buckets),
+                "series": series,
+            }
+        return families
+
+    def render(self) -> str:
+        """Current values in the Prometheus text exposition format."""
+        return render_snapshots([self.snapshot()])
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def render_snapshots(snapshots: list[dict]) -> str:
+    """
+    Render `MetricsRegistry.snapshot()`s in the Prometheus text format, summed.
+
+    Series with the same labels in several snapshots (e.g. one per worker
+    process) are added together, so counters, histograms and gauges such as
+    queue depths describe all the snapshots' processes at once.
+    """
+    merged: dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, {**family, "series": {}})
+            for values, value in family["series"]:
+                key = tuple(values)
+                if family["type"] != "histogram":
+                    target["series"][key] = target["series"].get(key, 0) + value
+                    continue
+                current = target["series"].get(key)
+                if current is None:
+                    target["series"][key] = {"counts": list(value["counts"]), "sum": value["sum"], "count": value["count"]}
+                else:
+                    current["counts"] = [a + b for a, b in zip(current["counts"], value["counts"])]
+                    current["sum"] += value["sum"]
+                    current["count"] += value["count"]
+
+    lines = []
+    for name, family in merged.items():
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        labels = family["labels"]
+        for values, value in sorted(family["series"].items()):
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_labels(labels, values)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip([*family["buckets"], float("inf")], value["counts"]):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{name}_bucket{_labels(labels, values, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels, values)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labels, values)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def payload_size(value: Any) -> int:
+    """Size in bytes of a text or binary payload (0 for anything else)."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8", "surrogatepass"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, memoryview):
+        return value.nbytes
+    return 0
+
+
+class CallMetrics:
+    """
+    Latency, time to first chunk, outcomes, concurrency and payload sizes of calls.
+
+    One instance covers one kind of call (model stages, whole chains, ...),
+    broken down by a key label such as the model name.
+
+    Attributes:
+        seconds: Histogram of total call time, by key and outcome ("ok",
+            "error", "cancelled")
+        first_chunk_seconds: Histogram of time to the first output chunk, by key
+        input_bytes: Counter of input payload bytes, by key
+        output_bytes: Counter of output payload bytes, by key
+        in_flight: Gauge of calls currently running, by key
+    """
+
+    def __init__(self, registry: MetricsRegistry, prefix: str, key: str, what: str):
+        """
+        Args:
+            registry: Registry holding the metrics
+            prefix: Metric name prefix, e.g. "chainalign_stage"
+            key: Label naming what is called, e.g. "model"
+            what: Description used in the metrics' help, e.g. "model stage"
+        """
+        self.seconds = registry.histogram(f"{prefix}_seconds", f"Total {what} call time", (key, "outcome"))
+        self.first_chunk_seconds = registry.histogram(
+            f"{prefix}_first_chunk_seconds", f"Time to the first output chunk of {what} calls", (key,)
+        )
+        self.input_bytes = registry.counter(f"{prefix}_input_bytes_total", f"Input bytes of {what} calls", (key,))
+        self.output_bytes = registry.counter(f"{prefix}_output_bytes_total", f"Output bytes of {what} calls", (key,))
+        self.in_flight = registry.gauge(f"{prefix}_in_flight", f"{what.capitalize()} calls running", (key,))
+
+    def start(self, key: str) -> "CallTimer":
+        """Start timing one call."""
+        return CallTimer(self, key)
+
+    async def call(self, key: str, function: Callable[[Any], Any], input_data: Any) -> Any:
+        """Await `function(input_data)`, timing it as one call."""
+        timer = self.start(key)
+        timer.input(input_data)
+        try:
+            output = await function(input_data)
+        except BaseException as exc:
+            timer.finish(exc)
+            raise
+        timer.chunk(output)
+        timer.finish()
+        return output
+
+    async def stream(self, key: str, chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Pass output chunks through, timing the stream as one call."""
+        timer = self.start(key)
+        try:
+            async for chunk in chunks:
+                timer.chunk(chunk)
+                yield chunk
+        except BaseException as exc:
+            timer.finish(exc)
+            raise
+        timer.finish()
+
+
+class CallTimer:
+    """Timing of one call in progress (see `CallMetrics`)."""
+
+    __slots__ = ("metrics", "key", "started", "first_chunk")
+
+    def __init__(self, metrics: CallMetrics, key: str):
+        self.metrics = metrics
+        self.key = key
+        self.started = time.perf_counter()
+        self.first_chunk: Optional[float] = None
+        metrics.in_flight.inc((key,))
+
+    def input(self, data: Any) -> None:
+        """Count an input payload (or chunk)."""
+        self.metrics.input_bytes.inc((self.key,), payload_size(data))
+
+    def chunk(self, data: Any) -> None:
+        """Count an output payload (or chunk); the first one sets the time to first chunk."""
+        if self.first_chunk is None:
+            self.first_chunk = time.perf_counter() - self.started
+            self.metrics.first_chunk_seconds.observe((self.key,), self.first_chunk)
+        self.metrics.output_bytes.inc((self.key,), payload_size(data))
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """Record the call's total time and outcome."""
+        if error is None:
+            outcome = "ok"
+        elif isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            outcome = "cancelled"
+        else:
+            outcome = "error"
+        self.metrics.seconds.observe((self.key, outcome), time.perf_counter() - self.started)
+        self.metrics.in_flight.inc((self.key,), -1)
+
+
+class InstrumentedModel(Generic[TInput, TOutput]):
+    """
+    Model wrapper that times every call of the model as a stage.
+
+    Awaited calls and streams are recorded in a `CallMetrics` under the
+    model's name: total time and outcome, time to the first output chunk
+    (the whole output, for awaited calls), and input and output sizes. The
+    wrapper keeps the model's name, so chains using it are rated as the
+    plain model.
+    """
+
+    def __init__(self, model: Model[TInput, TOutput], metrics: CallMetrics):
+        """
+        Args:
+            model: Model to wrap
+            metrics: Where the stage's calls are recorded
+        """
+        self.model = model
+        self.metrics = metrics
+        self.name = model.name
+
+    @property
+    def info(self) -> Any:
+        return getattr(self.model, "info", None)
+
+    def __call__(self, input_data: TInput) -> TOutput:
+        return self.model(input_data)
+
+    async def acall(self, input_data: TInput) -> TOutput:
+        return await self.metrics.call(self.name, lambda data: acall_model(self.model, data), input_data)
+
+    async def astream(self, chunks: AsyncIterator[TInput]) -> AsyncIterator[TOutput]:
+        timer = self.metrics.start(self.name)
+
+        async def counted() -> AsyncIterator[TInput]:
+            async for chunk in chunks:
+                timer.input(chunk)
+                yield chunk
+
+        try:
+            async for chunk in astream_model(self.model, counted()):
+                timer.chunk(chunk)
+                yield chunk
+        except BaseException as exc:
+            timer.finish(exc)
+            raise
+        timer.finish()
+
+    def __repr__(self) -> str:
+        return f"InstrumentedModel({self.model!r})"
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __eq__(self, other) -> bool:
+        return Model.__eq__(self, other)
@@ -0,0 +1,122 @@
+import asyncio
+from typing import Callable, Generic, Iterable, Optional
+from arena.arena_base import Model, ModelChain, TInput, TOutput, acall_model
+
+
+class _PlanNode:
+    """A single stage in the prefix trie, shared by every chain that starts with its path."""
+
+    __slots__ = ("model", "children", "chains", "reaches")
+
+    def __init__(self, model: Optional[Model] = None) -> None:
+        self.model = model
+        self.children: dict[Model, "_PlanNode"] = {}
+        # Chains whose final stage is this node
+        self.chains: list[ModelChain] = []
+        # Chains whose final stage is this node or one below it
+        self.reaches: set[ModelChain] = set()
+
+
+class ChainPlanner(Generic[TInput, TOutput]):
+    """
+    Execution planner that runs shared chain prefixes only once.
+
+    Chains are organised into a prefix trie keyed by model, so chains such as
+    `[gpt-4, claude-3-haiku]` and `[gpt-4, mistral-large]` share a single
+    `gpt-4` stage whose output is fanned out to both branches. Sibling branches
+    run concurrently.
+
+    Attributes:
+        model_chains: Chains covered by the plan, in the order given
+        stage_count: Number of model calls one run of the plan makes
+        naive_stage_count: Number of model calls running each chain separately makes
+    """
+
+    def __init__(self, model_chains: list[ModelChain[TInput, TOutput]]):
+        """
+        Build the prefix trie for the given chains.
+
+        Args:
+            model_chains: Chains to plan; duplicates are executed once
+        """
+        self.model_chains = model_chains
+        self._root = _PlanNode()
+        self.stage_count = 0
+        self.naive_stage_count = 0
+
+        for chain in model_chains:
+            node = self._root
+            node.reaches.add(chain)
+            for model in chain.model_chain:
+                child = node.children.get(model)
+                if child is None:
+                    child = _PlanNode(model)
+                    node.children[model] = child
+                    self.stage_count += 1
+                node = child
+                node.reaches.add(chain)
+            node.chains.append(chain)
+            self.naive_stage_count += len(chain.model_chain)
+
+    def __repr__(self) -> str:
+        return (
+            f"ChainPlanner(chains={len(self.model_chains)}, "
+            f"stages={self.stage_count}/{self.naive_stage_count})"
+        )
+
+    async def run(
+        self,
+        input_data: TInput,
+        chains: Optional[Iterable[ModelChain[TInput, TOutput]]] = None,
+        on_output: Optional[Callable[[ModelChain[TInput, TOutput], TOutput], None]] = None,
+    ) -> dict[ModelChain[TInput, TOutput], TOutput]:
+        """
+        Run planned chains on the same input.
+
+        Args:
+            input_data: Input fed to the first stage of every chain
+            chains: Chains to run, e.g. the two of a matchup (default: all);
+                only the stages they use run, shared prefixes still once
+            on_output: Called with each chain and its output as soon as that
+                chain finishes, while the others may still be running
+
+        Returns:
+            Mapping of each chain run to its final output
+
+        Raises:
+            ValueError: If `chains` names a chain that is not planned
+        """
+        wanted = None
+        if chains is not None:
+            wanted = set(chains)
+            unknown = wanted - self._root.reaches
+            if unknown:
+                raise ValueError(f"Chains not in the plan: {sorted(chain.names for chain in unknown)}")
+        outputs: dict[ModelChain[TInput, TOutput], TOutput] = {}
+        await self._run_node(self._root, input_data, wanted, outputs, on_output)
+        return outputs
+
+    async def _run_node(
+        self,
+        node: _PlanNode,
+        input_data,
+        wanted: Optional[set[ModelChain[TInput, TOutput]]],
+        outputs: dict[ModelChain[TInput, TOutput], TOutput],
+        on_output: Optional[Callable[[ModelChain[TInput, TOutput], TOutput], None]],
+    ) -> None:
+        if node.model is not None:
+            input_data = await acall_model(node.model, input_data)
+        for chain in node.chains:
+            if wanted is None or chain in wanted:
+                outputs[chain] = input_data
+                if on_output is not None:
+                    on_output(chain, input_data)
+        children = [
+            child for child in node.children.values() if wanted is None or not wanted.isdisjoint(child.reaches)
+        ]
+        if len(children) == 1:
+            await self._run_node(children[0], input_data, wanted, outputs, on_output)
+        elif children:
+            await asyncio.gather(
+                *(self._run_node(child, input_data, wanted, outputs, on_output) for child in children)
+            )
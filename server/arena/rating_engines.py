@@ -0,0 +1,601 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Optional
+import numpy as np
+from arena.elo import calculate_elo_from_vote, calculate_team_elo_from_vote
+from arena.ratings import RatingStore
+from arena.replay import OUTCOME_CODES, EloReplayEngine, VoteLog
+from arena.types import VoteOutcome
+
+# Outcome code -> VoteOutcome, for engines that update vote by vote
+_OUTCOMES = {code: outcome for outcome, code in OUTCOME_CODES.items()}
+
+# Actual score of side A / side B for each outcome code (both_bad: both lose)
+_SCORE_A = (1.0, 0.0, 0.5, 0.0)
+_SCORE_B = (0.0, 1.0, 0.5, 0.0)
+
+_TIE = OUTCOME_CODES[VoteOutcome.TIE]
+_BOTH_BAD = OUTCOME_CODES[VoteOutcome.BOTH_BAD]
+_B = OUTCOME_CODES[VoteOutcome.B]
+
+
+class RatingEngine(ABC):
+    """
+    Rating system used by an arena.
+
+    An engine rates every chain as an individual player and every model as a
+    member of the team formed by its chain. It is bound to the arena's two
+    `RatingStore`s, writes each player's point estimate (on the ELO scale)
+    into them, and keeps any extra per-player state (e.g. uncertainty) in
+    arrays indexed by the same ids.
+
+    Subclasses implement `record_vote`; they can override `record_votes`
+    with a faster batched update and `flush` if they defer updates.
+    """
+
+    def bind(
+        self,
+        model_elos: RatingStore,
+        chain_elos: RatingStore,
+        chain_members: list[tuple[int, ...]],
+    ) -> None:
+        """
+        Attach the engine to an arena's ratings.
+
+        Args:
+            model_elos: Per-model ratings
+            chain_elos: Per-chain ratings
+            chain_members: Member model ids of each chain, indexed by chain id
+        """
+        self.model_elos = model_elos
+        self.chain_elos = chain_elos
+        self.chain_members = chain_members
+
+    @abstractmethod
+    def record_vote(self, chain_a: int, chain_b: int, vote: VoteOutcome) -> None:
+        """
+        Apply one vote between two chains, referenced by chain id.
+
+        Args:
+            chain_a: Chain id of side A
+            chain_b: Chain id of side B
+            vote: The outcome of the vote
+        """
+
+    def record_votes(self, log: VoteLog) -> None:
+        """Apply a vote log, in order (default: one `record_vote` per vote)."""
+        for chain_a, chain_b, code in zip(
+            log.chain_a.tolist(), log.chain_b.tolist(), log.outcome.tolist()
+        ):
+            self.record_vote(chain_a, chain_b, _OUTCOMES[code])
+
+    def flush(self) -> None:
+        """Apply any deferred updates (e.g. close the current rating period)."""
+
+    def model_uncertainty(self) -> Optional[np.ndarray]:
+        """Standard deviation of each model's rating, or None if not tracked."""
+        return None
+
+    def chain_uncertainty(self) -> Optional[np.ndarray]:
+        """Standard deviation of each chain's rating, or None if not tracked."""
+        return None
+
+    def chain_rating_variance(self, chain_id: int) -> Optional[float]:
+        """Variance of one chain's rating in O(1), or None if not tracked."""
+        return None
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        """State kept besides the two rating stores, as named arrays (for checkpoints)."""
+        return {}
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        """
+        Restore state returned by `get_state` of an engine bound to the same chains.
+
+        Raises:
+            KeyError: If an array is missing
+        """
+
+
+# === ELO ===
+
+
+class EloEngine(RatingEngine):
+    """
+    Classic ELO: chains are rated as players, models as averaged teams.
+
+    This is the arena's default engine and matches `arena.elo` exactly;
+    batches are replayed through the vectorized `EloReplayEngine`.
+
+    Attributes:
+        k_factor: ELO k-factor
+    """
+
+    def __init__(self, k_factor: int = 32):
+        """
+        Args:
+            k_factor: ELO k-factor (default: 32)
+        """
+        self.k_factor = k_factor
+        self._replay_engine: Optional[EloReplayEngine] = None
+
+    def bind(self, model_elos, chain_elos, chain_members) -> None:
+        super().bind(model_elos, chain_elos, chain_members)
+        self._replay_engine = None
+
+    def record_vote(self, chain_a: int, chain_b: int, vote: VoteOutcome) -> None:
+        members_a = self.chain_members[chain_a]
+        members_b = self.chain_members[chain_b]
+
+        # Team-based ratings: each model in the chain gets the same adjustment
+        model_ratings = self.model_elos.ratings
+        new_team_a_ratings, new_team_b_ratings = calculate_team_elo_from_vote(
+            vote,
+            [model_ratings[i] for i in members_a],
+            [model_ratings[i] for i in members_b],
+            self.k_factor,
+        )
+        set_model_rating = self.model_elos.set_rating
+        for model_id, rating in zip(members_a, new_team_a_ratings):
+            set_model_rating(model_id, rating)
+        for model_id, rating in zip(members_b, new_team_b_ratings):
+            set_model_rating(model_id, rating)
+
+        # Chain-based ratings: each chain is a single player
+        chain_ratings = self.chain_elos.ratings
+        new_chain_a_elo, new_chain_b_elo = calculate_elo_from_vote(
+            vote, chain_ratings[chain_a], chain_ratings[chain_b], self.k_factor
+        )
+        self.chain_elos.set_rating(chain_a, new_chain_a_elo)
+        self.chain_elos.set_rating(chain_b, new_chain_b_elo)
+
+    def record_votes(self, log: VoteLog) -> None:
+        if self._replay_engine is None:
+            # Interning in the same order as the rating stores keeps ids aligned
+            self._replay_engine = EloReplayEngine(
+                self.chain_elos.keys_by_id, k_factor=self.k_factor
+            )
+        model_ratings, chain_ratings = self._replay_engine.replay(
+            log, self.model_elos.ratings, self.chain_elos.ratings
+        )
+        self.model_elos.load(model_ratings)
+        self.chain_elos.load(chain_ratings)
+
+
+# === Glicko-2 ===
+
+# Glicko-2 internal units: rating points per unit of mu / phi
+GLICKO2_SCALE = 400 / math.log(10)
+
+
+def _glicko2_g(phi: np.ndarray) -> np.ndarray:
+    return 1 / np.sqrt(1 + 3 * phi**2 / math.pi**2)
+
+
+def _glicko2_volatility(
+    delta: np.ndarray, phi: np.ndarray, sigma: np.ndarray, v: np.ndarray,
+    tau: float, tolerance: float = 1e-6, max_iterations: int = 100,
+) -> np.ndarray:
+    """New volatility of each player (step 5 of Glickman's paper, vectorized Illinois)."""
+    a = np.log(sigma**2)
+
+    def f(x: np.ndarray) -> np.ndarray:
+        ex = np.exp(x)
+        return ex * (delta**2 - phi**2 - v - ex) / (2 * (phi**2 + v + ex) ** 2) - (x - a) / tau**2
+
+    big_a = a.copy()
+    excess = delta**2 - phi**2 - v
+    big_b = np.where(excess > 0, np.log(np.where(excess > 0, excess, 1.0)), a - tau)
+    # Bracket the root from below where the step-size guess was not enough
+    searching = excess <= 0
+    k = 1
+    while searching.any() and k < max_iterations:
+        searching &= f(a - k * tau) < 0
+        k += 1
+        big_b = np.where(searching, a - k * tau, big_b)
+
+    f_a, f_b = f(big_a), f(big_b)
+    for _ in range(max_iterations):
+        active = np.abs(big_b - big_a) > tolerance
+        if not active.any():
+            break
+        big_c = big_a + (big_a - big_b) * f_a / (f_b - f_a)
+        f_c = f(big_c)
+        replace_a = f_c * f_b <= 0
+        big_a = np.where(active, np.where(replace_a, big_b, big_a), big_a)
+        f_a = np.where(active, np.where(replace_a, f_b, f_a / 2), f_a)
+        big_b = np.where(active, big_c, big_b)
+        f_b = np.where(active, f_c, f_b)
+    return np.exp(big_a / 2)
+
+
+def glicko2_period(
+    mu: np.ndarray,
+    phi: np.ndarray,
+    sigma: np.ndarray,
+    player: np.ndarray,
+    opponent_mu: np.ndarray,
+    opponent_phi: np.ndarray,
+    score: np.ndarray,
+    tau: float = 0.5,
+    max_phi: Optional[float] = None,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Apply one Glicko-2 rating period to every player at once.
+
+    Ratings are in Glicko-2 units (mu, phi). Each game of the period is one
+    entry of `player`/`opponent_mu`/`opponent_phi`/`score`; a player can
+    appear in any number of games.
+
+    Args:
+        mu, phi, sigma: Current rating, deviation and volatility of every player
+        player: Player id of each game
+        opponent_mu: Opponent rating of each game
+        opponent_phi: Opponent deviation of each game
+        score: Player's score in each game (1, 0.5 or 0)
+        tau: System constant limiting volatility changes (default: 0.5)
+        max_phi: Cap on deviations of idle players (default: no cap)
+
+    Returns:
+        New (mu, phi, sigma) arrays
+    """
+    n = len(mu)
+    g = _glicko2_g(opponent_phi)
+    expected = 1 / (1 + np.exp(-g * (mu[player] - opponent_mu)))
+    information = np.bincount(player, g**2 * expected * (1 - expected), n)
+    improvement = np.bincount(player, g * (score - expected), n)
+
+    played = information > 0
+    new_mu, new_sigma = mu.copy(), sigma.copy()
+    # Idle players only become less certain
+    new_phi = np.sqrt(phi**2 + sigma**2)
+    if max_phi is not None:
+        new_phi = np.minimum(new_phi, max_phi)
+
+    if played.any():
+        v = 1 / information[played]
+        delta = v * improvement[played]
+        new_sigma[played] = _glicko2_volatility(delta, phi[played], sigma[played], v, tau)
+        phi_star = np.sqrt(phi[played] ** 2 + new_sigma[played] ** 2)
+        new_phi[played] = 1 / np.sqrt(1 / phi_star**2 + 1 / v)
+        new_mu[played] = mu[played] + new_phi[played] ** 2 * improvement[played]
+    return new_mu, new_phi, new_sigma
+
+
+class Glicko2Engine(RatingEngine):
+    """
+    Glicko-2 ratings with deviation and volatility, updated per rating period.
+
+    Votes are collected into rating periods of `period_size` votes; when a
+    period closes, every player is updated at once from all of its games in
+    the period (players who did not play become slightly less certain).
+    Ratings shown in the arena change at period boundaries; `flush` closes
+    the current period early.
+
+    For model ratings each member of a chain is rated against the opposing
+    chain's composite (mean rating, root-mean-square deviation), with the
+    expected score computed between the two team composites.
+
+    Attributes:
+        period_size: Number of votes per rating period
+        initial_rd: Rating deviation of a new player (rating points)
+        initial_volatility: Volatility of a new player
+        tau: System constant limiting volatility changes
+    """
+
+    def __init__(
+        self,
+        period_size: int = 32,
+        initial_rd: float = 350.0,
+        initial_volatility: float = 0.06,
+        tau: float = 0.5,
+    ):
+        """
+        Args:
+            period_size: Number of votes per rating period (default: 32)
+            initial_rd: Rating deviation of a new player (default: 350)
+            initial_volatility: Volatility of a new player (default: 0.06)
+            tau: System constant limiting volatility changes (default: 0.5)
+        """
+        if period_size < 1:
+            raise ValueError("period_size must be at least 1")
+        self.period_size = period_size
+        self.initial_rd = initial_rd
+        self.initial_volatility = initial_volatility
+        self.tau = tau
+        self._pending: list[tuple[int, int, int]] = []
+
+    def bind(self, model_elos, chain_elos, chain_members) -> None:
+        super().bind(model_elos, chain_elos, chain_members)
+        n_models, n_chains = len(model_elos), len(chain_elos)
+        self.model_rd = np.full(n_models, self.initial_rd)
+        self.chain_rd = np.full(n_chains, self.initial_rd)
+        self.model_volatility = np.full(n_models, self.initial_volatility)
+        self.chain_volatility = np.full(n_chains, self.initial_volatility)
+        # Ratings are centred on each player's initial rating
+        self._model_origin = np.array(model_elos.ratings)
+        self._chain_origin = np.array(chain_elos.ratings)
+
+        width = max((len(members) for members in chain_members), default=1)
+        self._members = np.full((n_chains, width), -1, dtype=np.int64)
+        for chain_id, members in enumerate(chain_members):
+            self._members[chain_id, : len(members)] = members
+        self._pending = []
+
+    def record_vote(self, chain_a: int, chain_b: int, vote: VoteOutcome) -> None:
+        self._pending.append((chain_a, chain_b, OUTCOME_CODES[vote]))
+        if len(self._pending) >= self.period_size:
+            self.flush()
+
+    def record_votes(self, log: VoteLog) -> None:
+        votes = list(zip(log.chain_a.tolist(), log.chain_b.tolist(), log.outcome.tolist()))
+        while votes:
+            room = self.period_size - len(self._pending)
+            self._pending.extend(votes[:room])
+            votes = votes[room:]
+            if len(self._pending) >= self.period_size:
+                self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        chain_a, chain_b, outcome = (np.array(column, dtype=np.int64) for column in zip(*self._pending))
+        self._pending = []
+        score_a = np.array(_SCORE_A)[outcome]
+        score_b = np.array(_SCORE_B)[outcome]
+
+        # Chains: individual players
+        store, origin = self.chain_elos, self._chain_origin
+        mu = (np.array(store.ratings) - origin) / GLICKO2_SCALE
+        phi = self.chain_rd / GLICKO2_SCALE
+        mu, phi, self.chain_volatility = glicko2_period(
+            mu, phi, self.chain_volatility,
+            np.concatenate([chain_a, chain_b]),
+            np.concatenate([mu[chain_b], mu[chain_a]]),
+            np.concatenate([phi[chain_b], phi[chain_a]]),
+            np.concatenate([score_a, score_b]),
+            self.tau, self.initial_rd / GLICKO2_SCALE,
+        )
+        store.load(origin + mu * GLICKO2_SCALE)
+        self.chain_rd = phi * GLICKO2_SCALE
+
+        # Models: members of teams, each played against the opposing composite
+        store, origin = self.model_elos, self._model_origin
+        mu = (np.array(store.ratings) - origin) / GLICKO2_SCALE
+        phi = self.model_rd / GLICKO2_SCALE
+        mask = self._members >= 0
+        safe = np.where(mask, self._members, 0)
+        counts = mask.sum(axis=1)
+        team_mu = np.where(mask, mu[safe], 0).sum(axis=1) / counts
+        team_phi = np.sqrt(np.where(mask, phi[safe] ** 2, 0).sum(axis=1) / counts)
+
+        players, opponent_mu, opponent_phi, scores = [], [], [], []
+        for own, other, score in ((chain_a, chain_b, score_a), (chain_b, chain_a, score_b)):
+            members = self._members[own]
+            member_mask = members >= 0
+            rows = np.nonzero(member_mask)[0]
+            member = members[member_mask]
+            players.append(member)
+            # Shift the opponent so that (member - opponent) equals (own team - other team)
+            opponent_mu.append(team_mu[other][rows] - (team_mu[own][rows] - mu[member]))
+            opponent_phi.append(team_phi[other][rows])
+            scores.append(score[rows])
+        mu, phi, self.model_volatility = glicko2_period(
+            mu, phi, self.model_volatility,
+            np.concatenate(players),
+            np.concatenate(opponent_mu),
+            np.concatenate(opponent_phi),
+            np.concatenate(scores),
+            self.tau, self.initial_rd / GLICKO2_SCALE,
+        )
+        store.load(origin + mu * GLICKO2_SCALE)
+        self.model_rd = phi * GLICKO2_SCALE
+
+    def model_uncertainty(self) -> np.ndarray:
+        return self.model_rd
+
+    def chain_uncertainty(self) -> np.ndarray:
+        return self.chain_rd
+
+    def chain_rating_variance(self, chain_id: int) -> float:
+        return float(self.chain_rd[chain_id]) ** 2
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        return {
+            "model_rd": self.model_rd.copy(),
+            "chain_rd": self.chain_rd.copy(),
+            "model_volatility": self.model_volatility.copy(),
+            "chain_volatility": self.chain_volatility.copy(),
+            # Votes of the open rating period, one (chain_a, chain_b, code) row each
+            "pending": np.array(self._pending, dtype=np.int64).reshape(-1, 3),
+        }
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        self.model_rd = np.array(state["model_rd"], dtype=np.float64)
+        self.chain_rd = np.array(state["chain_rd"], dtype=np.float64)
+        self.model_volatility = np.array(state["model_volatility"], dtype=np.float64)
+        self.chain_volatility = np.array(state["chain_volatility"], dtype=np.float64)
+        self._pending = [tuple(row) for row in state["pending"].tolist()]
+
+
+# === TrueSkill-style Gaussian teams ===
+
+
+def _pdf(x: float) -> float:
+    return math.exp(-x * x / 2) / math.sqrt(2 * math.pi)
+
+
+def _cdf(x: float) -> float:
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+
+def _inverse_cdf(p: float) -> float:
+    """Inverse of the standard normal CDF (bisection; only used at construction)."""
+    low, high = -10.0, 10.0
+    for _ in range(100):
+        mid = (low + high) / 2
+        if _cdf(mid) < p:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def _win_factors(t: float, epsilon: float) -> tuple[float, float]:
+    """Mean and variance corrections (v, w) for a win with margin t."""
+    x = t - epsilon
+    denominator = _cdf(x)
+    if denominator < 1e-300:
+        # Asymptotic limit for extremely surprising results
+        return -x, 1.0
+    v = _pdf(x) / denominator
+    return v, v * (v + x)
+
+
+def _draw_factors(t: float, epsilon: float) -> tuple[float, float]:
+    """Mean and variance corrections (v, w) for a draw with margin t."""
+    a, b = -epsilon - t, epsilon - t
+    denominator = _cdf(b) - _cdf(a)
+    if denominator < 1e-300:
+        return (-t - epsilon if t > 0 else -t + epsilon), 1.0
+    v = (_pdf(a) - _pdf(b)) / denominator
+    w = v * v + (b * _pdf(b) - a * _pdf(a)) / denominator
+    return v, w
+
+
+class TrueSkillEngine(RatingEngine):
+    """
+    TrueSkill-style Bayesian ratings with Gaussian skills and team performance.
+
+    Every player has a skill mean and variance. A chain's performance is the
+    mean of its models' skills plus Gaussian noise, and each vote updates
+    every member by its share of the team's surprise, scaled by its own
+    variance: uncertain models move a lot and settle quickly, well-known
+    ones barely move. Ties and both_bad votes count as draws (neither side
+    was preferred). Ratings shown in the arena are skill means on the ELO
+    scale; `sigma` is each rating's standard deviation.
+
+    Attributes:
+        sigma: Skill standard deviation of a new player (rating points)
+        beta: Performance noise of a team (rating points)
+        tau: Skill drift added before every game (rating points)
+        draw_probability: Prior probability of a draw between equal teams
+    """
+
+    def __init__(
+        self,
+        sigma: float = 400.0,
+        beta: float = 200.0,
+        tau: float = 4.0,
+        draw_probability: float = 0.1,
+    ):
+        """
+        Args:
+            sigma: Skill standard deviation of a new player (default: 400)
+            beta: Performance noise of a team (default: 200, so a 400-point
+                gap is roughly a 90% win chance as in ELO)
+            tau: Skill drift added before every game (default: 4)
+            draw_probability: Prior probability of a draw (default: 0.1)
+        """
+        self.sigma = sigma
+        self.beta = beta
+        self.tau = tau
+        self.draw_probability = draw_probability
+        self.draw_margin = _inverse_cdf((draw_probability + 1) / 2) * math.sqrt(2) * beta
+
+    def bind(self, model_elos, chain_elos, chain_members) -> None:
+        super().bind(model_elos, chain_elos, chain_members)
+        self.model_variance = [self.sigma**2] * len(model_elos)
+        self.chain_variance = [self.sigma**2] * len(chain_elos)
+        self._chain_teams = [(chain_id,) for chain_id in range(len(chain_elos))]
+
+    def _update(
+        self,
+        mu,
+        variance: list[float],
+        team_a: tuple[int, ...],
+        team_b: tuple[int, ...],
+        code: int,
+    ) -> dict[int, float]:
+        """
+        Update variances in place and return the new mean of every member.
+
+        Teams perform as the mean of their members' skills. A model on both
+        sides (e.g. a shared first stage) receives both adjustments.
+        """
+        drift = self.tau**2
+        for i in set(team_a) | set(team_b):
+            variance[i] += drift
+        weight_a, weight_b = 1 / len(team_a), 1 / len(team_b)
+        mean_a = sum(mu[i] for i in team_a) * weight_a
+        mean_b = sum(mu[i] for i in team_b) * weight_b
+        c_squared = (
+            sum(variance[i] for i in team_a) * weight_a**2
+            + sum(variance[i] for i in team_b) * weight_b**2
+            + 2 * self.beta**2
+        )
+        c = math.sqrt(c_squared)
+
+        # Factors are computed from the winner's point of view
+        if code == _B:
+            winner, loser, weight_w, weight_l = team_b, team_a, weight_b, weight_a
+            t = (mean_b - mean_a) / c
+        else:
+            winner, loser, weight_w, weight_l = team_a, team_b, weight_a, weight_b
+            t = (mean_a - mean_b) / c
+        epsilon = self.draw_margin / c
+        if code == _TIE or code == _BOTH_BAD:
+            v, w = _draw_factors(t, epsilon)
+        else:
+            v, w = _win_factors(t, epsilon)
+
+        # Every share is computed from the pre-game variances
+        shares = {i: variance[i] / c for i in set(team_a) | set(team_b)}
+        updates: dict[int, float] = {}
+        for team, weight, sign in ((winner, weight_w, 1.0), (loser, weight_l, -1.0)):
+            for i in team:
+                share = weight * shares[i]
+                updates[i] = updates.get(i, mu[i]) + sign * share * v
+                variance[i] *= max(1 - weight * share / c * w, 1e-6)
+        return updates
+
+    def record_vote(self, chain_a: int, chain_b: int, vote: VoteOutcome) -> None:
+        code = OUTCOME_CODES[vote]
+        for store, variance, teams in (
+            (self.chain_elos, self.chain_variance, self._chain_teams),
+            (self.model_elos, self.model_variance, self.chain_members),
+        ):
+            for i, rating in self._update(store.ratings, variance, teams[chain_a], teams[chain_b], code).items():
+                store.set_rating(i, rating)
+
+    def record_votes(self, log: VoteLog) -> None:
+        votes = list(zip(log.chain_a.tolist(), log.chain_b.tolist(), log.outcome.tolist()))
+        for store, variance, teams in (
+            (self.chain_elos, self.chain_variance, self._chain_teams),
+            (self.model_elos, self.model_variance, self.chain_members),
+        ):
+            # Work on a plain list and publish the ratings once at the end
+            mu = list(store.ratings)
+            for chain_a, chain_b, code in votes:
+                for i, rating in self._update(mu, variance, teams[chain_a], teams[chain_b], code).items():
+                    mu[i] = rating
+            store.load(mu)
+
+    def model_uncertainty(self) -> np.ndarray:
+        return np.sqrt(self.model_variance)
+
+    def chain_uncertainty(self) -> np.ndarray:
+        return np.sqrt(self.chain_variance)
+
+    def chain_rating_variance(self, chain_id: int) -> float:
+        return self.chain_variance[chain_id]
+
+    def get_state(self) -> dict[str, np.ndarray]:
+        return {
+            "model_variance": np.array(self.model_variance),
+            "chain_variance": np.array(self.chain_variance),
+        }
+
+    def set_state(self, state: dict[str, np.ndarray]) -> None:
+        self.model_variance = state["model_variance"].tolist()
+        self.chain_variance = state["chain_variance"].tolist()
@@ -0,0 +1,217 @@
+from array import array
+from bisect import bisect_left, insort
+from typing import Any, Hashable, Iterator, Mapping, Optional
+
+
+class RankedIndex:
+    """
+    Ids kept sorted by rating (highest first), updated in place.
+
+    Entries are `(-rating, id)` tuples in a sorted list, so ties keep id
+    order, the top k entries are a slice, and a rating change moves a single
+    entry with two binary searches.
+
+    Attributes:
+        version: Incremented on every change, so readers can skip unchanged snapshots
+    """
+
+    __slots__ = ("_entries", "version")
+
+    def __init__(self, ratings=()) -> None:
+        self._entries: list[tuple[float, int]] = sorted(
+            (-rating, key_id) for key_id, rating in enumerate(ratings)
+        )
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def insert(self, key_id: int, rating: float) -> None:
+        insort(self._entries, (-rating, key_id))
+        self.version += 1
+
+    def update(self, key_id: int, old_rating: float, new_rating: float) -> None:
+        """Move an id from its old rating to its new one."""
+        if old_rating == new_rating:
+            return
+        entries = self._entries
+        del entries[bisect_left(entries, (-old_rating, key_id))]
+        insort(entries, (-new_rating, key_id))
+        self.version += 1
+
+    def rank(self, key_id: int, rating: float) -> int:
+        """0-based rank of an id currently at `rating`."""
+        return bisect_left(self._entries, (-rating, key_id))
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> list[int]:
+        """Ids ranked `offset` to `offset + limit` (all remaining when limit is None)."""
+        end = None if limit is None else offset + limit
+        return [key_id for _, key_id in self._entries[offset:end]]
+
+
+class RatingStore(Mapping):
+    """
+    Ratings for a fixed set of keys, interned to dense integer ids.
+
+    Every key (a model or a model chain) is assigned the next integer id the
+    first time it is added, and its rating lives at that position of a
+    contiguous `array('d')`. Keys with a `name` attribute can also be looked
+    up by name in O(1). The store behaves as a read/write mapping from key to
+    rating, so `store[model]` and `store[model] = elo` work as on a dict, but
+    keys can only be added through `add`.
+
+    Ratings must be written through the store (`set_rating`, item assignment
+    or `load`) rather than into `ratings` directly, so the ranking stays in
+    sync.
+
+    Attributes:
+        ratings: Ratings indexed by id
+        keys_by_id: Keys indexed by id
+        ranking: Ids ordered by rating
+        loads: Number of bulk rewrites through `load`
+    """
+
+    __slots__ = ("ratings", "keys_by_id", "ranking", "loads", "_ids", "_names")
+
+    def __init__(self) -> None:
+        self.ratings = array("d")
+        self.keys_by_id: list[Any] = []
+        self.ranking = RankedIndex()
+        self.loads = 0
+        self._ids: dict[Hashable, int] = {}
+        self._names: dict[str, int] = {}
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever a rating (and so possibly the ranking) changes."""
+        return self.ranking.version
+
+    def add(self, key: Hashable, rating: float) -> int:
+        """
+        Intern a key with an initial rating.
+
+        Args:
+            key: Model or chain to add; re-adding an existing key is a no-op
+            rating: Initial rating for a new key
+
+        Returns:
+            The key's integer id
+        """
+        key_id = self._ids.get(key)
+        if key_id is not None:
+            return key_id
+        key_id = len(self.keys_by_id)
+        self._ids[key] = key_id
+        self.keys_by_id.append(key)
+        self.ratings.append(rating)
+        self.ranking.insert(key_id, rating)
+        name = getattr(key, "name", None)
+        if isinstance(name, str):
+            self._names.setdefault(name, key_id)
+        return key_id
+
+    def id_of(self, key: Hashable) -> int:
+        """
+        Integer id of a key.
+
+        Raises:
+            KeyError: If the key is not in the store
+        """
+        return self._ids[key]
+
+    def id_of_name(self, name: str) -> int:
+        """
+        Integer id of the key with the given `name`.
+
+        Raises:
+            KeyError: If no key has that name
+        """
+        return self._names[name]
+
+    def get_by_name(self, name: str, default: Optional[float] = None) -> Optional[float]:
+        """Rating of the key with the given `name`, or `default`."""
+        key_id = self._names.get(name)
+        return default if key_id is None else self.ratings[key_id]
+
+    def load(self, ratings) -> None:
+        """
+        Replace every rating at once.
+
+        Args:
+            ratings: Sequence of floats indexed by id (e.g. a NumPy array)
+        """
+        if len(ratings) != len(self.ratings):
+            raise ValueError(f"Expected {len(self.ratings)} ratings, got {len(ratings)}")
+        self.ratings[:] = array("d", ratings)
+        version = self.ranking.version
+        self.ranking = RankedIndex(self.ratings)
+        self.ranking.version = version + 1
+        self.loads += 1
+
+    def set_rating(self, key_id: int, rating: float) -> None:
+        """Update the rating at an id, keeping the ranking in order."""
+        self.ranking.update(key_id, self.ratings[key_id], rating)
+        self.ratings[key_id] = rating
+
+    # === Ranked reads ===
+
+    def top(self, k: int) -> list[tuple[Any, float]]:
+        """The k highest-rated (key, rating) pairs, in O(k)."""
+        return self.page(0, k)
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> list[tuple[Any, float]]:
+        """
+        A slice of the leaderboard.
+
+        Args:
+            offset: Rank of the first entry (0 = highest rated)
+            limit: Maximum number of entries (default: all remaining)
+
+        Returns:
+            List of (key, rating) tuples sorted by rating (highest first)
+        """
+        keys, ratings = self.keys_by_id, self.ratings
+        return [(keys[key_id], ratings[key_id]) for key_id in self.ranking.page(offset, limit)]
+
+    def rank(self, key: Hashable) -> int:
+        """
+        0-based leaderboard position of a key (ties rank by insertion order).
+
+        Raises:
+            KeyError: If the key is not in the store
+        """
+        key_id = self._ids[key]
+        return self.ranking.rank(key_id, self.ratings[key_id])
+
+    # === Mapping interface ===
+
+    def __getitem__(self, key: Hashable) -> float:
+        return self.ratings[self._ids[key]]
+
+    def __setitem__(self, key: Hashable, rating: float) -> None:
+        """
+        Update the rating of an existing key.
+
+        Raises:
+            KeyError: If the key is not in the store (use `add`)
+        """
+        self.set_rating(self._ids[key], rating)
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            return key in self._ids
+        except TypeError:
+            return False
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.keys_by_id)
+
+    def __len__(self) -> int:
+        return len(self.keys_by_id)
+
+    def items(self):
+        """(key, rating) pairs in id order."""
+        return list(zip(self.keys_by_id, self.ratings))
+
+    def __repr__(self) -> str:
+        return f"RatingStore({dict(self.items())!r})"
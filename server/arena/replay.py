@@ -0,0 +1,346 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional, Sequence
+import numpy as np
+from arena.types import VoteOutcome
+
+# Integer codes used for outcomes in vote logs
+OUTCOME_CODES: dict[VoteOutcome, int] = {
+    VoteOutcome.A: 0,
+    VoteOutcome.B: 1,
+    VoteOutcome.TIE: 2,
+    VoteOutcome.BOTH_BAD: 3,
+}
+
+# Actual score of side A / side B for each outcome code
+_SCORE_A = np.array([1.0, 0.0, 0.5, 0.0])
+_SCORE_B = np.array([0.0, 1.0, 0.5, 0.0])
+
+
+@dataclass
+class VoteLog:
+    """
+    Columnar vote history with chains referenced by integer id.
+
+    Attributes:
+        chain_a: Chain id of side A for each vote
+        chain_b: Chain id of side B for each vote
+        outcome: Outcome code (see `OUTCOME_CODES`) for each vote
+    """
+    chain_a: np.ndarray
+    chain_b: np.ndarray
+    outcome: np.ndarray
+
+    def __post_init__(self) -> None:
+        self.chain_a = np.asarray(self.chain_a, dtype=np.int32)
+        self.chain_b = np.asarray(self.chain_b, dtype=np.int32)
+        self.outcome = np.asarray(self.outcome, dtype=np.int8)
+        if not len(self.chain_a) == len(self.chain_b) == len(self.outcome):
+            raise ValueError("Vote log columns must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.outcome)
+
+    def __getitem__(self, index: slice) -> "VoteLog":
+        return VoteLog(self.chain_a[index], self.chain_b[index], self.outcome[index])
+
+    @classmethod
+    def concat(cls, logs: Sequence["VoteLog"]) -> "VoteLog":
+        """Join several logs in order."""
+        return cls(
+            np.concatenate([log.chain_a for log in logs]),
+            np.concatenate([log.chain_b for log in logs]),
+            np.concatenate([log.outcome for log in logs]),
+        )
+
+
+def _pow10(exponents: np.ndarray) -> np.ndarray:
+    """
+    Elementwise 10 ** x with the C library `pow` used by Python floats.
+
+    NumPy's SIMD power kernels can differ from `pow` in the last bit, which
+    would make replayed ratings drift from `record_vote`.
+    """
+    return np.fromiter((10 ** x for x in exponents.tolist()), np.float64, len(exponents))
+
+
+def _expected_scores(rating_a: np.ndarray, rating_b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Expected ELO scores of both sides, computed exactly as in `arena.elo`."""
+    expected_a = 1 / (1 + _pow10((rating_b - rating_a) / 400))
+    expected_b = 1 / (1 + _pow10((rating_a - rating_b) / 400))
+    return expected_a, expected_b
+
+
+def _conflict_starts(touched: np.ndarray, n_votes: int) -> list[int]:
+    """
+    Split a vote sequence into runs whose votes touch pairwise-disjoint entities.
+
+    Inside such a run no vote reads a rating written by an earlier vote of the
+    same run, so the whole run can be applied at once with identical results.
+
+    Args:
+        touched: (n_votes, width) entity ids touched by each vote, -1 for padding
+        n_votes: Number of votes
+
+    Returns:
+        Start index of every run, followed by `n_votes`
+    """
+    width = touched.shape[1]
+    votes = np.repeat(np.arange(n_votes, dtype=np.int64), width)
+    entities = touched.reshape(-1).astype(np.int64)
+    valid = entities >= 0
+    votes, entities = votes[valid], entities[valid]
+
+    # Index of the previous vote touching the same entity (-1 if none)
+    order = np.lexsort((votes, entities))
+    votes, entities = votes[order], entities[order]
+    same = np.empty(len(entities), dtype=bool)
+    if len(entities):
+        same[0] = False
+        same[1:] = (entities[1:] == entities[:-1]) & (votes[1:] != votes[:-1])
+    previous = np.where(same, np.roll(votes, 1), -1)
+    last_conflict = np.full(n_votes, -1, dtype=np.int64)
+    np.maximum.at(last_conflict, votes, previous)
+
+    starts = [0]
+    start = 0
+    for index, conflict in enumerate(last_conflict.tolist()):
+        if conflict >= start:
+            starts.append(index)
+            start = index
+    starts.append(n_votes)
+    return starts
+
+
+class ChainIndex:
+    """
+    Interns the models and chains of an arena to dense integer ids.
+
+    Attributes:
+        model_ids: Mapping of model to integer id
+        chain_ids: Mapping of model chain to integer id
+        members: (n_chains, max_chain_length) member model ids, padded with -1
+        lengths: Number of models in each chain
+    """
+
+    def __init__(self, model_chains: list):
+        """
+        Args:
+            model_chains: Chains to index; duplicates share one id
+        """
+        self.model_ids: dict = {}
+        self.chain_ids: dict = {}
+        for chain in model_chains:
+            if chain in self.chain_ids:
+                continue
+            self.chain_ids[chain] = len(self.chain_ids)
+            for model in chain.model_chain:
+                self.model_ids.setdefault(model, len(self.model_ids))
+
+        chains = list(self.chain_ids)
+        width = max((len(chain.model_chain) for chain in chains), default=1)
+        self.members = np.full((len(chains), width), -1, dtype=np.int32)
+        for chain_id, chain in enumerate(chains):
+            for position, model in enumerate(chain.model_chain):
+                self.members[chain_id, position] = self.model_ids[model]
+        self.lengths = (self.members >= 0).sum(axis=1)
+
+    @property
+    def models(self) -> list:
+        return list(self.model_ids)
+
+    @property
+    def chains(self) -> list:
+        return list(self.chain_ids)
+
+    def encode(self, votes: Iterable[tuple]) -> VoteLog:
+        """
+        Convert (chain_a, chain_b, VoteOutcome) tuples into a `VoteLog`.
+
+        Raises:
+            KeyError: If a vote references a chain that is not indexed
+        """
+        chain_a, chain_b, outcome = [], [], []
+        for a, b, vote in votes:
+            chain_a.append(self.chain_ids[a])
+            chain_b.append(self.chain_ids[b])
+            outcome.append(OUTCOME_CODES[vote])
+        return VoteLog(chain_a, chain_b, outcome)
+
+
+class EloReplayEngine:
+    """
+    Batch engine that replays a vote history through sequential ELO.
+
+    Models and chains are interned to integer ids and the vote log is held
+    as NumPy arrays. The log is split into runs of votes touching disjoint
+    ratings; long runs are applied as single vectorized updates and short
+    runs go through a tight scalar loop over plain float lists. Both the
+    team (per-model) and the chain variant are replayed, and results match
+    calling `ArenaBase.record_vote` for every vote in order.
+
+    Attributes:
+        index: Integer ids of the models and chains being rated
+        model_ids: Mapping of model to integer id
+        chain_ids: Mapping of model chain to integer id
+        initial_elo: Rating assigned before any vote
+        k_factor: ELO k-factor
+    """
+
+    def __init__(
+        self,
+        model_chains: list | ChainIndex,
+        initial_elo: float = 1500.0,
+        k_factor: int = 32,
+        min_vector_run: int = 16,
+    ):
+        """
+        Args:
+            model_chains: Chains whose votes will be replayed, or an existing index
+            initial_elo: Rating assigned before any vote (default: 1500.0)
+            k_factor: ELO k-factor (default: 32)
+            min_vector_run: Shortest conflict-free run applied as one vectorized update
+        """
+        self.initial_elo = initial_elo
+        self.k_factor = k_factor
+        self.min_vector_run = min_vector_run
+
+        self.index = model_chains if isinstance(model_chains, ChainIndex) else ChainIndex(model_chains)
+        self.model_ids = self.index.model_ids
+        self.chain_ids = self.index.chain_ids
+        self.members = self.index.members
+        self.lengths = self.index.lengths
+
+    def encode(self, votes: Iterable[tuple]) -> VoteLog:
+        """Convert (chain_a, chain_b, VoteOutcome) tuples into a `VoteLog`."""
+        return self.index.encode(votes)
+
+    def initial_ratings(self) -> tuple[np.ndarray, np.ndarray]:
+        """Fresh (model_ratings, chain_ratings) arrays at the initial rating."""
+        return (
+            np.full(len(self.model_ids), self.initial_elo, dtype=np.float64),
+            np.full(len(self.chain_ids), self.initial_elo, dtype=np.float64),
+        )
+
+    def replay(
+        self,
+        log: VoteLog,
+        model_ratings: Optional[np.ndarray] = None,
+        chain_ratings: Optional[np.ndarray] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Replay a vote log.
+
+        Args:
+            log: Votes to apply, in order
+            model_ratings: Starting model ratings indexed by model id (default: initial)
+            chain_ratings: Starting chain ratings indexed by chain id (default: initial)
+
+        Returns:
+            Tuple of (model_ratings, chain_ratings) after every vote
+        """
+        fresh_models, fresh_chains = self.initial_ratings()
+        models = fresh_models if model_ratings is None else np.array(model_ratings, dtype=np.float64)
+        chains = fresh_chains if chain_ratings is None else np.array(chain_ratings, dtype=np.float64)
+        if len(log) == 0:
+            return models, chains
+
+        self._replay_chains(log, chains)
+        self._replay_teams(log, models)
+        return models, chains
+
+    def _vectorize(self, run_length: int, n_ratings: int) -> bool:
+        """Whether a conflict-free run is long enough to apply as one array update."""
+        # Moving ratings between the list and an array costs O(n_ratings)
+        return run_length >= max(self.min_vector_run, n_ratings // 4)
+
+    # === Chain variant: each chain is a single player ===
+
+    def _replay_chains(self, log: VoteLog, ratings: np.ndarray) -> None:
+        touched = np.stack([log.chain_a, log.chain_b], axis=1)
+        starts = _conflict_starts(touched, len(log))
+        k = self.k_factor
+        chain_a, chain_b, outcome = log.chain_a.tolist(), log.chain_b.tolist(), log.outcome.tolist()
+        score_a, score_b = _SCORE_A.tolist(), _SCORE_B.tolist()
+        # The scalar loop runs on a plain list, which is much faster to index than an array
+        values = ratings.tolist()
+
+        for begin, end in zip(starts[:-1], starts[1:]):
+            if self._vectorize(end - begin, len(values)):
+                array = np.array(values)
+                a, b = log.chain_a[begin:end], log.chain_b[begin:end]
+                codes = log.outcome[begin:end]
+                rating_a, rating_b = array[a], array[b]
+                expected_a, expected_b = _expected_scores(rating_a, rating_b)
+                array[a] = rating_a + k * (_SCORE_A[codes] - expected_a)
+                array[b] = rating_b + k * (_SCORE_B[codes] - expected_b)
+                values = array.tolist()
+                continue
+
+            for a, b, code in zip(chain_a[begin:end], chain_b[begin:end], outcome[begin:end]):
+                rating_a, rating_b = values[a], values[b]
+                expected_a = 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+                expected_b = 1 / (1 + 10 ** ((rating_a - rating_b) / 400))
+                values[a] = rating_a + k * (score_a[code] - expected_a)
+                values[b] = rating_b + k * (score_b[code] - expected_b)
+
+        ratings[:] = values
+
+    # === Team variant: every model of a chain gets the same change ===
+
+    def _team_average(self, ratings: np.ndarray, chain_ids: np.ndarray) -> np.ndarray:
+        members = self.members[chain_ids]
+        # Sum column by column so the additions happen in the same order as sum()
+        total = ratings[members[:, 0]]
+        for column in range(1, members.shape[1]):
+            ids = members[:, column]
+            total = total + np.where(ids >= 0, ratings[ids], 0.0)
+        return total / self.lengths[chain_ids]
+
+    def _replay_teams(self, log: VoteLog, ratings: np.ndarray) -> None:
+        touched = np.concatenate([self.members[log.chain_a], self.members[log.chain_b]], axis=1)
+        starts = _conflict_starts(touched, len(log))
+        k = self.k_factor
+        members = self.members
+        lengths = self.lengths.tolist()
+        member_lists = [[m for m in row if m >= 0] for row in members.tolist()]
+        chain_a, chain_b, outcome = log.chain_a.tolist(), log.chain_b.tolist(), log.outcome.tolist()
+        score_a, score_b = _SCORE_A.tolist(), _SCORE_B.tolist()
+        values = ratings.tolist()
+
+        for begin, end in zip(starts[:-1], starts[1:]):
+            if self._vectorize(end - begin, len(values)):
+                array = np.array(values)
+                a, b = log.chain_a[begin:end], log.chain_b[begin:end]
+                codes = log.outcome[begin:end]
+                expected_a, expected_b = _expected_scores(
+                    self._team_average(array, a), self._team_average(array, b)
+                )
+                change_a = k * (_SCORE_A[codes] - expected_a)
+                change_b = k * (_SCORE_B[codes] - expected_b)
+
+                members_a, members_b = members[a], members[b]
+                mask_a, mask_b = members_a >= 0, members_b >= 0
+                new_a = array[np.where(mask_a, members_a, 0)] + change_a[:, None]
+                new_b = array[np.where(mask_b, members_b, 0)] + change_b[:, None]
+                # Side B is written last, as in record_vote, for models on both sides
+                array[members_a[mask_a]] = new_a[mask_a]
+                array[members_b[mask_b]] = new_b[mask_b]
+                values = array.tolist()
+                continue
+
+            for a, b, code in zip(chain_a[begin:end], chain_b[begin:end], outcome[begin:end]):
+                models_a, models_b = member_lists[a], member_lists[b]
+                team_a = [values[m] for m in models_a]
+                team_b = [values[m] for m in models_b]
+                average_a = sum(team_a) / lengths[a]
+                average_b = sum(team_b) / lengths[b]
+                expected_a = 1 / (1 + 10 ** ((average_b - average_a) / 400))
+                expected_b = 1 / (1 + 10 ** ((average_a - average_b) / 400))
+                change_a = k * (score_a[code] - expected_a)
+                change_b = k * (score_b[code] - expected_b)
+                for model, rating in zip(models_a, team_a):
+                    values[model] = rating + change_a
+                for model, rating in zip(models_b, team_b):
+                    values[model] = rating + change_b
+
+        ratings[:] = values
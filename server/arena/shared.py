@@ -0,0 +1,297 @@
+import fcntl
+import mmap
+import os
+import struct
+import time
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Optional, Sequence
+
+import numpy as np
+from arena.matchmaking import MatchupSnapshot
+from arena.snapshot import RatingSnapshot
+
+if TYPE_CHECKING:
+    from arena.arena_base import ArenaBase
+
+# magic, layout, sequence, version, n_models, n_chains, recent capacity, n_recent
+_HEADER = struct.Struct("<4sIQQIIII")
+_HEADER_SIZE = 64
+_SEQUENCE = struct.Struct("<Q")
+_SEQUENCE_OFFSET = 8
+_MAGIC = b"CARS"
+_LAYOUT = 1
+
+
+class SharedRatings:
+    """
+    Arena ratings published in a memory-mapped file for other processes.
+
+    One writer process publishes `RatingSnapshot`s into the file; any number
+    of reader processes map the same file and rebuild snapshots from it
+    without locks. Consistency comes from a sequence lock: the writer makes
+    the sequence number odd, copies the payload in one block and makes it
+    even again; a reader copies the payload and retries if the sequence was
+    odd or changed meanwhile.
+
+    The file holds ratings by id, not keys: every process builds the same
+    models and chains in the same order (e.g. an `ArenaBase` over the same
+    chain specification) and passes them in. Matchmaker pair counts are not
+    shared, only the most recent pairs.
+
+    Layout (little-endian): a 64-byte header, then model ratings, chain
+    ratings and chain variances as float64, then model order, chain order
+    and recent pairs as int32.
+
+    Attributes:
+        path: File backing the segment
+        models: Models indexed by id
+        chains: Chains indexed by id
+        recent_capacity: Maximum number of recent pairs stored
+    """
+
+    def __init__(
+        self,
+        path: str,
+        models: Sequence,
+        chains: Sequence,
+        writable: bool = False,
+        window: int = 16,
+        explore: float = 0.05,
+    ):
+        """
+        Map an existing segment.
+
+        Args:
+            path: File created by `SharedRatings.create`
+            models: Models indexed by id, as in the publishing arena
+            chains: Chains indexed by id, as in the publishing arena
+            writable: Map for publishing (only one process should)
+            window: Matchmaker window for snapshots read from the segment
+            explore: Matchmaker exploration rate for snapshots read from the segment
+
+        Raises:
+            ValueError: If the file is not a segment for these models and chains
+        """
+        self.path = path
+        self.models = tuple(models)
+        self.chains = tuple(chains)
+        self.window = window
+        self.explore = explore
+        self._model_ids = {model: i for i, model in enumerate(self.models)}
+        with open(path, "r+b" if writable else "rb") as file:
+            self._map = mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            )
+        magic, layout, _, _, n_models, n_chains, capacity, _ = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC or layout != _LAYOUT:
+            raise ValueError(f"{path} is not a shared ratings segment")
+        if (n_models, n_chains) != (len(self.models), len(self.chains)):
+            raise ValueError(
+                f"{path} holds {n_models} models and {n_chains} chains, "
+                f"expected {len(self.models)} and {len(self.chains)}"
+            )
+        self.recent_capacity = capacity
+        # (sequence number, snapshot) of the latest read
+        self._cached: tuple[int, Optional[RatingSnapshot]] = (-1, None)
+
+    @classmethod
+    def create(
+        cls, path: str, arena: "ArenaBase", recent_capacity: Optional[int] = None
+    ) -> "SharedRatings":
+        """
+        Create a segment for an arena and publish its current ratings.
+
+        The file is written to a temporary name and renamed into place, so
+        other processes never map a partial segment.
+
+        Args:
+            path: File to create (replaced if it exists)
+            arena: Arena whose models, chains and ratings are published
+            recent_capacity: Recent pairs to store (default: the matchmaker's)
+
+        Returns:
+            A writable `SharedRatings` over the new file
+        """
+        if recent_capacity is None:
+            recent_capacity = arena.matchmaker.recent_pairs
+        n_models, n_chains = len(arena.model_elos), len(arena.chain_elos)
+        size = _HEADER_SIZE + 8 * (n_models + 2 * n_chains) + 4 * (n_models + n_chains + 2 * recent_capacity)
+        header = _HEADER.pack(_MAGIC, _LAYOUT, 0, 0, n_models, n_chains, recent_capacity, 0)
+
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(header.ljust(_HEADER_SIZE, b"\0"))
+            file.truncate(size)
+        os.replace(temporary, path)
+
+        shared = cls(
+            path,
+            arena.model_elos.keys_by_id,
+            arena.chain_elos.keys_by_id,
+            writable=True,
+            window=arena.matchmaker.window,
+            explore=arena.matchmaker.explore,
+        )
+        shared.publish(arena.snapshot())
+        return shared
+
+    def close(self) -> None:
+        self._map.close()
+
+    # === Writing ===
+
+    def publish(self, snapshot: RatingSnapshot) -> None:
+        """
+        Make a snapshot visible to every reader (writer process only).
+
+        Args:
+            snapshot: Snapshot of the arena this segment was created for
+        """
+        model_ids = self._model_ids
+        matchups = snapshot.matchups
+        recent = sorted(matchups.recent)[: self.recent_capacity]
+        payload = b"".join((
+            np.array([snapshot.model_elos[model] for model in self.models], dtype="<f8").tobytes(),
+            np.array(matchups.ratings, dtype="<f8").tobytes(),
+            np.array(matchups.variances, dtype="<f8").tobytes(),
+            np.array([model_ids[model] for model, _ in snapshot.model_leaderboard], dtype="<i4").tobytes(),
+            np.array(matchups.order, dtype="<i4").tobytes(),
+            np.array(recent, dtype="<i4").reshape(-1).tobytes(),
+        ))
+
+        segment = self._map
+        # Odd while writing; a writer that died mid-publish left it odd already
+        writing = _SEQUENCE.unpack_from(segment, _SEQUENCE_OFFSET)[0] | 1
+        _SEQUENCE.pack_into(segment, _SEQUENCE_OFFSET, writing)
+        segment[_HEADER_SIZE : _HEADER_SIZE + len(payload)] = payload
+        _HEADER.pack_into(
+            segment, 0, _MAGIC, _LAYOUT, writing, snapshot.version,
+            len(self.models), len(self.chains), self.recent_capacity, len(recent),
+        )
+        _SEQUENCE.pack_into(segment, _SEQUENCE_OFFSET, writing + 1)
+
+    # === Reading ===
+
+    @property
+    def version(self) -> int:
+        """Leaderboard version of the latest published snapshot."""
+        return self._read(header_only=True)[1]
+
+    def snapshot(self) -> RatingSnapshot:
+        """
+        The latest published ratings as a `RatingSnapshot`.
+
+        Rebuilding costs O(n); until the writer publishes again the previous
+        snapshot is returned instead.
+
+        Raises:
+            TimeoutError: If a consistent copy could not be read (the writer
+                died mid-publish)
+        """
+        cached_sequence, cached = self._cached
+        sequence, version, n_recent, payload = self._read(known_sequence=cached_sequence)
+        if payload is None:
+            return cached
+
+        n_models, n_chains = len(self.models), len(self.chains)
+        floats = np.frombuffer(payload, dtype="<f8", count=n_models + 2 * n_chains)
+        ints = np.frombuffer(payload, dtype="<i4", offset=floats.nbytes)
+        model_ratings = floats[:n_models]
+        chain_ratings = floats[n_models : n_models + n_chains]
+        variances = floats[n_models + n_chains :]
+        model_order = ints[:n_models]
+        chain_order = ints[n_models : n_models + n_chains]
+        recent = ints[n_models + n_chains : n_models + n_chains + 2 * n_recent].reshape(-1, 2)
+
+        matchups = MatchupSnapshot(
+            chains=self.chains,
+            ratings=tuple(chain_ratings.tolist()),
+            variances=tuple(variances.tolist()),
+            order=tuple(chain_order.tolist()),
+            pair_counts=MappingProxyType({}),
+            recent=frozenset(map(tuple, recent.tolist())),
+            window=self.window,
+            explore=self.explore,
+        )
+        snapshot = RatingSnapshot.from_arrays(
+            version=version,
+            models=self.models,
+            model_ratings=model_ratings.tolist(),
+            model_order=model_order.tolist(),
+            matchups=matchups,
+        )
+        self._cached = (sequence, snapshot)
+        return snapshot
+
+    def _read(self, known_sequence: int = -1, header_only: bool = False, timeout: float = 1.0):
+        """
+        Copy the header and payload under the sequence lock.
+
+        Args:
+            known_sequence: Sequence number whose payload the caller already has
+            header_only: Skip copying the payload
+            timeout: Seconds to retry while the writer is publishing
+
+        Returns:
+            Tuple of (sequence, version, n_recent, payload), with payload None
+            when it was not copied
+        """
+        segment = self._map
+        deadline = time.monotonic() + timeout
+        while True:
+            before = _SEQUENCE.unpack_from(segment, _SEQUENCE_OFFSET)[0]
+            if not before & 1:
+                _, _, _, version, _, _, _, n_recent = _HEADER.unpack_from(segment)
+                payload = None
+                if not header_only and before != known_sequence:
+                    payload = segment[_HEADER_SIZE:]
+                if _SEQUENCE.unpack_from(segment, _SEQUENCE_OFFSET)[0] == before:
+                    return before, version, n_recent, payload
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"No consistent copy of {self.path} within {timeout}s")
+            time.sleep(0)
+
+
+class WriterLease:
+    """
+    Exclusive, crash-safe writer role over a file, between processes.
+
+    Backed by `flock`: the operating system releases the lease when the
+    holder closes the file or exits, so another process can take over.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Lock file (created if missing)
+        """
+        self.path = path
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """
+        Try to become the writer without blocking.
+
+        Returns:
+            True if this lease holds the role (including when it already did)
+        """
+        if self._file is not None:
+            return True
+        file = open(self.path, "a+b")
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return False
+        self._file = file
+        return True
+
+    def release(self) -> None:
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
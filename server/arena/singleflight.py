@@ -0,0 +1,159 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, Optional
+from arena.arena_base import Model, TInput, TOutput, acall_model, astream_model
+from arena.cache import StageCache, stage_key
+
+_MISSING = object()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into a single in-flight call.
+
+    The first caller for a key starts the call; callers arriving while it is
+    running wait on the same task and receive its result, its exception, or
+    its cancellation. A caller cancelling only stops its own wait: the shared
+    call is cancelled once every waiter has gone away.
+
+    Attributes:
+        calls: Number of calls actually started
+        coalesced: Number of callers that joined an in-flight call
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[str, tuple[asyncio.Task, list[int]]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        """Number of calls currently in flight."""
+        return len(self._flights)
+
+    async def do(self, key: str, function: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `function` unless a call for `key` is already in flight.
+
+        Args:
+            key: Identity of the call (see `stage_key`)
+            function: Zero-argument coroutine function performing the call
+
+        Returns:
+            The result of the (possibly shared) call
+
+        Raises:
+            Exception: Whatever the shared call raised
+            asyncio.CancelledError: If the shared call was cancelled
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(function())
+            flight = (task, [0])
+            self._flights[key] = flight
+            task.add_done_callback(lambda _, key=key, task=task: self._forget(key, task))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        task, waiters = flight
+        waiters[0] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; drop the shared call if nobody else waits
+            if not task.done():
+                waiters[0] -= 1
+                if waiters[0] == 0:
+                    # Forget the flight first: callers arriving before the task
+                    # finishes cancelling must start a new call, not join this one
+                    self._drop(key, task)
+                    task.cancel()
+            raise
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every waiter already left
+            task.exception()
+        self._drop(key, task)
+
+    def _drop(self, key: str, task: asyncio.Task) -> None:
+        flight = self._flights.get(key)
+        if flight is not None and flight[0] is task:
+            del self._flights[key]
+
+
+class CoalescedModel(Generic[TInput, TOutput]):
+    """
+    Model wrapper that coalesces concurrent identical calls.
+
+    Concurrent `acall`s with the same (model, input) key share one underlying
+    call through a `SingleFlight` group. When a `StageCache` is given, it is
+    checked before joining a flight and filled by the leading call, so the
+    wrapper covers both in-flight and completed duplicates.
+
+    Only `acall` coalesces: flights are event loop tasks over a complete
+    input. Synchronous calls (`__call__`, e.g. from a worker thread) use the
+    cache but each runs the model itself, and streams (`astream`) are passed
+    straight to the model.
+    """
+
+    def __init__(
+        self,
+        model: Model[TInput, TOutput],
+        group: Optional[SingleFlight] = None,
+        cache: Optional[StageCache] = None,
+    ):
+        """
+        Args:
+            model: Model to wrap
+            group: Coalescing group, shareable between models (default: a new group)
+            cache: Optional result cache consulted before coalescing
+        """
+        self.model = model
+        self.group = group if group is not None else SingleFlight()
+        self.cache = cache
+        self.name = model.name
+
+    @property
+    def config(self) -> Any:
+        return getattr(self.model, "config", None)
+
+    @property
+    def info(self) -> Any:
+        return getattr(self.model, "info", None)
+
+    def __call__(self, input_data: TInput) -> TOutput:
+        if self.cache is None:
+            return self.model(input_data)
+        key = stage_key(self.model, input_data)
+        output = self.cache.get(key, _MISSING)
+        if output is _MISSING:
+            output = self.model(input_data)
+            self.cache.put(key, output)
+        return output
+
+    async def acall(self, input_data: TInput) -> TOutput:
+        key = stage_key(self.model, input_data)
+        if self.cache is not None:
+            output = self.cache.get(key, _MISSING)
+            if output is not _MISSING:
+                return output
+        return await self.group.do(key, lambda: self._call(key, input_data))
+
+    async def _call(self, key: str, input_data: TInput) -> TOutput:
+        output = await acall_model(self.model, input_data)
+        if self.cache is not None:
+            self.cache.put(key, output)
+        return output
+
+    async def astream(self, chunks: AsyncIterator[TInput]) -> AsyncIterator[TOutput]:
+        async for chunk in astream_model(self.model, chunks):
+            yield chunk
+
+    def __repr__(self) -> str:
+        return f"CoalescedModel({self.model!r})"
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __eq__(self, other) -> bool:
+        return Model.__eq__(self, other)
@@ -0,0 +1,145 @@
+import random
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Sequence
+
+from arena.matchmaking import MatchupSnapshot
+from arena.ratings import RatingStore
+
+if TYPE_CHECKING:
+    from arena.arena_base import Model, ModelChain
+
+
+@dataclass(frozen=True)
+class RatingSnapshot:
+    """
+    Immutable view of an arena's ratings after some prefix of its votes.
+
+    Built by `ArenaBase.snapshot` and never modified afterwards: leaderboards
+    are tuples, lookups are read-only mappings and matchups are drawn from a
+    frozen `MatchupSnapshot`. Any number of readers can share one snapshot
+    while the next batch of votes is applied to the live arena.
+
+    Attributes:
+        version: `ArenaBase.leaderboard_version` when the snapshot was taken
+        model_leaderboard: (model, rating) tuples sorted by rating (highest first)
+        chain_leaderboard: (chain, rating) tuples sorted by rating (highest first)
+        model_elos: Rating of each model
+        chain_elos: Rating of each chain
+        model_elos_by_name: Rating of each model by name
+        matchups: Frozen matchmaker state for picking matchups
+    """
+    version: int
+    model_leaderboard: tuple[tuple["Model", float], ...]
+    chain_leaderboard: tuple[tuple["ModelChain", float], ...]
+    model_elos: Mapping["Model", float]
+    chain_elos: Mapping["ModelChain", float]
+    model_elos_by_name: Mapping[str, float]
+    matchups: MatchupSnapshot
+
+    @classmethod
+    def capture(
+        cls,
+        model_elos: RatingStore,
+        chain_elos: RatingStore,
+        matchups: MatchupSnapshot,
+    ) -> "RatingSnapshot":
+        """
+        Copy two rating stores into a snapshot (O(n)).
+
+        Args:
+            model_elos: Store of model ratings
+            chain_elos: Store of chain ratings
+            matchups: Frozen matchmaker state taken at the same time
+        """
+        return cls.from_arrays(
+            version=model_elos.version + chain_elos.version,
+            models=model_elos.keys_by_id,
+            model_ratings=model_elos.ratings,
+            model_order=model_elos.ranking.page(),
+            matchups=matchups,
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        version: int,
+        models: Sequence["Model"],
+        model_ratings: Sequence[float],
+        model_order: Sequence[int],
+        matchups: MatchupSnapshot,
+    ) -> "RatingSnapshot":
+        """
+        Build a snapshot from ratings indexed by id.
+
+        Args:
+            version: Leaderboard version the ratings belong to
+            models: Models indexed by id
+            model_ratings: Rating of each model id
+            model_order: Model ids sorted by rating (highest first)
+            matchups: Frozen matchmaker state, which also holds the chains,
+                their ratings and their order
+        """
+        chains, chain_ratings = matchups.chains, matchups.ratings
+        by_name: dict[str, float] = {}
+        for model, rating in zip(models, model_ratings):
+            name = getattr(model, "name", None)
+            if isinstance(name, str):
+                by_name.setdefault(name, float(rating))
+        return cls(
+            version=int(version),
+            model_leaderboard=tuple((models[i], float(model_ratings[i])) for i in model_order),
+            chain_leaderboard=tuple((chains[i], float(chain_ratings[i])) for i in matchups.order),
+            model_elos=MappingProxyType({m: float(r) for m, r in zip(models, model_ratings)}),
+            chain_elos=MappingProxyType({c: float(r) for c, r in zip(chains, chain_ratings)}),
+            model_elos_by_name=MappingProxyType(by_name),
+            matchups=matchups,
+        )
+
+    def get_leaderboard(
+        self, limit: Optional[int] = None, offset: int = 0
+    ) -> list[tuple["Model", float]]:
+        """Models sorted by rating, as `ArenaBase.get_leaderboard`."""
+        return list(_page(self.model_leaderboard, offset, limit))
+
+    def get_chain_leaderboard(
+        self, limit: Optional[int] = None, offset: int = 0
+    ) -> list[tuple["ModelChain", float]]:
+        """Chains sorted by rating, as `ArenaBase.get_chain_leaderboard`."""
+        return list(_page(self.chain_leaderboard, offset, limit))
+
+    def get_model_elo(self, model: "Model | str") -> float:
+        """
+        Rating of a model object or model name.
+
+        Raises:
+            KeyError: If the model is not in the snapshot
+        """
+        if isinstance(model, str):
+            if model not in self.model_elos_by_name:
+                raise KeyError(f"Model with name '{model}' not found in arena")
+            return self.model_elos_by_name[model]
+        return self.model_elos[model]
+
+    def get_chain_elo(self, chain: "ModelChain") -> float:
+        """
+        Rating of a chain.
+
+        Raises:
+            KeyError: If the chain is not in the snapshot
+        """
+        return self.chain_elos[chain]
+
+    def generate_matchup(self, rng: random.Random) -> tuple["ModelChain", "ModelChain"]:
+        """
+        Pick a matchup from the frozen matchmaker state.
+
+        Raises:
+            ValueError: If there are fewer than two chains
+        """
+        return self.matchups.next_matchup(rng)
+
+
+def _page(entries: tuple[Any, ...], offset: int, limit: Optional[int]) -> tuple[Any, ...]:
+    end = None if limit is None else offset + limit
+    return entries[offset:end]
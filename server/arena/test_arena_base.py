@@ -1,5 +1,17 @@
+import asyncio
+import pickle
+import time
+
 import pytest
-from arena.arena_base import Model, ModelChain, ArenaBase
+from arena.arena_base import (
+    Model,
+    ModelChain,
+    ArenaBase,
+    acall_model,
+    aiter_chunks,
+    interleave_streams,
+    join_chunks,
+)
 from arena.types import VoteOutcome
 
 
@@ -26,6 +38,15 @@ class SimpleModel:
         return False
 
 
+class ProtocolModel(Model):
+    """Model subclassing the protocol explicitly."""
+
+    __slots__ = ()
+
+    def __call__(self, input_data):
+        return self.function(input_data)
+
+
 @pytest.fixture
 def simple_models():
     """Create simple test models."""
@@ -103,13 +124,13 @@ class TestModelChain:
         model1 = SimpleModel("m1", lambda x: x + "1")
         model2 = SimpleModel("m2", lambda x: x + "2")
         chain = ModelChain([model1, model2])
-        assert chain.model_chain == [model1, model2]
+        assert chain.model_chain == (model1, model2)
 
     def test_chain_creation_from_single_model(self):
         """Test creating a chain from a single callable model."""
         model = SimpleModel("m1", lambda x: x + "1")
         chain = ModelChain(model)
-        assert chain.model_chain == [model]
+        assert chain.model_chain == (model,)
 
     def test_chain_repr(self):
         """Test chain string representation."""
@@ -161,6 +182,39 @@ class TestModelChain:
         assert chain != "chain"
         assert chain != [model]
 
+    def test_chain_is_immutable(self):
+        """Test a chain's models cannot be reassigned after construction."""
+        model = SimpleModel("m1", lambda x: x)
+        chain = ModelChain([model])
+        with pytest.raises(AttributeError):
+            chain.model_chain = [model, model]
+        assert chain.names == ("m1",)
+
+    def test_chain_survives_pickling(self):
+        """Test an unpickled chain recomputes its hash and stays equal."""
+        model = ProtocolModel("m1", str.upper)
+        chain = ModelChain([model])
+        restored = pickle.loads(pickle.dumps(chain))
+        assert restored == chain
+        assert hash(restored) == hash(chain)
+        assert restored("a") == "A"
+
+
+class TestModelProtocol:
+    def test_protocol_model_equality(self):
+        """Test Model subclasses compare by name without isinstance on the protocol."""
+        model1 = ProtocolModel("same", str.upper)
+        model2 = ProtocolModel("same", str.lower)
+        assert model1 == model2
+        assert model1 != ProtocolModel("other", str.upper)
+        assert model1 == SimpleModel("same", str.upper)
+        assert model1 != "same"
+        assert model1 != ModelChain([model1])
+
+    def test_protocol_model_has_no_instance_dict(self):
+        """Test Model instances store their fields in slots."""
+        assert not hasattr(ProtocolModel("m", str.upper), "__dict__")
+
 
 # === ArenaBase Tests ===
 class TestArenaBase:
@@ -378,3 +432,163 @@ class TestVoting:
 
         # Models in the same chain should have equal ratings (same change applied)
         assert arena.model_elos[model_a] == arena.model_elos[model_b]
+
+
+# === Async Execution Tests ===
+class FixedMatchupArena(ArenaBase):
+    """Arena that always pits the first two chains against each other."""
+
+    def generate_matchup(self):
+        return self.model_chains[0], self.model_chains[1]
+
+
+class AsyncModel(SimpleModel):
+    """Test model whose call is a coroutine."""
+
+    async def __call__(self, input_data):
+        await asyncio.sleep(0)
+        return self.function(input_data)
+
+
+class TestAsyncExecution:
+    def test_acall_model_wraps_sync_model(self):
+        """Test sync models can be awaited through acall_model."""
+        model = SimpleModel("upper", lambda x: x.upper())
+        assert asyncio.run(acall_model(model, "hello")) == "HELLO"
+
+    def test_acall_model_awaits_async_model(self):
+        """Test coroutine models are awaited directly."""
+        model = AsyncModel("upper", lambda x: x.upper())
+        assert asyncio.run(acall_model(model, "hello")) == "HELLO"
+
+    def test_chain_acall_matches_sync_call(self):
+        """Test the async chain path produces the same output as the sync one."""
+        model1 = SimpleModel("upper", lambda x: x.upper())
+        model2 = AsyncModel("exclaim", lambda x: x + "!")
+        chain = ModelChain([model1, model2])
+        assert asyncio.run(chain.acall("hello")) == "HELLO!"
+
+    def test_sync_model_does_not_block_event_loop(self):
+        """Test blocking models run off the event loop."""
+        model = SimpleModel("slow", lambda x: time.sleep(0.2) or x)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.02)
+
+        async def run():
+            await asyncio.gather(acall_model(model, "x"), ticker())
+
+        asyncio.run(run())
+        assert len(ticks) == 5
+        assert ticks[-1] - ticks[0] < 0.2
+
+    def test_generate_output_runs_chains_concurrently(self):
+        """Test both chains of a matchup run at the same time."""
+        slow_a = SimpleModel("slow_a", lambda x: time.sleep(0.2) or x + "a")
+        slow_b = SimpleModel("slow_b", lambda x: time.sleep(0.2) or x + "b")
+        arena = FixedMatchupArena([ModelChain([slow_a]), ModelChain([slow_b])])
+
+        start = time.perf_counter()
+        output_a, output_b = asyncio.run(arena.generate_output("x"))
+        elapsed = time.perf_counter() - start
+
+        assert (output_a, output_b) == ("xa", "xb")
+        assert elapsed < 0.35
+
+
+# === Streaming Tests ===
+class WordStreamModel(SimpleModel):
+    """Test model that emits its output one word at a time."""
+
+    async def astream(self, chunks):
+        text = join_chunks([chunk async for chunk in chunks])
+        for word in self.function(text).split(" "):
+            await asyncio.sleep(0.05)
+            yield word + " "
+
+
+class IncrementalModel(SimpleModel):
+    """Test model that transforms each input chunk as soon as it arrives."""
+
+    async def astream(self, chunks):
+        async for chunk in chunks:
+            yield self.function(chunk)
+
+
+class TestStreaming:
+    def test_join_chunks(self):
+        """Test chunks are reassembled according to their type."""
+        assert join_chunks(["ab", "c"]) == "abc"
+        assert join_chunks([b"ab", b"c"]) == b"abc"
+        assert join_chunks([42]) == 42
+
+    def test_chain_stream_buffers_non_streaming_models(self):
+        """Test models without astream receive the whole input at once."""
+        model1 = SimpleModel("upper", lambda x: x.upper())
+        model2 = SimpleModel("exclaim", lambda x: x + "!")
+        chain = ModelChain([model1, model2])
+
+        async def collect():
+            return [chunk async for chunk in chain.astream("hello")]
+
+        assert asyncio.run(collect()) == ["HELLO!"]
+
+    def test_chain_stream_pipelines_incremental_stages(self):
+        """Test the first output chunk arrives before the first stage finishes."""
+        words = WordStreamModel("words", lambda x: x)
+        upper = IncrementalModel("upper", lambda x: x.upper())
+        chain = ModelChain([words, upper])
+
+        async def collect():
+            start = time.perf_counter()
+            first_chunk_at = None
+            chunks = []
+            async for chunk in chain.astream("one two three four five"):
+                if first_chunk_at is None:
+                    first_chunk_at = time.perf_counter() - start
+                chunks.append(chunk)
+            return chunks, first_chunk_at, time.perf_counter() - start
+
+        chunks, first_chunk_at, total = asyncio.run(collect())
+        assert join_chunks(chunks) == "ONE TWO THREE FOUR FIVE "
+        assert first_chunk_at < total / 2
+
+    def test_interleave_streams_propagates_errors(self):
+        """Test an error in one stream surfaces to the consumer."""
+
+        async def failing():
+            yield "ok"
+            raise RuntimeError("stage failed")
+
+        async def collect():
+            return [item async for item in interleave_streams({"A": failing()})]
+
+        with pytest.raises(RuntimeError, match="stage failed"):
+            asyncio.run(collect())
+
+    def test_stream_output_labels_chunks(self):
+        """Test matchup streaming yields chunks labelled by side."""
+        words = WordStreamModel("words", lambda x: x)
+        upper = SimpleModel("upper", lambda x: x.upper())
+        arena = FixedMatchupArena([ModelChain([words]), ModelChain([upper])])
+
+        async def collect():
+            outputs = {"A": [], "B": []}
+            async for label, chunk in arena.stream_output("a b"):
+                outputs[label].append(chunk)
+            return outputs
+
+        outputs = asyncio.run(collect())
+        assert join_chunks(outputs["A"]) == "a b "
+        assert outputs["B"] == ["A B"]
+
+    def test_aiter_chunks_wraps_value(self):
+        """Test a complete value becomes a single-chunk stream."""
+
+        async def collect():
+            return [chunk async for chunk in aiter_chunks("x")]
+
+        assert asyncio.run(collect()) == ["x"]
@@ -0,0 +1,159 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from arena.arena_base import Model, ModelChain
+from arena.batching import BatchedModel, MicroBatcher
+
+
+class RecordingBatchFunction:
+    """Batch function that records the batches it receives."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+
+class TestMicroBatcher:
+    def test_results_returned_to_each_caller(self):
+        """Test every caller gets the result for its own input."""
+        function = RecordingBatchFunction()
+        batcher = MicroBatcher(function, max_batch_size=4, max_wait_ms=50)
+
+        async def run():
+            return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+        assert asyncio.run(run()) == [i * 2 for i in range(10)]
+        assert [len(batch) for batch in function.batches] == [4, 4, 2]
+
+    def test_partial_batch_dispatched_after_max_wait(self):
+        """Test a lone item is not held longer than max_wait_ms."""
+        function = RecordingBatchFunction()
+        batcher = MicroBatcher(function, max_batch_size=16, max_wait_ms=10)
+
+        async def run():
+            return await asyncio.wait_for(batcher.submit(3), timeout=1)
+
+        assert asyncio.run(run()) == 6
+        assert function.batches == [[3]]
+
+    def test_async_batch_function(self):
+        """Test coroutine batch functions are awaited."""
+
+        async def batch(items):
+            await asyncio.sleep(0)
+            return [item + 1 for item in items]
+
+        batcher = MicroBatcher(batch, max_batch_size=2, max_wait_ms=10)
+
+        async def run():
+            return await asyncio.gather(batcher.submit(1), batcher.submit(2))
+
+        assert asyncio.run(run()) == [2, 3]
+
+    def test_errors_delivered_to_whole_batch(self):
+        """Test a failing batch fails every caller in it."""
+
+        def batch(items):
+            raise RuntimeError("model crashed")
+
+        batcher = MicroBatcher(batch, max_batch_size=2, max_wait_ms=10)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.submit(1), batcher.submit(2), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_result_count_mismatch_is_an_error(self):
+        """Test batch functions must return one result per input."""
+        batcher = MicroBatcher(lambda items: items[:1], max_batch_size=2, max_wait_ms=10)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.submit(1), batcher.submit(2), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_fill_rate_metrics(self):
+        """Test batch statistics reflect dispatched batch sizes."""
+        batcher = MicroBatcher(RecordingBatchFunction(), max_batch_size=4, max_wait_ms=10)
+
+        async def run():
+            await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+
+        asyncio.run(run())
+        assert batcher.stats.batches == 2
+        assert batcher.stats.items == 6
+        assert batcher.stats.full_batches == 1
+        assert batcher.stats.fill_rate == pytest.approx(0.75)
+
+    def test_cancelled_batch_cancels_callers(self):
+        """Test callers of a batch whose task is cancelled are cancelled too, not left waiting."""
+        async def never(items):
+            await asyncio.sleep(10)
+
+        async def run():
+            batcher = MicroBatcher(never, max_batch_size=2)
+            callers = [asyncio.ensure_future(batcher.submit(i)) for i in range(2)]
+            await asyncio.sleep(0.01)
+            for task in list(batcher._inflight):
+                task.cancel()
+            return await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), 1)
+
+        results = asyncio.run(run())
+        assert [type(result) for result in results] == [asyncio.CancelledError] * 2
+
+    def test_invalid_batch_size(self):
+        """Test batch size must be positive."""
+        with pytest.raises(ValueError):
+            MicroBatcher(RecordingBatchFunction(), max_batch_size=0)
+
+
+class TestBatchedModel:
+    def test_concurrent_chain_calls_are_batched(self):
+        """Test concurrent chain runs share batches of the batched stage."""
+        function = RecordingBatchFunction()
+        model = BatchedModel("kokoro-82m", function, max_batch_size=8, max_wait_ms=20)
+        chain = ModelChain([model])
+
+        async def run():
+            return await asyncio.gather(*(chain.acall(i) for i in range(5)))
+
+        assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+        assert len(function.batches) == 1
+        assert model.stats.items == 5
+
+    def test_sync_call_uses_single_item_batch(self):
+        """Test the sync call path still works."""
+        model = BatchedModel("kokoro-82m", RecordingBatchFunction())
+        assert model(21) == 42
+
+    def test_sync_call_rejects_async_batch_function(self):
+        """Test the synchronous path refuses async batch functions instead of unpacking a coroutine."""
+        async def upper(items):
+            return [item.upper() for item in items]
+
+        model = BatchedModel("upper", upper)
+        with pytest.raises(TypeError):
+            model("hi")
+        assert asyncio.run(model.acall("hi")) == "HI"
+
+        model = BatchedModel("upper", lambda items: upper(items))
+        with pytest.raises(TypeError):
+            model("hi")
+
+    def test_repr_and_equality(self):
+        """Test the model shows as a batched model and compares by name like `Model`."""
+        model = BatchedModel("kokoro-82m", RecordingBatchFunction(), max_batch_size=4)
+        assert repr(model) == "BatchedModel(name=kokoro-82m, max_batch_size=4)"
+        assert model == Model("kokoro-82m", str) and Model("kokoro-82m", str) == model
+        assert model != SimpleNamespace(name="kokoro-82m")
+        assert model != Model("other", str)
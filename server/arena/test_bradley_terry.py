@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+from arena.bradley_terry import BradleyTerryRater, count_pairs
+from arena.replay import ChainIndex, OUTCOME_CODES, VoteLog
+from arena.test_replay import make_chains
+from arena.types import VoteOutcome
+
+A = OUTCOME_CODES[VoteOutcome.A]
+B = OUTCOME_CODES[VoteOutcome.B]
+TIE = OUTCOME_CODES[VoteOutcome.TIE]
+BOTH_BAD = OUTCOME_CODES[VoteOutcome.BOTH_BAD]
+
+
+def simulate(strengths: np.ndarray, n_votes: int, seed: int = 0) -> VoteLog:
+    """Draw votes between random chain pairs from Bradley-Terry strengths."""
+    rng = np.random.default_rng(seed)
+    n = len(strengths)
+    chain_a = rng.integers(0, n, n_votes)
+    chain_b = (chain_a + rng.integers(1, n, n_votes)) % n
+    p_a = 1 / (1 + np.exp(strengths[chain_b] - strengths[chain_a]))
+    draw = rng.random(n_votes)
+    outcome = np.where(draw < 0.9 * p_a, A, np.where(draw < 0.9, B, np.where(draw < 0.95, TIE, BOTH_BAD)))
+    return VoteLog(chain_a, chain_b, outcome)
+
+
+class TestCountPairs:
+    def test_orients_pairs_and_scores(self):
+        """Test votes are folded onto (lower id, higher id) pairs with the lower id's score."""
+        log = VoteLog([0, 1, 1, 0], [1, 0, 0, 1], [A, A, TIE, B])
+        pairs = count_pairs(log)
+        categories = {
+            (int(f), int(s), float(score)): int(count)
+            for f, s, score, count in zip(pairs.first, pairs.second, pairs.score, pairs.count)
+        }
+        # 0 beats 1 once, 1 beats 0 twice (A from side 1, B from side 0), one tie
+        assert categories == {(0, 1, 1.0): 1, (0, 1, 0.0): 2, (0, 1, 0.5): 1}
+
+    def test_both_bad_handling(self):
+        """Test both_bad votes count as draws or are dropped."""
+        log = VoteLog([0, 0], [1, 1], [BOTH_BAD, A])
+        assert count_pairs(log, "tie").total == 2
+        assert count_pairs(log, "ignore").total == 1
+        with pytest.raises(ValueError):
+            count_pairs(log, "loss")
+
+    def test_self_matches_are_ignored(self):
+        """Test votes between a chain and itself carry no information."""
+        assert count_pairs(VoteLog([2], [2], [A])).total == 0
+
+
+class TestBradleyTerryRater:
+    def test_recovers_strength_order(self):
+        """Test fitted chain ratings track the simulated strengths."""
+        chains = make_chains(10, 12)
+        strengths = np.linspace(-2, 2, 12)
+        result = BradleyTerryRater(chains).fit_chains(simulate(strengths, 20_000))
+
+        assert np.corrcoef(result.ratings, strengths)[0, 1] > 0.99
+        assert result.ratings.mean() == pytest.approx(1500.0)
+        leaderboard = result.leaderboard()
+        assert leaderboard[0][0] == chains[-1]
+        assert [rating for _, rating in leaderboard] == sorted(result.ratings, reverse=True)
+
+    def test_order_independent(self):
+        """Test shuffling the vote log does not change the fit."""
+        chains = make_chains(6, 5)
+        log = simulate(np.zeros(5), 2_000)
+        order = np.random.default_rng(3).permutation(len(log))
+        shuffled = VoteLog(log.chain_a[order], log.chain_b[order], log.outcome[order])
+        rater = BradleyTerryRater(chains)
+        assert np.allclose(rater.fit_chains(log).ratings, rater.fit_chains(shuffled).ratings)
+
+    def test_undefeated_chain_stays_finite(self):
+        """Test regularization keeps ratings finite when a chain never loses."""
+        chains = make_chains(4, 3)
+        result = BradleyTerryRater(chains).fit_chains(VoteLog([0] * 5, [1] * 5, [A] * 5))
+        assert np.all(np.isfinite(result.ratings))
+        assert result.ratings[0] > result.ratings[1]
+
+    def test_fit_models(self):
+        """Test per-model ratings credit the models of winning chains."""
+        chains = make_chains(8, 20, seed=4)
+        index = ChainIndex(chains)
+        model_strengths = np.linspace(-1.5, 1.5, len(index.models))
+        strengths = np.array([
+            model_strengths[row[row >= 0]].mean() for row in index.members
+        ])
+        result = BradleyTerryRater(index).fit_models(simulate(strengths, 30_000))
+
+        assert result.items == index.models
+        assert np.corrcoef(result.ratings, model_strengths)[0, 1] > 0.95
+
+    def test_rejects_unknown_chains(self):
+        """Test votes must be encoded with the rater's index."""
+        with pytest.raises(ValueError):
+            BradleyTerryRater(make_chains(4, 3)).fit_chains(VoteLog([0], [7], [A]))
+
+    def test_intervals_require_bootstrap(self):
+        """Test asking for intervals without resamples raises ValueError."""
+        result = BradleyTerryRater(make_chains(4, 3)).fit_chains(VoteLog([0], [1], [A]))
+        with pytest.raises(ValueError):
+            result.intervals()
+
+
+class TestBootstrap:
+    def test_intervals_cover_estimate(self):
+        """Test bootstrap bounds bracket each rating and are reproducible by seed."""
+        chains = make_chains(6, 6)
+        log = simulate(np.linspace(-1, 1, 6), 3_000)
+        rater = BradleyTerryRater(chains)
+        result = rater.fit_chains(log, bootstrap=50, seed=7)
+
+        intervals = result.intervals()
+        for chain, rating in zip(result.items, result.ratings):
+            low, high = intervals[chain]
+            assert low <= rating <= high
+        again = rater.fit_chains(log, bootstrap=50, seed=7)
+        assert np.array_equal(result.lower, again.lower)
+
+    def test_more_votes_narrow_intervals(self):
+        """Test intervals shrink as the vote log grows."""
+        chains = make_chains(6, 6)
+        rater = BradleyTerryRater(chains)
+        strengths = np.linspace(-1, 1, 6)
+        small = rater.fit_chains(simulate(strengths, 500), bootstrap=40, seed=1)
+        large = rater.fit_chains(simulate(strengths, 20_000), bootstrap=40, seed=1)
+        assert np.mean(large.upper - large.lower) < np.mean(small.upper - small.lower)
+
+    def test_process_pool(self):
+        """Test resamples can be spread over worker processes."""
+        chains = make_chains(6, 4)
+        log = simulate(np.linspace(-1, 1, 4), 2_000)
+        result = BradleyTerryRater(chains).fit_chains(log, bootstrap=6, n_jobs=2, seed=2)
+        assert result.lower.shape == (4,)
+        assert np.all(result.lower <= result.upper)
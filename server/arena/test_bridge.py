@@ -0,0 +1,159 @@
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+import pytest
+from arena.arena_base import ModelChain, astream_model
+from arena.bridge import SentenceBridge, split_sentences
+
+TEXT = (
+    "The arena compares chains. Each vote updates the ratings! "
+    "Does streaming help? It should, a lot.\nShort. And a final clause without an end"
+)
+
+
+async def token_stream(text: str, size: int = 3, delay: float = 0.0):
+    """Yield text in small pieces, like LLM tokens."""
+    for start in range(0, len(text), size):
+        if delay:
+            await asyncio.sleep(delay)
+        yield text[start:start + size]
+
+
+class FakeTTS:
+    """Async stand-in TTS model with per-call latency, tracking concurrency."""
+
+    def __init__(self, name: str = "tts", delay=0.02, fail_on: str = None):
+        self.name = name
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    async def acall(self, text: str) -> bytes:
+        self.calls.append(text)
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay(text) if callable(self.delay) else self.delay)
+            if self.fail_on is not None and self.fail_on in text:
+                raise RuntimeError(f"cannot say {text!r}")
+            return f"<{text}>".encode()
+        finally:
+            self.active -= 1
+
+    def __call__(self, text: str) -> bytes:
+        return f"<{text}>".encode()
+
+
+async def collect(stream) -> list:
+    return [chunk async for chunk in stream]
+
+
+class TestSplitSentences:
+    def test_splits_across_chunks(self):
+        """Test sentences are found however the text is chunked, and the tail is flushed."""
+        expected = [
+            "The arena compares chains.",
+            "Each vote updates the ratings!",
+            "Does streaming help?",
+            "It should, a lot.",
+            "Short. And a final clause without an end",
+        ]
+        for size in (1, 3, 7, len(TEXT)):
+            assert asyncio.run(collect(split_sentences(token_stream(TEXT, size)))) == expected
+
+    def test_min_and_max_length(self):
+        """Test short sentences are merged and endless text is cut at spaces."""
+        sentences = asyncio.run(collect(split_sentences(token_stream("Hi. Yo. Hello there friend. "), min_length=8)))
+        assert sentences == ["Hi. Yo.", "Hello there friend."]
+
+        words = "word " * 100
+        sentences = asyncio.run(collect(split_sentences(token_stream(words), max_length=50)))
+        assert all(len(sentence) <= 50 for sentence in sentences)
+        assert " ".join(sentences).split() == words.split()
+
+    def test_yields_before_input_ends(self):
+        """Test a sentence is emitted as soon as it is complete."""
+        seen = []
+
+        async def tokens():
+            yield "First sentence is here. Sec"
+            seen.append("second chunk requested")
+            yield "ond one."
+
+        async def run():
+            stream = split_sentences(tokens())
+            first = await anext(stream)
+            return first, list(seen)
+
+        assert asyncio.run(run()) == ("First sentence is here.", [])
+
+
+class TestSentenceBridge:
+    def test_keeps_order_under_random_latency(self):
+        """Test outputs follow sentence order even when later sentences finish first."""
+        rng = random.Random(0)
+        tts = FakeTTS(delay=lambda text: rng.uniform(0, 0.03))
+        bridge = SentenceBridge(tts, max_in_flight=3)
+
+        outputs = asyncio.run(collect(bridge.astream(token_stream(TEXT))))
+        assert outputs == [f"<{sentence}>".encode() for sentence in tts.calls]
+        assert len(outputs) == 5
+
+    def test_limits_concurrency(self):
+        """Test no more than max_in_flight sentences are synthesized at once."""
+        tts = FakeTTS()
+        text = " ".join(f"This is sentence number {i}." for i in range(20))
+        asyncio.run(collect(SentenceBridge(tts, max_in_flight=2).astream(token_stream(text, size=50))))
+        assert tts.peak == 2
+        assert len(tts.calls) == 20
+
+    def test_first_audio_before_text_ends(self):
+        """Test the first output arrives after the first sentence, not after the whole text."""
+        text = " ".join(f"This is sentence number {i}." for i in range(10))
+        tts = FakeTTS(delay=0.01)
+        bridge = SentenceBridge(tts)
+
+        async def run():
+            start = time.perf_counter()
+            stream = bridge.astream(token_stream(text, size=10, delay=0.01))
+            await anext(stream)
+            first = time.perf_counter() - start
+            await collect(stream)
+            return first, time.perf_counter() - start
+
+        first, total = asyncio.run(run())
+        assert first < total / 3
+
+    def test_errors_after_earlier_outputs(self):
+        """Test a failing sentence raises after the outputs of the sentences before it."""
+        tts = FakeTTS(fail_on="updates")
+        outputs = []
+
+        async def run():
+            async for chunk in SentenceBridge(tts).astream(token_stream(TEXT)):
+                outputs.append(chunk)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(run())
+        assert outputs == [b"<The arena compares chains.>"]
+
+    def test_in_chain(self):
+        """Test the bridge streams inside a chain and keeps the model's identity."""
+        tts = FakeTTS()
+        bridge = SentenceBridge(tts)
+        assert bridge == tts and hash(bridge) == hash("tts")
+        assert bridge != SimpleNamespace(name="tts")
+        assert ModelChain([bridge]).names == ("tts",)
+
+        streamed = asyncio.run(collect(astream_model(bridge, token_stream(TEXT))))
+        assert len(streamed) == 5
+        assert asyncio.run(bridge.acall(TEXT)) == f"<{TEXT}>".encode()
+
+    def test_rejects_no_concurrency(self):
+        """Test at least one sentence must be allowed in flight."""
+        with pytest.raises(ValueError):
+            SentenceBridge(FakeTTS(), max_in_flight=0)
@@ -0,0 +1,225 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from arena.arena_base import ModelChain
+from arena.cache import CachedModel, StageCache, stage_key
+
+
+class CountingModel:
+    """Test model that records how many times it was called."""
+
+    def __init__(self, name: str, function, config=None):
+        self.name = name
+        self.function = function
+        self.config = config
+        self.calls = 0
+
+    def __call__(self, input_data):
+        self.calls += 1
+        return self.function(input_data)
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __eq__(self, other) -> bool:
+        return getattr(other, "name", None) == self.name
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStageKey:
+    def test_same_model_and_input_share_key(self):
+        """Test identical calls map to the same key."""
+        model = CountingModel("m", str.upper)
+        assert stage_key(model, "hello") == stage_key(model, "hello")
+
+    def test_key_covers_input_and_config(self):
+        """Test different inputs or configs produce different keys."""
+        model = CountingModel("m", str.upper, config={"temperature": 0})
+        other_config = CountingModel("m", str.upper, config={"temperature": 1})
+        assert stage_key(model, "hello") != stage_key(model, "world")
+        assert stage_key(model, "hello") != stage_key(other_config, "hello")
+
+    def test_key_distinguishes_text_and_bytes(self):
+        """Test text and binary inputs with the same content do not collide."""
+        model = CountingModel("m", str.upper)
+        assert stage_key(model, "abc") != stage_key(model, b"abc")
+
+
+class TestStageCache:
+    def test_hit_and_miss_counters(self):
+        """Test lookups are counted as hits and misses."""
+        cache = StageCache()
+        assert cache.get("k") is None
+        cache.put("k", "v")
+        assert cache.get("k") == "v"
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.hit_rate == 0.5
+
+    def test_lru_eviction_by_bytes(self):
+        """Test least recently used entries are evicted to respect the byte budget."""
+        value = b"x" * 1000
+        cache = StageCache(max_bytes=2500)
+        cache.put("a", value)
+        cache.put("b", value)
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", value)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.stats.evictions == 1
+        assert cache.stats.bytes <= 2500
+
+    def test_ttl_expiry(self):
+        """Test entries expire after their time-to-live."""
+        clock = FakeClock()
+        cache = StageCache(ttl=10, clock=clock)
+        cache.put("default", "v")
+        cache.put("custom", "v", ttl=100)
+
+        clock.now += 11
+        assert cache.get("default") is None
+        assert cache.get("custom") == "v"
+        assert cache.stats.expirations == 1
+
+    def test_disk_tier_receives_evictions_and_persists(self, tmp_path):
+        """Test evicted entries spill to disk and survive a new cache instance."""
+        value = b"x" * 1000
+        cache = StageCache(max_bytes=1500, disk_dir=tmp_path)
+        cache.put("a", value)
+        cache.put("b", value)  # evicts "a" to disk
+
+        assert cache.get("a") == value
+        assert cache.stats.disk_hits == 1
+
+        reopened = StageCache(max_bytes=1500, disk_dir=tmp_path)
+        assert reopened.get("a") == value
+        assert reopened.stats.disk_hits == 1
+
+    def test_oversized_values_go_to_disk_only(self, tmp_path):
+        """Test values larger than the memory budget bypass the memory tier."""
+        cache = StageCache(max_bytes=100, disk_dir=tmp_path)
+        cache.put("big", b"x" * 1000)
+        assert len(cache) == 0
+        assert cache.get("big") == b"x" * 1000
+
+
+    def test_unpicklable_values_are_not_spilled(self, tmp_path):
+        """Test values the disk tier cannot pickle are dropped and counted instead of failing the put."""
+        cache = StageCache(max_bytes=100, disk_dir=tmp_path)
+        cache.put("big", [lambda: None] * 50)
+        assert cache.stats.spill_failures == 1
+        assert cache.get("big") is None and list(tmp_path.glob("*/*")) == []
+
+        cache = StageCache(max_bytes=200, disk_dir=tmp_path)
+        cache.put("handle", threading.Lock())
+        cache.put("other", b"x" * 150)  # evicts the lock to the disk tier
+        assert cache.stats.spill_failures == 1 and cache.get("other") == b"x" * 150
+
+    def test_memory_hits_do_not_wait_for_disk_writes(self, tmp_path):
+        """Test lookups in memory proceed while an eviction is being written to disk."""
+        writing, release = threading.Event(), threading.Event()
+
+        class SlowDiskCache(StageCache):
+            def _disk_write(self, key, value, expires_at):
+                writing.set()
+                release.wait(5)
+                super()._disk_write(key, value, expires_at)
+
+        cache = SlowDiskCache(max_bytes=1500, disk_dir=tmp_path)
+        cache.put("a", b"x" * 1000)
+        evicting = threading.Thread(target=cache.put, args=("b", b"y" * 1000))
+        evicting.start()
+        assert writing.wait(5)
+        try:
+            assert cache.get("b") == b"y" * 1000
+        finally:
+            release.set()
+            evicting.join()
+        assert cache.get("a") == b"x" * 1000
+
+    def test_disk_budget_drops_least_recently_used(self, tmp_path, monkeypatch):
+        """Test the disk tier evicts by use without rescanning its directory."""
+        cache = StageCache(max_bytes=100, disk_dir=tmp_path, disk_max_bytes=2500)
+        monkeypatch.setattr(cache, "_disk_files", lambda: pytest.fail("disk tier rescanned"))
+        cache.put("a", b"a" * 1000)
+        cache.put("b", b"b" * 1000)
+        assert cache.get("a") == b"a" * 1000  # now more recently used than "b"
+        cache.put("c", b"c" * 1000)
+
+        assert "b" not in cache
+        assert cache.get("a") == b"a" * 1000 and cache.get("c") == b"c" * 1000
+        assert sorted(path.stem for path in tmp_path.glob("*/*.pkl")) == ["a", "c"]
+
+
+class TestCachedModel:
+    def test_repeated_input_calls_model_once(self):
+        """Test a cached model serves repeats from the cache."""
+        model = CountingModel("upper", str.upper)
+        cached = CachedModel(model, StageCache())
+        assert cached("hi") == "HI"
+        assert cached("hi") == "HI"
+        assert model.calls == 1
+
+    def test_async_and_stream_paths_share_cache(self):
+        """Test acall and chain streaming hit the same cache entries."""
+        model = CountingModel("upper", str.upper)
+        cached = CachedModel(model, StageCache())
+        chain = ModelChain([cached])
+
+        async def run():
+            first = await chain.acall("hi")
+            streamed = [chunk async for chunk in chain.astream("hi")]
+            return first, streamed
+
+        assert asyncio.run(run()) == ("HI", ["HI"])
+        assert model.calls == 1
+
+    def test_stream_passes_input_through(self):
+        """Test a cached incremental stage receives its input before the upstream ends."""
+        seen = []
+
+        class Incremental:
+            name = "incremental"
+
+            async def astream(self, chunks):
+                async for chunk in chunks:
+                    seen.append(chunk)
+                    yield chunk.upper()
+
+        async def upstream():
+            yield "a"
+            assert seen[-1] == "a"
+            yield "b"
+
+        async def run():
+            cached = CachedModel(Incremental(), StageCache())
+            first = [chunk async for chunk in cached.astream(upstream())]
+            again = [chunk async for chunk in cached.astream(upstream())]
+            return first, again, await cached.acall("ab")
+
+        first, again, called = asyncio.run(run())
+        assert first == ["A", "B"]
+        assert again == ["A", "B"]  # output had started: the model streams again
+        assert called == "AB"  # but the joined output was cached
+
+    def test_keeps_model_identity(self):
+        """Test the wrapper hashes and compares like the wrapped model."""
+        model = CountingModel("upper", str.upper)
+        cached = CachedModel(model, StageCache())
+        assert hash(cached) == hash(model)
+        assert cached == model
+        assert cached != SimpleNamespace(name="upper")
+        assert repr(cached) == f"CachedModel({model!r})"
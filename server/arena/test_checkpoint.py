@@ -0,0 +1,70 @@
+import pytest
+from arena.arena_base import ArenaBase
+from arena.checkpoint import checkpoint_bytes, checkpoint_position, load_checkpoint, save_checkpoint
+from arena.matchmaking import Matchmaker
+from arena.rating_engines import EloEngine, Glicko2Engine, TrueSkillEngine
+from arena.test_replay import make_chains, make_votes
+
+ENGINES = [EloEngine, lambda: Glicko2Engine(period_size=7), TrueSkillEngine]
+
+
+def make_arena(engine=EloEngine, n_chains: int = 15) -> ArenaBase:
+    return ArenaBase(make_chains(8, n_chains, seed=2), rating_engine=engine(), matchmaker=Matchmaker(seed=0))
+
+
+class TestCheckpoint:
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_restores_arena(self, tmp_path, engine):
+        """Test a restored arena matches the original now and after further votes."""
+        path = str(tmp_path / "checkpoint")
+        original = make_arena(engine)
+        votes = make_votes(original.model_chains, 300)
+        original.record_votes(votes[:200])
+        save_checkpoint(path, checkpoint_bytes(original, position=1234))
+
+        restored = make_arena(engine)
+        assert load_checkpoint(path, restored) == 1234
+        assert restored.get_leaderboard() == original.get_leaderboard()
+        assert restored.get_chain_leaderboard() == original.get_chain_leaderboard()
+        assert restored.leaderboard_version == original.leaderboard_version
+        assert restored.matchmaker.snapshot().variances == original.matchmaker.snapshot().variances
+        assert restored.matchmaker.snapshot().pair_counts == original.matchmaker.snapshot().pair_counts
+
+        # Open rating periods and pair history carry over
+        original.record_votes(votes[200:])
+        restored.record_votes(votes[200:])
+        original.flush_ratings()
+        restored.flush_ratings()
+        assert restored.get_chain_leaderboard() == original.get_chain_leaderboard()
+        assert restored.matchmaker.snapshot().recent == original.matchmaker.snapshot().recent
+
+    def test_position(self, tmp_path):
+        """Test the covered log position is read from the header alone."""
+        path = str(tmp_path / "checkpoint")
+        assert checkpoint_position(path) is None
+        save_checkpoint(path, checkpoint_bytes(make_arena(), position=99))
+        assert checkpoint_position(path) == 99
+        assert not list(tmp_path.glob("*.tmp"))
+
+    def test_rejects_other_arenas(self, tmp_path):
+        """Test checkpoints are refused by arenas with other chains or engines."""
+        path = str(tmp_path / "checkpoint")
+        save_checkpoint(path, checkpoint_bytes(make_arena(), position=0))
+        with pytest.raises(ValueError):
+            load_checkpoint(path, make_arena(n_chains=14))
+        with pytest.raises(ValueError):
+            load_checkpoint(path, make_arena(TrueSkillEngine))
+
+    def test_rejects_corruption(self, tmp_path):
+        """Test a damaged checkpoint is detected before anything is restored."""
+        path = tmp_path / "checkpoint"
+        arena = make_arena()
+        arena.record_votes(make_votes(arena.model_chains, 50))
+        data = bytearray(checkpoint_bytes(arena, position=0))
+        data[len(data) // 2] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        fresh = make_arena()
+        with pytest.raises(ValueError):
+            load_checkpoint(str(path), fresh)
+        assert all(rating == 1500.0 for _, rating in fresh.get_chain_leaderboard())
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+from arena.arena_base import Model, ModelChain, acall_model
+from arena.executors import ExecutionBackend, ExecutorRegistry, worker_state
+
+
+# Worker functions must be importable top-level functions for the process backend
+def load_weights(scale: int) -> None:
+    worker_state()["scale"] = scale
+
+
+def scaled(value: int) -> tuple[int, int]:
+    return value * worker_state().get("scale", 1), os.getpid()
+
+
+def synthesize(size: int) -> bytes:
+    return bytes(range(256)) * (size // 256)
+
+
+def slow_synthesize(size: int) -> bytes:
+    time.sleep(0.2)
+    return synthesize(size)
+
+
+class BackendModel(Model):
+    """Test model declaring an execution backend."""
+
+    def __call__(self, input_data):
+        return self.function(input_data)
+
+
+class DoublingModel(Model):
+    """Test model whose call does more than its function."""
+
+    def __call__(self, input_data):
+        return self.function(input_data) * 2
+
+
+def shared_segments() -> set[str]:
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+@pytest.fixture
+def registry():
+    registry = ExecutorRegistry(thread_workers=2)
+    yield registry
+    registry.shutdown()
+
+
+class TestExecutorRegistry:
+    def test_inline_backend_runs_on_loop_thread(self, registry):
+        """Test inline models run on the event loop thread."""
+        model = BackendModel("inline", lambda x: threading.get_ident(), ExecutionBackend.INLINE)
+
+        async def run():
+            return await registry.run(model, None), threading.get_ident()
+
+        model_thread, loop_thread = asyncio.run(run())
+        assert model_thread == loop_thread
+
+    def test_thread_backend_runs_off_loop_thread(self, registry):
+        """Test thread models run in the registry's thread pool."""
+        model = BackendModel("thread", lambda x: threading.current_thread().name)
+
+        name = asyncio.run(registry.run(model, None))
+        assert name.startswith("arena-model")
+
+    def test_process_backend_uses_warm_workers(self, registry):
+        """Test process models run in workers prepared by the pool initializer."""
+        registry.configure_process_pool("local", max_workers=1, initializer=load_weights, initargs=(3,))
+        pids = registry.warm_up("local")
+        model = BackendModel("local", scaled, ExecutionBackend.PROCESS, pool="local")
+
+        value, pid = asyncio.run(registry.run(model, 5))
+        assert value == 15
+        assert pid in pids
+        assert pid != os.getpid()
+
+    def test_large_binary_outputs_use_shared_memory(self, registry):
+        """Test large binary results come back intact from process workers."""
+        model = BackendModel("tts", synthesize, ExecutionBackend.PROCESS)
+
+        async def run():
+            return await asyncio.gather(
+                registry.run(model, 1024), registry.run(model, 1024 * 1024)
+            )
+
+        small, large = asyncio.run(run())
+        assert small == synthesize(1024)
+        assert large == synthesize(1024 * 1024)
+
+    def test_process_backend_calls_the_model(self, registry):
+        """Test process workers call the model itself, like the other backends."""
+        for backend in (ExecutionBackend.THREAD, ExecutionBackend.PROCESS):
+            model = DoublingModel("double", abs, backend)
+            assert asyncio.run(registry.run(model, -4)) == 8
+
+    @pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs POSIX shared memory in /dev/shm")
+    def test_abandoned_results_release_shared_memory(self, registry):
+        """Test a cancelled caller's large result is unlinked once the worker returns it."""
+        model = BackendModel("tts", slow_synthesize, ExecutionBackend.PROCESS)
+        registry.warm_up()
+        before = shared_segments()
+
+        async def run():
+            call = asyncio.ensure_future(registry.run(model, 1024 * 1024))
+            await asyncio.sleep(0.05)  # running in the worker
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+            await asyncio.sleep(0.5)
+
+        asyncio.run(run())
+        assert shared_segments() == before
+
+    def test_cannot_reconfigure_running_pool(self, registry):
+        """Test a running pool's configuration cannot be changed."""
+        registry.process_pool("busy")
+        with pytest.raises(ValueError, match="already running"):
+            registry.configure_process_pool("busy", max_workers=4)
+
+
+class TestModelBackends:
+    def test_acall_model_respects_backend(self):
+        """Test acall_model dispatches on the model's declared backend."""
+        model = BackendModel("inline", lambda x: threading.get_ident(), ExecutionBackend.INLINE)
+
+        async def run():
+            return await acall_model(model, None), threading.get_ident()
+
+        model_thread, loop_thread = asyncio.run(run())
+        assert model_thread == loop_thread
+
+    def test_chain_with_thread_models(self):
+        """Test chains of default (thread) models still produce correct output."""
+        chain = ModelChain([BackendModel("a", str.upper), BackendModel("b", lambda x: x + "!")])
+        assert asyncio.run(chain.acall("hi")) == "HI!"
@@ -0,0 +1,232 @@
+import asyncio
+import dataclasses
+import random
+import time
+
+import pytest
+from arena.arena_base import ArenaBase, ModelChain
+from arena.ingest import VoteIngestor
+from arena.matchmaking import Matchmaker
+from arena.test_replay import NamedModel
+from arena.types import VoteOutcome
+
+
+def make_arena(n: int = 6, seed: int = 0) -> ArenaBase:
+    chains = [ModelChain([NamedModel(f"m{i}"), NamedModel(f"m{(i + 1) % n}")]) for i in range(n)]
+    return ArenaBase(chains, matchmaker=Matchmaker(seed=seed))
+
+
+def random_votes(arena: ArenaBase, count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    outcomes = list(VoteOutcome)
+    return [
+        (*rng.sample(arena.model_chains, 2), rng.choice(outcomes))
+        for _ in range(count)
+    ]
+
+
+class TestRatingSnapshot:
+    def test_matches_arena(self):
+        """Test a snapshot reproduces the arena's leaderboards and lookups."""
+        arena = make_arena()
+        arena.record_votes(random_votes(arena, 50))
+        snapshot = arena.snapshot()
+
+        assert snapshot.version == arena.leaderboard_version
+        assert snapshot.get_leaderboard() == arena.get_leaderboard()
+        assert snapshot.get_chain_leaderboard(2, 1) == arena.get_chain_leaderboard(2, 1)
+        chain = arena.model_chains[3]
+        assert snapshot.get_chain_elo(chain) == arena.get_chain_elo(chain)
+        assert snapshot.get_model_elo("m2") == arena.get_model_elo("m2")
+        with pytest.raises(KeyError):
+            snapshot.get_model_elo("missing")
+
+    def test_is_immutable(self):
+        """Test snapshots cannot be modified and ignore later votes."""
+        arena = make_arena()
+        snapshot = arena.snapshot()
+        chain = arena.model_chains[0]
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            snapshot.version = 0
+        with pytest.raises(TypeError):
+            snapshot.chain_elos[chain] = 0.0
+
+        arena.record_votes(random_votes(arena, 20))
+        assert snapshot.get_chain_elo(chain) == 1500.0
+        assert arena.snapshot().version > snapshot.version
+
+    def test_matchups_follow_matchmaker(self):
+        """Test a frozen matchmaker picks exactly what the live one would."""
+        arena = make_arena(n=40)
+        arena.record_votes(random_votes(arena, 300))
+        snapshot = arena.matchmaker.snapshot()
+
+        arena.matchmaker.rng = random.Random(7)
+        rng = random.Random(7)
+        for _ in range(200):
+            assert snapshot.next_pair(rng) == arena.matchmaker.next_pair()
+
+
+class TestVoteIngestor:
+    def test_applies_votes_in_order(self):
+        """Test queued votes end up with the same ratings as direct recording."""
+        votes = random_votes(make_arena(), 100)
+        direct = make_arena()
+        direct.record_votes(votes)
+
+        async def run():
+            arena = make_arena()
+            ingestor = VoteIngestor(arena)
+            sequences = [await ingestor.submit(*vote) for vote in votes]
+            snapshot = await ingestor.drain()
+            await ingestor.stop()
+            return sequences, snapshot
+
+        sequences, snapshot = asyncio.run(run())
+        assert sequences == list(range(1, 101))
+        assert snapshot.get_chain_leaderboard() == direct.get_chain_leaderboard()
+        assert snapshot.get_leaderboard() == direct.get_leaderboard()
+
+    def test_batches_votes(self):
+        """Test votes queued while the writer is busy are applied together."""
+        arena = make_arena()
+        batches = []
+        record_votes = arena.record_votes
+
+        def recording(votes):
+            batches.append(len(votes))
+            record_votes(votes)
+
+        arena.record_votes = recording
+
+        async def run():
+            ingestor = VoteIngestor(arena, max_batch=8)
+            for vote in random_votes(arena, 20):
+                await ingestor.submit(*vote)
+            await ingestor.stop()
+            return ingestor
+
+        ingestor = asyncio.run(run())
+        assert batches == [8, 8, 4]
+        assert ingestor.processed == 20
+        assert ingestor.pending == 0
+
+    def test_submit_does_not_wait_for_ratings(self):
+        """Test votes are accepted while a slow batch is being applied."""
+        arena = make_arena()
+        record_votes = arena.record_votes
+
+        def slow(votes):
+            time.sleep(0.2)
+            record_votes(votes)
+
+        arena.record_votes = slow
+
+        async def run():
+            ingestor = VoteIngestor(arena, max_batch=1)
+            votes = random_votes(arena, 50)
+            await ingestor.submit(*votes[0])
+            await asyncio.sleep(0.01)  # the writer is now inside the first batch
+            start = time.perf_counter()
+            for vote in votes[1:]:
+                await ingestor.submit(*vote)
+            elapsed = time.perf_counter() - start
+            processed = ingestor.processed
+            ingestor._writer.cancel()
+            return elapsed, processed
+
+        elapsed, processed = asyncio.run(run())
+        assert processed == 0
+        assert elapsed < 0.1
+
+    def test_readers_see_whole_batches(self):
+        """Test the published snapshot only changes between batches."""
+        arena = make_arena()
+
+        async def run():
+            ingestor = VoteIngestor(arena, max_batch=5)
+            initial = ingestor.snapshot
+            for vote in random_votes(arena, 5):
+                await ingestor.submit(*vote)
+            assert ingestor.snapshot is initial
+            snapshot = await ingestor.wait_processed(5)
+            await ingestor.stop()
+            return initial, snapshot
+
+        initial, snapshot = asyncio.run(run())
+        assert snapshot is not initial
+        assert snapshot.version == arena.leaderboard_version
+        assert all(rating == 1500.0 for _, rating in initial.chain_leaderboard)
+
+    def test_rejects_unknown_chains(self):
+        """Test votes for chains outside the arena are refused before queueing."""
+        arena = make_arena()
+        stranger = ModelChain([NamedModel("stranger")])
+
+        async def run():
+            ingestor = VoteIngestor(arena)
+            with pytest.raises(KeyError):
+                await ingestor.submit(arena.model_chains[0], stranger, VoteOutcome.A)
+            return ingestor.submitted
+
+        assert asyncio.run(run()) == 0
+
+    def test_failed_batch_does_not_stop_writer(self):
+        """Test a batch that raises is counted and later votes still apply."""
+        arena = make_arena()
+        record_votes = arena.record_votes
+        calls = []
+
+        def flaky(votes):
+            calls.append(votes)
+            if len(calls) == 1:
+                raise RuntimeError("engine failure")
+            record_votes(votes)
+
+        arena.record_votes = flaky
+        chain_a, chain_b = arena.model_chains[:2]
+
+        async def run():
+            ingestor = VoteIngestor(arena, max_batch=1)
+            await ingestor.submit(chain_a, chain_b, VoteOutcome.A)
+            await ingestor.drain()
+            await ingestor.submit(chain_a, chain_b, VoteOutcome.A)
+            snapshot = await ingestor.drain()
+            await ingestor.stop()
+            return ingestor, snapshot
+
+        ingestor, snapshot = asyncio.run(run())
+        assert ingestor.failed == 1
+        assert isinstance(ingestor.last_error, RuntimeError)
+        assert snapshot.get_chain_elo(chain_a) > 1500.0
+
+    def test_matchups_from_snapshot(self):
+        """Test matchups are drawn from the published snapshot."""
+        arena = make_arena()
+
+        async def run():
+            ingestor = VoteIngestor(arena, seed=3)
+            pairs = [ingestor.generate_matchup() for _ in range(50)]
+            await ingestor.stop()
+            return pairs
+
+        for chain_a, chain_b in asyncio.run(run()):
+            assert chain_a != chain_b
+            assert chain_a in arena.chain_elos and chain_b in arena.chain_elos
+
+    def test_on_snapshot_hook(self):
+        """Test each published snapshot is handed to the hook first."""
+        arena = make_arena()
+        published = []
+
+        async def run():
+            ingestor = VoteIngestor(arena, max_batch=4, on_snapshot=published.append)
+            for vote in random_votes(arena, 8):
+                await ingestor.submit(*vote)
+            await ingestor.stop()
+            return ingestor.snapshot
+
+        final = asyncio.run(run())
+        assert len(published) == 2
+        assert published[-1] is final
@@ -0,0 +1,142 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+from arena.arena_base import ArenaBase, ModelChain
+from arena.matchmaking import Matchmaker, SumTree, information_gain
+from arena.rating_engines import Glicko2Engine
+from arena.test_replay import NamedModel
+from arena.types import VoteOutcome
+
+
+def single_model_chains(n: int) -> list[ModelChain]:
+    return [ModelChain([NamedModel(f"m{i}")]) for i in range(n)]
+
+
+def rating_error(active: bool, n_votes: int, seed: int, n_chains: int = 60) -> float:
+    """
+    Simulate an arena with hidden strengths and return the rating RMSE.
+
+    Votes follow ELO win probabilities from the hidden strengths, with 10%
+    ties. Pairs come from the arena's matchmaker when `active`, otherwise
+    uniformly at random.
+    """
+    rng = random.Random(seed)
+    strengths = np.array([rng.gauss(0, 300) for _ in range(n_chains)])
+    chains = single_model_chains(n_chains)
+    ids = {chain: i for i, chain in enumerate(chains)}
+    arena = ArenaBase(chains, rating_engine=Glicko2Engine(), matchmaker=Matchmaker(seed=seed))
+    for _ in range(n_votes):
+        if active:
+            chain_a, chain_b = arena.generate_matchup()
+            i, j = ids[chain_a], ids[chain_b]
+        else:
+            i, j = rng.sample(range(n_chains), 2)
+        p_a = 1 / (1 + 10 ** ((strengths[j] - strengths[i]) / 400))
+        draw = rng.random()
+        vote = VoteOutcome.A if draw < 0.9 * p_a else VoteOutcome.B if draw < 0.9 else VoteOutcome.TIE
+        arena.record_vote(chains[i], chains[j], vote)
+    arena.flush_ratings()
+    ratings = np.array([arena.get_chain_elo(chain) for chain in chains])
+    error = (ratings - ratings.mean()) - (strengths - strengths.mean())
+    return float(np.sqrt(np.mean(error**2)))
+
+
+class TestSumTree:
+    def test_total_and_updates(self):
+        """Test inner sums follow leaf updates."""
+        tree = SumTree([1.0, 2.0, 3.0])
+        assert tree.total == 6.0
+        tree.update(1, 0.5)
+        assert tree.total == 4.5
+        assert tree[1] == 0.5
+        with pytest.raises(ValueError):
+            tree.update(0, -1.0)
+
+    def test_sampling_is_proportional(self):
+        """Test draws follow the weights and skip zero-weight ids."""
+        tree = SumTree([1.0, 0.0, 3.0, 0.0, 0.0])
+        rng = random.Random(0)
+        counts = Counter(tree.sample(rng) for _ in range(8000))
+        assert set(counts) == {0, 2}
+        assert counts[2] / counts[0] == pytest.approx(3.0, rel=0.1)
+
+    def test_empty_tree_cannot_sample(self):
+        """Test sampling with no weight raises ValueError."""
+        with pytest.raises(ValueError):
+            SumTree([0.0, 0.0]).sample(random.Random(0))
+
+
+class TestMatchmaker:
+    def test_needs_two_chains(self):
+        """Test a single-chain arena cannot produce a matchup."""
+        arena = ArenaBase(single_model_chains(1))
+        with pytest.raises(ValueError):
+            arena.generate_matchup()
+
+    def test_matchups_are_distinct_chains(self):
+        """Test matchups always pair two different chains of the arena."""
+        chains = single_model_chains(5)
+        arena = ArenaBase(chains, matchmaker=Matchmaker(seed=1))
+        for _ in range(50):
+            chain_a, chain_b = arena.generate_matchup()
+            assert chain_a != chain_b
+            assert chain_a in chains and chain_b in chains
+            arena.record_vote(chain_a, chain_b, VoteOutcome.A)
+
+    def test_avoids_recent_pairs(self):
+        """Test the latest pairs are not repeated while alternatives exist."""
+        chains = single_model_chains(12)
+        arena = ArenaBase(chains, matchmaker=Matchmaker(explore=0.0, recent_pairs=4, seed=2))
+        recent = []
+        for _ in range(40):
+            pair = frozenset(arena.generate_matchup())
+            assert pair not in recent
+            recent = (recent + [pair])[-4:]
+            arena.record_vote(*pair, VoteOutcome.TIE)
+
+    def test_prefers_uncertain_chains(self):
+        """Test chains with fewer votes are scheduled more often under ELO."""
+        chains = single_model_chains(4)
+        arena = ArenaBase(chains, matchmaker=Matchmaker(seed=3))
+        for _ in range(30):
+            arena.record_vote(chains[0], chains[1], VoteOutcome.TIE)
+        shown = Counter()
+        for _ in range(400):
+            shown.update(arena.generate_matchup())
+        assert shown[chains[2]] > shown[chains[0]]
+        assert shown[chains[3]] > shown[chains[1]]
+
+    def test_prefers_close_opponents(self):
+        """Test opponents are chosen among chains with similar ratings."""
+        chains = single_model_chains(4)
+        arena = ArenaBase(chains, matchmaker=Matchmaker(explore=0.0, recent_pairs=0, seed=4))
+        for chain, rating in zip(chains, [1500.0, 1510.0, 1900.0, 1910.0]):
+            arena.chain_elos[chain] = rating
+        pairs = {frozenset(arena.generate_matchup()) for _ in range(100)}
+        assert pairs == {frozenset(chains[:2]), frozenset(chains[2:])}
+
+    def test_batch_votes_refresh_weights(self):
+        """Test record_votes counts games and rebuilds the sampling weights."""
+        chains = single_model_chains(3)
+        arena = ArenaBase(chains)
+        arena.record_votes([(chains[0], chains[1], VoteOutcome.A)] * 10)
+        assert arena.matchmaker.games == [10, 10, 0]
+        arena.generate_matchup()
+
+    def test_information_gain(self):
+        """Test close, uncertain pairs are the most informative."""
+        assert information_gain(1500, 1500, 100, 100) > information_gain(1500, 1800, 100, 100)
+        assert information_gain(1500, 1500, 200, 200) > information_gain(1500, 1500, 100, 100)
+
+
+class TestActiveSampling:
+    def test_settles_with_fewer_votes_than_random(self):
+        """Test active matchups get close to random pairing's accuracy with half the votes."""
+        seeds = range(3)
+        active = np.mean([rating_error(True, 600, seed) for seed in seeds])
+        uniform = np.mean([rating_error(False, 600, seed) for seed in seeds])
+        uniform_double = np.mean([rating_error(False, 1200, seed) for seed in seeds])
+        assert active < 0.85 * uniform
+        assert active <= 1.1 * uniform_double
@@ -0,0 +1,175 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from arena.arena_base import Model, ModelChain
+from arena.metrics import CallMetrics, Histogram, InstrumentedModel, MetricsRegistry, payload_size, render_snapshots
+
+
+class SlowStream:
+    """Async model yielding one chunk per input chunk, after a delay."""
+
+    def __init__(self, name: str = "slow", delay: float = 0.01, fail_after: int = None):
+        self.name = name
+        self.delay = delay
+        self.fail_after = fail_after
+
+    async def acall(self, text: str) -> str:
+        await asyncio.sleep(self.delay)
+        if self.fail_after is not None:
+            raise RuntimeError("provider error")
+        return text.upper()
+
+    async def astream(self, chunks):
+        count = 0
+        async for chunk in chunks:
+            await asyncio.sleep(self.delay)
+            if self.fail_after is not None and count >= self.fail_after:
+                raise RuntimeError("provider error")
+            count += 1
+            yield chunk.upper()
+
+
+class Exclaim(Model):
+    """Blocking model, run in a worker thread."""
+
+    def __call__(self, text: str) -> str:
+        return text + "!"
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+async def collect(stream) -> list:
+    return [chunk async for chunk in stream]
+
+
+def series(registry: MetricsRegistry, name: str) -> dict:
+    return {tuple(values): value for values, value in registry.snapshot()[name]["series"]}
+
+
+class TestRendering:
+    def test_histogram_buckets(self):
+        """Test observations land in the first bucket whose bound they do not exceed."""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+        assert histogram.counts == [2, 1, 1]
+        assert histogram.count == 4 and histogram.sum == pytest.approx(2.65)
+
+    def test_prometheus_text(self):
+        """Test families render with help, type, cumulative buckets and escaped labels."""
+        registry = MetricsRegistry()
+        registry.counter("votes_total", "Votes", ("status",)).inc(("200",), 3)
+        latency = registry.histogram("call_seconds", "Call time", ("model",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(('say "hi"\n',), value)
+
+        text = registry.render()
+        assert "# HELP votes_total Votes\n# TYPE votes_total counter\n" in text
+        assert 'votes_total{status="200"} 3\n' in text
+        assert 'call_seconds_bucket{model="say \\"hi\\"\\n",le="0.1"} 1\n' in text
+        assert 'call_seconds_bucket{model="say \\"hi\\"\\n",le="1"} 2\n' in text
+        assert 'call_seconds_bucket{model="say \\"hi\\"\\n",le="+Inf"} 3\n' in text
+        assert 'call_seconds_sum{model="say \\"hi\\"\\n"} 5.55\n' in text
+        assert 'call_seconds_count{model="say \\"hi\\"\\n"} 3\n' in text
+
+    def test_merges_snapshots(self):
+        """Test snapshots from several processes are summed series by series."""
+        snapshots = []
+        for worker in range(3):
+            registry = MetricsRegistry()
+            registry.counter("votes_total", "Votes").inc(amount=worker + 1)
+            registry.gauge("queue", "Queue", ("kind",)).set(("wal",), 2)
+            registry.histogram("call_seconds", "Call time", buckets=(1.0,)).observe((), 0.75 * worker)
+            snapshots.append(registry.snapshot())
+
+        text = render_snapshots(snapshots)
+        assert text.count("# TYPE votes_total counter") == 1
+        assert "votes_total 6\n" in text
+        assert 'queue{kind="wal"} 6\n' in text
+        assert 'call_seconds_bucket{le="1"} 2\n' in text
+        assert 'call_seconds_bucket{le="+Inf"} 3\n' in text
+
+    def test_collectors_run_at_snapshot(self):
+        """Test collected values are read when a snapshot is taken, not before."""
+        registry = MetricsRegistry()
+        depth = registry.gauge("depth", "Queue depth")
+        queue = []
+        registry.collect(lambda: depth.set((), len(queue)))
+        queue.extend([1, 2])
+        assert series(registry, "depth") == {(): 2}
+
+    def test_type_conflict(self):
+        """Test a name cannot be registered as two metric types."""
+        registry = MetricsRegistry()
+        registry.counter("calls", "Calls")
+        assert registry.counter("calls", "Calls") is registry.counter("calls", "Calls")
+        with pytest.raises(ValueError):
+            registry.gauge("calls", "Calls")
+
+
+class TestInstrumentedModel:
+    def test_times_calls(self):
+        """Test awaited calls record total time, sizes and outcome per model."""
+        registry = MetricsRegistry()
+        model = InstrumentedModel(SlowStream(), CallMetrics(registry, "stage", "model", "stage"))
+        assert asyncio.run(model.acall("héllo")) == "HÉLLO"
+
+        (outcome, histogram), = series(registry, "stage_seconds").items()
+        assert outcome == ("slow", "ok")
+        assert histogram["count"] == 1 and histogram["sum"] >= 0.01
+        assert series(registry, "stage_input_bytes_total") == {("slow",): 6}
+        assert series(registry, "stage_output_bytes_total") == {("slow",): 6}
+        assert series(registry, "stage_in_flight") == {("slow",): 0}
+
+    def test_first_chunk_of_stream(self):
+        """Test streams record the time to the first chunk separately from the total."""
+        registry = MetricsRegistry()
+        model = InstrumentedModel(SlowStream(delay=0.02), CallMetrics(registry, "stage", "model", "stage"))
+        assert asyncio.run(collect(model.astream(chunks("a", "b", "c")))) == ["A", "B", "C"]
+
+        first = series(registry, "stage_first_chunk_seconds")[("slow",)]
+        total = series(registry, "stage_seconds")[("slow", "ok")]
+        assert first["count"] == 1 and total["count"] == 1
+        assert first["sum"] < total["sum"]
+        assert series(registry, "stage_input_bytes_total") == {("slow",): 3}
+
+    def test_outcomes(self):
+        """Test failed and abandoned calls are recorded with their outcome."""
+        registry = MetricsRegistry()
+        metrics = CallMetrics(registry, "stage", "model", "stage")
+        failing = InstrumentedModel(SlowStream(fail_after=1), metrics)
+        with pytest.raises(RuntimeError):
+            asyncio.run(failing.acall("x"))
+        with pytest.raises(RuntimeError):
+            asyncio.run(collect(failing.astream(chunks("a", "b"))))
+
+        async def abandon():
+            stream = InstrumentedModel(SlowStream(), metrics).astream(chunks("a", "b"))
+            await anext(stream)
+            await stream.aclose()
+
+        asyncio.run(abandon())
+        outcomes = {key: value["count"] for key, value in series(registry, "stage_seconds").items()}
+        assert outcomes == {("slow", "error"): 2, ("slow", "cancelled"): 1}
+        assert series(registry, "stage_in_flight") == {("slow",): 0}
+
+    def test_in_chain(self):
+        """Test instrumented stages keep the model's identity and run inside chains."""
+        registry = MetricsRegistry()
+        metrics = CallMetrics(registry, "stage", "model", "stage")
+        plain = Exclaim("plain", None)
+        chain = ModelChain([InstrumentedModel(plain, metrics), InstrumentedModel(SlowStream(), metrics)])
+        assert chain.names == ("plain", "slow") and chain == ModelChain([plain, SlowStream()])
+        assert InstrumentedModel(plain, metrics) != SimpleNamespace(name="plain")
+        assert asyncio.run(chain.acall("hi")) == "HI!"
+        assert set(series(registry, "stage_seconds")) == {("plain", "ok"), ("slow", "ok")}
+
+    def test_payload_size(self):
+        """Test text is measured in UTF-8 bytes, binary by length, anything else as 0."""
+        assert payload_size("é") == 2
+        assert payload_size(memoryview(bytes(8)).cast("H")) == 8
+        assert payload_size(None) == 0
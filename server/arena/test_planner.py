@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+from arena.arena_base import ModelChain, ArenaBase
+from arena.planner import ChainPlanner
+
+
+class CountingModel:
+    """Test model that records how many times it was called."""
+
+    def __init__(self, name: str, function):
+        self.name = name
+        self.function = function
+        self.calls = 0
+
+    def __call__(self, input_data):
+        self.calls += 1
+        return self.function(input_data)
+
+    def __repr__(self) -> str:
+        return f"Model(name={self.name})"
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CountingModel):
+            return self.name == other.name
+        return False
+
+
+@pytest.fixture
+def counting_models():
+    """Create a shared first stage and two distinct second stages."""
+    gpt = CountingModel("gpt-4", lambda x: x + ">gpt")
+    haiku = CountingModel("claude-3-haiku", lambda x: x + ">haiku")
+    mistral = CountingModel("mistral-large", lambda x: x + ">mistral")
+    return gpt, haiku, mistral
+
+
+class TestChainPlanner:
+    def test_shared_prefix_runs_once(self, counting_models):
+        """Test a stage shared by several chains is only called once."""
+        gpt, haiku, mistral = counting_models
+        chain_1 = ModelChain([gpt, haiku])
+        chain_2 = ModelChain([gpt, mistral])
+
+        outputs = asyncio.run(ChainPlanner([chain_1, chain_2]).run("in"))
+
+        assert outputs[chain_1] == "in>gpt>haiku"
+        assert outputs[chain_2] == "in>gpt>mistral"
+        assert gpt.calls == 1
+        assert haiku.calls == 1
+        assert mistral.calls == 1
+
+    def test_chain_that_is_prefix_of_another(self, counting_models):
+        """Test a chain ending at an inner trie node gets that node's output."""
+        gpt, haiku, _ = counting_models
+        short = ModelChain([gpt])
+        long = ModelChain([gpt, haiku])
+
+        outputs = asyncio.run(ChainPlanner([short, long]).run("in"))
+
+        assert outputs[short] == "in>gpt"
+        assert outputs[long] == "in>gpt>haiku"
+        assert gpt.calls == 1
+
+    def test_stage_counts(self, counting_models):
+        """Test the planner reports calls saved by prefix sharing."""
+        gpt, haiku, mistral = counting_models
+        planner = ChainPlanner(
+            [ModelChain([gpt, haiku]), ModelChain([gpt, mistral]), ModelChain([haiku])]
+        )
+        assert planner.naive_stage_count == 5
+        assert planner.stage_count == 4
+
+    def test_matches_sequential_execution(self, counting_models):
+        """Test planned outputs equal running each chain on its own."""
+        gpt, haiku, mistral = counting_models
+        chains = [
+            ModelChain([gpt, haiku]),
+            ModelChain([mistral, gpt]),
+            ModelChain([gpt, haiku, mistral]),
+        ]
+        outputs = asyncio.run(ChainPlanner(chains).run("in"))
+        for chain in chains:
+            assert outputs[chain] == chain("in")
+
+    def test_runs_only_requested_chains(self, counting_models):
+        """Test a subset of the chains runs only the stages it uses, sharing prefixes."""
+        gpt, haiku, mistral = counting_models
+        chain_1, chain_2, chain_3 = ModelChain([gpt, haiku]), ModelChain([gpt, mistral]), ModelChain([haiku])
+        planner = ChainPlanner([chain_1, chain_2, chain_3])
+
+        outputs = asyncio.run(planner.run("in", [chain_1, chain_2]))
+
+        assert outputs == {chain_1: "in>gpt>haiku", chain_2: "in>gpt>mistral"}
+        assert (gpt.calls, haiku.calls, mistral.calls) == (1, 1, 1)
+        assert asyncio.run(planner.run("in", [chain_3])) == {chain_3: "in>haiku"}
+        assert gpt.calls == 1
+
+    def test_on_output_as_chains_finish(self, counting_models):
+        """Test each chain's output is reported when that chain finishes, before slower chains do."""
+        gpt, haiku, _ = counting_models
+        short, long = ModelChain([gpt]), ModelChain([gpt, haiku])
+        finished = []
+
+        def on_output(chain, output):
+            finished.append((chain, output, haiku.calls))
+
+        asyncio.run(ChainPlanner([long, short]).run("in", on_output=on_output))
+        assert finished == [(short, "in>gpt", 0), (long, "in>gpt>haiku", 1)]
+
+    def test_unknown_chain(self, counting_models):
+        """Test running a chain the plan does not cover is refused."""
+        gpt, haiku, mistral = counting_models
+        planner = ChainPlanner([ModelChain([gpt, haiku])])
+        with pytest.raises(ValueError):
+            asyncio.run(planner.run("in", [ModelChain([mistral])]))
+        assert gpt.calls == 0
+
+    def test_arena_fan_out(self, counting_models):
+        """Test ArenaBase.generate_all_outputs runs every chain with sharing."""
+        gpt, haiku, mistral = counting_models
+        chains = [ModelChain([gpt, haiku]), ModelChain([gpt, mistral])]
+        arena = ArenaBase(chains)
+
+        outputs = asyncio.run(arena.generate_all_outputs("in"))
+
+        assert set(outputs) == set(chains)
+        assert gpt.calls == 1
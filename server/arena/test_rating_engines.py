@@ -0,0 +1,187 @@
+import random
+
+import numpy as np
+import pytest
+from arena.arena_base import ArenaBase, ModelChain
+from arena.rating_engines import (
+    GLICKO2_SCALE,
+    EloEngine,
+    Glicko2Engine,
+    TrueSkillEngine,
+    glicko2_period,
+)
+from arena.test_replay import NamedModel, make_chains, make_votes
+from arena.types import VoteOutcome
+
+
+def single_model_chains(n: int) -> list[ModelChain]:
+    return [ModelChain([NamedModel(f"m{i}")]) for i in range(n)]
+
+
+def simulate_votes(chains, strengths, n_votes: int, seed: int = 0) -> list[tuple]:
+    """Votes between random pairs, won with ELO probabilities from hidden strengths."""
+    rng = random.Random(seed)
+    votes = []
+    for _ in range(n_votes):
+        i, j = rng.sample(range(len(chains)), 2)
+        p_a = 1 / (1 + 10 ** ((strengths[j] - strengths[i]) / 400))
+        draw = rng.random()
+        vote = VoteOutcome.A if draw < 0.9 * p_a else VoteOutcome.B if draw < 0.9 else VoteOutcome.TIE
+        votes.append((chains[i], chains[j], vote))
+    return votes
+
+
+class TestEloEngine:
+    def test_default_engine(self):
+        """Test arenas rate with K=32 ELO unless told otherwise."""
+        arena = ArenaBase(single_model_chains(2))
+        assert isinstance(arena.rating_engine, EloEngine)
+        assert arena.get_chain_uncertainty(arena.model_chains[0]) is None
+
+    def test_k_factor(self):
+        """Test the k-factor scales the rating change."""
+        chains = single_model_chains(2)
+        arena = ArenaBase(chains, rating_engine=EloEngine(k_factor=16))
+        arena.record_vote(chains[0], chains[1], VoteOutcome.A)
+        assert arena.get_chain_elo(chains[0]) == pytest.approx(1508.0)
+
+    def test_batch_matches_per_vote_with_custom_k(self):
+        """Test batched replay honours the engine's k-factor."""
+        chains = make_chains(6, 8)
+        votes = make_votes(chains, 200)
+        one_by_one = ArenaBase(chains, rating_engine=EloEngine(k_factor=10))
+        for vote in votes:
+            one_by_one.record_vote(*vote)
+        batched = ArenaBase(chains, rating_engine=EloEngine(k_factor=10))
+        batched.record_votes(votes)
+        assert list(batched.chain_elos.ratings) == pytest.approx(list(one_by_one.chain_elos.ratings), rel=1e-12)
+
+
+class TestGlicko2:
+    def test_reference_period(self):
+        """Test the worked example from Glickman's Glicko-2 paper."""
+        opponents = np.array([1400.0, 1550.0, 1700.0])
+        opponent_rd = np.array([30.0, 100.0, 300.0])
+        mu, phi, sigma = glicko2_period(
+            np.array([0.0]),
+            np.array([200 / GLICKO2_SCALE]),
+            np.array([0.06]),
+            np.array([0, 0, 0]),
+            (opponents - 1500) / GLICKO2_SCALE,
+            opponent_rd / GLICKO2_SCALE,
+            np.array([1.0, 0.0, 0.0]),
+            tau=0.5,
+        )
+        assert 1500 + mu[0] * GLICKO2_SCALE == pytest.approx(1464.06, abs=0.01)
+        assert phi[0] * GLICKO2_SCALE == pytest.approx(151.52, abs=0.01)
+        assert sigma[0] == pytest.approx(0.05999, abs=1e-5)
+
+    def test_idle_players_lose_certainty(self):
+        """Test players without games only see their deviation grow, up to the cap."""
+        mu, phi, sigma = glicko2_period(
+            np.zeros(2), np.array([0.5, 2.0]), np.full(2, 0.06),
+            np.array([], dtype=np.int64), np.array([]), np.array([]), np.array([]),
+            max_phi=2.0,
+        )
+        assert mu.tolist() == [0.0, 0.0]
+        assert phi[0] == pytest.approx(np.sqrt(0.25 + 0.06**2))
+        assert phi[1] == 2.0
+
+    def test_updates_wait_for_period_end(self):
+        """Test ratings change only when a rating period closes or is flushed."""
+        chains = single_model_chains(3)
+        arena = ArenaBase(chains, rating_engine=Glicko2Engine(period_size=2))
+        arena.record_vote(chains[0], chains[1], VoteOutcome.A)
+        assert arena.get_chain_elo(chains[0]) == 1500.0
+        arena.record_vote(chains[0], chains[2], VoteOutcome.A)
+        assert arena.get_chain_elo(chains[0]) > 1500.0
+
+        arena.record_vote(chains[1], chains[2], VoteOutcome.A)
+        before = arena.get_chain_elo(chains[1])
+        arena.flush_ratings()
+        assert arena.get_chain_elo(chains[1]) > before
+        assert arena.get_chain_uncertainty(chains[0]) < 350.0
+
+    def test_batch_matches_per_vote(self):
+        """Test record_votes fills periods exactly like repeated record_vote."""
+        chains = make_chains(6, 8)
+        votes = make_votes(chains, 100)
+        one_by_one = ArenaBase(chains, rating_engine=Glicko2Engine(period_size=7))
+        for vote in votes:
+            one_by_one.record_vote(*vote)
+        batched = ArenaBase(chains, rating_engine=Glicko2Engine(period_size=7))
+        batched.record_votes(votes[:10])
+        batched.record_votes(votes[10:])
+        for arena in (one_by_one, batched):
+            arena.flush_ratings()
+        assert list(batched.chain_elos.ratings) == pytest.approx(list(one_by_one.chain_elos.ratings))
+        assert list(batched.model_elos.ratings) == pytest.approx(list(one_by_one.model_elos.ratings))
+
+
+class TestTrueSkill:
+    def test_win_moves_means_and_shrinks_uncertainty(self):
+        """Test a win raises the winner, lowers the loser and reduces both sigmas."""
+        chains = single_model_chains(2)
+        arena = ArenaBase(chains, rating_engine=TrueSkillEngine())
+        arena.record_vote(chains[0], chains[1], VoteOutcome.B)
+        assert arena.get_chain_elo(chains[1]) > 1500.0 > arena.get_chain_elo(chains[0])
+        assert arena.get_chain_elo(chains[1]) - 1500 == pytest.approx(1500 - arena.get_chain_elo(chains[0]))
+        assert arena.get_chain_uncertainty(chains[0]) < 400.0
+        assert arena.get_model_uncertainty("m1") < 400.0
+
+    def test_draw_between_equals_keeps_means(self):
+        """Test ties and both_bad votes between equal players only reduce uncertainty."""
+        chains = single_model_chains(2)
+        arena = ArenaBase(chains, rating_engine=TrueSkillEngine())
+        arena.record_vote(chains[0], chains[1], VoteOutcome.TIE)
+        arena.record_vote(chains[0], chains[1], VoteOutcome.BOTH_BAD)
+        assert arena.get_chain_elo(chains[0]) == pytest.approx(1500.0)
+        assert arena.get_chain_uncertainty(chains[0]) < 400.0
+
+    def test_shared_model_is_not_credited(self):
+        """Test a model used by both chains gets no net credit for the result."""
+        shared, x, y = NamedModel("shared"), NamedModel("x"), NamedModel("y")
+        chain_a, chain_b = ModelChain([shared, x]), ModelChain([shared, y])
+        arena = ArenaBase([chain_a, chain_b], rating_engine=TrueSkillEngine())
+        arena.record_vote(chain_a, chain_b, VoteOutcome.A)
+        assert arena.get_model_elo("shared") == pytest.approx(1500.0)
+        assert arena.get_model_elo("x") > 1500.0 > arena.get_model_elo("y")
+
+    def test_uncertain_models_move_more(self):
+        """Test a well-known model moves less than a new one on the same result."""
+        chains = single_model_chains(3)
+        arena = ArenaBase(chains, rating_engine=TrueSkillEngine())
+        for _ in range(20):
+            arena.record_vote(chains[0], chains[1], VoteOutcome.TIE)
+        before_known = arena.get_chain_elo(chains[0])
+        arena.record_vote(chains[2], chains[0], VoteOutcome.A)
+        assert abs(arena.get_chain_elo(chains[0]) - before_known) < arena.get_chain_elo(chains[2]) - 1500
+
+    def test_batch_matches_per_vote(self):
+        """Test batched updates equal repeated record_vote."""
+        chains = make_chains(6, 8)
+        votes = make_votes(chains, 200)
+        one_by_one = ArenaBase(chains, rating_engine=TrueSkillEngine())
+        for vote in votes:
+            one_by_one.record_vote(*vote)
+        batched = ArenaBase(chains, rating_engine=TrueSkillEngine())
+        batched.record_votes(votes)
+        assert list(batched.chain_elos.ratings) == pytest.approx(list(one_by_one.chain_elos.ratings), rel=1e-12)
+        assert list(batched.model_elos.ratings) == pytest.approx(list(one_by_one.model_elos.ratings), rel=1e-12)
+
+
+class TestConvergence:
+    @pytest.mark.parametrize(
+        "engine", [EloEngine, Glicko2Engine, TrueSkillEngine], ids=["elo", "glicko2", "trueskill"]
+    )
+    def test_engines_recover_ranking(self, engine):
+        """Test every engine orders chains by their hidden strength."""
+        chains = single_model_chains(8)
+        strengths = np.linspace(-400, 400, 8)
+        arena = ArenaBase(chains, rating_engine=engine())
+        arena.record_votes(simulate_votes(chains, strengths, 1500))
+        arena.flush_ratings()
+        ratings = [arena.get_chain_elo(chain) for chain in chains]
+        assert np.corrcoef(np.argsort(np.argsort(ratings)), np.arange(8))[0, 1] > 0.9
+        # Leaderboards stay consistent with the engine's ratings
+        assert arena.get_chain_leaderboard(limit=1)[0][1] == max(ratings)
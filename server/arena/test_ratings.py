@@ -0,0 +1,136 @@
+import pytest
+from arena.arena_base import ArenaBase, ModelChain
+from arena.ratings import RatingStore
+from arena.test_replay import NamedModel, make_chains, make_votes
+from arena.types import VoteOutcome
+
+
+class TestRatingStore:
+    def test_add_interns_dense_ids(self):
+        """Test keys get consecutive ids and re-adding keeps the first rating."""
+        store = RatingStore()
+        a, b = NamedModel("a"), NamedModel("b")
+        assert store.add(a, 1500.0) == 0
+        assert store.add(b, 1400.0) == 1
+        assert store.add(NamedModel("a"), 9999.0) == 0
+        assert len(store) == 2
+        assert store[a] == 1500.0
+        assert list(store) == [a, b]
+
+    def test_lookup_by_name(self):
+        """Test ratings can be found by key name in O(1)."""
+        store = RatingStore()
+        store.add(NamedModel("gpt-4"), 1510.0)
+        assert store.id_of_name("gpt-4") == 0
+        assert store.get_by_name("gpt-4") == 1510.0
+        assert store.get_by_name("missing") is None
+        with pytest.raises(KeyError):
+            store.id_of_name("missing")
+
+    def test_setitem_updates_existing_keys_only(self):
+        """Test assignment updates ratings but cannot add new keys."""
+        store = RatingStore()
+        model = NamedModel("a")
+        store.add(model, 1500.0)
+        store[model] = 1600.0
+        assert store.ratings[0] == 1600.0
+        with pytest.raises(KeyError):
+            store[NamedModel("b")] = 1500.0
+
+    def test_load_replaces_all_ratings(self):
+        """Test bulk loading checks the length and keeps ids."""
+        store = RatingStore()
+        for name in "abc":
+            store.add(NamedModel(name), 1500.0)
+        store.load([1.0, 2.0, 3.0])
+        assert store.items() == [(NamedModel("a"), 1.0), (NamedModel("b"), 2.0), (NamedModel("c"), 3.0)]
+        with pytest.raises(ValueError):
+            store.load([1.0])
+
+    def test_unhashable_keys_are_not_contained(self):
+        """Test membership checks tolerate unhashable keys."""
+        assert [1] not in RatingStore()
+
+
+class TestArenaRatingStore:
+    def test_chain_members_shared_across_chains(self):
+        """Test a model shared by two chains has a single rating slot."""
+        shared = NamedModel("shared")
+        chains = [ModelChain([shared, NamedModel("x")]), ModelChain([shared])]
+        arena = ArenaBase(chains)
+        arena.record_vote(chains[0], chains[1], VoteOutcome.A)
+        assert len(arena.model_elos) == 2
+        assert arena.get_model_elo("shared") == arena.model_elos[shared]
+
+    def test_duplicate_chains_share_a_rating(self):
+        """Test equal chains passed twice are rated as one."""
+        model = NamedModel("m")
+        arena = ArenaBase([ModelChain([model]), ModelChain([model]), ModelChain([NamedModel("n")])])
+        assert len(arena.chain_elos) == 2
+
+    def test_record_vote_matches_batch_replay(self):
+        """Test per-vote updates and batch replay agree on the array-backed store."""
+        chains = make_chains(8, 10)
+        votes = make_votes(chains, 300)
+        one_by_one = ArenaBase(chains)
+        for chain_a, chain_b, vote in votes:
+            one_by_one.record_vote(chain_a, chain_b, vote)
+        batched = ArenaBase(chains)
+        batched.record_votes(votes)
+        assert list(batched.chain_elos.ratings) == pytest.approx(list(one_by_one.chain_elos.ratings), rel=1e-12)
+        assert list(batched.model_elos.ratings) == pytest.approx(list(one_by_one.model_elos.ratings), rel=1e-12)
+
+
+class TestRankedLeaderboard:
+    @pytest.fixture
+    def voted_arena(self):
+        chains = make_chains(12, 30)
+        arena = ArenaBase(chains)
+        for chain_a, chain_b, vote in make_votes(chains, 500):
+            arena.record_vote(chain_a, chain_b, vote)
+        return arena
+
+    def test_matches_full_sort(self, voted_arena):
+        """Test the incremental ranking matches sorting every rating."""
+        expected = sorted(voted_arena.chain_elos.items(), key=lambda x: x[1], reverse=True)
+        assert voted_arena.get_chain_leaderboard() == expected
+        expected = sorted(voted_arena.model_elos.items(), key=lambda x: x[1], reverse=True)
+        assert voted_arena.get_leaderboard() == expected
+
+    def test_top_k_and_pagination(self, voted_arena):
+        """Test limit/offset return consecutive slices of the leaderboard."""
+        full = voted_arena.get_chain_leaderboard()
+        assert voted_arena.get_chain_leaderboard(limit=5) == full[:5]
+        assert voted_arena.get_chain_leaderboard(limit=5, offset=5) == full[5:10]
+        assert voted_arena.chain_elos.top(3) == full[:3]
+        assert voted_arena.get_chain_leaderboard(limit=5, offset=100) == []
+
+    def test_rank_queries(self, voted_arena):
+        """Test rank lookups agree with leaderboard positions."""
+        for position, (chain, _) in enumerate(voted_arena.get_chain_leaderboard()):
+            assert voted_arena.get_chain_rank(chain) == position
+        for position, (model, _) in enumerate(voted_arena.get_leaderboard()):
+            assert voted_arena.get_model_rank(model.name) == position
+
+    def test_ties_keep_insertion_order(self):
+        """Test equal ratings are ranked in the order keys were added."""
+        chains = make_chains(4, 3)
+        arena = ArenaBase(chains)
+        assert [chain for chain, _ in arena.get_chain_leaderboard()] == chains
+        assert [arena.get_chain_rank(chain) for chain in chains] == [0, 1, 2]
+
+    def test_version_tracks_changes(self, voted_arena):
+        """Test reads leave the version alone and rating changes bump it."""
+        version = voted_arena.leaderboard_version
+        voted_arena.get_leaderboard(limit=3)
+        assert voted_arena.leaderboard_version == version
+
+        chains = voted_arena.model_chains
+        voted_arena.record_vote(chains[0], chains[1], VoteOutcome.A)
+        assert voted_arena.leaderboard_version > version
+
+        version = voted_arena.leaderboard_version
+        voted_arena.record_votes([(chains[2], chains[3], VoteOutcome.B)])
+        assert voted_arena.leaderboard_version > version
+        expected = sorted(voted_arena.chain_elos.items(), key=lambda x: x[1], reverse=True)
+        assert voted_arena.get_chain_leaderboard() == expected
@@ -0,0 +1,146 @@
+import random
+
+import numpy as np
+import pytest
+from arena.arena_base import ModelChain, ArenaBase
+from arena.replay import EloReplayEngine, OUTCOME_CODES, VoteLog
+from arena.types import VoteOutcome
+
+
+class NamedModel:
+    """Minimal hashable model for replay tests."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, input_data):
+        return input_data
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, NamedModel) and self.name == other.name
+
+
+def make_chains(n_models: int, n_chains: int, seed: int = 0) -> list[ModelChain]:
+    """Build random chains of 1-3 models, with shared models across chains."""
+    rng = random.Random(seed)
+    models = [NamedModel(f"m{i}") for i in range(n_models)]
+    chains = []
+    seen = set()
+    while len(chains) < n_chains:
+        members = tuple(rng.sample(models, rng.randint(1, 3)))
+        key = tuple(m.name for m in members)
+        if key not in seen:
+            seen.add(key)
+            chains.append(ModelChain(list(members)))
+    return chains
+
+
+def make_votes(chains: list[ModelChain], n_votes: int, seed: int = 1) -> list[tuple]:
+    rng = random.Random(seed)
+    outcomes = list(VoteOutcome)
+    return [
+        (*rng.sample(chains, 2), rng.choice(outcomes))
+        for _ in range(n_votes)
+    ]
+
+
+def sequential_ratings(chains, votes):
+    arena = ArenaBase(chains)
+    for chain_a, chain_b, vote in votes:
+        arena.record_vote(chain_a, chain_b, vote)
+    return arena
+
+
+class TestVoteLog:
+    def test_columns_must_match(self):
+        """Test vote log columns are validated."""
+        with pytest.raises(ValueError):
+            VoteLog([0, 1], [1], [0, 0])
+
+    def test_slicing_and_concat(self):
+        """Test logs can be sliced and joined."""
+        log = VoteLog([0, 1, 2], [1, 2, 0], [0, 1, 2])
+        joined = VoteLog.concat([log[:1], log[1:]])
+        assert np.array_equal(joined.chain_a, log.chain_a)
+        assert len(joined) == 3
+
+    def test_encode_uses_interned_ids(self):
+        """Test votes are encoded with the engine's chain ids and outcome codes."""
+        chains = make_chains(4, 3)
+        engine = EloReplayEngine(chains)
+        log = engine.encode([(chains[2], chains[0], VoteOutcome.TIE)])
+        assert log.chain_a.tolist() == [2]
+        assert log.chain_b.tolist() == [0]
+        assert log.outcome.tolist() == [OUTCOME_CODES[VoteOutcome.TIE]]
+
+
+class TestEloReplayEngine:
+    @pytest.mark.parametrize("min_vector_run", [1, 4, 10_000])
+    def test_matches_record_vote(self, min_vector_run):
+        """Test vectorized and scalar replay both match sequential record_vote."""
+        chains = make_chains(n_models=30, n_chains=60)
+        votes = make_votes(chains, 2000)
+        expected = sequential_ratings(chains, votes)
+
+        engine = EloReplayEngine(chains, min_vector_run=min_vector_run)
+        model_ratings, chain_ratings = engine.replay(engine.encode(votes))
+
+        for model, model_id in engine.model_ids.items():
+            assert model_ratings[model_id] == pytest.approx(expected.model_elos[model], rel=1e-12)
+        for chain, chain_id in engine.chain_ids.items():
+            assert chain_ratings[chain_id] == pytest.approx(expected.chain_elos[chain], rel=1e-12)
+
+    def test_shared_model_on_both_sides(self):
+        """Test a model in both chains of a vote ends with side B's update."""
+        shared, other_a, other_b = NamedModel("gpt-4"), NamedModel("haiku"), NamedModel("mistral")
+        chain_a = ModelChain([shared, other_a])
+        chain_b = ModelChain([shared, other_b])
+        votes = [(chain_a, chain_b, VoteOutcome.A)] * 5
+        expected = sequential_ratings([chain_a, chain_b], votes)
+
+        engine = EloReplayEngine([chain_a, chain_b], min_vector_run=1)
+        model_ratings, _ = engine.replay(engine.encode(votes))
+
+        for model, model_id in engine.model_ids.items():
+            assert model_ratings[model_id] == pytest.approx(expected.model_elos[model], rel=1e-12)
+
+    def test_replay_continues_from_given_ratings(self):
+        """Test replaying two halves equals replaying the whole log."""
+        chains = make_chains(n_models=10, n_chains=20)
+        engine = EloReplayEngine(chains, min_vector_run=2)
+        log = engine.encode(make_votes(chains, 500))
+
+        whole = engine.replay(log)
+        first = engine.replay(log[:250])
+        second = engine.replay(log[250:], *first)
+
+        assert np.allclose(whole[0], second[0], rtol=1e-12)
+        assert np.allclose(whole[1], second[1], rtol=1e-12)
+
+    def test_empty_log(self):
+        """Test an empty log leaves ratings at their initial value."""
+        chains = make_chains(4, 3)
+        engine = EloReplayEngine(chains, initial_elo=1200.0)
+        model_ratings, chain_ratings = engine.replay(engine.encode([]))
+        assert set(model_ratings.tolist()) == {1200.0}
+        assert set(chain_ratings.tolist()) == {1200.0}
+
+
+class TestArenaRecordVotes:
+    def test_record_votes_matches_record_vote(self):
+        """Test ArenaBase.record_votes equals recording each vote in turn."""
+        chains = make_chains(n_models=12, n_chains=25)
+        votes = make_votes(chains, 300)
+        expected = sequential_ratings(chains, votes)
+
+        arena = ArenaBase(chains)
+        arena.record_votes(votes[:100])
+        arena.record_votes(votes[100:])
+
+        for model, elo in expected.model_elos.items():
+            assert arena.model_elos[model] == pytest.approx(elo, rel=1e-12)
+        for chain, elo in expected.chain_elos.items():
+            assert arena.chain_elos[chain] == pytest.approx(elo, rel=1e-12)
@@ -0,0 +1,161 @@
+import multiprocessing
+import random
+
+import pytest
+from arena.arena_base import ArenaBase
+from arena.shared import SharedRatings, WriterLease, _SEQUENCE, _SEQUENCE_OFFSET
+from arena.test_replay import make_chains
+from arena.types import VoteOutcome
+
+
+def make_arena(n_chains: int = 12) -> ArenaBase:
+    return ArenaBase(make_chains(8, n_chains, seed=1))
+
+
+def vote_randomly(arena: ArenaBase, count: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    arena.record_votes(
+        (*rng.sample(arena.model_chains, 2), rng.choice(list(VoteOutcome))) for _ in range(count)
+    )
+
+
+def _publish_uniform(path: str, rounds: int) -> None:
+    """Publish ratings that are all equal within each round (runs in a child process)."""
+    arena = make_arena()
+    shared = SharedRatings(
+        path, arena.model_elos.keys_by_id, arena.chain_elos.keys_by_id, writable=True
+    )
+    for round_number in range(rounds):
+        rating = 1000.0 + round_number
+        arena.model_elos.load([rating] * len(arena.model_elos))
+        arena.chain_elos.load([rating] * len(arena.chain_elos))
+        shared.publish(arena.snapshot())
+    shared.close()
+
+
+def _hold_lease(path: str) -> None:
+    """Take a writer lease and exit without releasing it (runs in a child process)."""
+    assert WriterLease(path).acquire()
+
+
+def open_reader(path: str, arena: ArenaBase) -> SharedRatings:
+    return SharedRatings(path, arena.model_elos.keys_by_id, arena.chain_elos.keys_by_id)
+
+
+class TestSharedRatings:
+    def test_round_trip(self, tmp_path):
+        """Test readers rebuild exactly the snapshot the writer published."""
+        arena = make_arena()
+        path = str(tmp_path / "ratings")
+        writer = SharedRatings.create(path, arena)
+        vote_randomly(arena, 200)
+        expected = arena.snapshot()
+        writer.publish(expected)
+
+        snapshot = open_reader(path, make_arena()).snapshot()
+        assert snapshot.version == expected.version
+        assert [(c.names, r) for c, r in snapshot.chain_leaderboard] == [
+            (c.names, r) for c, r in expected.chain_leaderboard
+        ]
+        assert [(m.name, r) for m, r in snapshot.model_leaderboard] == [
+            (m.name, r) for m, r in expected.model_leaderboard
+        ]
+        assert snapshot.matchups.variances == expected.matchups.variances
+        assert snapshot.matchups.recent == expected.matchups.recent
+
+    def test_snapshot_is_cached_until_publish(self, tmp_path):
+        """Test unchanged segments return the same snapshot object."""
+        arena = make_arena()
+        path = str(tmp_path / "ratings")
+        writer = SharedRatings.create(path, arena)
+        reader = open_reader(path, arena)
+        first = reader.snapshot()
+        assert reader.snapshot() is first
+
+        vote_randomly(arena, 10)
+        writer.publish(arena.snapshot())
+        assert reader.snapshot() is not first
+        assert reader.version == arena.leaderboard_version
+
+    def test_matchups_from_shared_snapshot(self, tmp_path):
+        """Test readers in other processes can draw valid matchups."""
+        arena = make_arena()
+        path = str(tmp_path / "ratings")
+        SharedRatings.create(path, arena)
+        reader_arena = make_arena()
+        snapshot = open_reader(path, reader_arena).snapshot()
+
+        rng = random.Random(0)
+        for _ in range(50):
+            chain_a, chain_b = snapshot.generate_matchup(rng)
+            assert chain_a != chain_b
+            assert chain_a in reader_arena.chain_elos
+
+    def test_rejects_other_arenas(self, tmp_path):
+        """Test a segment cannot be mapped with a different set of chains."""
+        path = str(tmp_path / "ratings")
+        SharedRatings.create(path, make_arena(12))
+        other = make_arena(10)
+        with pytest.raises(ValueError):
+            open_reader(path, other)
+
+    def test_recovers_from_interrupted_publish(self, tmp_path):
+        """Test a writer that died mid-publish blocks readers until the next publish."""
+        arena = make_arena()
+        path = str(tmp_path / "ratings")
+        writer = SharedRatings.create(path, arena)
+        reader = open_reader(path, arena)
+
+        sequence = _SEQUENCE.unpack_from(writer._map, _SEQUENCE_OFFSET)[0]
+        _SEQUENCE.pack_into(writer._map, _SEQUENCE_OFFSET, sequence + 1)
+        with pytest.raises(TimeoutError):
+            reader._read(timeout=0.05)
+
+        vote_randomly(arena, 5)
+        writer.publish(arena.snapshot())
+        assert reader.snapshot().version == arena.leaderboard_version
+
+    def test_readers_never_see_torn_writes(self, tmp_path):
+        """Test reads stay consistent while another process keeps publishing."""
+        arena = make_arena()
+        path = str(tmp_path / "ratings")
+        SharedRatings.create(path, arena).close()
+        reader = open_reader(path, arena)
+
+        context = multiprocessing.get_context("spawn")
+        writer = context.Process(target=_publish_uniform, args=(path, 3000))
+        writer.start()
+        seen = set()
+        while writer.is_alive() or not seen:
+            snapshot = reader.snapshot()
+            ratings = {rating for _, rating in snapshot.chain_leaderboard}
+            ratings |= {rating for _, rating in snapshot.model_leaderboard}
+            assert len(ratings) == 1
+            seen |= ratings
+        writer.join()
+        assert writer.exitcode == 0
+        assert reader.snapshot().chain_leaderboard[0][1] == 1000.0 + 2999
+
+
+class TestWriterLease:
+    def test_single_holder(self, tmp_path):
+        """Test only one lease holds the role until it is released."""
+        path = str(tmp_path / "writer.lock")
+        first, second = WriterLease(path), WriterLease(path)
+        assert first.acquire()
+        assert first.acquire()
+        assert not second.acquire()
+        first.release()
+        assert second.acquire()
+        assert second.held and not first.held
+        second.release()
+
+    def test_released_when_holder_exits(self, tmp_path):
+        """Test a crashed writer's role can be taken over."""
+        path = str(tmp_path / "writer.lock")
+        context = multiprocessing.get_context("spawn")
+        holder = context.Process(target=_hold_lease, args=(path,))
+        holder.start()
+        holder.join()
+        assert holder.exitcode == 0
+        assert WriterLease(path).acquire()
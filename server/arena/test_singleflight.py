@@ -0,0 +1,204 @@
+import asyncio
+from types import SimpleNamespace
+
+from arena.cache import StageCache
+from arena.singleflight import CoalescedModel, SingleFlight
+
+
+class SlowModel:
+    """Test model whose async call takes a while and counts invocations."""
+
+    def __init__(self, name: str, function, delay: float = 0.05):
+        self.name = name
+        self.function = function
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, input_data):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.function(input_data)
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
+    def __eq__(self, other) -> bool:
+        return getattr(other, "name", None) == self.name
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        """Test identical concurrent calls run the function once."""
+        group = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def run():
+            return await asyncio.gather(*(group.do("k", work) for _ in range(10)))
+
+        assert asyncio.run(run()) == ["result"] * 10
+        assert len(calls) == 1
+        assert group.calls == 1
+        assert group.coalesced == 9
+        assert len(group) == 0
+
+    def test_errors_are_shared(self):
+        """Test every waiter receives the shared call's exception."""
+        group = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("provider down")
+
+        async def run():
+            return await asyncio.gather(
+                *(group.do("k", work) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, ValueError) for r in results)
+
+    def test_cancelling_one_waiter_keeps_shared_call(self):
+        """Test a cancelled caller does not cancel the call for others."""
+        group = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def run():
+            first = asyncio.ensure_future(group.do("k", work))
+            second = asyncio.ensure_future(group.do("k", work))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await asyncio.gather(first, second, return_exceptions=True)
+
+        first, second = asyncio.run(run())
+        assert isinstance(first, asyncio.CancelledError)
+        assert second == "result"
+
+    def test_shared_call_cancelled_when_all_waiters_leave(self):
+        """Test the shared call is cancelled once nobody waits for it."""
+        group = SingleFlight()
+        finished = []
+
+        async def work():
+            await asyncio.sleep(0.05)
+            finished.append(1)
+
+        async def run():
+            waiter = asyncio.ensure_future(group.do("k", work))
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.sleep(0.08)
+
+        asyncio.run(run())
+        assert finished == []
+        assert len(group) == 0
+
+    def test_caller_after_abandonment_starts_new_call(self):
+        """Test a caller arriving while an abandoned call winds down is not handed its cancellation."""
+        group = SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "fresh"
+
+        async def run():
+            first = asyncio.ensure_future(group.do("k", slow))
+            await asyncio.sleep(0)
+            first.cancel()
+            await asyncio.sleep(0)  # the last waiter leaves and cancels the shared call
+            return await group.do("k", slow)
+
+        assert asyncio.run(run()) == "fresh"
+        assert group.calls == 2 and group.coalesced == 0
+
+    def test_new_call_after_completion(self):
+        """Test a finished flight is not reused for later calls."""
+        group = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            return len(calls)
+
+        async def run():
+            return await group.do("k", work), await group.do("k", work)
+
+        assert asyncio.run(run()) == (1, 2)
+
+
+class TestCoalescedModel:
+    def test_coalesces_identical_inputs_only(self):
+        """Test only calls with the same input are merged."""
+        model = SlowModel("upper", str.upper)
+        coalesced = CoalescedModel(model)
+
+        async def run():
+            return await asyncio.gather(
+                coalesced.acall("a"), coalesced.acall("a"), coalesced.acall("b")
+            )
+
+        assert asyncio.run(run()) == ["A", "A", "B"]
+        assert model.calls == 2
+
+    def test_fills_and_uses_cache(self):
+        """Test the leading call fills the cache for later callers."""
+        model = SlowModel("upper", str.upper)
+        coalesced = CoalescedModel(model, cache=StageCache())
+
+        async def run():
+            await asyncio.gather(coalesced.acall("a"), coalesced.acall("a"))
+            return await coalesced.acall("a")
+
+        assert asyncio.run(run()) == "A"
+        assert model.calls == 1
+
+    def test_sync_calls_use_cache(self):
+        """Test the synchronous path is served from and fills the cache."""
+        calls = []
+
+        class Upper:
+            name = "upper"
+
+            def __call__(self, text):
+                calls.append(text)
+                return text.upper()
+
+        coalesced = CoalescedModel(Upper(), cache=StageCache())
+        assert coalesced("hi") == "HI" and coalesced("hi") == "HI"
+        assert asyncio.run(coalesced.acall("hi")) == "HI"
+        assert calls == ["hi"]
+
+    def test_streams_pass_through(self):
+        """Test streamed input reaches the model's own stream, chunk by chunk."""
+        class Words:
+            name = "words"
+
+            def __call__(self, text):
+                return text
+
+            async def astream(self, chunks):
+                async for chunk in chunks:
+                    yield chunk.upper()
+
+        async def chunks():
+            yield "a "
+            yield "b"
+
+        async def run():
+            return [chunk async for chunk in CoalescedModel(Words()).astream(chunks())]
+
+        assert asyncio.run(run()) == ["A ", "B"]
+
+    def test_keeps_model_identity(self):
+        """Test the wrapper equals its model but not other objects of the same name."""
+        model = SlowModel("upper", str.upper)
+        coalesced = CoalescedModel(model)
+        assert hash(coalesced) == hash(model) and coalesced == model
+        assert coalesced != SimpleNamespace(name="upper")
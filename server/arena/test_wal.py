@@ -0,0 +1,207 @@
+import asyncio
+import os
+import random
+import uuid
+
+import pytest
+from arena.arena_base import ArenaBase
+from arena.test_replay import make_chains
+from arena.types import VoteOutcome
+from arena.wal import HEADER_SIZE, RECORD_SIZE, VoteWAL, WALRecord, log_position, replay_records
+
+
+def random_records(count: int, sessions: list, n_chains: int = 12, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        chain_a, chain_b = rng.sample(range(n_chains), 2)
+        records.append(WALRecord(
+            session=rng.choice(sessions),
+            matchup=uuid.UUID(int=rng.getrandbits(128)),
+            chain_a=chain_a,
+            chain_b=chain_b,
+            outcome=rng.choice(list(VoteOutcome)),
+            timestamp=1000.0 + i,
+        ))
+    return records
+
+
+async def append_all(wal: VoteWAL, records: list) -> None:
+    await asyncio.gather(*(wal.append(record) for record in records))
+
+
+class TestWALRecord:
+    def test_round_trip(self):
+        """Test records decode to what was encoded and are fixed-size."""
+        record = random_records(1, [uuid.uuid4()])[0]
+        data = record.encode()
+        assert len(data) == RECORD_SIZE
+        assert WALRecord.decode(data) == record
+
+    def test_detects_corruption(self):
+        """Test a flipped byte fails the checksum."""
+        data = bytearray(random_records(1, [uuid.uuid4()])[0].encode())
+        data[30] ^= 0xFF
+        assert WALRecord.decode(bytes(data)) is None
+
+
+class TestVoteWAL:
+    def test_append_and_read(self, tmp_path):
+        """Test appended votes are read back in order, also per session."""
+        sessions = [uuid.uuid4(), uuid.uuid4()]
+        records = random_records(300, sessions)
+        wal = VoteWAL(str(tmp_path / "votes"))
+        for record in records:
+            asyncio.run(wal.append(record))
+
+        read, offset = wal.read()
+        assert read == records
+        assert offset == log_position(1, HEADER_SIZE + 300 * RECORD_SIZE) == wal.end
+        mine, _ = wal.read(session=sessions[0])
+        assert mine == [r for r in records if r.session == sessions[0]]
+        tail, _ = wal.read(start=log_position(1, HEADER_SIZE + 290 * RECORD_SIZE))
+        assert tail == records[290:]
+        wal.close()
+
+    def test_group_commit(self, tmp_path):
+        """Test concurrent appends share fsyncs."""
+        records = random_records(500, [uuid.uuid4()])
+        wal = VoteWAL(str(tmp_path / "votes"))
+        asyncio.run(append_all(wal, records))
+
+        assert wal.records == 500
+        assert wal.commits < 10
+        assert wal.read()[0] == records
+        wal.close()
+
+    def test_failed_commit_reports_error(self, tmp_path):
+        """Test appenders see the error of the commit that held their vote."""
+        wal = VoteWAL(str(tmp_path / "votes"))
+
+        def failing(data):
+            raise OSError("disk full")
+
+        wal._write = failing
+        with pytest.raises(OSError):
+            asyncio.run(wal.append(random_records(1, [uuid.uuid4()])[0]))
+        assert wal.records == 0
+        wal.close()
+
+    def test_reopen_keeps_votes(self, tmp_path):
+        """Test a reopened log holds every committed vote."""
+        path = str(tmp_path / "votes")
+        records = random_records(50, [uuid.uuid4()])
+        wal = VoteWAL(path)
+        asyncio.run(append_all(wal, records))
+        wal.close()
+
+        reopened = VoteWAL(path)
+        assert reopened.recovered_bytes == 0
+        assert reopened.read()[0] == records
+        reopened.close()
+
+    @pytest.mark.parametrize("damage", ["partial", "corrupt"])
+    def test_truncates_torn_tail(self, tmp_path, damage):
+        """Test recovery drops a partial or corrupt last record and later appends read back."""
+        path = str(tmp_path / "votes")
+        records = random_records(20, [uuid.uuid4()])
+        wal = VoteWAL(path)
+        asyncio.run(append_all(wal, records))
+        wal.close()
+
+        with open(wal.segment_path(1), "r+b") as file:
+            if damage == "partial":
+                file.seek(0, os.SEEK_END)
+                file.write(records[0].encode()[:RECORD_SIZE // 2])
+            else:
+                file.seek(HEADER_SIZE + 19 * RECORD_SIZE + 10)
+                file.write(b"\xff\xff")
+        size = os.path.getsize(wal.segment_path(1))
+
+        wal = VoteWAL(path)
+        valid = records if damage == "partial" else records[:19]
+        assert wal.recovered_bytes == size - HEADER_SIZE - len(valid) * RECORD_SIZE
+        assert os.path.getsize(wal.segment_path(1)) == HEADER_SIZE + len(valid) * RECORD_SIZE
+        extra = random_records(5, [uuid.uuid4()], seed=1)
+        asyncio.run(append_all(wal, extra))
+        assert wal.read()[0] == valid + extra
+        wal.close()
+
+    def test_no_recovery_while_open_elsewhere(self, tmp_path):
+        """Test a second handle leaves the log alone while another has it open."""
+        path = str(tmp_path / "votes")
+        first = VoteWAL(path)
+        asyncio.run(append_all(first, random_records(3, [uuid.uuid4()])))
+        with open(first.segment_path(1), "ab") as file:
+            file.write(b"in flight")
+
+        second = VoteWAL(path)
+        assert second.recovered_bytes == 0
+        assert os.path.getsize(first.segment_path(1)) == HEADER_SIZE + 3 * RECORD_SIZE + len(b"in flight")
+        assert len(second.read()[0]) == 3
+        second.close()
+        first.close()
+
+    def test_rejects_other_files(self, tmp_path):
+        """Test a segment that is not a vote log is refused, not truncated."""
+        (tmp_path / "votes").mkdir()
+        path = tmp_path / "votes" / "00000001.wal"
+        path.write_bytes(b"definitely not a vote log")
+        with pytest.raises(ValueError):
+            VoteWAL(str(tmp_path / "votes"))
+        assert path.read_bytes() == b"definitely not a vote log"
+
+    def test_segments(self, tmp_path):
+        """Test full segments are sealed and reads continue across them."""
+        segment_size = HEADER_SIZE + 10 * RECORD_SIZE
+        wal = VoteWAL(str(tmp_path / "votes"), segment_size=segment_size)
+        records = random_records(35, [uuid.uuid4()])
+        for record in records:
+            asyncio.run(wal.append(record))
+
+        assert wal.segments() == [1, 2, 3, 4]
+        assert [wal.is_sealed(segment) for segment in wal.segments()] == [True, True, True, False]
+        read, end = wal.read()
+        assert read == records
+        assert end == wal.end == log_position(4, HEADER_SIZE + 5 * RECORD_SIZE)
+        middle, _ = wal.read(log_position(2, HEADER_SIZE + 5 * RECORD_SIZE), log_position(3, HEADER_SIZE + 2 * RECORD_SIZE))
+        assert middle == records[15:22]
+        wal.close()
+
+    def test_archive(self, tmp_path):
+        """Test archived segments leave the log and reads skip them."""
+        wal = VoteWAL(str(tmp_path / "votes"), segment_size=HEADER_SIZE + 10 * RECORD_SIZE)
+        sessions = [uuid.uuid4(), uuid.uuid4()]
+        records = random_records(25, sessions)
+        for record in records:
+            asyncio.run(wal.append(record))
+        assert wal.sessions_in(1) == {r.session for r in records[:10]}
+
+        with pytest.raises(ValueError):
+            wal.archive(3, str(tmp_path / "archive"))
+        wal.archive(1, str(tmp_path / "archive"))
+        assert wal.segments() == [2, 3]
+        assert (tmp_path / "archive" / "00000001.wal").exists()
+        assert wal.read()[0] == records[10:]
+        assert wal.read(log_position(1, HEADER_SIZE))[0] == records[10:]
+        wal.close()
+
+
+class TestReplayRecords:
+    def test_rebuilds_ratings(self, tmp_path):
+        """Test replaying the log reproduces the ratings of the live arena."""
+        session = uuid.uuid4()
+        live = ArenaBase(make_chains(8, 12, seed=1))
+        records = random_records(200, [session, uuid.uuid4()])
+        wal = VoteWAL(str(tmp_path / "votes"))
+        asyncio.run(append_all(wal, records))
+        chains = live.chain_elos.keys_by_id
+        live.record_votes(
+            (chains[r.chain_a], chains[r.chain_b], r.outcome) for r in records if r.session == session
+        )
+
+        rebuilt = ArenaBase(make_chains(8, 12, seed=1))
+        replay_records(rebuilt, wal.read(session=session)[0])
+        assert rebuilt.get_chain_leaderboard() == live.get_chain_leaderboard()
+        assert rebuilt.get_leaderboard() == live.get_leaderboard()
+        wal.close()
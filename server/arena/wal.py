@@ -0,0 +1,482 @@
+import asyncio
+import fcntl
+import os
+import struct
+import threading
+import uuid
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from arena.replay import OUTCOME_CODES
+from arena.types import VoteOutcome
+
+if TYPE_CHECKING:
+    from arena.arena_base import ArenaBase
+
+# magic, layout, reserved
+_FILE_HEADER = struct.Struct("<4sI8x")
+_MAGIC = b"CAVW"
+_LAYOUT = 1
+HEADER_SIZE = _FILE_HEADER.size
+
+# crc32 of the rest, session, matchup, chain_a, chain_b, outcome, timestamp
+_RECORD = struct.Struct("<I16s16sIIB3xd")
+RECORD_SIZE = _RECORD.size
+_CRC = struct.Struct("<I")
+
+_OUTCOMES = {code: outcome for outcome, code in OUTCOME_CODES.items()}
+
+# Records read per chunk when scanning the log
+_CHUNK_RECORDS = 4096
+
+# Log positions are (segment number << 32) | byte offset in the segment
+_SEGMENT_SHIFT = 32
+_OFFSET_MASK = (1 << _SEGMENT_SHIFT) - 1
+
+
+@dataclass(frozen=True)
+class WALRecord:
+    """
+    One vote as stored in the write-ahead log.
+
+    Attributes:
+        session: Session the vote belongs to
+        matchup: Matchup that was voted on
+        chain_a: Chain id of side A (as in `ArenaBase.chain_elos`)
+        chain_b: Chain id of side B
+        outcome: The vote
+        timestamp: When the vote was accepted (epoch seconds)
+    """
+    session: uuid.UUID
+    matchup: uuid.UUID
+    chain_a: int
+    chain_b: int
+    outcome: VoteOutcome
+    timestamp: float
+
+    def encode(self) -> bytes:
+        body = _RECORD.pack(
+            0, self.session.bytes, self.matchup.bytes,
+            self.chain_a, self.chain_b, OUTCOME_CODES[self.outcome], self.timestamp,
+        )
+        return _CRC.pack(zlib.crc32(body[4:])) + body[4:]
+
+    @classmethod
+    def decode(cls, buffer, offset: int = 0) -> Optional["WALRecord"]:
+        """
+        Decode the record at `offset`.
+
+        Returns:
+            The record, or None if it is corrupt
+        """
+        if _CRC.unpack_from(buffer, offset)[0] != zlib.crc32(buffer[offset + 4 : offset + RECORD_SIZE]):
+            return None
+        return cls._unpack(buffer, offset)
+
+    @classmethod
+    def _unpack(cls, buffer, offset: int) -> Optional["WALRecord"]:
+        _, session, matchup, chain_a, chain_b, outcome, timestamp = _RECORD.unpack_from(buffer, offset)
+        if outcome not in _OUTCOMES:
+            return None
+        return cls(uuid.UUID(bytes=session), uuid.UUID(bytes=matchup), chain_a, chain_b, _OUTCOMES[outcome], timestamp)
+
+
+def log_position(segment: int, offset: int) -> int:
+    """Log position of a byte offset within a segment (positions order like the log)."""
+    return segment << _SEGMENT_SHIFT | offset
+
+
+def split_log_position(value: int) -> tuple[int, int]:
+    """(segment, offset) of a log position."""
+    return value >> _SEGMENT_SHIFT, value & _OFFSET_MASK
+
+
+class VoteWAL:
+    """
+    Append-only binary vote log with group commit, shared between processes.
+
+    `append` returns once the vote is on disk. Votes appended while a
+    commit is in progress are written and fsynced together by the next
+    one, so under load each fsync covers many votes and throughput is
+    bounded by disk bandwidth rather than fsync latency.
+
+    The log is a directory of numbered segment files, each a 16-byte header
+    followed by fixed-size 56-byte records with a CRC32. Every commit is a
+    single `O_APPEND` write to the newest segment, so several processes can
+    append to the same log. A commit that finds the segment full creates the
+    next one; a segment is sealed once a newer one exists and no commit to it
+    is in flight (commits hold a shared `flock` on their segment). Places in
+    the log are integer positions (see `position`), so readers can resume,
+    and old segments can be archived once checkpoints cover them.
+
+    Recovery: the first process to open the log (none other has it open)
+    truncates the newest segments from the first torn or corrupt record on,
+    i.e. whatever a crash left behind after the last commit. Processes hold
+    a shared lock on the directory while the log is open, so recovery never
+    runs under a live writer.
+
+    Attributes:
+        directory: Directory holding the segments
+        segment_size: Bytes after which a commit starts a new segment
+        recovered_bytes: Bytes truncated by recovery when this handle opened it
+        commits: Write+fsync rounds done by this handle
+        records: Records committed by this handle
+        skipped: Corrupt records skipped in sealed segments by this handle
+    """
+
+    def __init__(self, directory: str, segment_size: int = 16 * 2**20):
+        """
+        Open (and create or recover) a log.
+
+        Args:
+            directory: Directory holding the segments (created if missing)
+            segment_size: Bytes after which a new segment is started (default: 16 MiB)
+
+        Raises:
+            ValueError: If a segment is not a vote log
+        """
+        if not HEADER_SIZE + RECORD_SIZE <= segment_size <= _OFFSET_MASK:
+            raise ValueError(f"segment_size must be between {HEADER_SIZE + RECORD_SIZE} and {_OFFSET_MASK}")
+        self.directory = directory
+        self.segment_size = segment_size
+        self.recovered_bytes = 0
+        self.commits = 0
+        self.records = 0
+        self.skipped = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock_fd = os.open(os.path.join(directory, "wal.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            try:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another process has the log open (and recovered it)
+                fcntl.flock(self._lock_fd, fcntl.LOCK_SH)
+            else:
+                self.recovered_bytes = self._recover()
+                fcntl.flock(self._lock_fd, fcntl.LOCK_SH)
+            self._segment = self.segments()[-1]
+            self._fd = self._open_segment(self._segment, os.O_RDWR | os.O_APPEND)
+        except BaseException:
+            os.close(self._lock_fd)
+            raise
+        self._write_lock = threading.Lock()
+        self._pending: list[bytes] = []
+        self._waiters: list[asyncio.Future] = []
+        self._committer: Optional[asyncio.Task] = None
+
+    # === Segments ===
+
+    def segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{segment:08d}.wal")
+
+    def segments(self) -> list[int]:
+        """Numbers of the segments in the directory, oldest first."""
+        return sorted(
+            int(name[:-4]) for name in os.listdir(self.directory)
+            if name.endswith(".wal") and name[:-4].isdigit()
+        )
+
+    def _open_segment(self, segment: int, flags: int) -> int:
+        fd = os.open(self.segment_path(segment), flags)
+        try:
+            magic, layout = _FILE_HEADER.unpack(os.pread(fd, HEADER_SIZE, 0).ljust(HEADER_SIZE, b"\0"))
+        except BaseException:
+            os.close(fd)
+            raise
+        if magic != _MAGIC or layout != _LAYOUT:
+            os.close(fd)
+            raise ValueError(f"{self.segment_path(segment)} is not a vote log segment")
+        return fd
+
+    def _create_segment(self, segment: int) -> None:
+        """Create a segment with its header, unless another process already did."""
+        temporary = f"{self.segment_path(segment)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(_FILE_HEADER.pack(_MAGIC, _LAYOUT))
+            file.flush()
+            os.fsync(file.fileno())
+        try:
+            # Appears complete or not at all, and never replaces a segment
+            os.link(temporary, self.segment_path(segment))
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(temporary)
+        self._sync_directory()
+
+    def _sync_directory(self) -> None:
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _recover(self) -> int:
+        """Create the first segment or truncate torn tails (exclusive lock held)."""
+        segments = self.segments()
+        if not segments:
+            self._create_segment(1)
+            return 0
+        truncated = 0
+        # A crash can only leave torn commits in the segment being filled and,
+        # right after a switch, the one before it
+        for segment in segments[-2:]:
+            fd = self._open_segment(segment, os.O_RDWR)
+            try:
+                size = os.fstat(fd).st_size
+                valid_end = self._scan(fd, HEADER_SIZE, size, b"", None, sealed=False)
+                if valid_end < size:
+                    os.ftruncate(fd, valid_end)
+                    os.fsync(fd)
+                    truncated += size - valid_end
+            finally:
+                os.close(fd)
+        return truncated
+
+    def is_sealed(self, segment: int) -> bool:
+        """Whether a segment can no longer receive records."""
+        if not os.path.exists(self.segment_path(segment + 1)):
+            return False
+        try:
+            fd = os.open(self.segment_path(segment), os.O_RDONLY)
+        except FileNotFoundError:
+            return True
+        try:
+            # Fails while a commit that started before the switch is in flight
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+        finally:
+            os.close(fd)
+
+    def archive(self, segment: int, directory: str) -> str:
+        """
+        Move a sealed segment out of the log.
+
+        Args:
+            segment: Segment number
+            directory: Archive directory (created if missing)
+
+        Returns:
+            New path of the segment
+
+        Raises:
+            ValueError: If the segment is not sealed
+        """
+        if not self.is_sealed(segment):
+            raise ValueError(f"Segment {segment} is still being written")
+        os.makedirs(directory, exist_ok=True)
+        target = os.path.join(directory, os.path.basename(self.segment_path(segment)))
+        os.replace(self.segment_path(segment), target)
+        self._sync_directory()
+        return target
+
+    def sessions_in(self, segment: int) -> set[uuid.UUID]:
+        """Sessions with at least one vote in a segment."""
+        sessions: set[bytes] = set()
+        fd = self._open_segment(segment, os.O_RDONLY)
+        try:
+            self._scan(fd, HEADER_SIZE, None, b"", None, sealed=True, sessions=sessions)
+        finally:
+            os.close(fd)
+        return {uuid.UUID(bytes=session) for session in sessions}
+
+    @property
+    def start(self) -> int:
+        """Position of the oldest record in the log."""
+        return log_position(self.segments()[0], HEADER_SIZE)
+
+    @property
+    def end(self) -> int:
+        """Position of the end of the newest segment (may include a commit in progress)."""
+        segment = self.segments()[-1]
+        return log_position(segment, os.path.getsize(self.segment_path(segment)))
+
+    @property
+    def pending(self) -> int:
+        """Records appended through this handle and waiting for the next commit."""
+        return len(self._pending)
+
+    def close(self) -> None:
+        if self._lock_fd >= 0:
+            os.close(self._fd)
+            os.close(self._lock_fd)
+            self._fd = self._lock_fd = -1
+
+    # === Writing ===
+
+    async def append(self, record: WALRecord) -> None:
+        """
+        Append a vote and wait until it is durable.
+
+        Raises:
+            OSError: If the commit that included the vote failed
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(record.encode())
+        self._waiters.append(future)
+        if self._committer is None or self._committer.done():
+            self._committer = asyncio.create_task(self._commit_pending())
+        await future
+
+    async def _commit_pending(self) -> None:
+        """Commit queued records until none are left, one write+fsync per round."""
+        while self._pending:
+            data, waiters = b"".join(self._pending), self._waiters
+            self._pending, self._waiters = [], []
+            try:
+                await asyncio.to_thread(self._write, data)
+            except Exception as error:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(error)
+                continue
+            self.commits += 1
+            self.records += len(waiters)
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+
+    def _write(self, data: bytes) -> None:
+        with self._write_lock:
+            while True:
+                fcntl.flock(self._fd, fcntl.LOCK_SH)
+                following = self._segment + 1
+                full = os.fstat(self._fd).st_size >= self.segment_size
+                if not full and not os.path.exists(self.segment_path(following)):
+                    break
+                # Switch to the next segment (starting it if needed) and retry
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+                if full:
+                    self._create_segment(following)
+                fd = self._open_segment(following, os.O_RDWR | os.O_APPEND)
+                os.close(self._fd)
+                self._segment, self._fd = following, fd
+            try:
+                written = os.write(self._fd, data)
+                if written != len(data):
+                    raise OSError(f"Short write to {self.segment_path(self._segment)} ({written} of {len(data)} bytes)")
+                os.fdatasync(self._fd)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    # === Reading ===
+
+    def read(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        session: Optional[uuid.UUID] = None,
+    ) -> tuple[list[WALRecord], int]:
+        """
+        Read committed records in log order.
+
+        Stops at the first incomplete or corrupt record of the newest
+        segment, which is either a commit still being written by another
+        process or a torn tail; corrupt records in sealed segments are
+        skipped. Archived segments are skipped.
+
+        Args:
+            start: Position of the first record (a previous call's return;
+                default: the start of the log)
+            end: Position to stop at, already read once (default: the end)
+            session: Only return this session's records
+
+        Returns:
+            Tuple of (records, position after the last valid record)
+        """
+        records: list[WALRecord] = []
+        wanted = session.bytes if session is not None else None
+        segment, offset = split_log_position(self.start if start is None else start)
+        end_segment, end_offset = split_log_position(end) if end is not None else (None, None)
+        while end_segment is None or segment <= end_segment:
+            try:
+                fd = self._open_segment(segment, os.O_RDONLY)
+            except FileNotFoundError:
+                following = [number for number in self.segments() if number > segment]
+                if not following:
+                    break
+                segment, offset = following[0], HEADER_SIZE
+                continue
+            try:
+                if segment == end_segment:
+                    offset = self._scan(fd, offset, end_offset, wanted, records.append, sealed=True)
+                    break
+                # Up to `end` the records were seen complete before
+                sealed = end_segment is not None or self.is_sealed(segment)
+                offset = self._scan(fd, offset, None, wanted, records.append, sealed=sealed)
+            finally:
+                os.close(fd)
+            if not sealed:
+                break
+            segment, offset = segment + 1, HEADER_SIZE
+        return records, log_position(segment, offset)
+
+    def valid_end(self) -> int:
+        """Position after the last valid record of the newest segment, without decoding any."""
+        segment = self.segments()[-1]
+        fd = self._open_segment(segment, os.O_RDONLY)
+        try:
+            return log_position(segment, self._scan(fd, HEADER_SIZE, None, b"", None, sealed=False))
+        finally:
+            os.close(fd)
+
+    def _scan(
+        self,
+        fd: int,
+        start: int,
+        end: Optional[int],
+        wanted: Optional[bytes],
+        collect,
+        sealed: bool,
+        sessions: Optional[set] = None,
+    ) -> int:
+        """
+        Verify records of one segment from offset `start`.
+
+        Passes the records of session `wanted` (all if None) to `collect`
+        and adds every record's session to `sessions`. Stops at a corrupt
+        record unless the segment is `sealed`, where it is skipped.
+
+        Returns:
+            Offset after the last record read
+        """
+        if end is None:
+            end = os.fstat(fd).st_size
+        offset = start
+        while offset + RECORD_SIZE <= end:
+            length = min(end - offset, _CHUNK_RECORDS * RECORD_SIZE)
+            chunk = os.pread(fd, length - length % RECORD_SIZE, offset)
+            for at in range(0, len(chunk) - RECORD_SIZE + 1, RECORD_SIZE):
+                body = chunk[at + 4 : at + RECORD_SIZE]
+                record = None
+                valid = zlib.crc32(body) == _CRC.unpack_from(chunk, at)[0]
+                if valid and (wanted is None or body[:16] == wanted):
+                    record = WALRecord._unpack(chunk, at)
+                    valid = record is not None
+                if not valid:
+                    if not sealed:
+                        return offset
+                    self.skipped += 1
+                elif record is not None:
+                    collect(record)
+                elif sessions is not None:
+                    sessions.add(body[:16])
+                offset += RECORD_SIZE
+            if len(chunk) < RECORD_SIZE:
+                break
+        return offset
+
+
+def replay_records(arena: "ArenaBase", records: Iterable[WALRecord]) -> None:
+    """
+    Apply logged votes to an arena in log order, e.g. to rebuild its ratings.
+
+    Args:
+        arena: Arena over the chains the votes were recorded for
+        records: Votes from `VoteWAL.read`
+    """
+    chains = arena.chain_elos.keys_by_id
+    arena.record_votes((chains[r.chain_a], chains[r.chain_b], r.outcome) for r in records)
@@ -0,0 +1,339 @@
+"""
+Content-addressed storage for binary chain outputs (audio, images, video).
+
+Outputs are stored once per distinct content, under their SHA-256 digest,
+in a directory shared by every worker. API responses carry a reference
+(digest, size, content type) instead of the bytes, and `BlobResponse` serves
+a blob straight from a memory map of its file, with HTTP range support, so
+media never passes through Python heap memory or JSON encoding.
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import mmap
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
+from typing import AsyncIterable, Iterator, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+_DIGEST = re.compile(r"[0-9a-f]{64}")
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class BlobTooLarge(ValueError):
+    """Raised when a streamed blob exceeds its size limit."""
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    """
+    A blob in the store.
+
+    Attributes:
+        digest: SHA-256 of the content (hex)
+        size: Size in bytes
+        content_type: MIME type given when it was first stored
+    """
+    digest: str
+    size: int
+    content_type: str
+
+
+class BlobStore:
+    """
+    Content-addressed blobs on local disk.
+
+    Each blob lives at `root/<2 hex digits>/<digest>` with its content type
+    in a `.type` file next to it. Blobs are written to a temporary file and
+    renamed into place, so readers (in any process) never see a partial
+    blob, and storing content that already exists only refreshes its
+    modification time, which `prune` uses to drop blobs nobody stored again.
+    Commits and prunes of a shard exclude each other through a `flock` on
+    its `.lock` file, so a blob is never pruned while it is being stored.
+
+    Attributes:
+        root: Directory holding the blobs
+    """
+
+    # Bytes of a stream buffered before they are hashed and written in a thread
+    spool_size = 1024 * 1024
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory holding the blobs (created if missing)
+        """
+        self.root = root
+        self._incoming = os.path.join(root, "incoming")
+        os.makedirs(self._incoming, exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        """
+        File holding a blob.
+
+        Raises:
+            ValueError: If `digest` is not a SHA-256 hex digest
+        """
+        if not _DIGEST.fullmatch(digest):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data: bytes, content_type: str = "application/octet-stream") -> StoredBlob:
+        """Store bytes (blocking; run in a thread for large blobs)."""
+        temporary = self._temporary()
+        with open(temporary, "wb") as file:
+            file.write(data)
+        return self._commit(temporary, hashlib.sha256(data).hexdigest(), len(data), content_type)
+
+    async def put_stream(
+        self,
+        chunks: AsyncIterable[bytes],
+        content_type: str = "application/octet-stream",
+        max_size: Optional[int] = None,
+    ) -> StoredBlob:
+        """
+        Store a stream of chunks, hashing and spooling them to disk as they arrive.
+
+        Args:
+            chunks: Byte chunks, e.g. a request body or a chain's streamed output
+            content_type: MIME type of the content
+            max_size: Largest accepted size in bytes (default: unlimited)
+
+        Raises:
+            BlobTooLarge: If the stream exceeds `max_size` (nothing is stored)
+        """
+        temporary = self._temporary()
+        file = await asyncio.to_thread(open, temporary, "wb")
+        digest = hashlib.sha256()
+        size = 0
+
+        def spool(parts: list[bytes]) -> None:
+            for part in parts:
+                digest.update(part)
+                file.write(part)
+
+        def discard() -> None:
+            file.close()
+            with suppress(FileNotFoundError):
+                os.unlink(temporary)
+
+        def commit() -> StoredBlob:
+            file.close()
+            return self._commit(temporary, digest.hexdigest(), size, content_type)
+
+        try:
+            parts, buffered = [], 0
+            async for chunk in chunks:
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise BlobTooLarge(f"Blob exceeds {max_size} bytes")
+                parts.append(chunk)
+                buffered += len(chunk)
+                if buffered >= self.spool_size:
+                    await asyncio.to_thread(spool, parts)
+                    parts, buffered = [], 0
+            await asyncio.to_thread(spool, parts)
+        except BaseException:
+            await asyncio.to_thread(discard)
+            raise
+        return await asyncio.to_thread(commit)
+
+    def _temporary(self) -> str:
+        return os.path.join(self._incoming, f"{os.getpid()}-{uuid.uuid4().hex}")
+
+    @contextmanager
+    def _shard_lock(self, shard: str, operation: int) -> Iterator[None]:
+        """Hold the `flock` of a shard directory: shared to commit, exclusive to prune."""
+        fd = os.open(os.path.join(shard, ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, operation)
+            yield
+        finally:
+            os.close(fd)
+
+    def _commit(self, temporary: str, digest: str, size: int, content_type: str) -> StoredBlob:
+        """Move a fully written temporary file into place under its digest (blocking)."""
+        path = self.path(digest)
+        shard = os.path.dirname(path)
+        os.makedirs(shard, exist_ok=True)
+        with self._shard_lock(shard, fcntl.LOCK_SH):
+            if os.path.exists(path):
+                os.unlink(temporary)
+                os.utime(path)
+                return self.get(digest)
+            with open(temporary, "rb+") as file:
+                os.fsync(file.fileno())
+            # The type is written first: a blob file always has one
+            type_temporary = f"{temporary}.type"
+            with open(type_temporary, "w") as file:
+                file.write(content_type)
+            os.replace(type_temporary, f"{path}.type")
+            os.replace(temporary, path)
+        return StoredBlob(digest, size, content_type)
+
+    def get(self, digest: str) -> Optional[StoredBlob]:
+        """The stored blob with this digest, or None."""
+        try:
+            path = self.path(digest)
+            size = os.path.getsize(path)
+            with open(f"{path}.type") as file:
+                content_type = file.read()
+        except (ValueError, FileNotFoundError):
+            return None
+        return StoredBlob(digest, size, content_type)
+
+    def prune(self, max_age: float, now: Optional[float] = None) -> int:
+        """
+        Delete blobs not stored for `max_age` seconds (blocking).
+
+        Returns:
+            Number of blobs deleted
+        """
+        cutoff = (time.time() if now is None else now) - max_age
+        deleted = 0
+        for shard in os.scandir(self.root):
+            if not shard.is_dir() or shard.path == self._incoming:
+                continue
+            # Other workers may be storing or pruning in the shard at the same time
+            with self._shard_lock(shard.path, fcntl.LOCK_EX):
+                names = set(os.listdir(shard.path))
+                for name in names:
+                    if not _DIGEST.fullmatch(name):
+                        continue
+                    path = os.path.join(shard.path, name)
+                    try:
+                        if os.stat(path).st_mtime >= cutoff:
+                            continue
+                        # The blob goes first: a blob file always has a type
+                        os.unlink(path)
+                    except FileNotFoundError:
+                        continue
+                    with suppress(FileNotFoundError):
+                        os.unlink(f"{path}.type")
+                    deleted += 1
+                # Types whose blob is gone, left by a pruner that died between the unlinks
+                for name in names:
+                    if name.endswith(".type") and name[: -len(".type")] not in names:
+                        with suppress(FileNotFoundError):
+                            os.unlink(os.path.join(shard.path, name))
+        # Leftovers of writers that died mid-upload
+        for entry in os.scandir(self._incoming):
+            with suppress(FileNotFoundError):
+                if entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+        return deleted
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Whether an `If-None-Match` header matches an entity tag.
+
+    The header is `*` (any current representation) or a comma-separated
+    list of tags, compared weakly: `W/"x"` matches `"x"`.
+    """
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Resolve a single-range `Range` header to [start, end) byte offsets.
+
+    Returns:
+        The range, or None to serve the whole content (no header, or a
+        multi-range or unit we do not serve partially)
+
+    Raises:
+        ValueError: If the range cannot be satisfied (HTTP 416)
+    """
+    if header is None:
+        return None
+    match = _RANGE.fullmatch(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size
+    start = int(first)
+    end = size if not last else min(int(last) + 1, size)
+    if start >= size or start >= end:
+        raise ValueError(f"Range {header!r} outside {size} bytes")
+    return start, end
+
+
+class BlobResponse(Response):
+    """
+    Serve a blob from a memory map of its file, whole or one byte range.
+
+    Body chunks are slices of the mapping, so the content is handed to the
+    server without being copied into Python objects. Blobs are immutable, so
+    the digest is a strong ETag and responses may be cached forever.
+    """
+
+    chunk_size = 256 * 1024
+
+    def __init__(self, store: BlobStore, blob: StoredBlob, request: Request):
+        """
+        Args:
+            store: Store holding the blob
+            blob: Blob to serve
+            request: Request (for `Range`, `If-Range` and `If-None-Match`)
+
+        Raises:
+            ValueError: If the requested range cannot be satisfied
+        """
+        self.path = store.path(blob.digest)
+        etag = f'"{blob.digest}"'
+        headers = {
+            "accept-ranges": "bytes",
+            "etag": etag,
+            "cache-control": "public, max-age=31536000, immutable",
+        }
+        self.start, self.end = 0, blob.size
+        status_code = 200
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            status_code, self.end = 304, 0
+        else:
+            if_range = request.headers.get("if-range")
+            byte_range = None
+            if if_range is None or if_range == etag:
+                byte_range = parse_range(request.headers.get("range"), blob.size)
+            if byte_range is not None:
+                self.start, self.end = byte_range
+                status_code = 206
+                headers["content-range"] = f"bytes {self.start}-{self.end - 1}/{blob.size}"
+            headers["content-length"] = str(self.end - self.start)
+        super().__init__(status_code=status_code, headers=headers, media_type=blob.content_type)
+        self.send_body = request.method != "HEAD" and status_code != 304
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or self.start == self.end:
+            await send({"type": "http.response.body", "body": b""})
+            return
+        with open(self.path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Not closed explicitly: the server may still hold slices it has not
+        # written yet; the mapping goes away with the last of them
+        view = memoryview(mapped)
+        for offset in range(self.start, self.end, self.chunk_size):
+            chunk = view[offset : min(offset + self.chunk_size, self.end)]
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,161 @@
+"""
+Compilation of chain specifications (lists of registry model IDs) into plans.
+
+A chain is compiled once per process: its IDs are resolved against the
+model registry, adjacent stages are checked for media type compatibility
+(each stage's output type must be the next stage's input type) and the
+result is an immutable `ModelChain`, with text-to-audio stages wrapped in a
+`SentenceBridge` so they start speaking streamed text before it ends, every
+stage's outputs cached in the process-wide `STAGE_CACHE` (per sentence for
+bridged stages), concurrent identical calls of a stage coalesced into one
+(see `STAGE_CALLS`) and every stage timed (see `server.metrics`), cache hits
+included. Compiled chains and whole session plans are interned, so every
+session over the same chains shares the same model, chain and planner
+objects, and with them one rating identity per chain; sessions run their
+matchups through their plan's planner.
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Sequence
+
+from arena import (
+    CachedModel,
+    ChainPlanner,
+    CoalescedModel,
+    InstrumentedModel,
+    ModelChain,
+    SentenceBridge,
+    SingleFlight,
+    StageCache,
+)
+from server.metrics import STAGES
+from server.models_registry import RegistryModel, get_model_by_id
+from server.schemas import MediaType
+
+# Outputs of every compiled stage, keyed by model, config and input
+STAGE_CACHE = StageCache(
+    max_bytes=int(os.environ.get("CHAINALIGN_STAGE_CACHE_BYTES", 64 * 2**20)),
+    ttl=float(os.environ.get("CHAINALIGN_STAGE_CACHE_TTL", 3600)),
+)
+# In-flight calls of every compiled stage, shared by concurrent identical calls
+STAGE_CALLS = SingleFlight()
+
+
+class ChainError(ValueError):
+    """A chain specification that cannot be compiled."""
+
+
+@dataclass(frozen=True, eq=False)
+class ChainPlan:
+    """
+    Compiled chains of a session.
+
+    Attributes:
+        chains: Compiled chains, in the order given
+        input_type: Media type every chain takes
+        output_type: Media type every chain produces
+        planner: Execution plan the session's matchups run through,
+            running a leading stage both chains share once
+    """
+    chains: tuple[ModelChain, ...]
+    input_type: MediaType
+    output_type: MediaType
+    planner: ChainPlanner
+
+
+def chain_key(model_chains: Sequence[Sequence[str]]) -> tuple[tuple[str, ...], ...]:
+    """Hashable form of a chain specification, as used by the plan cache."""
+    return tuple(tuple(chain) for chain in model_chains)
+
+
+@lru_cache(maxsize=None)
+def _model(model_id: str) -> RegistryModel:
+    # Registry IDs are a fixed set, so this stays small
+    return RegistryModel(model_id)
+
+
+@lru_cache(maxsize=None)
+def _stage(model_id: str) -> InstrumentedModel:
+    model = _model(model_id)
+    stage = CachedModel(CoalescedModel(model, STAGE_CALLS), STAGE_CACHE)
+    # Text-to-audio stages speak streamed text sentence by sentence, caching each sentence
+    if (model.info.input_type, model.info.output_type) == (MediaType.TEXT, MediaType.AUDIO):
+        stage = SentenceBridge(stage)
+    return InstrumentedModel(stage, STAGES)
+
+
+@lru_cache(maxsize=4096)
+def compile_chain(model_ids: tuple[str, ...]) -> ModelChain:
+    """
+    Resolve and validate one chain.
+
+    Args:
+        model_ids: Registry model IDs, in execution order
+
+    Returns:
+        The interned compiled chain
+
+    Raises:
+        ChainError: If the chain is empty, names an unknown model or feeds
+            a stage a media type it does not take
+    """
+    if not model_ids:
+        raise ChainError("Model chains cannot be empty")
+    for model_id in model_ids:
+        if get_model_by_id(model_id) is None:
+            raise ChainError(f"Unknown model {model_id!r}")
+    models = [_model(model_id) for model_id in model_ids]
+    for current, following in zip(models, models[1:]):
+        if current.info.output_type != following.info.input_type:
+            raise ChainError(
+                f"Incompatible types between {current.info.name} and {following.info.name}: "
+                f"{current.info.name} outputs {current.info.output_type.value} "
+                f"but {following.info.name} expects {following.info.input_type.value}"
+            )
+    return ModelChain([_stage(model_id) for model_id in model_ids])
+
+
+@lru_cache(maxsize=1024)
+def compile_plan(model_chains: tuple[tuple[str, ...], ...]) -> ChainPlan:
+    """
+    Compile a session's chains and check they can be compared.
+
+    Args:
+        model_chains: Chain specification (see `chain_key`)
+
+    Returns:
+        The interned plan
+
+    Raises:
+        ChainError: If a chain does not compile, or chains differ in the
+            media type they take or produce
+    """
+    if not model_chains:
+        raise ChainError("No model chains given")
+    chains = []
+    for number, model_ids in enumerate(model_chains, start=1):
+        try:
+            chains.append(compile_chain(model_ids))
+        except ChainError as exc:
+            raise ChainError(f"Chain {number}: {exc}") from None
+
+    def types(chain: ModelChain) -> tuple[MediaType, MediaType]:
+        return chain.model_chain[0].info.input_type, chain.model_chain[-1].info.output_type
+
+    input_type, output_type = types(chains[0])
+    for number, chain in enumerate(chains, start=1):
+        chain_input, chain_output = types(chain)
+        if chain_input != input_type:
+            raise ChainError(
+                f"Chain {number} has inconsistent input type: expected {input_type.value} but got {chain_input.value}"
+            )
+        if chain_output != output_type:
+            raise ChainError(
+                f"Chain {number} has inconsistent output type: "
+                f"expected {output_type.value} but got {chain_output.value}"
+            )
+    # One immutable tuple, shared by the plan and its planner
+    chains = tuple(chains)
+    return ChainPlan(chains, input_type, output_type, ChainPlanner(chains))
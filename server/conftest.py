@@ -2,10 +2,37 @@
 Pytest configuration for the server tests.
 This file ensures proper Python path setup for imports.
 """
+import os
 import sys
+import tempfile
 from pathlib import Path
 
+import pytest
+
 # Add server directory to Python path
 server_dir = Path(__file__).parent
 if str(server_dir) not in sys.path:
     sys.path.insert(0, str(server_dir))
+
+# The API keeps its state under CHAINALIGN_STATE_DIR, read when server.main is
+# imported; tests never touch the default shared directory
+os.environ["CHAINALIGN_STATE_DIR"] = tempfile.mkdtemp(prefix="chainalign-test-")
+
+
+@pytest.fixture
+def client():
+    """API test client, with the app's background loops running."""
+    from fastapi.testclient import TestClient
+    from server.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def session_id(client):
+    """A session comparing two text chains."""
+    response = client.post(
+        "/session/start", json={"model_chains": [["gpt-4", "claude-3-haiku"], ["gpt-3.5-turbo"]]}
+    )
+    return response.json()["session_id"]
@@ -1,23 +1,118 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.types import Receive, Scope, Send
 from server.schemas import (
     StartSessionRequest,
     StartSessionResponse,
     ProcessInputRequest,
     ProcessInputResponse,
+    BatchProcessRequest,
+    BatchProcessResult,
+    BatchProcessResponse,
+    BlobRef,
+    MediaType,
+    ProcessStreamEvent,
     VoteRequest,
     VoteResponse,
+    BulkVoteResult,
     ModelResponse,
+    LeaderboardEntry,
+    LeaderboardResponse,
+    SessionMemory,
 )
-from server.models_registry import get_all_models
-from typing import List
+from server.blob_store import BlobResponse, BlobStore, etag_matches
+from server.chains import ChainError, chain_key, compile_chain, compile_plan
+from server.metrics import (
+    CHAINS,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    REGISTRY,
+    VOTES,
+    chain_label,
+    other_workers,
+    publish,
+    retract,
+    watch_caches,
+    watch_sessions,
+)
+from server.models_registry import get_model_by_id, models_json
+from server.uploads import UploadError, receive_upload
+from server.session_store import DuplicateVote, SessionStore, SharedSession
+from arena import ArenaBase, ModelChain, VoteOutcome, interleave_streams, render_snapshots
+from contextlib import asynccontextmanager, suppress
+from collections import defaultdict
+from typing import AsyncIterator, List, Optional, Union
+import asyncio
+import base64
+import os
+import tempfile
 import uuid
 
-app = FastAPI(title="ChainAlign Arena API")
 
-# In-memory storage for sessions (replace with database later)
-sessions = {}
+def _build_arena(model_chains: List[List[str]]) -> ArenaBase:
+    """Create an arena over the compiled (process-wide shared) chains of registry model IDs."""
+    return ArenaBase(list(compile_plan(chain_key(model_chains)).chains))
+
+
+# Sessions live in a directory shared by every worker process (uvicorn --workers N)
+STATE_DIR = os.environ.get("CHAINALIGN_STATE_DIR", os.path.join(tempfile.gettempdir(), "chainalign"))
+sessions = SessionStore(
+    STATE_DIR,
+    _build_arena,
+    max_sessions=int(os.environ.get("CHAINALIGN_MAX_SESSIONS", 1000)),
+    ttl=float(os.environ.get("CHAINALIGN_SESSION_TTL", 24 * 3600)),
+    max_matchups=int(os.environ.get("CHAINALIGN_MAX_MATCHUPS", 1000)),
+    checkpoint_interval=float(os.environ.get("CHAINALIGN_CHECKPOINT_INTERVAL", 60)),
+)
+# Binary outputs, shared by every worker; kept as long as sessions are
+blobs = BlobStore(os.path.join(STATE_DIR, "blobs"))
+MAX_UPLOAD_BYTES = int(os.environ.get("CHAINALIGN_MAX_UPLOAD_BYTES", 100 * 2**20))
+MAX_BATCH_SIZE = min(int(os.environ.get("CHAINALIGN_MAX_BATCH_SIZE", 256)), sessions.max_matchups)
+VALID_VOTES = ["A", "B", "tie", "both_bad"]
+# Bulk votes are applied this many lines at a time; longer lines are refused
+BULK_VOTE_BATCH = 512
+BULK_VOTE_MAX_LINE = 64 * 1024
+# Each worker publishes its metrics here for whichever worker answers /metrics
+METRICS_DIR = os.path.join(STATE_DIR, "metrics")
+METRICS_INTERVAL = float(os.environ.get("CHAINALIGN_METRICS_INTERVAL", 5))
+watch_sessions(sessions)
+watch_caches({"chain_plans": compile_plan, "chains": compile_chain, "model_listings": models_json})
+
+
+async def _prune_blobs() -> None:
+    """Drop blobs nobody produced again within the session TTL, once an hour."""
+    while True:
+        await asyncio.to_thread(blobs.prune, sessions.ttl)
+        await asyncio.sleep(3600)
+
+
+async def _publish_metrics() -> None:
+    """Share this worker's metrics with the other workers every METRICS_INTERVAL seconds."""
+    while True:
+        await asyncio.to_thread(publish, METRICS_DIR, REGISTRY.snapshot())
+        await asyncio.sleep(METRICS_INTERVAL)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the session store's, blob store's and metrics' background loops; apply pending votes on shutdown."""
+    background = [
+        asyncio.create_task(sessions.run()),
+        asyncio.create_task(_prune_blobs()),
+        asyncio.create_task(_publish_metrics()),
+    ]
+    yield
+    for task in background:
+        task.cancel()
+    with suppress(asyncio.CancelledError):
+        await asyncio.gather(*background)
+    retract(METRICS_DIR)
+    await sessions.close()
+
+
+app = FastAPI(title="ChainAlign Arena API", lifespan=lifespan)
+
 @app.post("/session/start", response_model=StartSessionResponse)
 async def start_session(request: StartSessionRequest):
     """
@@ -25,16 +120,17 @@ async def start_session(request: StartSessionRequest):
 
     Creates an arena that will compare outputs from different model chains.
     """
-    session_id = str(uuid.uuid4())
+    if len(request.model_chains) < 2:
+        raise HTTPException(status_code=400, detail="At least two model chains are required")
+    try:
+        compile_plan(chain_key(request.model_chains))
+    except ChainError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
-    # Store session data (dummy for now)
-    sessions[session_id] = {
-        "model_chains": request.model_chains,
-        "matchups": {}
-    }
+    session = await sessions.create(request.model_chains)
 
     return StartSessionResponse(
-        session_id=session_id,
+        session_id=session.session_id,
         num_chains=len(request.model_chains),
         message=f"Arena session created with {len(request.model_chains)} chains"
     )
@@ -43,54 +139,246 @@ async def start_session(request: StartSessionRequest):
 @app.post("/session/process", response_model=ProcessInputResponse)
 async def process_input(request: ProcessInputRequest):
     """
-    Process user input through two randomly selected chains.
+    Process user input through the session's next matchup.
 
-    Selects two chains from the arena, feeds the input through them,
+    The arena's matchmaker picks two chains, the input is fed through them,
     and returns both outputs for comparison.
     """
-    if request.session_id not in sessions:
+    session = await sessions.get(request.session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    matchup_id = str(uuid.uuid4())
+    return await _process(session, request.user_input)
+
+
+@app.post("/session/process/upload", response_model=ProcessInputResponse)
+async def process_upload(session_id: str, request: Request):
+    """
+    Process an audio, image or video input through the session's next matchup.
+
+    The body is the raw media (with its own Content-Type) or multipart form
+    data whose first file part is the media. It is streamed to disk as it
+    arrives and rejected with 413 once it exceeds CHAINALIGN_MAX_UPLOAD_BYTES,
+    or with 415 if the session's chains do not take that media type.
+    """
+    session = await sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    accepted = {compile_plan(chain_key(session.model_chains)).input_type}
+    try:
+        blob, _ = await receive_upload(request, blobs, MAX_UPLOAD_BYTES, accepted)
+    except UploadError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=str(exc))
+
+    return await _process(session, f"/blobs/{blob.digest}")
+
+
+@app.post("/session/process/batch", response_model=BatchProcessResponse)
+async def process_batch(request: BatchProcessRequest):
+    """
+    Process many inputs, each through its own matchup, concurrently.
+
+    The batch's matchups are stored in one transaction and all chains run at
+    once. An input whose chains fail gets an error in its result instead of
+    failing the batch; results are in input order.
+    """
+    session = await sessions.get(request.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    if len(request.user_inputs) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} inputs per batch")
+
+    matchups = [
+        (str(uuid.uuid4()), *session.generate_matchup(), user_input) for user_input in request.user_inputs
+    ]
+    await session.add_matchups(matchups)
+    outputs = await asyncio.gather(
+        *(_run_matchup(session, chain_a, chain_b, user_input) for _, chain_a, chain_b, user_input in matchups),
+        return_exceptions=True,
+    )
+
+    results = []
+    for (matchup_id, _, _, _), output in zip(matchups, outputs):
+        if isinstance(output, Exception):
+            results.append(BatchProcessResult(matchup_id=matchup_id, error=str(output)))
+        else:
+            results.append(BatchProcessResult(matchup_id=matchup_id, output_a=output[0], output_b=output[1]))
+    return BatchProcessResponse(session_id=request.session_id, results=results)
 
-    # Store matchup info (dummy for now)
-    sessions[request.session_id]["matchups"][matchup_id] = {
-        "user_input": request.user_input,
-        "chains": ["chain_0", "chain_1"]  # Dummy chain IDs
-    }
 
-    # Return dummy outputs
+async def _process(session: SharedSession, user_input: str) -> ProcessInputResponse:
+    """Run the session's next matchup on an input (text, or a blob URL for media)."""
+    matchup_id, chain_a, chain_b = await _create_matchup(session, user_input)
+    output_a, output_b = await _run_matchup(session, chain_a, chain_b, user_input)
+
     return ProcessInputResponse(
-        session_id=request.session_id,
+        session_id=session.session_id,
         matchup_id=matchup_id,
-        output_a="Lorem ipsum dolor sit amet, consectetur adipiscing elit. Sed do eiusmod tempor incididunt ut labore et dolore magna aliqua.",
-        output_b="Ut enim ad minim veniam, quis nostrud exercitation ullamco laboris nisi ut aliquip ex ea commodo consequat."
+        output_a=output_a,
+        output_b=output_b,
     )
 
 
+@app.post("/session/process/stream")
+async def process_input_stream(request: ProcessInputRequest):
+    """
+    Stream outputs from the session's next matchup as server-sent events.
+
+    Each event carries a chunk from output A or B as soon as the chain
+    produces it, followed by a final event without an output label.
+    """
+    session = await sessions.get(request.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    matchup_id, chain_a, chain_b = await _create_matchup(session, request.user_input)
+    streams = {"A": _output_stream(chain_a, request.user_input), "B": _output_stream(chain_b, request.user_input)}
+
+    return StreamingResponse(
+        _sse_events(request.session_id, matchup_id, streams),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _create_matchup(session: SharedSession, user_input: str) -> tuple[str, ModelChain, ModelChain]:
+    """Pick the next matchup for the session, register it and return its ID and chains."""
+    chain_a, chain_b = session.generate_matchup()
+    matchup_id = str(uuid.uuid4())
+    await session.add_matchup(matchup_id, chain_a, chain_b, user_input)
+    return matchup_id, chain_a, chain_b
+
+
+async def _run_matchup(
+    session: SharedSession, chain_a: ModelChain, chain_b: ModelChain, user_input: str
+) -> list[Union[str, BlobRef]]:
+    """
+    Outputs of both chains of a matchup on an input.
+
+    The chains run concurrently through the session's compiled plan, so a
+    leading stage they share runs once. Each chain is timed from the start
+    until its own output is ready (its stages time themselves).
+    """
+    planner = compile_plan(chain_key(session.model_chains)).planner
+    matchup = (chain_a, chain_b)
+    timers = {chain: CHAINS.start(chain_label(chain)) for chain in matchup}
+    for timer in timers.values():
+        timer.input(user_input)
+
+    def finished(chain: ModelChain, output: Union[str, bytes]) -> None:
+        timer = timers.pop(chain)
+        timer.chunk(output)
+        timer.finish()
+
+    try:
+        outputs = await planner.run(user_input, matchup, on_output=finished)
+    except BaseException as exc:
+        for timer in timers.values():
+            timer.finish(exc)
+        raise
+    return await asyncio.gather(*(_output_payload(chain, outputs[chain]) for chain in matchup))
+
+
+def _output_type(chain: ModelChain) -> MediaType:
+    """Media type a chain produces: that of its last model."""
+    return chain.model_chain[-1].info.output_type
+
+
+_CONTENT_TYPES = {
+    MediaType.AUDIO: "audio/wav",
+}
+
+
+async def _output_payload(chain: ModelChain, output: Union[str, bytes]) -> Union[str, BlobRef]:
+    """Text as is; binary output stored in the blob store and returned by reference."""
+    if isinstance(output, str):
+        return output
+    content_type = _CONTENT_TYPES.get(_output_type(chain), "application/octet-stream")
+    blob = await asyncio.to_thread(blobs.put, output, content_type)
+    return BlobRef(digest=blob.digest, size=blob.size, content_type=blob.content_type, url=f"/blobs/{blob.digest}")
+
+
+def _output_stream(chain: ModelChain, user_input: str) -> AsyncIterator:
+    """
+    Stream a chain's output on an input, timing it as a whole (its stages time themselves).
+
+    Every stage consumes the previous stage's output as it is produced: text
+    stages pass on tokens, and text-to-audio stages speak them sentence by
+    sentence, so audio starts after the first sentence instead of the whole text.
+    """
+    return CHAINS.stream(chain_label(chain), chain.astream(user_input))
+
+
+async def _sse_events(
+    session_id: str, matchup_id: str, streams: dict[str, AsyncIterator]
+) -> AsyncIterator[str]:
+    """Format interleaved chain output chunks as server-sent events."""
+    try:
+        async for label, chunk in interleave_streams(streams):
+            if isinstance(chunk, (bytes, bytearray, memoryview)):
+                event = ProcessStreamEvent(
+                    session_id=session_id,
+                    matchup_id=matchup_id,
+                    output=label,
+                    chunk=base64.b64encode(chunk).decode("ascii"),
+                    encoding="base64",
+                )
+            else:
+                event = ProcessStreamEvent(
+                    session_id=session_id, matchup_id=matchup_id, output=label, chunk=str(chunk)
+                )
+            yield f"event: chunk\ndata: {event.model_dump_json()}\n\n"
+    except Exception as exc:
+        event = ProcessStreamEvent(session_id=session_id, matchup_id=matchup_id, error=str(exc))
+        yield f"event: error\ndata: {event.model_dump_json()}\n\n"
+        return
+
+    event = ProcessStreamEvent(session_id=session_id, matchup_id=matchup_id)
+    yield f"event: done\ndata: {event.model_dump_json()}\n\n"
+
+
 @app.post("/session/vote", response_model=VoteResponse)
 async def vote(request: VoteRequest):
     """
     Record a vote for which output the user preferred.
 
-    Updates internal ELO ratings and statistics based on the vote.
+    The vote is stored for the session's rating writer (in whichever worker
+    holds that role) and the response is sent immediately; ratings and
+    leaderboards reflect it once its batch has been applied.
     """
-    if request.session_id not in sessions:
+    try:
+        response = await _record_vote(request)
+    except HTTPException as exc:
+        VOTES.inc((str(exc.status_code),))
+        raise
+    VOTES.inc(("200",))
+    return response
+
+
+async def _record_vote(request: VoteRequest) -> VoteResponse:
+    """Validate and store a single vote, raising HTTPException for the error statuses."""
+    session = await sessions.get(request.session_id)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    if request.matchup_id not in sessions[request.session_id]["matchups"]:
+    if await session.get_matchup(request.matchup_id) is None:
         raise HTTPException(status_code=404, detail="Matchup not found")
 
     # Validate vote
-    valid_votes = ["A", "B", "tie", "both_bad"]
-    if request.vote not in valid_votes:
+    if request.vote not in VALID_VOTES:
         raise HTTPException(
             status_code=400,
-            detail=f"Invalid vote. Must be one of: {', '.join(valid_votes)}"
+            detail=f"Invalid vote. Must be one of: {', '.join(VALID_VOTES)}"
         )
 
-    # Store vote (dummy for now)
-    sessions[request.session_id]["matchups"][request.matchup_id]["vote"] = request.vote
+    try:
+        await session.add_vote(request.matchup_id, VoteOutcome(request.vote))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Matchup not found")
+    except DuplicateVote:
+        raise HTTPException(status_code=409, detail="Matchup already has a vote")
+    sessions.notify()
 
     return VoteResponse(
         session_id=request.session_id,
@@ -100,14 +388,238 @@ async def vote(request: VoteRequest):
     )
 
 
+@app.post("/session/vote/bulk")
+async def vote_bulk(request: Request):
+    """
+    Record many votes from an NDJSON body, one `VoteRequest` object per line.
+
+    Lines are parsed as the body streams in and applied in batches: per
+    session, one transaction claims the batch's matchups and their log
+    appends share commits. The response is NDJSON with one `BulkVoteResult`
+    per non-empty line, in order, carrying the status `/session/vote` would
+    have answered for it; each batch's results are sent as soon as it is
+    applied, while the rest of the body is still being read.
+    """
+    return _DuplexStreamingResponse(_bulk_vote_results(request.stream()), media_type="application/x-ndjson")
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response sent while the request body is still being read.
+
+    `StreamingResponse` watches for the client disconnecting by reading
+    request messages itself, which would take body chunks away from the
+    endpoint; here a disconnect surfaces through `request.stream()` instead.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.stream_response(send)
+
+
+async def _bulk_vote_results(body: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Apply the bulk vote lines of a streamed body in batches, yielding each batch's NDJSON results."""
+    batch: list[tuple[int, Optional[bytes]]] = []
+    try:
+        async for number, line in _ndjson_lines(body):
+            batch.append((number, line))
+            if len(batch) >= BULK_VOTE_BATCH:
+                results = await _apply_votes(batch)
+                batch = []
+                sessions.notify()
+                yield "".join(result.model_dump_json() + "\n" for result in results)
+    except ClientDisconnect:
+        # Batches applied so far stay recorded; the rest of the upload never arrived
+        return
+    if batch:
+        results = await _apply_votes(batch)
+        sessions.notify()
+        yield "".join(result.model_dump_json() + "\n" for result in results)
+
+
+async def _ndjson_lines(body: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, Optional[bytes]]]:
+    """
+    Split a streamed body into numbered non-empty lines.
+
+    Lines longer than BULK_VOTE_MAX_LINE are yielded as None (and not buffered).
+    """
+    number = 0
+    pending = bytearray()
+    too_long = False
+    async for chunk in body:
+        *lines, rest = chunk.split(b"\n")
+        for line in lines:
+            number += 1
+            if too_long or len(pending) + len(line) > BULK_VOTE_MAX_LINE:
+                yield number, None
+            else:
+                if pending:
+                    line = bytes(pending + line)
+                if line.strip():
+                    yield number, line
+            pending.clear()
+            too_long = False
+        if too_long or len(pending) + len(rest) > BULK_VOTE_MAX_LINE:
+            pending.clear()
+            too_long = True
+        else:
+            pending += rest
+    if too_long:
+        yield number + 1, None
+    elif pending.strip():
+        yield number + 1, bytes(pending)
+
+
+async def _apply_votes(lines: List[tuple[int, Optional[bytes]]]) -> List[BulkVoteResult]:
+    """Validate and record a batch of bulk vote lines; one result per line, in order."""
+    results: dict[int, BulkVoteResult] = {}
+    by_session: dict[str, list[tuple[int, VoteRequest]]] = defaultdict(list)
+    for number, line in lines:
+        if line is None:
+            results[number] = BulkVoteResult(line=number, status=413, error=f"Line exceeds {BULK_VOTE_MAX_LINE} bytes")
+            continue
+        try:
+            request = VoteRequest.model_validate_json(line)
+        except ValidationError as exc:
+            detail = "; ".join(f"{'.'.join(map(str, e['loc'])) or 'line'}: {e['msg']}" for e in exc.errors())
+            results[number] = BulkVoteResult(line=number, status=422, error=detail)
+            continue
+        if request.vote not in VALID_VOTES:
+            results[number] = BulkVoteResult(
+                line=number,
+                session_id=request.session_id,
+                matchup_id=request.matchup_id,
+                status=400,
+                error=f"Invalid vote. Must be one of: {', '.join(VALID_VOTES)}",
+            )
+            continue
+        by_session[request.session_id].append((number, request))
+
+    async def apply(session_id: str, requests: list[tuple[int, VoteRequest]]) -> None:
+        session = await sessions.get(session_id)
+        if session is None:
+            errors = [None] * len(requests)
+        else:
+            errors = await session.add_votes(
+                [(request.matchup_id, VoteOutcome(request.vote)) for _, request in requests]
+            )
+        for (number, request), error in zip(requests, errors):
+            if session is None:
+                status, detail = 404, "Session not found"
+            elif error is None:
+                status, detail = 200, None
+            elif isinstance(error, KeyError):
+                status, detail = 404, "Matchup not found"
+            elif isinstance(error, DuplicateVote):
+                status, detail = 409, "Matchup already has a vote"
+            else:
+                status, detail = 500, str(error)
+            results[number] = BulkVoteResult(
+                line=number, session_id=session_id, matchup_id=request.matchup_id, status=status, error=detail
+            )
+
+    await asyncio.gather(*(apply(session_id, requests) for session_id, requests in by_session.items()))
+    for result in results.values():
+        VOTES.inc((str(result.status),))
+    return [results[number] for number in sorted(results)]
+
+
+@app.api_route("/blobs/{digest}", methods=["GET", "HEAD"])
+async def get_blob(digest: str, request: Request):
+    """
+    Download a binary output by digest, whole or one byte range.
+
+    Served from a memory map of the stored file. Supports `Range` (206/416),
+    `If-Range` and `If-None-Match` (304); blobs never change, so responses
+    are cacheable indefinitely.
+    """
+    blob = await asyncio.to_thread(blobs.get, digest)
+    if blob is None:
+        raise HTTPException(status_code=404, detail="Blob not found")
+    try:
+        return BlobResponse(blobs, blob, request)
+    except ValueError:
+        raise HTTPException(
+            status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{blob.size}"}
+        )
+
+
+@app.get("/session/{session_id}/leaderboard", response_model=LeaderboardResponse)
+async def get_leaderboard(session_id: str, limit: Optional[int] = Query(None, ge=1), offset: int = Query(0, ge=0)):
+    """
+    Get the session's chains ranked by rating (highest first).
+
+    Served from the latest rating snapshot, so it never waits for votes
+    being applied and may trail the most recent votes by one batch.
+    """
+    session = await sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    snapshot = session.snapshot()
+    entries = [
+        LeaderboardEntry(rank=offset + position, chain=list(chain.names), rating=rating)
+        for position, (chain, rating) in enumerate(snapshot.get_chain_leaderboard(limit, offset))
+    ]
+    return LeaderboardResponse(session_id=session_id, version=snapshot.version, entries=entries)
+
+
+@app.get("/sessions/memory", response_model=List[SessionMemory])
+async def get_session_memory():
+    """
+    Report approximate memory held by each session loaded in this worker.
+
+    Sessions evicted from memory (or never loaded by this worker) are not
+    listed; their matchups and votes remain in the session database.
+    """
+    return [
+        SessionMemory(session_id=session.session_id, bytes=session.memory_usage(), is_writer=session.is_writer)
+        for session in sessions.loaded()
+    ]
+
+
 @app.get("/models", response_model=List[ModelResponse])
-async def get_models():
+async def get_models(
+    request: Request,
+    provider: Optional[str] = None,
+    capability: Optional[str] = None,
+    input_type: Optional[MediaType] = None,
+    output_type: Optional[MediaType] = None,
+):
+    """
+    Get available models, optionally filtered by provider, capability and media types.
+
+    Responses are serialized once per filter combination and carry an ETag;
+    requests with a matching If-None-Match get 304 Not Modified.
+    """
+    body, etag = models_json(provider, capability, input_type, output_type)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/models/{model_id}", response_model=ModelResponse)
+async def get_model(model_id: str):
+    """Get details for a specific model."""
+    model = get_model_by_id(model_id)
+    if model is None:
+        raise HTTPException(status_code=404, detail="Model not found")
+    return model
+
+
+@app.get("/metrics")
+async def get_metrics():
     """
-    Get all available models.
+    Metrics of every worker in the Prometheus text format.
 
-    Returns a list of all registered models with their metadata.
+    Per-model stage and per-chain latency histograms (total and time to first
+    chunk, by outcome), payload sizes, votes by status, queue depths and cache
+    statistics; other workers' values are as of their last publication (at
+    most METRICS_INTERVAL seconds old).
     """
-    return get_all_models()
+    snapshot = REGISTRY.snapshot()
+    others = await asyncio.to_thread(other_workers, METRICS_DIR, 6 * METRICS_INTERVAL)
+    return Response(render_snapshots([snapshot, *others]), media_type=METRICS_CONTENT_TYPE)
 
 
 @app.get("/health")
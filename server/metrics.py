@@ -0,0 +1,123 @@
+"""
+Process metrics of the API, exposed in the Prometheus text format.
+
+Model stages and whole chains are timed by `CallMetrics` aggregators (see
+`arena.metrics`); votes are counted by status; queue depths and cache
+statistics are read from their owners when a snapshot is taken.
+
+Each worker process (uvicorn --workers N) aggregates its own metrics and
+periodically writes a snapshot to a directory shared by the workers;
+`/metrics`, answered by whichever worker receives the scrape, merges its own
+fresh snapshot with the other workers' recent ones, so a scrape describes
+the whole server.
+"""
+
+import json
+import os
+import tempfile
+import time
+from typing import Callable
+
+from arena import CallMetrics, MetricsRegistry, ModelChain
+from server.session_store import SessionStore
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY = MetricsRegistry()
+# Calls of each model stage, and of each chain as a whole
+STAGES = CallMetrics(REGISTRY, "chainalign_stage", "model", "model stage")
+CHAINS = CallMetrics(REGISTRY, "chainalign_chain", "chain", "chain")
+VOTES = REGISTRY.counter("chainalign_votes_total", "Votes received, by response status", ("status",))
+
+
+def chain_label(chain: ModelChain) -> str:
+    """Metric label of a chain: its model names in order."""
+    return " > ".join(chain.names)
+
+
+def watch_sessions(sessions: SessionStore) -> None:
+    """Report the session store's queue depths and this worker's loaded sessions."""
+    loaded = REGISTRY.gauge("chainalign_sessions_loaded", "Sessions in memory")
+    writing = REGISTRY.gauge("chainalign_sessions_writing", "Sessions whose rating writer runs in this process")
+    queued = REGISTRY.gauge("chainalign_queue_depth", "Items waiting in a queue", ("queue",))
+    records = REGISTRY.counter("chainalign_vote_log_records_total", "Votes committed to the vote log")
+    commits = REGISTRY.counter("chainalign_vote_log_commits_total", "Vote log write+fsync rounds")
+
+    def collect() -> None:
+        session_list = sessions.loaded()
+        loaded.set((), len(session_list))
+        writing.set((), sum(session.is_writer for session in session_list))
+        queued.set(("rating_writer",), sum(session.pending_votes for session in session_list))
+        wal = sessions.wal
+        queued.set(("vote_log",), wal.pending)
+        records.set((), wal.records)
+        commits.set((), wal.commits)
+
+    REGISTRY.collect(collect)
+
+
+def watch_caches(caches: dict[str, Callable]) -> None:
+    """Report hits, misses and sizes of `functools.lru_cache` functions, by name."""
+    hits = REGISTRY.counter("chainalign_cache_hits_total", "Cache lookups answered from the cache", ("cache",))
+    misses = REGISTRY.counter("chainalign_cache_misses_total", "Cache lookups that computed the value", ("cache",))
+    size = REGISTRY.gauge("chainalign_cache_entries", "Entries held by a cache", ("cache",))
+
+    def collect() -> None:
+        for name, function in caches.items():
+            info = function.cache_info()
+            hits.set((name,), info.hits)
+            misses.set((name,), info.misses)
+            size.set((name,), info.currsize)
+
+    REGISTRY.collect(collect)
+
+
+def publish(directory: str, snapshot: dict) -> None:
+    """Write this process's snapshot for the other workers (atomically; blocking)."""
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    with os.fdopen(fd, "w") as file:
+        json.dump(snapshot, file)
+    os.replace(temp_path, os.path.join(directory, f"{os.getpid()}.json"))
+
+
+def other_workers(directory: str, max_age: float) -> list[dict]:
+    """
+    Latest snapshots published by the other worker processes (blocking).
+
+    Args:
+        directory: Directory the workers publish snapshots to
+        max_age: Seconds after which a snapshot is taken to belong to a
+            stopped worker; such snapshots are removed
+
+    Returns:
+        The snapshots, to merge with this process's own (see `arena.render_snapshots`)
+    """
+    own = f"{os.getpid()}.json"
+    now = time.time()
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    snapshots = []
+    for name in names:
+        if name == own or not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if now - os.path.getmtime(path) > max_age:
+                os.unlink(path)
+                continue
+            with open(path) as file:
+                snapshots.append(json.load(file))
+        except (OSError, ValueError):
+            continue  # removed or replaced concurrently
+    return snapshots
+
+
+def retract(directory: str) -> None:
+    """Remove this process's published snapshot, e.g. on shutdown."""
+    try:
+        os.unlink(os.path.join(directory, f"{os.getpid()}.json"))
+    except FileNotFoundError:
+        pass
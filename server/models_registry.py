@@ -1,5 +1,16 @@
-"""Registry of available LLM and TTS models for the ChainAlign arena."""
+"""Registry of available LLM, TTS and STT models for the ChainAlign arena."""
 
+import asyncio
+import hashlib
+import io
+import re
+import wave
+from functools import lru_cache
+from typing import AsyncIterator
+
+from pydantic import TypeAdapter
+
+from arena import Model
 from server.schemas import ModelResponse, MediaType
 
 # Central registry of all available models
@@ -223,40 +234,142 @@ AVAILABLE_MODELS = [
         description="Lightweight and efficient TTS model",
         capabilities=["text-to-speech"]
     ),
+
+    # === STT Models (Audio -> Text) ===
+    ModelResponse(
+        id="whisper-1",
+        name="OpenAI Whisper",
+        provider="OpenAI",
+        input_type=MediaType.AUDIO,
+        output_type=MediaType.TEXT,
+        description="OpenAI's speech recognition model",
+        capabilities=["speech-to-text"]
+    ),
 ]
 
 
+def _index(keys) -> dict:
+    """Map each key of each model (from `keys(model)`) to its models, in registry order."""
+    index: dict = {}
+    for model in AVAILABLE_MODELS:
+        for key in keys(model):
+            index.setdefault(key, []).append(model)
+    return index
+
+
+# Lookup indexes, built once: the registry does not change at runtime
+_BY_ID = {model.id: model for model in AVAILABLE_MODELS}
+_BY_PROVIDER = _index(lambda model: [model.provider.lower()])
+_BY_CAPABILITY = _index(lambda model: model.capabilities or [])
+# (input, output), with None standing for any type on that side
+_BY_TYPE = _index(lambda model: [
+    (model.input_type, model.output_type), (model.input_type, None), (None, model.output_type), (None, None)
+])
+_MODEL_LIST = TypeAdapter(list[ModelResponse])
+
+
 def get_all_models() -> list[ModelResponse]:
     """Get all available models."""
-    return AVAILABLE_MODELS
+    return list(AVAILABLE_MODELS)
 
 
 def get_model_by_id(model_id: str) -> ModelResponse | None:
     """Get a specific model by its ID."""
-    for model in AVAILABLE_MODELS:
-        if model.id == model_id:
-            return model
-    return None
+    return _BY_ID.get(model_id)
 
 
 def get_models_by_provider(provider: str) -> list[ModelResponse]:
     """Get all models from a specific provider."""
-    return [model for model in AVAILABLE_MODELS if model.provider.lower() == provider.lower()]
+    return list(_BY_PROVIDER.get(provider.lower(), ()))
 
 
 def get_models_by_capability(capability: str) -> list[ModelResponse]:
     """Get all models with a specific capability."""
-    return [
-        model for model in AVAILABLE_MODELS
-        if model.capabilities and capability in model.capabilities
-    ]
+    return list(_BY_CAPABILITY.get(capability, ()))
 
 
 def get_models_by_type(input_type: MediaType = None, output_type: MediaType = None) -> list[ModelResponse]:
     """Get all models filtered by input and/or output type."""
-    models = AVAILABLE_MODELS
-    if input_type:
-        models = [m for m in models if m.input_type == input_type]
-    if output_type:
-        models = [m for m in models if m.output_type == output_type]
-    return models
+    return list(_BY_TYPE.get((input_type or None, output_type or None), ()))
+
+
+def find_models(
+    provider: str = None, capability: str = None, input_type: MediaType = None, output_type: MediaType = None
+) -> list[ModelResponse]:
+    """Get the models matching every given filter, in registry order."""
+    matches = [_BY_TYPE.get((input_type or None, output_type or None), [])]
+    if provider is not None:
+        matches.append(_BY_PROVIDER.get(provider.lower(), []))
+    if capability is not None:
+        matches.append(_BY_CAPABILITY.get(capability, []))
+    smallest = min(matches, key=len)
+    others = [{model.id for model in models} for models in matches if models is not smallest]
+    return [model for model in smallest if all(model.id in ids for ids in others)]
+
+
+@lru_cache(maxsize=256)
+def models_json(
+    provider: str = None, capability: str = None, input_type: MediaType = None, output_type: MediaType = None
+) -> tuple[bytes, str]:
+    """
+    Serialized `find_models` result, cached per filter combination.
+
+    Returns:
+        The JSON array of models, and a strong ETag for it
+    """
+    body = _MODEL_LIST.dump_json(find_models(provider, capability, input_type, output_type))
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+class RegistryModel(Model):
+    """
+    Arena model for a registry entry.
+
+    Stands in for the provider call until model functions are wired up: the
+    model is identified (and rated) by its registry ID; text models echo
+    their input (streamed word by word, as an LLM streams tokens) and audio
+    models return silence as long as reading it would take.
+    """
+
+    def __init__(self, model_id: str):
+        self.info = get_model_by_id(model_id)
+        speaks = self.info is not None and self.info.output_type == MediaType.AUDIO
+        super().__init__(model_id, _silence if speaks else _echo)
+
+    def __call__(self, input_data):
+        return self.function(input_data)
+
+    async def astream(self, chunks: AsyncIterator) -> AsyncIterator:
+        if self.function is not _echo:
+            async for output in super().astream(chunks):
+                yield output
+            return
+        async for chunk in chunks:
+            for word in _WORDS.findall(chunk) if isinstance(chunk, str) else [chunk]:
+                await asyncio.sleep(0)
+                yield word
+
+
+# Words with the whitespace after them, so the words join back into the text
+_WORDS = re.compile(r"\s*\S+\s*|\s+")
+
+
+def _echo(input_data):
+    return input_data
+
+
+def _silence(text: str) -> bytes:
+    # Roughly 15 characters per second of speech
+    return silent_wav(round(min(len(text) / 15, 30.0), 1))
+
+
+@lru_cache(maxsize=64)
+def silent_wav(seconds: float = 1.0, rate: int = 16000) -> bytes:
+    """Mono 16-bit WAV of silence, standing in for TTS output."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as audio:
+        audio.setnchannels(1)
+        audio.setsampwidth(2)
+        audio.setframerate(rate)
+        audio.writeframes(bytes(2 * int(seconds * rate)))
+    return buffer.getvalue()
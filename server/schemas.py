@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Union
 from enum import Enum
 
 
@@ -41,17 +41,55 @@ class StartSessionResponse(BaseModel):
 
 
 class ProcessInputRequest(BaseModel):
-    """Request to process input through two randomly selected chains."""
+    """Request to process input through the next matchup of two chains."""
     session_id: str
     user_input: str
 
 
+class BlobRef(BaseModel):
+    """Reference to a binary output in the blob store, downloadable from `url`."""
+    digest: str  # SHA-256 of the content
+    size: int
+    content_type: str
+    url: str
+
+
 class ProcessInputResponse(BaseModel):
-    """Response containing outputs from two chains."""
+    """Response containing outputs from two chains (text inline, media as blob references)."""
+    session_id: str
+    matchup_id: str
+    output_a: Union[str, BlobRef]
+    output_b: Union[str, BlobRef]
+
+
+class BatchProcessRequest(BaseModel):
+    """Request to process many inputs, each through its own matchup."""
+    session_id: str
+    user_inputs: List[str]
+
+
+class BatchProcessResult(BaseModel):
+    """Outputs for one input of a batch, or the error that input hit."""
+    matchup_id: Optional[str] = None
+    output_a: Optional[Union[str, BlobRef]] = None
+    output_b: Optional[Union[str, BlobRef]] = None
+    error: Optional[str] = None
+
+
+class BatchProcessResponse(BaseModel):
+    """Results of a batch, in input order."""
+    session_id: str
+    results: List[BatchProcessResult]
+
+
+class ProcessStreamEvent(BaseModel):
+    """A single server-sent event from a streaming process request."""
     session_id: str
     matchup_id: str
-    output_a: str
-    output_b: str
+    output: Optional[str] = None  # "A" or "B"; None for the terminal "done" event
+    chunk: Optional[str] = None
+    encoding: str = "text"  # "text", or "base64" for binary (e.g. audio) chunks
+    error: Optional[str] = None
 
 
 class VoteRequest(BaseModel):
@@ -67,3 +105,33 @@ class VoteResponse(BaseModel):
     matchup_id: str
     vote: str
     message: str
+
+
+class BulkVoteResult(BaseModel):
+    """Outcome of one line of a bulk vote upload (one NDJSON line per vote)."""
+    line: int  # 1-based line number in the upload
+    session_id: Optional[str] = None
+    matchup_id: Optional[str] = None
+    status: int  # HTTP status the vote would have got from /session/vote
+    error: Optional[str] = None
+
+
+class LeaderboardEntry(BaseModel):
+    """A ranked chain and its rating."""
+    rank: int  # 0-based
+    chain: List[str]
+    rating: float
+
+
+class LeaderboardResponse(BaseModel):
+    """A page of a session's chain leaderboard."""
+    session_id: str
+    version: int  # Changes whenever any rating changes
+    entries: List[LeaderboardEntry]
+
+
+class SessionMemory(BaseModel):
+    """Approximate memory held by a session in the responding worker."""
+    session_id: str
+    bytes: int
+    is_writer: bool  # Whether this worker applies the session's votes
@@ -0,0 +1,799 @@
+"""
+Arena session storage shared between uvicorn worker processes.
+
+Sessions have two tiers:
+
+- Persistent: one SQLite database (WAL mode, safe for concurrent worker
+  processes) holding each session's chain specification and its most
+  recent matchups, a segmented `VoteWAL` holding every vote, which every
+  worker appends to with group commit, and a checkpoint of each session's
+  arena.
+- Memory: each worker keeps an LRU of session handles (arena, shared rating
+  segment, writer state), loading sessions other workers created on demand.
+
+Ratings are not stored in SQLite: every session directory under the root
+holds a `SharedRatings` segment that every worker maps and reads without
+locks, and a `writer.lock` that one worker holds while it applies the
+session's votes to its arena and publishes each batch to the segment. A
+worker taking the lock (at startup, or because the previous writer exited)
+loads the session's checkpoint and replays only the votes logged after it.
+
+Sessions idle for longer than the TTL are deleted from both tiers.
+"""
+
+import asyncio
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import types
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from typing import Any, Callable, List, Optional, Sequence
+
+import numpy as np
+from arena import (
+    ArenaBase,
+    ModelChain,
+    RatingSnapshot,
+    SharedRatings,
+    VoteIngestor,
+    VoteOutcome,
+    VoteWAL,
+    WALRecord,
+    WriterLease,
+    checkpoint_bytes,
+    checkpoint_position,
+    load_checkpoint,
+    log_position,
+    replay_records,
+    save_checkpoint,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    model_chains TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_active REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS matchups (
+    session_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    chain_a INTEGER NOT NULL,
+    chain_b INTEGER NOT NULL,
+    user_input TEXT NOT NULL,
+    vote TEXT,
+    UNIQUE (session_id, id)
+);
+CREATE INDEX IF NOT EXISTS matchups_by_session ON matchups (session_id);
+"""
+
+_TOUCH = "UPDATE sessions SET last_active = MAX(last_active, ?) WHERE id = ?"
+
+
+_OPAQUE = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    asyncio.AbstractEventLoop,
+)
+
+
+class DuplicateVote(Exception):
+    """A vote was already recorded for the matchup (by any worker)."""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open the session database in WAL mode, creating the schema if needed."""
+    # Used from the store's worker threads, one at a time (see `SessionStore.run_db`)
+    connection = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(_SCHEMA)
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(matchups)")}
+    if "vote" not in columns:
+        # Databases created before votes moved to the vote log
+        connection.execute("ALTER TABLE matchups ADD COLUMN vote TEXT")
+    return connection
+
+
+def deep_sizeof(obj: Any, seen: Optional[set[int]] = None) -> int:
+    """
+    Approximate bytes held by an object and everything it references.
+
+    Follows containers, `__dict__` and `__slots__`; counts shared objects
+    once and skips functions, classes and modules.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, _OPAQUE):
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is None else 0)
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, (dict, types.MappingProxyType)):
+        return size + sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + sum(deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+class SharedSession:
+    """
+    One worker's handle on a stored session.
+
+    Attributes:
+        session_id: Session identifier
+        key: Session identifier as stored in the vote log
+        model_chains: Chain specification (lists of model IDs)
+        arena: Local arena; only mutated while this worker is the writer
+        ratings: Read-only view of the shared rating segment
+        last_active: Last time this worker served the session (epoch seconds)
+        expired: Whether the session was deleted (its handle is no longer checkpointed)
+    """
+
+    def __init__(
+        self,
+        store: "SessionStore",
+        session_id: str,
+        model_chains: List[List[str]],
+        arena: ArenaBase,
+    ):
+        self.store = store
+        self.session_id = session_id
+        self.key = uuid.UUID(session_id)
+        self.model_chains = model_chains
+        self.arena = arena
+        self.directory = store.session_directory(session_id)
+        self.ratings = SharedRatings(
+            os.path.join(self.directory, "ratings"),
+            arena.model_elos.keys_by_id,
+            arena.chain_elos.keys_by_id,
+            window=arena.matchmaker.window,
+            explore=arena.matchmaker.explore,
+        )
+        self.rng = random.Random()
+        self.last_active = time.time()
+        self._persisted_active = self.last_active
+        self._lease = WriterLease(os.path.join(self.directory, "writer.lock"))
+        # Writer state, set up when this worker takes the lease
+        self._ingestor: Optional[VoteIngestor] = None
+        self._publisher: Optional[SharedRatings] = None
+        self.checkpoint_path = os.path.join(self.directory, "checkpoint")
+        # Log position up to which the writer has queued votes
+        self._position = 0
+        # Votes queued since the last checkpoint, and when it was taken
+        self._unsaved = 0
+        self._checkpointed = 0.0
+        self._closed = False
+        self.expired = False
+
+    @property
+    def is_writer(self) -> bool:
+        return self._lease.held
+
+    async def touch(self) -> None:
+        """Mark the session active (persisted at most every `store.touch_interval`)."""
+        self.last_active = time.time()
+        if self.last_active - self._persisted_active >= self.store.touch_interval:
+            await self.persist_activity()
+
+    async def persist_activity(self) -> None:
+        """Write `last_active` to SQLite, where every worker sees it."""
+        active = self.last_active
+        # Set first, so concurrent touches do not write it again
+        self._persisted_active = active
+        await self.store.run_db(lambda db: db.execute(_TOUCH, (active, self.session_id)))
+
+    # === Reads ===
+
+    def snapshot(self) -> RatingSnapshot:
+        """Latest ratings published by the writer."""
+        return self.ratings.snapshot()
+
+    def generate_matchup(self) -> tuple[ModelChain, ModelChain]:
+        return self.snapshot().generate_matchup(self.rng)
+
+    async def get_matchup(self, matchup_id: str) -> Optional[dict]:
+        """
+        Look up a matchup created by any worker.
+
+        Returns:
+            Dict with "user_input", "chains" (names) and "matchup" (chain
+            objects), or None if unknown or evicted by the matchup cap
+        """
+        row = await self.store.run_db(
+            lambda db: db.execute(
+                "SELECT chain_a, chain_b, user_input FROM matchups WHERE session_id = ? AND id = ?",
+                (self.session_id, matchup_id),
+            ).fetchone()
+        )
+        if row is None:
+            return None
+        chains = self.arena.chain_elos.keys_by_id
+        chain_a, chain_b = chains[row[0]], chains[row[1]]
+        return {
+            "user_input": row[2],
+            "chains": [list(chain_a.names), list(chain_b.names)],
+            "matchup": (chain_a, chain_b),
+        }
+
+    @property
+    def pending_votes(self) -> int:
+        """Votes handed to this worker's rating writer but not yet applied (0 if it is not the writer)."""
+        return self._ingestor.pending if self._ingestor is not None else 0
+
+    def memory_usage(self) -> int:
+        """Approximate bytes this worker holds for the session."""
+        ingested = self._ingestor.snapshot if self._ingestor is not None else None
+        return deep_sizeof((self.arena, self.ratings, ingested))
+
+    # === Writes (any worker) ===
+
+    async def add_matchup(self, matchup_id: str, chain_a: ModelChain, chain_b: ModelChain, user_input: str) -> None:
+        """Store a matchup, dropping the session's oldest ones beyond the cap."""
+        await self.add_matchups([(matchup_id, chain_a, chain_b, user_input)])
+
+    async def add_matchups(self, matchups: Sequence[tuple[str, ModelChain, ModelChain, str]]) -> None:
+        """
+        Store matchups in one transaction, dropping the session's oldest ones beyond the cap.
+
+        Args:
+            matchups: (matchup ID, chain A, chain B, user input) per matchup
+        """
+        chain_id = self.arena.chain_elos.id_of
+        rows = [
+            (self.session_id, matchup_id, chain_id(chain_a), chain_id(chain_b), user_input)
+            for matchup_id, chain_a, chain_b, user_input in matchups
+        ]
+
+        def insert(db: sqlite3.Connection) -> None:
+            with db:
+                db.execute("BEGIN IMMEDIATE")
+                db.executemany(
+                    "INSERT INTO matchups (session_id, id, chain_a, chain_b, user_input) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                db.execute(
+                    "DELETE FROM matchups WHERE session_id = ?1 AND rowid <= ("
+                    "SELECT rowid FROM matchups WHERE session_id = ?1 ORDER BY rowid DESC LIMIT 1 OFFSET ?2)",
+                    (self.session_id, self.store.max_matchups),
+                )
+
+        await self.store.run_db(insert)
+
+    async def add_vote(self, matchup_id: str, vote: VoteOutcome) -> None:
+        """
+        Log a vote for the writer to apply.
+
+        The matchup is claimed in SQLite first, so concurrent votes for it
+        from any worker are refused, then the vote is appended to the log.
+        Returns once the vote is durable; ratings reflect it after the
+        writer's next batch.
+
+        Raises:
+            KeyError: If the matchup is unknown
+            DuplicateVote: If the matchup already has a vote
+            OSError: If the vote could not be logged (the matchup is released)
+        """
+        (error,) = await self.add_votes([(matchup_id, vote)])
+        if error is not None:
+            raise error
+
+    async def add_votes(self, votes: Sequence[tuple[str, VoteOutcome]]) -> list[Optional[Exception]]:
+        """
+        Log many votes: one transaction claims their matchups and the log
+        appends share group commits.
+
+        Args:
+            votes: (matchup ID, outcome) per vote
+
+        Returns:
+            Per vote, None if it was logged, else the error `add_vote` would
+            raise for it (KeyError, DuplicateVote or OSError)
+        """
+        errors: list[Optional[Exception]] = [None] * len(votes)
+
+        def claim(db: sqlite3.Connection) -> dict[int, WALRecord]:
+            records = {}
+            with db:
+                db.execute("BEGIN IMMEDIATE")
+                for i, (matchup_id, vote) in enumerate(votes):
+                    row = db.execute(
+                        "SELECT chain_a, chain_b, vote FROM matchups WHERE session_id = ? AND id = ?",
+                        (self.session_id, matchup_id),
+                    ).fetchone()
+                    if row is None:
+                        errors[i] = KeyError(matchup_id)
+                        continue
+                    if row[2] is not None:
+                        errors[i] = DuplicateVote(matchup_id)
+                        continue
+                    db.execute(
+                        "UPDATE matchups SET vote = ? WHERE session_id = ? AND id = ?",
+                        (vote.value, self.session_id, matchup_id),
+                    )
+                    records[i] = WALRecord(
+                        session=self.key,
+                        matchup=uuid.UUID(matchup_id),
+                        chain_a=row[0],
+                        chain_b=row[1],
+                        outcome=vote,
+                        timestamp=time.time(),
+                    )
+            return records
+
+        def release(db: sqlite3.Connection, indices: list[int]) -> None:
+            db.executemany(
+                "UPDATE matchups SET vote = NULL WHERE session_id = ? AND id = ?",
+                [(self.session_id, votes[i][0]) for i in indices],
+            )
+
+        records = await self.store.run_db(claim)
+        try:
+            results = await asyncio.gather(
+                *(self.store.wal.append(record) for record in records.values()), return_exceptions=True
+            )
+        except BaseException:
+            # The release runs in its thread even if this task is cancelled again
+            await self.store.run_db(release, list(records))
+            raise
+        failed = []
+        for i, result in zip(records, results):
+            if isinstance(result, BaseException):
+                errors[i] = result
+                failed.append(i)
+        if failed:
+            await self.store.run_db(release, failed)
+        return errors
+
+    # === Writer role ===
+
+    async def pump(self, records: Sequence[WALRecord] = (), start: int = 0, end: int = 0) -> None:
+        """
+        Take over as the writer if this worker just got the role (see
+        `SessionStore.sync`), else queue the session's new votes if it has it.
+
+        Args:
+            records: This session's votes between log positions `start` and
+                `end`, read by the store's last sync
+            start: Log position the store's last sync read from
+            end: Log position the store's last sync read up to
+        """
+        if self._ingestor is None:
+            if self._lease.held:
+                await self._take_over()
+            return
+        if end <= self._position:
+            return  # already included when taking over
+        if start < self._position:
+            records, _ = await asyncio.to_thread(self.store.wal.read, self._position, end, session=self.key)
+        chains = self.arena.chain_elos.keys_by_id
+        for record in records:
+            await self._ingestor.submit(chains[record.chain_a], chains[record.chain_b], record.outcome)
+        self._position = end
+        self._unsaved += len(records)
+
+    async def _take_over(self) -> None:
+        """Rebuild the arena from the latest checkpoint plus the votes logged after it."""
+        end = self.store.wal_position
+
+        def rebuild() -> tuple[int, int, SharedRatings]:
+            start = None
+            try:
+                start = load_checkpoint(self.checkpoint_path, self.arena)
+            except FileNotFoundError:
+                pass
+            except ValueError:
+                # Unusable (e.g. the chain specification changed): replay the whole log
+                self.arena = self.store.build_arena(self.model_chains)
+            if start is not None and start >= end:
+                # Another worker's checkpoint, ahead of this worker's sync
+                position, unsaved = start, 0
+            else:
+                logged, _ = self.store.wal.read(start, end, session=self.key)
+                replay_records(self.arena, logged)
+                position, unsaved = end, len(logged)
+            publisher = SharedRatings(self.ratings.path, self.ratings.models, self.ratings.chains, writable=True)
+            publisher.publish(self.arena.snapshot())
+            return position, unsaved, publisher
+
+        self._position, self._unsaved, self._publisher = await asyncio.to_thread(rebuild)
+        self._checkpointed = time.monotonic()
+        self._ingestor = VoteIngestor(self.arena, on_snapshot=self._publisher.publish)
+
+    async def checkpoint(self) -> bool:
+        """
+        Save the arena if this worker is the writer and votes arrived since the last save.
+
+        Returns:
+            Whether a checkpoint was written
+        """
+        if self._ingestor is None or not self._unsaved or self.expired:
+            return False
+        await self._ingestor.drain()
+        # Serialized here: nothing is queued until this returns
+        data = checkpoint_bytes(self.arena, self._position)
+        await asyncio.to_thread(save_checkpoint, self.checkpoint_path, data)
+        self._unsaved = 0
+        self._checkpointed = time.monotonic()
+        return True
+
+    async def close(self) -> None:
+        """Apply and checkpoint the queued votes if this worker is the writer, then give up the role."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._ingestor is not None:
+            await self.checkpoint()
+            await self._ingestor.stop()
+            self._publisher.close()
+            self._ingestor = self._publisher = None
+        self._lease.release()
+        self.ratings.close()
+
+
+class SessionStore:
+    """
+    Sessions in SQLite, with an LRU of loaded sessions in each worker.
+
+    Database, log and filesystem work runs in worker threads, never on the
+    event loop; database calls are serialized through `run_db`, since the
+    worker shares one connection.
+
+    Sessions created by other workers are loaded on first access. The
+    memory tier holds at most `max_sessions` handles; the least recently
+    used are closed (their votes stay in the log). Sessions idle for `ttl`
+    seconds in every worker are deleted.
+
+    Votes logged by any worker reach this worker's writers through `sync`,
+    which reads the log from where it last stopped. Writers checkpoint their
+    arena every `checkpoint_interval` seconds (if votes arrived), and log
+    segments whose votes are all covered by checkpoints (or belong to
+    deleted sessions) are moved to `archive/`, so taking over a session
+    replays at most one interval of votes.
+
+    Attributes:
+        root: Directory shared by every worker (database, vote log and rating segments)
+        max_sessions: Session handles kept in this worker's memory
+        ttl: Seconds of inactivity before a session is deleted
+        max_matchups: Most recent matchups kept per session
+        checkpoint_interval: Seconds between checkpoints of a session with new votes
+    """
+
+    def __init__(
+        self,
+        root: str,
+        build_arena: Callable[[List[List[str]]], ArenaBase],
+        max_sessions: int = 1000,
+        ttl: float = 24 * 3600,
+        max_matchups: int = 1000,
+        poll_interval: float = 0.05,
+        checkpoint_interval: float = 60.0,
+        segment_size: int = 16 * 2**20,
+    ):
+        """
+        Args:
+            root: Directory shared by every worker
+            build_arena: Builds an arena from a chain specification; must
+                be deterministic, since every worker builds its own copy
+            max_sessions: Session handles kept in memory (default: 1000)
+            ttl: Idle seconds before a session is deleted (default: 1 day)
+            max_matchups: Most recent matchups kept per session (default: 1000)
+            poll_interval: Seconds between checks for votes logged by other workers
+            checkpoint_interval: Seconds between checkpoints of a session
+                with new votes (default: 60)
+            segment_size: Bytes per vote log segment (default: 16 MiB)
+        """
+        self.root = root
+        self.build_arena = build_arena
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_matchups = max_matchups
+        self.poll_interval = poll_interval
+        self.checkpoint_interval = checkpoint_interval
+        self.segment_size = segment_size
+        # Bounds how stale `last_active` in SQLite can be
+        self.touch_interval = min(60.0, ttl / 10)
+        os.makedirs(root, exist_ok=True)
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._wal: Optional[VoteWAL] = None
+        self._wal_lock = threading.Lock()
+        self._wal_position = 0
+        # Sessions with votes in each sealed segment, filled by `compact`
+        self._segment_sessions: dict[int, set[uuid.UUID]] = {}
+        self._sessions: OrderedDict[str, SharedSession] = OrderedDict()
+        self._evicted: list[SharedSession] = []
+        self._wake: Optional[asyncio.Event] = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        """Connection to the session database (reopened after `close`); use it through `run_db`."""
+        if self._db is None:
+            self._db = connect(os.path.join(self.root, "sessions.db"))
+        return self._db
+
+    async def run_db(self, function: Callable[..., Any], *args: Any) -> Any:
+        """
+        Call `function(db, *args)` in a worker thread, one call at a time.
+
+        Calls are serialized because they share the connection, whose
+        transactions must not interleave.
+
+        Returns:
+            What the function returned
+        """
+
+        def call() -> Any:
+            with self._db_lock:
+                return function(self.db, *args)
+
+        return await asyncio.to_thread(call)
+
+    @property
+    def wal(self) -> VoteWAL:
+        """The vote log (recovered by the first worker to open it, reopened after `close`)."""
+        with self._wal_lock:
+            if self._wal is None:
+                self._wal = VoteWAL(os.path.join(self.root, "votes"), segment_size=self.segment_size)
+                # Writers rebuild from their checkpoint and the log when they
+                # take over, so only votes logged from now on need dispatching
+                self._wal_position = self._wal.valid_end()
+            return self._wal
+
+    @property
+    def wal_position(self) -> int:
+        """Log position up to which votes have been handed to this worker's writers."""
+        return self._wal_position
+
+    def session_directory(self, session_id: str) -> str:
+        return os.path.join(self.root, session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    async def create(self, model_chains: List[List[str]]) -> SharedSession:
+        """Create a session; the first worker to poll it becomes its writer."""
+        session_id = str(uuid.uuid4())
+
+        def build() -> SharedSession:
+            os.makedirs(self.session_directory(session_id))
+            arena = self.build_arena(model_chains)
+            SharedRatings.create(os.path.join(self.session_directory(session_id), "ratings"), arena).close()
+            return SharedSession(self, session_id, model_chains, arena)
+
+        session = await asyncio.to_thread(build)
+        # Inserted last: other workers only see fully created sessions
+        now = time.time()
+        await self.run_db(
+            lambda db: db.execute(
+                "INSERT INTO sessions VALUES (?, ?, ?, ?)", (session_id, json.dumps(model_chains), now, now)
+            )
+        )
+        self._remember(session)
+        return session
+
+    async def get(self, session_id: str) -> Optional[SharedSession]:
+        """Session by ID (loaded from SQLite if needed), marked as active."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            row = await self.run_db(
+                lambda db: db.execute("SELECT model_chains FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            )
+            if row is None:
+                return None
+            model_chains = json.loads(row[0])
+            loaded = await asyncio.to_thread(
+                lambda: SharedSession(self, session_id, model_chains, self.build_arena(model_chains))
+            )
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = loaded
+                self._remember(session)
+            else:
+                await loaded.close()  # loaded concurrently by another request
+        else:
+            self._sessions.move_to_end(session_id)
+        await session.touch()
+        return session
+
+    def _remember(self, session: SharedSession) -> None:
+        self._sessions[session.session_id] = session
+        while len(self._sessions) > self.max_sessions:
+            _, evicted = self._sessions.popitem(last=False)
+            self._evicted.append(evicted)  # closed by the background loop
+        self.notify()
+
+    # === Eviction ===
+
+    async def expire(self, now: Optional[float] = None) -> list[str]:
+        """
+        Delete sessions idle for longer than the TTL (in every worker).
+
+        Loaded sessions that another worker deleted are dropped as well.
+
+        Returns:
+            IDs of the deleted sessions
+        """
+        cutoff = (time.time() if now is None else now) - self.ttl
+        # Publish fresher activity seen by this worker before deciding
+        fresher = []
+        for session in self._sessions.values():
+            if session.last_active > session._persisted_active:
+                session._persisted_active = session.last_active
+                fresher.append((session.last_active, session.session_id))
+
+        loaded = json.dumps(list(self._sessions))
+
+        def delete(db: sqlite3.Connection) -> tuple[list[str], list[str]]:
+            db.executemany(_TOUCH, fresher)
+            expired = [row[0] for row in db.execute("SELECT id FROM sessions WHERE last_active < ?", (cutoff,))]
+            if expired:
+                with db:
+                    db.execute("BEGIN IMMEDIATE")
+                    for session_id in expired:
+                        db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+                        db.execute("DELETE FROM matchups WHERE session_id = ?", (session_id,))
+            gone = [
+                row[0]
+                for row in db.execute(
+                    "SELECT value FROM json_each(?) WHERE value NOT IN (SELECT id FROM sessions)", (loaded,)
+                )
+            ]
+            return expired, gone
+
+        expired, gone = await self.run_db(delete)
+        for session_id in gone:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                session.expired = True
+                self._evicted.append(session)
+
+        def remove() -> None:
+            for session_id in expired:
+                shutil.rmtree(self.session_directory(session_id), ignore_errors=True)
+
+        await asyncio.to_thread(remove)
+        return expired
+
+    def loaded(self) -> list[SharedSession]:
+        """Sessions in this worker's memory tier, least recently used first."""
+        return list(self._sessions.values())
+
+    def memory_usage(self) -> dict[str, int]:
+        """Approximate bytes held in this worker, per loaded session."""
+        return {session_id: session.memory_usage() for session_id, session in self._sessions.items()}
+
+    # === Background work ===
+
+    def notify(self) -> None:
+        """Wake the background loop, e.g. after this worker stored a vote."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def sync(self) -> None:
+        """
+        Hand votes logged since the last sync to the writers in this worker,
+        and take the writer role of loaded sessions that have none.
+        """
+        start = self.wal_position
+        sessions = list(self._sessions.values()) + self._evicted
+
+        def poll() -> tuple[list[WALRecord], int]:
+            for session in sessions:
+                if not session.is_writer:
+                    session._lease.acquire()
+            return self.wal.read(start)
+
+        records, self._wal_position = await asyncio.to_thread(poll)
+        by_session = defaultdict(list)
+        for record in records:
+            by_session[record.session].append(record)
+        for session in sessions:
+            await session.pump(by_session.get(session.key, ()), start, self._wal_position)
+
+    async def checkpoint(self, force: bool = False) -> int:
+        """
+        Checkpoint the sessions this worker writes whose last checkpoint is
+        older than `checkpoint_interval` (all of them if `force`).
+
+        Returns:
+            Number of checkpoints written
+        """
+        due = time.monotonic() - self.checkpoint_interval
+        written = 0
+        for session in list(self._sessions.values()):
+            if session.is_writer and (force or session._checkpointed <= due):
+                written += await session.checkpoint()
+        return written
+
+    def compact(self) -> list[int]:
+        """
+        Archive sealed log segments whose votes no session still needs (blocking).
+
+        A segment is no longer needed once every session with votes in it
+        has a checkpoint past the segment's end or has been deleted. At most
+        one worker compacts at a time.
+
+        Returns:
+            Numbers of the archived segments
+        """
+        lease = WriterLease(os.path.join(self.root, "compact.lock"))
+        if not lease.acquire():
+            return []
+        archived = []
+        try:
+            wal = self.wal
+            for segment in wal.segments()[:-1]:
+                if not wal.is_sealed(segment):
+                    break
+                sessions = self._segment_sessions.get(segment)
+                if sessions is None:
+                    sessions = self._segment_sessions[segment] = wal.sessions_in(segment)
+                following = log_position(segment + 1, 0)
+                for session_id in map(str, sessions):
+                    covered = checkpoint_position(os.path.join(self.session_directory(session_id), "checkpoint"))
+                    if os.path.isdir(self.session_directory(session_id)) and (covered or 0) < following:
+                        break
+                else:
+                    wal.archive(segment, os.path.join(self.root, "archive"))
+                    del self._segment_sessions[segment]
+                    archived.append(segment)
+        finally:
+            lease.release()
+        return archived
+
+    async def run(self, expire_interval: float = 60.0) -> None:
+        """
+        Feed session writers, close evicted sessions and checkpoint them, and
+        expire idle sessions and compact the log every `expire_interval`
+        seconds (until cancelled).
+        """
+        self._wake = asyncio.Event()
+        next_expiry = time.monotonic()
+        while True:
+            self._wake.clear()
+            if time.monotonic() >= next_expiry:
+                await self.expire()
+                await asyncio.to_thread(self.compact)
+                next_expiry = time.monotonic() + expire_interval
+            await self.sync()
+            while self._evicted:
+                await self._evicted.pop().close()
+            await self.checkpoint()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def close(self) -> None:
+        if self._wal is not None:
+            await self.sync()
+        sessions = list(self._sessions.values()) + self._evicted
+        await asyncio.gather(*(session.close() for session in sessions))
+        self._sessions.clear()
+        self._evicted.clear()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+from server import main
+from server.blob_store import BlobStore, BlobTooLarge, etag_matches, parse_range
+
+DATA = bytes(range(256)) * 40
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def files(store: BlobStore) -> list[str]:
+    """Every file under the store, relative to its root (lock files excluded)."""
+    return sorted(
+        os.path.relpath(os.path.join(directory, name), store.root)
+        for directory, _, names in os.walk(store.root)
+        for name in names
+        if name != ".lock"
+    )
+
+
+def age(store: BlobStore, digest: str, seconds: float) -> None:
+    """Make a blob look last stored `seconds` ago."""
+    then = time.time() - seconds
+    os.utime(store.path(digest), (then, then))
+
+
+class TestBlobStore:
+    def test_put_deduplicates(self, tmp_path):
+        """Test storing content again keeps one file and its first type, and refreshes it."""
+        store = BlobStore(str(tmp_path))
+        blob = store.put(DATA, "audio/wav")
+        assert blob.digest == hashlib.sha256(DATA).hexdigest() and blob.size == len(DATA)
+        age(store, blob.digest, 100)
+
+        assert store.put(DATA, "audio/mpeg") == blob
+        assert time.time() - os.path.getmtime(store.path(blob.digest)) < 10
+        with open(store.path(blob.digest), "rb") as file:
+            assert file.read() == DATA
+        assert files(store) == [f"{blob.digest[:2]}/{blob.digest}", f"{blob.digest[:2]}/{blob.digest}.type"]
+
+    def test_put_stream(self, tmp_path):
+        """Test streamed content is spooled in batches and deduplicated against stored blobs."""
+        store = BlobStore(str(tmp_path))
+        store.spool_size = 1000
+        parts = [DATA[i : i + 700] for i in range(0, len(DATA), 700)]
+        blob = asyncio.run(store.put_stream(chunks(*parts), "image/png"))
+        assert blob == store.get(blob.digest) == store.put(DATA, "image/png")
+        with open(store.path(blob.digest), "rb") as file:
+            assert file.read() == DATA
+        assert os.listdir(tmp_path / "incoming") == []
+
+    def test_put_stream_too_large(self, tmp_path):
+        """Test a stream over its limit stores nothing and leaves no temporary file."""
+        store = BlobStore(str(tmp_path))
+        with pytest.raises(BlobTooLarge):
+            asyncio.run(store.put_stream(chunks(DATA, DATA), max_size=len(DATA) + 1))
+        assert files(store) == []
+
+    def test_prune(self, tmp_path):
+        """Test prune deletes old blobs with their type, stray types and stale temporary files."""
+        store = BlobStore(str(tmp_path))
+        old, fresh = store.put(b"old", "audio/wav"), store.put(b"fresh", "audio/wav")
+        age(store, old.digest, 100)
+        stray = store.path(hashlib.sha256(b"gone").hexdigest())
+        os.makedirs(os.path.dirname(stray), exist_ok=True)
+        with open(f"{stray}.type", "w") as file:
+            file.write("audio/wav")
+        leftover = tmp_path / "incoming" / "leftover"
+        leftover.write_bytes(b"partial")
+        os.utime(leftover, (time.time() - 100, time.time() - 100))
+
+        assert store.prune(max_age=50) == 1
+        assert store.get(old.digest) is None and store.get(fresh.digest) == fresh
+        assert files(store) == [f"{fresh.digest[:2]}/{fresh.digest}", f"{fresh.digest[:2]}/{fresh.digest}.type"]
+        assert store.prune(max_age=50) == 0
+
+
+class TestHeaders:
+    def test_parse_range(self):
+        """Test single ranges resolve to [start, end) offsets and others serve everything."""
+        assert parse_range("bytes=0-99", 1000) == (0, 100)
+        assert parse_range("bytes=900-", 1000) == (900, 1000)
+        assert parse_range("bytes=-100", 1000) == (900, 1000)
+        assert parse_range("bytes=-5000", 1000) == (0, 1000)
+        assert parse_range("bytes=990-5000", 1000) == (990, 1000)
+        for header in (None, "bytes=0-1,5-9", "items=0-1", "bytes=-"):
+            assert parse_range(header, 1000) is None
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=2000-3000", "bytes=-0", "bytes=50-10"])
+    def test_unsatisfiable_range(self, header):
+        """Test ranges outside the content are refused."""
+        with pytest.raises(ValueError):
+            parse_range(header, 1000)
+
+    def test_etag_matches(self):
+        """Test If-None-Match lists, weak tags and the wildcard match."""
+        assert etag_matches('"a", "b"', '"b"')
+        assert etag_matches('W/"b"', '"b"')
+        assert etag_matches(" * ", '"b"')
+        assert not etag_matches('"a", "bb"', '"b"')
+        assert not etag_matches(None, '"b"')
+
+
+class TestBlobEndpoint:
+    @pytest.fixture
+    def blob(self, client):
+        return main.blobs.put(DATA, "audio/wav")
+
+    def test_whole_and_range(self, client, blob):
+        """Test blobs are served whole, or one range with 206 and Content-Range."""
+        response = client.get(f"/blobs/{blob.digest}")
+        assert response.status_code == 200 and response.content == DATA
+        assert response.headers["content-type"] == "audio/wav"
+        assert response.headers["etag"] == f'"{blob.digest}"'
+
+        response = client.get(f"/blobs/{blob.digest}", headers={"Range": "bytes=-10"})
+        assert response.status_code == 206 and response.content == DATA[-10:]
+        assert response.headers["content-range"] == f"bytes {len(DATA) - 10}-{len(DATA) - 1}/{len(DATA)}"
+
+    def test_unsatisfiable_range(self, client, blob):
+        """Test a range past the end answers 416 with the blob size."""
+        response = client.get(f"/blobs/{blob.digest}", headers={"Range": f"bytes={len(DATA)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+
+    def test_if_range(self, client, blob):
+        """Test a range is served only while If-Range still names the blob."""
+        etag = f'"{blob.digest}"'
+        response = client.get(f"/blobs/{blob.digest}", headers={"Range": "bytes=0-9", "If-Range": etag})
+        assert response.status_code == 206 and response.content == DATA[:10]
+        response = client.get(f"/blobs/{blob.digest}", headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+        assert response.status_code == 200 and response.content == DATA
+
+    @pytest.mark.parametrize("header", ['"other", "{digest}"', 'W/"{digest}"', "*"])
+    def test_not_modified(self, client, blob, header):
+        """Test a matching If-None-Match answers 304 without a body."""
+        response = client.get(f"/blobs/{blob.digest}", headers={"If-None-Match": header.format(digest=blob.digest)})
+        assert response.status_code == 304 and response.content == b""
+        assert response.headers["etag"] == f'"{blob.digest}"'
+
+    def test_head(self, client, blob):
+        """Test HEAD answers the headers of GET without the body."""
+        response = client.head(f"/blobs/{blob.digest}", headers={"Range": "bytes=10-19"})
+        assert response.status_code == 206 and response.content == b""
+        assert response.headers["content-length"] == "10"
+
+    def test_unknown_blob(self, client):
+        """Test unknown digests answer 404."""
+        assert client.get(f"/blobs/{'0' * 64}").status_code == 404
+        assert client.get("/blobs/not-a-digest").status_code == 404
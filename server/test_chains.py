@@ -0,0 +1,131 @@
+import asyncio
+import uuid
+
+import pytest
+from arena import CachedModel, CoalescedModel, SentenceBridge, VoteOutcome
+from server import main
+from server.chains import STAGE_CACHE, STAGE_CALLS, ChainError, chain_key, compile_chain, compile_plan
+from server.models_registry import RegistryModel
+from server.schemas import MediaType
+
+SPEC = [["gpt-4", "claude-3-haiku"], ["gpt-4", "mistral-large"], ["gpt-3.5-turbo"]]
+
+
+class TestCompileChain:
+    def test_interned(self):
+        """Test a chain compiles once, and chains share one model object per registry ID."""
+        chain = compile_chain(("gpt-4", "tts-1"))
+        assert compile_chain(("gpt-4", "tts-1")) is chain
+        assert chain.names == ("gpt-4", "tts-1")
+        assert compile_chain(("gpt-4",)).model_chain[0].model is chain.model_chain[0].model
+
+    def test_text_to_audio_stages_are_bridged(self):
+        """Test stages that speak text are wrapped to speak streamed text sentence by sentence."""
+        text, speech = compile_chain(("gpt-4", "tts-1")).model_chain
+        assert isinstance(text.model, CachedModel) and isinstance(text.model.model, CoalescedModel)
+        assert isinstance(text.model.model.model, RegistryModel)
+        assert isinstance(speech.model, SentenceBridge) and isinstance(speech.model.model, CachedModel)
+
+    def test_stage_outputs_cached(self):
+        """Test every stage serves a repeated input from the shared stage cache, keeping its name."""
+        chain = compile_chain(("gpt-4", "claude-3-haiku"))
+        user_input = f"cache me {uuid.uuid4()}"
+        hits = STAGE_CACHE.stats.hits
+        assert asyncio.run(chain.model_chain[0].acall(user_input)) == user_input
+        assert STAGE_CACHE.stats.hits == hits
+        assert asyncio.run(chain.model_chain[0].acall(user_input)) == user_input
+        assert STAGE_CACHE.stats.hits == hits + 1
+        assert chain.names == ("gpt-4", "claude-3-haiku")
+
+    def test_concurrent_identical_calls_coalesced(self):
+        """Test concurrent calls of a stage with the same uncached input share one model call."""
+        stage = compile_chain(("gpt-4",)).model_chain[0]
+        user_input = f"coalesce me {uuid.uuid4()}"
+        calls, coalesced = STAGE_CALLS.calls, STAGE_CALLS.coalesced
+
+        async def run():
+            return await asyncio.gather(stage.acall(user_input), stage.acall(user_input))
+
+        assert asyncio.run(run()) == [user_input, user_input]
+        assert (STAGE_CALLS.calls, STAGE_CALLS.coalesced) == (calls + 1, coalesced + 1)
+
+    @pytest.mark.parametrize("model_ids, message", [
+        ((), "Model chains cannot be empty"),
+        (("gpt-4", "no-such-model"), "Unknown model 'no-such-model'"),
+        (
+            ("tts-1", "gpt-4"),
+            "Incompatible types between OpenAI TTS-1 and GPT-4: OpenAI TTS-1 outputs audio but GPT-4 expects text",
+        ),
+    ])
+    def test_invalid(self, model_ids, message):
+        """Test empty chains, unknown models and mismatched adjacent stages are refused."""
+        with pytest.raises(ChainError) as error:
+            compile_chain(model_ids)
+        assert str(error.value) == message
+
+
+class TestCompilePlan:
+    def test_interned(self):
+        """Test the same specification returns the identical plan, sharing chains with other plans."""
+        plan = compile_plan(chain_key(SPEC))
+        assert compile_plan(chain_key([list(chain) for chain in SPEC])) is plan
+        assert plan.chains[2] is compile_plan((("gpt-3.5-turbo",), ("gpt-4",))).chains[0]
+        assert (plan.input_type, plan.output_type) == (MediaType.TEXT, MediaType.TEXT)
+        assert plan.planner.stage_count == 4
+
+    @pytest.mark.parametrize("model_chains, message", [
+        ((), "No model chains given"),
+        ((("gpt-4",), ()), "Chain 2: Model chains cannot be empty"),
+        ((("gpt-4",), ("gpt-4", "nope")), "Chain 2: Unknown model 'nope'"),
+        (
+            (("gpt-4",), ("gpt-4",), ("gpt-4", "tts-1")),
+            "Chain 3 has inconsistent output type: expected text but got audio",
+        ),
+        ((("gpt-4",), ("whisper-1",)), "Chain 2 has inconsistent input type: expected text but got audio"),
+    ])
+    def test_invalid(self, model_chains, message):
+        """Test plan errors name the chain they come from."""
+        with pytest.raises(ChainError) as error:
+            compile_plan(model_chains)
+        assert str(error.value) == message
+
+    def test_sessions_share_no_mutable_state(self):
+        """Test sessions over one plan share its chains and models but keep their own ratings."""
+        plan = compile_plan(chain_key(SPEC))
+        first, second = main._build_arena(SPEC), main._build_arena(SPEC)
+        assert first.model_chains == list(plan.chains) == second.model_chains
+        assert all(a is b for a, b in zip(first.model_chains, second.model_chains))
+        assert first.chain_elos is not second.chain_elos and first.model_elos is not second.model_elos
+        assert plan.planner.model_chains is plan.chains  # immutable
+
+        before = second.snapshot().chain_leaderboard
+        first.record_vote(plan.chains[0], plan.chains[2], VoteOutcome.A)
+        assert first.get_chain_elo(plan.chains[0]) > first.get_chain_elo(plan.chains[2])
+        assert second.snapshot().chain_leaderboard == before
+
+    def test_concurrent_runs_of_shared_planner(self):
+        """Test concurrent runs of one plan keep their inputs and outputs apart."""
+        plan = compile_plan(chain_key(SPEC))
+
+        async def run():
+            return await asyncio.gather(*(plan.planner.run(f"input {i}") for i in range(8)))
+
+        for i, outputs in enumerate(asyncio.run(run())):
+            assert outputs == {chain: f"input {i}" for chain in plan.chains}
+
+    def test_matchups_run_through_plan(self, client, monkeypatch):
+        """Test /session/process runs just the matchup's two chains through the interned plan's planner."""
+        plan = compile_plan(chain_key(SPEC))
+        run = plan.planner.run
+        calls = []
+
+        async def recorded(input_data, chains=None, on_output=None):
+            calls.append((input_data, tuple(chains)))
+            return await run(input_data, chains, on_output)
+
+        monkeypatch.setattr(plan.planner, "run", recorded)
+        session_id = client.post("/session/start", json={"model_chains": SPEC}).json()["session_id"]
+        response = client.post("/session/process", json={"session_id": session_id, "user_input": "hi"})
+        assert response.json()["output_a"] == response.json()["output_b"] == "hi"
+        [(user_input, chains)] = calls
+        assert user_input == "hi" and len(set(chains)) == 2 and set(chains) <= set(plan.chains)
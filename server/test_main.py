@@ -0,0 +1,314 @@
+import asyncio
+import base64
+import json
+
+from server import main
+from server.metrics import REGISTRY
+from server.models_registry import RegistryModel, silent_wav
+
+
+def sse_events(response) -> list[tuple[str, dict]]:
+    """Parse a server-sent event body into (event, data) pairs."""
+    events = []
+    for block in response.text.split("\n\n"):
+        if not block:
+            continue
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def stage_calls(model: str) -> int:
+    """Calls of a model stage timed so far in this process."""
+    series = REGISTRY.snapshot()["chainalign_stage_seconds"]["series"]
+    return sum(value["count"] for (name, _), value in series if name == model)
+
+
+def start(client, *model_chains) -> str:
+    return client.post("/session/start", json={"model_chains": list(model_chains)}).json()["session_id"]
+
+
+class TestProcess:
+    def test_chains_run_on_input(self, client, session_id):
+        """Test both chains of the matchup run on the user's input (the stand-in text models echo it)."""
+        response = client.post("/session/process", json={"session_id": session_id, "user_input": "What is 2+2?"})
+        assert response.status_code == 200
+        assert response.json()["output_a"] == response.json()["output_b"] == "What is 2+2?"
+
+    def test_shared_first_stage_runs_once(self, client):
+        """Test a stage both chains of a matchup start with is called once through the session's plan."""
+        session = start(client, ["gpt-4", "claude-3-haiku"], ["gpt-4", "mistral-large"])
+        before = {model: stage_calls(model) for model in ("gpt-4", "claude-3-haiku", "mistral-large")}
+        client.post("/session/process", json={"session_id": session, "user_input": "hello"})
+        assert {model: stage_calls(model) - count for model, count in before.items()} == {
+            "gpt-4": 1, "claude-3-haiku": 1, "mistral-large": 1
+        }
+
+    def test_audio_output(self, client):
+        """Test audio chains speak their text stage's output, returned as a blob reference."""
+        session = start(client, ["gpt-4", "tts-1"], ["gpt-3.5-turbo", "tts-1"])
+        user_input = "Say this out loud, twice."
+        response = client.post("/session/process", json={"session_id": session, "user_input": user_input})
+        for output in (response.json()["output_a"], response.json()["output_b"]):
+            assert output["content_type"] == "audio/wav"
+            assert client.get(output["url"]).content == silent_wav(round(len(user_input) / 15, 1))
+
+
+class TestProcessStream:
+    def test_interleaved_chunks_then_done(self, client, session_id):
+        """Test chunks of both outputs interleave and the stream ends with one done event."""
+        user_input = "the quick brown fox jumps over the lazy dog"
+        response = client.post("/session/process/stream", json={"session_id": session_id, "user_input": user_input})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = sse_events(response)
+        assert [name for name, _ in events[:-1]] == ["chunk"] * (len(events) - 1)
+        assert events[-1][0] == "done" and events[-1][1]["output"] is None
+        assert len({data["matchup_id"] for _, data in events}) == 1
+
+        labels = [data["output"] for _, data in events[:-1]]
+        first_b = labels.index("B")
+        assert "A" in labels[first_b:]
+        text = {label: "".join(data["chunk"] for _, data in events[:-1] if data["output"] == label) for label in "AB"}
+        assert text == {"A": user_input, "B": user_input}
+
+    def test_every_stage_runs(self, client):
+        """Test a streamed chain runs each of its stages, each consuming the previous one's stream."""
+        session = start(client, ["gpt-4", "claude-3-haiku"], ["gpt-3.5-turbo", "mistral-large"])
+        before = {model: stage_calls(model) for model in ("gpt-4", "claude-3-haiku", "gpt-3.5-turbo", "mistral-large")}
+        response = client.post("/session/process/stream", json={"session_id": session, "user_input": "one two three"})
+        assert sse_events(response)[-1][0] == "done"
+        assert all(stage_calls(model) == count + 1 for model, count in before.items())
+
+    def test_speech_follows_text_stage(self, client):
+        """Test an LLM->TTS chain speaks its text stage's streamed output, one audio chunk per sentence."""
+        session = start(client, ["gpt-4", "tts-1"], ["gpt-3.5-turbo", "tts-1"])
+        sentences = ["The first sentence is here.", "And this is the second one!"]
+        response = client.post(
+            "/session/process/stream", json={"session_id": session, "user_input": " ".join(sentences)}
+        )
+        events = sse_events(response)
+        assert events[-1][0] == "done"
+        for label in "AB":
+            chunks = [data for _, data in events[:-1] if data["output"] == label]
+            assert {data["encoding"] for data in chunks} == {"base64"}
+            assert [base64.b64decode(data["chunk"]) for data in chunks] == [
+                silent_wav(round(len(sentence) / 15, 1)) for sentence in sentences
+            ]
+
+    def test_error_event(self, client, session_id, monkeypatch):
+        """Test a failing chain ends the stream with an error event instead of done."""
+        async def failing(self, chunks):
+            yield "partial "
+            raise RuntimeError("provider unavailable")
+
+        monkeypatch.setattr(RegistryModel, "astream", failing)
+        events = sse_events(
+            client.post("/session/process/stream", json={"session_id": session_id, "user_input": "hi"})
+        )
+        name, data = events[-1]
+        assert events[0][0] == "chunk"
+        assert name == "error" and data["error"] == "provider unavailable"
+        assert "done" not in [name for name, _ in events]
+
+    def test_unknown_session(self, client):
+        """Test streaming for an unknown session is a 404, not an empty stream."""
+        response = client.post("/session/process/stream", json={"session_id": "missing", "user_input": "hi"})
+        assert response.status_code == 404
+
+
+class TestLeaderboard:
+    def test_page(self, client, session_id):
+        """Test limit and offset select a page of the ranking, with ranks counted from the first chain."""
+        entries = client.get(f"/session/{session_id}/leaderboard").json()["entries"]
+        assert [entry["rank"] for entry in entries] == [0, 1]
+        response = client.get(f"/session/{session_id}/leaderboard", params={"limit": 1, "offset": 1})
+        assert response.status_code == 200 and response.json()["entries"] == entries[1:]
+
+    def test_invalid_page(self, client, session_id):
+        """Test a negative offset or a limit below one is refused with 422."""
+        for params in ({"offset": -1}, {"limit": 0}, {"limit": -1}):
+            response = client.get(f"/session/{session_id}/leaderboard", params=params)
+            assert response.status_code == 422, params
+
+
+def ndjson(*objects) -> bytes:
+    return b"".join(json.dumps(obj).encode() + b"\n" for obj in objects)
+
+
+def bulk_results(response) -> list[dict]:
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def new_matchup(client, session_id) -> str:
+    return client.post("/session/process", json={"session_id": session_id, "user_input": "hi"}).json()["matchup_id"]
+
+
+def bulk_exchange(client, messages: list[dict]) -> list:
+    """
+    Call /session/vote/bulk on the app directly, receiving `messages` one at a time.
+
+    Returns the type of each message as the app takes it, and the line numbers
+    of each response chunk as it is sent, in the order they happened.
+    """
+    messages = list(messages)
+    events = []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": "/session/vote/bulk", "raw_path": b"/session/vote/bulk", "root_path": "", "query_string": b"",
+        "headers": [], "server": ("testserver", 80),
+    }
+
+    async def receive():
+        message = messages.pop(0)
+        events.append(message["type"])
+        return message
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message["body"]:
+            events.append([json.loads(line)["line"] for line in message["body"].splitlines()])
+
+    client.portal.call(main.app, scope, receive, send)
+    return events
+
+
+async def body(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def lines(*chunks) -> list:
+    return [line async for line in main._ndjson_lines(body(*chunks))]
+
+
+class TestProcessBatch:
+    def test_results_in_input_order(self, client, session_id):
+        """Test every input gets its own stored matchup, in input order."""
+        response = client.post(
+            "/session/process/batch", json={"session_id": session_id, "user_inputs": ["one", "two", "three"]}
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert len(results) == 3 and len({result["matchup_id"] for result in results}) == 3
+        for result, user_input in zip(results, ["one", "two", "three"]):
+            assert result["error"] is None
+            assert result["output_a"] == result["output_b"] == user_input
+
+        votes = ndjson(*({"session_id": session_id, "matchup_id": r["matchup_id"], "vote": "A"} for r in results))
+        assert [r["status"] for r in bulk_results(client.post("/session/vote/bulk", content=votes))] == [200] * 3
+
+    def test_failed_input_does_not_fail_batch(self, client, session_id, monkeypatch):
+        """Test an input whose chains fail gets an error while the others get outputs."""
+        run_matchup = main._run_matchup
+        calls = []
+
+        async def second_fails(session, chain_a, chain_b, user_input):
+            calls.append(None)
+            if len(calls) == 2:
+                raise RuntimeError("provider unavailable")
+            return await run_matchup(session, chain_a, chain_b, user_input)
+
+        monkeypatch.setattr(main, "_run_matchup", second_fails)
+        response = client.post("/session/process/batch", json={"session_id": session_id, "user_inputs": ["a", "b", "c"]})
+        assert response.status_code == 200
+        errors = [result["error"] for result in response.json()["results"]]
+        assert errors == [None, "provider unavailable", None]
+        assert response.json()["results"][1]["matchup_id"]
+
+    def test_too_many_inputs(self, client, session_id, monkeypatch):
+        """Test batches over MAX_BATCH_SIZE are refused."""
+        monkeypatch.setattr(main, "MAX_BATCH_SIZE", 2)
+        response = client.post("/session/process/batch", json={"session_id": session_id, "user_inputs": ["a"] * 3})
+        assert response.status_code == 400
+
+    def test_unknown_session(self, client):
+        """Test batches for an unknown session answer 404."""
+        response = client.post("/session/process/batch", json={"session_id": "missing", "user_inputs": ["a"]})
+        assert response.status_code == 404
+
+
+class TestBulkVotes:
+    def test_status_per_line(self, client, session_id, monkeypatch):
+        """Test each line gets the status /session/vote would give it, across batches, in order."""
+        monkeypatch.setattr(main, "BULK_VOTE_BATCH", 3)
+        first, second = new_matchup(client, session_id), new_matchup(client, session_id)
+        upload = b"".join([
+            ndjson({"session_id": session_id, "matchup_id": first, "vote": "A"}),
+            b"\n   \n",
+            ndjson(
+                {"session_id": session_id, "matchup_id": first, "vote": "B"},
+                {"session_id": session_id, "matchup_id": second, "vote": "sideways"},
+                {"session_id": session_id, "matchup_id": "missing", "vote": "A"},
+                {"session_id": "missing", "matchup_id": second, "vote": "A"},
+                {"session_id": session_id, "vote": "A"},
+            ),
+            b"not json\n",
+            ndjson({"session_id": session_id, "matchup_id": second, "vote": "tie"}),
+            ndjson({"session_id": session_id, "matchup_id": second, "vote": "tie"})[:-1],
+        ])
+        results = bulk_results(client.post("/session/vote/bulk", content=upload))
+        assert [(r["line"], r["status"]) for r in results] == [
+            (1, 200), (4, 409), (5, 400), (6, 404), (7, 404), (8, 422), (9, 422), (10, 200), (11, 409)
+        ]
+        assert results[0] == {"line": 1, "session_id": session_id, "matchup_id": first, "status": 200, "error": None}
+        assert results[2]["error"].startswith("Invalid vote")
+        assert results[3]["error"] == "Matchup not found" and results[4]["error"] == "Session not found"
+        assert "matchup_id" in results[5]["error"]
+
+    def test_line_over_limit(self, client, session_id, monkeypatch):
+        """Test an overlong line is refused on its own without affecting the next line."""
+        monkeypatch.setattr(main, "BULK_VOTE_MAX_LINE", 200)
+        matchup = new_matchup(client, session_id)
+        upload = ndjson(
+            {"session_id": session_id, "matchup_id": matchup, "vote": "A", "padding": "x" * 300},
+            {"session_id": session_id, "matchup_id": matchup, "vote": "A"},
+        )
+        results = bulk_results(client.post("/session/vote/bulk", content=upload))
+        assert [(r["line"], r["status"]) for r in results] == [(1, 413), (2, 200)]
+
+    def test_results_stream_per_batch(self, client, session_id, monkeypatch):
+        """Test each batch's results are sent before the rest of the body is read."""
+        monkeypatch.setattr(main, "BULK_VOTE_BATCH", 2)
+        votes = [
+            ndjson({"session_id": session_id, "matchup_id": new_matchup(client, session_id), "vote": "A"})
+            for _ in range(3)
+        ]
+        events = bulk_exchange(client, [
+            {"type": "http.request", "body": votes[0] + votes[1], "more_body": True},
+            {"type": "http.request", "body": votes[2]},
+        ])
+        assert events == ["http.request", [1, 2], "http.request", [3]]
+
+    def test_client_disconnect(self, client, session_id, monkeypatch):
+        """Test a client leaving mid-upload ends the response, keeping the batches already applied."""
+        monkeypatch.setattr(main, "BULK_VOTE_BATCH", 1)
+        matchup = new_matchup(client, session_id)
+        vote = ndjson({"session_id": session_id, "matchup_id": matchup, "vote": "A"})
+        events = bulk_exchange(client, [
+            {"type": "http.request", "body": vote, "more_body": True}, {"type": "http.disconnect"}
+        ])
+        assert events == ["http.request", [1], "http.disconnect"]
+        response = client.post("/session/vote", json={"session_id": session_id, "matchup_id": matchup, "vote": "B"})
+        assert response.status_code == 409
+
+    def test_empty_body(self, client):
+        """Test an empty upload answers an empty result list."""
+        response = client.post("/session/vote/bulk", content=b"")
+        assert response.status_code == 200 and response.text == ""
+
+
+class TestNdjsonLines:
+    def test_lines_across_chunks(self):
+        """Test lines split across chunks are joined, blank lines skipped and the last line kept."""
+        assert asyncio.run(lines(b'{"a"', b': 1}\n\n{"b": 2}\n  \n{"c"', b": 3}")) == [
+            (1, b'{"a": 1}'), (3, b'{"b": 2}'), (5, b'{"c": 3}')
+        ]
+
+    def test_long_lines_are_not_buffered(self, monkeypatch):
+        """Test lines over the limit are yielded as None, wherever the chunks split them."""
+        monkeypatch.setattr(main, "BULK_VOTE_MAX_LINE", 8)
+        assert asyncio.run(lines(b"short\n0123", b"456789", b"abc\nok\n", b"0123456789")) == [
+            (1, b"short"), (2, None), (3, b"ok"), (4, None)
+        ]
@@ -0,0 +1,121 @@
+import json
+import os
+import re
+import time
+
+from arena import MetricsRegistry, render_snapshots
+from server import main
+from server.metrics import REGISTRY, other_workers, publish, retract
+
+# File names of workers that are not this process
+OTHER, STOPPED = "999999991.json", "999999992.json"
+
+
+def worker_snapshot(votes: int) -> dict:
+    """Snapshot of another worker that counted `votes` successful votes and one extra metric."""
+    registry = MetricsRegistry()
+    registry.counter("chainalign_votes_total", "Votes received, by response status", ("status",)).inc(("200",), votes)
+    registry.gauge("chainalign_test_only", "Only published by the other worker").set((), 7)
+    return registry.snapshot()
+
+
+def write_worker(directory, name: str, snapshot: dict, age: float = 0) -> None:
+    """Publish a snapshot as another worker would, last written `age` seconds ago."""
+    path = os.path.join(directory, name)
+    with open(path, "w") as file:
+        json.dump(snapshot, file)
+    then = time.time() - age
+    os.utime(path, (then, then))
+
+
+def sample(text: str, series: str) -> float:
+    """Value of one series in a Prometheus text exposition."""
+    match = re.search(rf"^{re.escape(series)} (\S+)$", text, re.MULTILINE)
+    assert match, series
+    return float(match.group(1))
+
+
+def histogram(name: str) -> dict:
+    """Series of one of this process's histograms, by label values."""
+    return {tuple(values): value for values, value in REGISTRY.snapshot()[name]["series"]}
+
+
+def own_votes() -> float:
+    """Successful votes counted by this process so far."""
+    series = dict((tuple(values), value) for values, value in REGISTRY.snapshot()["chainalign_votes_total"]["series"])
+    return series.get(("200",), 0)
+
+
+class TestWorkerSnapshots:
+    def test_merges_other_workers(self, tmp_path):
+        """Test other workers' snapshots are read back, without this process's own, and sum when rendered."""
+        publish(str(tmp_path), worker_snapshot(1))
+        write_worker(tmp_path, OTHER, worker_snapshot(2))
+        (tmp_path / "notes.txt").write_text("not a snapshot")
+
+        others = other_workers(str(tmp_path), max_age=60)
+        assert others == [worker_snapshot(2)]
+        text = render_snapshots([worker_snapshot(1), *others])
+        assert sample(text, 'chainalign_votes_total{status="200"}') == 3
+        assert sample(text, "chainalign_test_only") == 14
+
+    def test_stale_snapshots_removed(self, tmp_path):
+        """Test snapshots older than `max_age` are skipped and deleted, and half-written ones skipped."""
+        write_worker(tmp_path, OTHER, worker_snapshot(2), age=10)
+        write_worker(tmp_path, STOPPED, worker_snapshot(5), age=100)
+        (tmp_path / "999999993.json").write_text('{"chainalign')
+
+        assert other_workers(str(tmp_path), max_age=60) == [worker_snapshot(2)]
+        assert sorted(os.listdir(tmp_path)) == [OTHER, "999999993.json"]
+
+    def test_retract(self, tmp_path):
+        """Test retract removes only this process's snapshot, and tolerates it being gone."""
+        publish(str(tmp_path), worker_snapshot(1))
+        write_worker(tmp_path, OTHER, worker_snapshot(2))
+        retract(str(tmp_path))
+        retract(str(tmp_path))
+        assert os.listdir(tmp_path) == [OTHER]
+
+    def test_missing_directory(self, tmp_path):
+        """Test no other workers are found before any worker has published."""
+        assert other_workers(str(tmp_path / "metrics"), max_age=60) == []
+
+
+class TestStageMetrics:
+    def test_streamed_chain_times_every_stage(self, client, session_id):
+        """Test streaming a text chain records the total time and time to first chunk of each of its models."""
+        models = ("gpt-4", "claude-3-haiku", "gpt-3.5-turbo")
+        before = histogram("chainalign_stage_seconds"), histogram("chainalign_stage_first_chunk_seconds")
+        response = client.post(
+            "/session/process/stream", json={"session_id": session_id, "user_input": "one two three"}
+        )
+        assert response.status_code == 200
+        seconds, first_chunk = histogram("chainalign_stage_seconds"), histogram("chainalign_stage_first_chunk_seconds")
+
+        def count(series: dict, key: tuple) -> int:
+            return series[key]["count"] if key in series else 0
+
+        for model in models:
+            assert count(seconds, (model, "ok")) == count(before[0], (model, "ok")) + 1
+            assert count(first_chunk, (model,)) == count(before[1], (model,)) + 1
+        text = client.get("/metrics").text
+        for model in models:
+            assert f'chainalign_stage_first_chunk_seconds_count{{model="{model}"}}' in text
+
+
+class TestMetricsEndpoint:
+    def test_exposition_merges_workers(self, client, tmp_path, monkeypatch):
+        """Test /metrics renders this worker's live metrics summed with the other workers' recent snapshots."""
+        monkeypatch.setattr(main, "METRICS_DIR", str(tmp_path))
+        write_worker(tmp_path, OTHER, worker_snapshot(1000))
+        write_worker(tmp_path, STOPPED, worker_snapshot(5), age=10 * main.METRICS_INTERVAL)
+
+        votes = own_votes()
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == main.METRICS_CONTENT_TYPE
+        text = response.text
+        assert "# TYPE chainalign_votes_total counter" in text
+        assert sample(text, 'chainalign_votes_total{status="200"}') == votes + 1000
+        assert sample(text, "chainalign_test_only") == 7
+        assert not (tmp_path / STOPPED).exists()
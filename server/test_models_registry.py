@@ -0,0 +1,76 @@
+import itertools
+import json
+
+import pytest
+from server.models_registry import AVAILABLE_MODELS, find_models, get_models_by_type, models_json
+from server.schemas import MediaType
+
+PROVIDERS = [None, "OpenAI", "openai", "ElevenLabs", "Nobody"]
+CAPABILITIES = [None, "text-generation", "text-to-speech", "speech-to-text", "vision", "telepathy"]
+TYPES = [None, *MediaType]
+
+
+def expected(provider, capability, input_type, output_type) -> list[str]:
+    """IDs of the registry models matching every given filter, checked one model at a time."""
+    return [
+        model.id
+        for model in AVAILABLE_MODELS
+        if (provider is None or model.provider.lower() == provider.lower())
+        and (capability is None or capability in (model.capabilities or []))
+        and (input_type is None or model.input_type == input_type)
+        and (output_type is None or model.output_type == output_type)
+    ]
+
+
+class TestFindModels:
+    def test_filter_combinations(self):
+        """Test every combination of filters matches a model-by-model scan, in registry order."""
+        for filters in itertools.product(PROVIDERS, CAPABILITIES, TYPES, TYPES):
+            assert [model.id for model in find_models(*filters)] == expected(*filters), filters
+
+    def test_filters_narrow_results(self):
+        """Test a few combinations by hand: case-insensitive providers, types and capabilities together."""
+        assert [model.id for model in find_models("openai", input_type=MediaType.AUDIO)] == ["whisper-1"]
+        assert {model.id for model in find_models("OpenAI", "text-to-speech")} == {"tts-1"}
+        assert find_models("Nobody") == [] and find_models(capability="telepathy") == []
+        assert get_models_by_type(output_type=MediaType.AUDIO) == find_models(output_type=MediaType.AUDIO)
+
+
+class TestModelsJson:
+    def test_cached_and_stable(self):
+        """Test each filter combination is serialized once, with the same ETag on every call."""
+        body, etag = models_json("OpenAI", None, None, None)
+        assert models_json("OpenAI", None, None, None) is models_json("OpenAI", None, None, None)
+        assert models_json("OpenAI", None, None, None) == (body, etag)
+        assert [model["id"] for model in json.loads(body)] == expected("OpenAI", None, None, None)
+        assert models_json("Anthropic", None, None, None)[1] != etag
+
+    def test_etag_follows_content(self):
+        """Test filters that select the same models get the same ETag."""
+        assert models_json("openai", None, None, None)[1] == models_json("OpenAI", None, None, None)[1]
+
+
+class TestModelsEndpoint:
+    def test_filters_and_etag(self, client):
+        """Test the endpoint applies query filters and answers the same ETag on every request."""
+        response = client.get("/models", params={"provider": "openai", "input_type": "audio"})
+        assert response.status_code == 200
+        assert [model["id"] for model in response.json()] == ["whisper-1"]
+        again = client.get("/models", params={"provider": "openai", "input_type": "audio"})
+        assert again.headers["etag"] == response.headers["etag"]
+        assert client.get("/models").headers["etag"] != response.headers["etag"]
+
+    @pytest.mark.parametrize("header", ["{etag}", '"stale", {etag}', "W/{etag}", "*"])
+    def test_not_modified(self, client, header):
+        """Test a matching If-None-Match answers 304 with the ETag and no body."""
+        etag = client.get("/models").headers["etag"]
+        response = client.get("/models", headers={"If-None-Match": header.format(etag=etag)})
+        assert response.status_code == 304 and response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_modified(self, client):
+        """Test a stale or partial ETag gets the full body."""
+        etag = client.get("/models").headers["etag"]
+        for header in ('"stale"', etag[:-2] + '"', etag[1:-1]):
+            response = client.get("/models", headers={"If-None-Match": header})
+            assert response.status_code == 200 and len(response.json()) == len(AVAILABLE_MODELS)
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import time
+import uuid
+
+import pytest
+from arena import ArenaBase, Model, ModelChain, VoteOutcome
+from arena.wal import HEADER_SIZE, RECORD_SIZE
+from server.session_store import DuplicateVote, SessionStore
+
+CHAINS = [["a", "b"], ["c"], ["d"]]
+
+
+def build_arena(model_chains) -> ArenaBase:
+    return ArenaBase([ModelChain([Model(name, str) for name in chain]) for chain in model_chains])
+
+
+def open_store(root, **options) -> SessionStore:
+    return SessionStore(str(root), build_arena, **options)
+
+
+async def add_matchup(session, user_input: str = "hi") -> str:
+    matchup_id = str(uuid.uuid4())
+    await session.add_matchup(matchup_id, *session.generate_matchup(), user_input)
+    return matchup_id
+
+
+async def vote(session, outcome: VoteOutcome = VoteOutcome.A) -> None:
+    await session.add_vote(await add_matchup(session), outcome)
+
+
+def leaderboard(session) -> list:
+    return [(chain.names, rating) for chain, rating in session.snapshot().chain_leaderboard]
+
+
+class TestMatchups:
+    def test_keeps_most_recent_per_session(self, tmp_path):
+        """Test matchups beyond `max_matchups` are dropped oldest first, one session at a time."""
+        async def run():
+            store = open_store(tmp_path, max_matchups=3)
+            session, other = await store.create(CHAINS), await store.create(CHAINS)
+            kept = await add_matchup(other)
+            single = [await add_matchup(session) for _ in range(2)]
+            batch = [(str(uuid.uuid4()), *session.generate_matchup(), str(i)) for i in range(2)]
+            await session.add_matchups(batch)
+
+            assert await session.get_matchup(single[0]) is None
+            assert (await session.get_matchup(single[1]))["user_input"] == "hi"
+            assert [(await session.get_matchup(matchup[0]))["user_input"] for matchup in batch] == ["0", "1"]
+            assert await other.get_matchup(kept) is not None
+            await store.close()
+
+        asyncio.run(run())
+
+
+class TestVotes:
+    def test_unknown_and_duplicate_votes(self, tmp_path):
+        """Test add_votes reports unknown matchups and second votes, from any worker."""
+        async def run():
+            store, other = open_store(tmp_path), open_store(tmp_path)
+            session = await store.create(CHAINS)
+            first, second = await add_matchup(session), await add_matchup(session)
+
+            errors = await session.add_votes(
+                [(first, VoteOutcome.A), (str(uuid.uuid4()), VoteOutcome.B), (first, VoteOutcome.TIE)]
+            )
+            assert errors[0] is None
+            assert isinstance(errors[1], KeyError) and isinstance(errors[2], DuplicateVote)
+
+            elsewhere = await other.get(session.session_id)
+            with pytest.raises(DuplicateVote):
+                await elsewhere.add_vote(first, VoteOutcome.B)
+            await elsewhere.add_vote(second, VoteOutcome.B)
+            with pytest.raises(DuplicateVote):
+                await session.add_vote(second, VoteOutcome.A)
+            logged, _ = other.wal.read()
+            assert [record.outcome for record in logged] == [VoteOutcome.A, VoteOutcome.B]
+            await store.close()
+            await other.close()
+
+        asyncio.run(run())
+
+
+class TestMemoryTier:
+    def test_least_recently_used_are_evicted(self, tmp_path):
+        """Test handles beyond `max_sessions` leave memory LRU first and load again on access."""
+        async def run():
+            store = open_store(tmp_path, max_sessions=2)
+            first, second = await store.create(CHAINS), await store.create(CHAINS)
+            assert await store.get(first.session_id) is first
+            third = await store.create(CHAINS)
+            assert store.loaded() == [first, third]
+            assert store._evicted == [second]
+
+            reloaded = await store.get(second.session_id)
+            assert reloaded is not second and reloaded.model_chains == CHAINS
+            assert store.loaded() == [third, reloaded]
+            assert store._evicted == [second, first]
+            assert await store.get(str(uuid.uuid4())) is None
+            await store.close()
+
+        asyncio.run(run())
+
+    def test_expiry_across_workers(self, tmp_path):
+        """Test idle sessions are deleted for every worker, unless any worker served them recently."""
+        async def run():
+            workers = [open_store(tmp_path, ttl=100), open_store(tmp_path, ttl=100)]
+            active, idle = await workers[0].create(CHAINS), await workers[0].create(CHAINS)
+            served = await workers[1].get(active.session_id)
+            await workers[1].get(idle.session_id)
+            # Activity only the second worker has seen so far
+            now = time.time()
+            served.last_active = now + 1000
+
+            assert await workers[0].expire(now + 50) == []
+            assert await workers[1].expire(now + 500) == [idle.session_id]
+            assert not os.path.exists(workers[1].session_directory(idle.session_id))
+            assert workers[1].loaded() == [served]
+
+            # The first worker drops its handle on the deleted session, and
+            # sees the activity the second one persisted
+            assert await workers[0].expire(now + 500) == []
+            assert workers[0].loaded() == [active]
+            assert workers[0]._evicted[-1] is idle and idle.expired
+            for worker in workers:
+                await worker.close()
+
+        asyncio.run(run())
+
+
+class TestWriter:
+    def test_lease_takeover(self, tmp_path):
+        """Test one worker writes a session, and another takes over from its checkpoint when it stops."""
+        async def run():
+            workers = [open_store(tmp_path), open_store(tmp_path)]
+            writing = await workers[0].create(CHAINS)
+            reading = await workers[1].get(writing.session_id)
+            await workers[0].sync()
+            await workers[1].sync()
+            assert writing.is_writer and not reading.is_writer
+
+            for outcome in (VoteOutcome.A, VoteOutcome.B, VoteOutcome.A):
+                await vote(reading, outcome)
+            await workers[0].sync()
+            assert await workers[0].checkpoint(force=True) == 1
+            ratings = leaderboard(reading)
+            assert ratings == leaderboard(writing)
+            assert len({rating for _, rating in ratings}) > 1
+
+            await workers[0].close()
+            await workers[1].sync()
+            assert reading.is_writer
+            assert leaderboard(reading) == ratings
+
+            await vote(reading, VoteOutcome.B)
+            await workers[1].sync()
+            await workers[1].checkpoint(force=True)
+            assert leaderboard(reading) != ratings
+            await workers[1].close()
+
+        asyncio.run(run())
+
+
+class TestCompaction:
+    def test_archives_only_covered_segments(self, tmp_path):
+        """Test a log segment is archived once every session with votes in it has a checkpoint past it."""
+        async def run():
+            # Two votes per segment
+            store = open_store(tmp_path, segment_size=HEADER_SIZE + 2 * RECORD_SIZE)
+            first, second = await store.create(CHAINS), await store.create(CHAINS)
+            for session in (first, first, first, first, second, second, first, first):
+                await vote(session)
+            assert store.wal.segments() == [1, 2, 3, 4]
+
+            await store.sync()
+            assert await first.checkpoint()
+            assert await asyncio.to_thread(store.compact) == [1, 2]
+            assert store.wal.segments() == [3, 4]
+            assert sorted(os.listdir(tmp_path / "archive")) == [
+                os.path.basename(store.wal.segment_path(segment)) for segment in (1, 2)
+            ]
+
+            assert await second.checkpoint()
+            assert await asyncio.to_thread(store.compact) == [3]
+            await store.close()
+
+        asyncio.run(run())
@@ -0,0 +1,116 @@
+import hashlib
+import os
+
+import pytest
+from server import main
+from server.models_registry import silent_wav
+
+AUDIO = silent_wav(0.5)
+BOUNDARY = "chainalign-test-boundary"
+
+
+def multipart(*parts: tuple[str, str, bytes], closed: bool = True) -> bytes:
+    """Multipart/form-data body from (field name, content type or "" for a plain field, content) parts."""
+    body = b""
+    for name, content_type, content in parts:
+        body += f"--{BOUNDARY}\r\n".encode()
+        if content_type:
+            body += f'Content-Disposition: form-data; name="{name}"; filename="{name}.bin"\r\n'.encode()
+            body += f"Content-Type: {content_type}\r\n\r\n".encode()
+        else:
+            body += f'Content-Disposition: form-data; name="{name}"\r\n\r\n'.encode()
+        body += content + b"\r\n"
+    if closed:
+        body += f"--{BOUNDARY}--\r\n".encode()
+    return body
+
+
+def incoming() -> list[str]:
+    return os.listdir(os.path.join(main.blobs.root, "incoming"))
+
+
+@pytest.fixture
+def audio_session(client):
+    """A session whose chains take audio."""
+    response = client.post("/session/start", json={"model_chains": [["whisper-1"], ["whisper-1", "gpt-4"]]})
+    return response.json()["session_id"]
+
+
+def upload(client, session_id: str, content, content_type: str):
+    return client.post(
+        "/session/process/upload",
+        params={"session_id": session_id},
+        content=content,
+        headers={"Content-Type": content_type},
+    )
+
+
+class TestUploads:
+    def test_raw_audio(self, client, audio_session):
+        """Test a raw audio body is stored as a blob and run through the session's next matchup."""
+        response = upload(client, audio_session, AUDIO, "audio/wav")
+        assert response.status_code == 200
+        body = response.json()
+        assert body["session_id"] == audio_session and body["matchup_id"]
+        blob = main.blobs.get(hashlib.sha256(AUDIO).hexdigest())
+        # The stand-in speech-to-text model passes on the reference it gets
+        assert body["output_a"] == body["output_b"] == f"/blobs/{blob.digest}"
+
+        assert blob.content_type == "audio/wav" and blob.size == len(AUDIO)
+        assert client.get(f"/blobs/{blob.digest}").content == AUDIO
+
+    def test_multipart_after_form_field(self, client, audio_session):
+        """Test the first file part is stored, past form fields before it."""
+        body = multipart(("note", "", b"hello"), ("audio", "audio/wav", AUDIO), ("extra", "", b"ignored"))
+        response = upload(client, audio_session, body, f"multipart/form-data; boundary={BOUNDARY}")
+        assert response.status_code == 200
+        blob = main.blobs.get(hashlib.sha256(AUDIO).hexdigest())
+        assert blob is not None and blob.content_type == "audio/wav"
+
+    def test_declared_size_too_large(self, client, audio_session, monkeypatch):
+        """Test a Content-Length over the limit is refused before the body is read."""
+        monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 100)
+        response = upload(client, audio_session, AUDIO, "audio/wav")
+        assert response.status_code == 413
+        assert incoming() == []
+
+    def test_streamed_size_too_large(self, client, audio_session, monkeypatch):
+        """Test a body without Content-Length is stopped once it exceeds the limit."""
+        monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 100)
+        chunks = iter([AUDIO[:64], AUDIO[64:128], AUDIO[128:]])
+        response = upload(client, audio_session, chunks, "audio/wav")
+        assert response.status_code == 413
+        assert incoming() == []
+
+    @pytest.mark.parametrize("content_type", ["image/png", "text/plain", "application/octet-stream"])
+    def test_unsupported_media(self, client, audio_session, content_type):
+        """Test media the session's chains do not take is refused."""
+        assert upload(client, audio_session, AUDIO, content_type).status_code == 415
+
+    def test_text_session(self, client, session_id):
+        """Test sessions of text chains take no uploads."""
+        assert upload(client, session_id, AUDIO, "audio/wav").status_code == 415
+
+    def test_multipart_without_boundary(self, client, audio_session):
+        """Test multipart bodies must declare their boundary."""
+        body = multipart(("audio", "audio/wav", AUDIO))
+        assert upload(client, audio_session, body, "multipart/form-data").status_code == 400
+
+    def test_malformed_multipart(self, client, audio_session):
+        """Test a body that does not parse as the multipart it declares is refused, keeping nothing."""
+        body = b"this is not multipart at all\r\n" * 8
+        response = upload(client, audio_session, body, f"multipart/form-data; boundary={BOUNDARY}")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Malformed multipart upload"
+        assert incoming() == []
+
+    @pytest.mark.parametrize("closed", [True, False])
+    def test_multipart_without_file(self, client, audio_session, closed):
+        """Test a multipart body that ends before any file part is refused."""
+        body = multipart(("note", "", b"hello"), closed=closed)
+        response = upload(client, audio_session, body, f"multipart/form-data; boundary={BOUNDARY}")
+        assert response.status_code == 400
+
+    def test_unknown_session(self, client):
+        """Test uploads to unknown sessions answer 404."""
+        assert upload(client, "missing", AUDIO, "audio/wav").status_code == 404
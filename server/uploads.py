@@ -0,0 +1,184 @@
+"""
+Streaming uploads of non-text chain inputs (audio, images, video).
+
+The request body is read from the ASGI stream chunk by chunk and spooled
+into the blob store as it arrives, so memory stays flat however large or
+numerous concurrent uploads are, and the size limit stops an upload as soon
+as it is exceeded rather than after buffering it. Two encodings are
+accepted: the raw media as the body (its own `Content-Type`), or
+`multipart/form-data` whose first file part is the media.
+"""
+
+from typing import AsyncIterator, Collection, Optional
+
+from python_multipart import MultipartParser
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import parse_options_header
+from starlette.requests import Request
+
+from server.blob_store import BlobStore, BlobTooLarge, StoredBlob
+from server.schemas import MediaType
+
+_MEDIA_PREFIXES = {
+    b"audio/": MediaType.AUDIO,
+    b"image/": MediaType.IMAGE,
+    b"video/": MediaType.VIDEO,
+}
+
+
+class UploadError(Exception):
+    """
+    An upload that cannot be accepted.
+
+    Attributes:
+        status_code: HTTP status to answer with
+    """
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+
+
+def media_type_of(content_type: bytes) -> Optional[MediaType]:
+    """Non-text media type of a MIME type (parameters stripped), or None."""
+    for prefix, media_type in _MEDIA_PREFIXES.items():
+        if content_type.lower().startswith(prefix):
+            return media_type
+    return None
+
+
+async def receive_upload(
+    request: Request, blobs: BlobStore, max_size: int, accepted: Collection[MediaType]
+) -> tuple[StoredBlob, MediaType]:
+    """
+    Spool an uploaded input into the blob store.
+
+    Args:
+        request: Request whose body is the upload (not yet read)
+        blobs: Store to spool the content into
+        max_size: Largest accepted request body in bytes
+        accepted: Media types the receiving chains take
+
+    Returns:
+        The stored input and its media type
+
+    Raises:
+        UploadError: 413 if the body exceeds `max_size`, 415 for media the
+            chains do not take, 400 for malformed multipart bodies
+    """
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_size:
+        raise UploadError(413, f"Upload exceeds {max_size} bytes")
+    body = _limited(request.stream(), max_size)
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    if content_type == b"multipart/form-data":
+        if b"boundary" not in options:
+            raise UploadError(400, "Multipart upload without a boundary")
+        upload = _MultipartFile(body, options[b"boundary"])
+        content_type = await upload.begin()
+        chunks = upload.chunks()
+    else:
+        chunks = body
+
+    media_type = media_type_of(content_type)
+    if media_type is None or media_type not in accepted:
+        raise UploadError(415, f"The session's chains do not take {content_type.decode(errors='replace')!r} input")
+    try:
+        blob = await blobs.put_stream(chunks, content_type.decode("latin-1"), max_size=max_size)
+    except BlobTooLarge:
+        raise UploadError(413, f"Upload exceeds {max_size} bytes")
+    return blob, media_type
+
+
+async def _limited(body: AsyncIterator[bytes], max_size: int) -> AsyncIterator[bytes]:
+    """Pass body chunks through, failing once more than `max_size` bytes arrived."""
+    received = 0
+    async for chunk in body:
+        received += len(chunk)
+        if received > max_size:
+            raise UploadError(413, f"Upload exceeds {max_size} bytes")
+        yield chunk
+
+
+class _MultipartFile:
+    """
+    The first file part of a streamed multipart/form-data body.
+
+    Feeds body chunks to an incremental parser only as fast as the file's
+    data is consumed; other parts (form fields) are skipped.
+    """
+
+    def __init__(self, body: AsyncIterator[bytes], boundary: bytes):
+        self._body = body
+        self._parser = MultipartParser(boundary, callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+        self._headers: dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._in_file = False
+        self._finished = False
+        self._pending: list[bytes] = []
+        self.content_type: Optional[bytes] = None
+
+    async def _feed(self) -> None:
+        chunk = await anext(self._body, None)
+        if chunk is None:
+            raise UploadError(400, "Multipart upload ended before its file part did")
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError as exc:
+            raise UploadError(400, "Malformed multipart upload") from exc
+
+    async def begin(self) -> bytes:
+        """Read up to the file part's headers and return its content type."""
+        while self.content_type is None:
+            await self._feed()
+        return self.content_type
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        """The file part's content, as it arrives."""
+        while True:
+            pending, self._pending = self._pending, []
+            for data in pending:
+                yield data
+            if self._finished:
+                return
+            await self._feed()
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, disposition = parse_options_header(self._headers.get(b"content-disposition", b""))
+        if self.content_type is None and b"filename" in disposition:
+            self._in_file = True
+            self.content_type, _ = parse_options_header(
+                self._headers.get(b"content-type", b"application/octet-stream")
+            )
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self._finished = True